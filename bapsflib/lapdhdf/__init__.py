@@ -18,3 +18,14 @@ and read out (:meth:`~bapsflib.lapdhdf.files.File.read_data` and
 data written into HDF5 files generated by the LaPD DAQ system.
 """
 from .files import File
+from .hdfcache import hdfReadCache
+from .hdfcatalog import hdfCatalog
+from .hdfchunkcache import hdfSharedChunkCache
+from .hdfhandlepool import hdfHandlePool
+from .hdfinventory import hdfInventory
+from .hdfmetrics import (add_read_hook, remove_read_hook)
+from .hdfmultifile import hdfMultiFile
+from .hdfposition import hdfPositionIndex
+from .hdfreduce import hdfGroupReducer
+from .hdfserver import (hdfReadClient, hdfReadServer)
+from .hdfspectral import hdfSpectralReducer
@@ -9,10 +9,28 @@
 #   license terms and contributor agreement.
 #
 import h5py
+import numpy as np
+import os
 
+from .hdfcache import hdfReadCache
+from .hdfchunkcache import (hdfSharedChunkCache, open_dataset)
 from .hdfchecks import hdfCheck
+from .hdfgrid import read_grid
+from .hdfinventory import hdfInventory
+from .hdfjoint import hdfJointData
+from .hdfmapper import hdfMap
+from .hdfmmap import mmap_dataset
+from .hdfplan import (plan_read, plan_reads)
+from .hdfplasma import read_plasma
+from .hdfposition import hdfPositionIndex
+from .hdfprefetch import hdfPrefetchReader
+from .hdfreduce import reduce_data
+from .hdfspectral import (iter_fft, welch_data)
+from .hdftraverse import walk
+from .hdfwarmup import (hdfShotnumDataset, hdfWarmup)
 from .hdfreaddata import hdfReadData
 from .hdfreadcontrol import hdfReadControl
+from .hdfreadmsi import hdfReadMSI
 
 
 class File(h5py.File):
@@ -30,11 +48,66 @@ class File(h5py.File):
     :param userblock_size: Size (in bytes) of the user block. If
         nonzero, must be a power of 2 and at least 512.
     :param swmr: Single Write, Multiple Read
+    :param read_cache: cache for read results, either an instance of
+        :class:`~bapsflib.lapdhdf.hdfcache.hdfReadCache` (which can be
+        shared between files) or an `int` RAM budget (in bytes) for a
+        new cache.  :code:`None` (default) disables result caching.
+    :type read_cache: :class:`~bapsflib.lapdhdf.hdfcache.hdfReadCache`,
+        int, or :code:`None`
+    :param rdcc_nbytes: total size (in bytes) of the raw data chunk
+        cache of each dataset.  :code:`'auto'` sizes the cache of each
+        digitizer dataset from its chunk shape (see
+        :func:`~bapsflib.lapdhdf.hdfchunkcache.auto_chunk_cache`).
+        :code:`None` (default) uses the HDF5 default.
+    :type rdcc_nbytes: int, :code:`'auto'`, or :code:`None`
+    :param int rdcc_nslots: number of chunk slots in the raw data chunk
+        cache hash table
+    :param float rdcc_w0: chunk preemption policy for the raw data
+        chunk cache (0 to 1)
+    :param shared_chunk_cache: cross-process cache of decompressed
+        digitizer chunks.  :code:`None` (default) disables sharing.
+    :type shared_chunk_cache:
+        :class:`~bapsflib.lapdhdf.hdfchunkcache.hdfSharedChunkCache`
+    :param bool mmap_reads: :code:`True` (default) serves digitizer
+        reads from a memory map of the file when the dataset is
+        contiguous and unfiltered (see
+        :func:`~bapsflib.lapdhdf.hdfmmap.mmap_dataset`)
+    :param in_memory: :code:`True` loads the whole file image into RAM
+        (HDF5 :code:`'core'` driver without a backing store) so reads
+        no longer touch the disk.  :code:`'auto'` does the same only
+        if the file is no larger than :data:`in_memory_max_bytes`.
+        :code:`False` (default) reads from disk.  Only valid for
+        read-only mode and the default driver.
+    :type in_memory: bool or :code:`'auto'`
+    :param int in_memory_max_bytes: file size threshold (in bytes) for
+        :code:`in_memory='auto'` (default 512 MB)
+    :param bool warmup: :code:`True` starts a background warm-up
+        (:class:`~bapsflib.lapdhdf.hdfwarmup.hdfWarmup`) that opens all
+        mapped digitizer header and control datasets and reads their
+        shot number columns.  (default :code:`False`)
+    :param str inventory_cache: name of a JSON file used to persist
+        the file :attr:`inventory`.  If the file holds an up-to-date
+        inventory it is loaded instead of traversing the HDF5 file,
+        otherwise the inventory is built and saved to it.
+        :code:`None` (default) does not persist the inventory.
+    :param file_map: mapping of this file built by another (still
+        open) handle of the same file.  The file checks and mapping are
+        skipped and :data:`file_map` is used instead (see
+        :class:`~bapsflib.lapdhdf.hdfhandlepool.hdfHandlePool`).
+        :code:`None` (default) maps the file.
+    :type file_map: :class:`~bapsflib.lapdhdf.hdfmapper.hdfMap`
     :param kwargs: Driver specific keywords
     """
     def __init__(self, name, mode='r', driver=None, libver=None,
-                 userblock_size=None, swmr=False, **kwargs):
-        # TODO: re-work the argument pass through to h5py.File
+                 userblock_size=None, swmr=False, read_cache=None,
+                 rdcc_nbytes=None, rdcc_nslots=None, rdcc_w0=None,
+                 shared_chunk_cache=None, mmap_reads=True,
+                 in_memory=False, in_memory_max_bytes=512 * 2 ** 20,
+                 warmup=False, inventory_cache=None, file_map=None,
+                 **kwargs):
+        if file_map is not None and not isinstance(file_map, hdfMap):
+            raise TypeError('file_map must be an hdfMap or None')
+
         # TODO: add keyword save_report
         # - this will save the hdfChecks report to a text file alongside
         #   the HDF5 file
@@ -42,11 +115,101 @@ class File(h5py.File):
         # - this will prevent the report from printing to screen, but
         #   does not affect save_report
         #
-        h5py.File.__init__(self, name, mode, driver, libver,
-                           userblock_size, swmr, **kwargs)
+        # condition chunk cache keywords
+        if rdcc_nbytes == 'auto':
+            self.__auto_chunk_cache = True
+        elif rdcc_nbytes is None \
+                or (isinstance(rdcc_nbytes, int)
+                    and not isinstance(rdcc_nbytes, bool)
+                    and rdcc_nbytes >= 0):
+            self.__auto_chunk_cache = False
+            if rdcc_nbytes is not None:
+                kwargs['rdcc_nbytes'] = rdcc_nbytes
+        else:
+            raise ValueError("rdcc_nbytes must be a non-negative int, "
+                             "'auto', or None")
+        if rdcc_nslots is not None:
+            kwargs['rdcc_nslots'] = rdcc_nslots
+        if rdcc_w0 is not None:
+            kwargs['rdcc_w0'] = rdcc_w0
+        self.__rdcc = (rdcc_nslots, rdcc_w0)
+
+        # memory-mapped datasets, path -> hdfMMapDataset (or None)
+        self.__mmap_reads = bool(mmap_reads)
+        self.__mmap_dsets = {}
+
+        # opened dataset handles, path -> h5py.Dataset
+        self.__handles = {}
+
+        # file inventory (built on first use)
+        self.__inventory = None
+        self.__inventory_cache = inventory_cache
+
+        # paths of all file items (listed on first use)
+        self.__item_paths = None
+
+        # 6K position indices (built on first use), receptacle ->
+        # hdfPositionIndex
+        self.__position_index = {}
+
+        # condition in-memory keywords
+        if in_memory == 'auto':
+            try:
+                in_memory = (mode == 'r' and driver is None
+                             and os.path.getsize(name)
+                             <= in_memory_max_bytes)
+            except (OSError, TypeError):
+                in_memory = False
+        elif in_memory is True:
+            if mode != 'r' or driver is not None:
+                raise ValueError("in_memory requires mode='r' and the "
+                                 "default driver")
+        elif in_memory is not False:
+            raise ValueError("in_memory must be True, False, or 'auto'")
+        if in_memory:
+            driver = 'core'
+            kwargs['backing_store'] = False
+
+        # only pass optional h5py.File keywords that were specified
+        # so older versions of h5py are not handed unknown keywords
+        if driver is not None:
+            kwargs['driver'] = driver
+        if libver is not None:
+            kwargs['libver'] = libver
+        if userblock_size is not None:
+            kwargs['userblock_size'] = userblock_size
+        if swmr:
+            kwargs['swmr'] = swmr
+        h5py.File.__init__(self, name, mode=mode, **kwargs)
+
+        # attach read caches
+        self.read_cache = read_cache
+        self.shared_chunk_cache = shared_chunk_cache
+
+        # hooks called with the metrics of every read of this file
+        self.__read_hooks = []
+
+        self.__warmup = None
+        self.__file_map = file_map
+        self.__file_checks = None
+        if file_map is None:
+            print('Begin HDF5 Quick Report:')
+            self.__file_checks = hdfCheck(self)
 
-        print('Begin HDF5 Quick Report:')
-        self.__file_checks = hdfCheck(self)
+        # start warm-up
+        if warmup:
+            self.__warmup = hdfWarmup(self)
+
+    def close(self):
+        """Close the file (stopping any running warm-up)."""
+        if getattr(self, '_File__warmup', None) is not None:
+            self.__warmup.cancel()
+        if getattr(self, '_File__handles', None) is not None:
+            self.__handles.clear()
+        if getattr(self, '_File__mmap_dsets', None) is not None:
+            self.__mmap_dsets.clear()
+        self.__item_paths = None
+        h5py.File.close(self)
 
     @property
     def exp_descr(self):
@@ -64,17 +227,249 @@ class File(h5py.File):
         HDF5 file mappings
         (:class:`bapsflib.lapdhdf.hdfmapper.hdfMap`)
         """
+        if self.__file_map is not None:
+            return self.__file_map
         return self.__file_checks.get_hdf_mapping()
 
+    @property
+    def read_cache(self):
+        """
+        Cache of read results
+        (:class:`~bapsflib.lapdhdf.hdfcache.hdfReadCache`) used by
+        :meth:`read_data` and :meth:`read_controls`.  :code:`None` if
+        result caching is disabled.
+        """
+        return self.__read_cache
+
+    @read_cache.setter
+    def read_cache(self, val):
+        if val is None or isinstance(val, hdfReadCache):
+            self.__read_cache = val
+        elif isinstance(val, int) and not isinstance(val, bool):
+            self.__read_cache = hdfReadCache(max_bytes=val)
+        else:
+            raise TypeError('read_cache must be an hdfReadCache, int, '
+                            'or None')
+
+    @property
+    def read_hooks(self):
+        """
+        List of hooks called with the
+        :class:`~bapsflib.lapdhdf.hdfmetrics.hdfReadMetrics` of every
+        :meth:`read_data` and :meth:`read_controls` call on this file
+        (in addition to the hooks registered with
+        :func:`~bapsflib.lapdhdf.hdfmetrics.add_read_hook`).
+        """
+        return self.__read_hooks
+
+    @property
+    def auto_chunk_cache(self):
+        """
+        :code:`True` if the chunk cache of digitizer datasets is sized
+        automatically (i.e. :code:`rdcc_nbytes='auto'`)
+        """
+        return self.__auto_chunk_cache
+
+    @property
+    def warmup(self):
+        """
+        Background warm-up
+        (:class:`~bapsflib.lapdhdf.hdfwarmup.hdfWarmup`), :code:`None`
+        if no warm-up was requested
+        """
+        return self.__warmup
+
+    @property
+    def in_memory(self):
+        """
+        :code:`True` if the file image is held in RAM (see the
+        :data:`in_memory` keyword)
+        """
+        return self.driver == 'core'
+
+    @property
+    def mmap_reads(self):
+        """
+        :code:`True` if digitizer reads are served from a memory map of
+        the file whenever the dataset qualifies
+        """
+        return self.__mmap_reads
+
+    @property
+    def shared_chunk_cache(self):
+        """
+        Cross-process cache of decompressed digitizer chunks
+        (:class:`~bapsflib.lapdhdf.hdfchunkcache.hdfSharedChunkCache`).
+        :code:`None` if chunk sharing is disabled.
+        """
+        return self.__shared_chunk_cache
+
+    @shared_chunk_cache.setter
+    def shared_chunk_cache(self, val):
+        if val is None or isinstance(val, hdfSharedChunkCache):
+            self.__shared_chunk_cache = val
+        else:
+            raise TypeError('shared_chunk_cache must be an '
+                            'hdfSharedChunkCache or None')
+
+    def get_digi_dataset(self, path):
+        """
+        Get a digitizer dataset.  If :attr:`mmap_reads` is enabled and
+        the dataset qualifies, then a memory-mapped stand-in is
+        returned.  Otherwise, the dataset is opened with the chunk
+        cache settings of the file (see :attr:`auto_chunk_cache`).  If
+        the :attr:`warmup` has read the dataset's shot number column,
+        then shot number reads are served from memory.
+
+        :param str path: path to the dataset
+        :return: the dataset
+        :rtype: :class:`h5py.Dataset`,
+            :class:`~bapsflib.lapdhdf.hdfmmap.hdfMMapDataset`, or
+            :class:`~bapsflib.lapdhdf.hdfwarmup.hdfShotnumDataset`
+        """
+        dset = None
+        if self.__mmap_reads:
+            if path not in self.__mmap_dsets:
+                dset = self.__get_handle(path)
+                self.__mmap_dsets[path] = \
+                    mmap_dataset(dset) \
+                    if isinstance(dset, h5py.Dataset) else None
+            dset = self.__mmap_dsets[path]
+
+        if dset is None:
+            if self.__auto_chunk_cache:
+                key = (path, 'auto chunk cache')
+                if key not in self.__handles:
+                    self.__handles[key] = open_dataset(
+                        self, path, rdcc_nslots=self.__rdcc[0],
+                        rdcc_w0=self.__rdcc[1])
+                dset = self.__handles[key]
+            else:
+                dset = self.__get_handle(path)
+
+        return self.__add_warm_column(path, dset)
+
+    def get_control_dataset(self, path):
+        """
+        Get a control device dataset.  If the :attr:`warmup` has read
+        the dataset's shot number column, then shot number reads are
+        served from memory.
+
+        :param str path: path to the dataset
+        :return: the dataset
+        :rtype: :class:`h5py.Dataset` or
+            :class:`~bapsflib.lapdhdf.hdfwarmup.hdfShotnumDataset`
+        """
+        return self.__add_warm_column(path, self.__get_handle(path))
+
+    def __get_handle(self, path):
+        """
+        Get a dataset handle (from the warm-up if available).  Handles
+        are cached per path so repeated reads skip the HDF5 object
+        lookup.
+        """
+        dset = self.__handles.get(path, None)
+        if dset is None:
+            if self.__warmup is not None:
+                dset = self.__warmup.get_handle(path)
+            if dset is None:
+                dset = self.get(path)
+            if dset is not None:
+                self.__handles[path] = dset
+        return dset
+
+    def __add_warm_column(self, path, dset):
+        """Wrap dset if its shot number column has been warmed."""
+        if self.__warmup is None or dset is None:
+            return dset
+        column = self.__warmup.get_column(path)
+        if column is None:
+            return dset
+        return hdfShotnumDataset(dset, column[0], column[1])
+
+    def read_digi_rows(self, dset, index):
+        """
+        Read :code:`dset[index, :]`, through the
+        :attr:`shared_chunk_cache` if one is attached.
+
+        :param dset: digitizer dataset
+        :type dset: :class:`h5py.Dataset`
+        :param index: row index
+        :type index: int, list(int), slice()
+        :return: the requested rows
+        :rtype: :class:`numpy.ndarray`
+        """
+        if self.__shared_chunk_cache is None:
+            return dset[index, :]
+        return self.__shared_chunk_cache.read_rows(dset, index)
+
+    @property
+    def inventory(self):
+        """
+        Indexed inventory of all objects in the HDF5 file
+        (:class:`~bapsflib.lapdhdf.hdfinventory.hdfInventory`).  The
+        inventory is built once per open (or loaded from the
+        :data:`inventory_cache` file).
+        """
+        if self.__inventory is None:
+            inventory = None
+            if self.__inventory_cache is not None:
+                inventory = hdfInventory.load(self.__inventory_cache,
+                                              hdf_file=self)
+            if inventory is None:
+                inventory = hdfInventory.build(self)
+                if self.__inventory_cache is not None:
+                    try:
+                        inventory.save(self.__inventory_cache)
+                    except OSError:
+                        pass
+            self.__inventory = inventory
+        return self.__inventory
+
+    def position_index(self, receptacle=None):
+        """
+        Spatial index of the shots of a '6K Compumotor' probe drive
+        (see :class:`~bapsflib.lapdhdf.hdfposition.hdfPositionIndex`).
+        The index is built once per probe drive and cached.
+
+        :param int receptacle: probe drive receptacle (can be omitted
+            if only one probe drive is deployed)
+        :rtype: :class:`~bapsflib.lapdhdf.hdfposition.hdfPositionIndex`
+        """
+        if receptacle is None:
+            try:
+                receptacles = self.file_map.controls[
+                    '6K Compumotor'].list_receptacles
+            except KeyError:
+                raise ValueError("no '6K Compumotor' in the HDF5 file")
+            if len(receptacles) == 1:
+                receptacle = receptacles[0]
+        pindex = self.__position_index.get(receptacle, None)
+        if pindex is None:
+            pindex = hdfPositionIndex.build(self, receptacle)
+            self.__position_index[receptacle] = pindex
+        return pindex
+
     @property
     def list_file_items(self):
         """
         list of absolute paths for all items (Groups and Datasets) in
         the HDF5 file
+
+        The list is taken from the :attr:`inventory` if it is already
+        built, otherwise it is gathered in one object-info walk
+        (without opening any dataset).  Files opened read-only list
+        their items once per open.
         """
-        some_list = []
-        self.visit(some_list.append)
-        return some_list
+        if self.__item_paths is not None:
+            return list(self.__item_paths)
+        if self.__inventory is not None:
+            paths = [path.lstrip('/') for path in self.__inventory.paths]
+        else:
+            paths = [name for name, obj_type in walk(self)]
+        if self.mode == 'r':
+            self.__item_paths = paths
+        return list(paths)
 
     @property
     def list_msi(self):
@@ -101,8 +496,8 @@ class File(h5py.File):
                   index=slice(None), shotnum=slice(None),
                   digitizer=None, adc=None,
                   config_name=None, keep_bits=False, add_controls=None,
-                  intersection_set=True, silent=False,
-                  **kwargs):
+                  add_msi=None, intersection_set=True, silent=False,
+                  position=None, **kwargs):
         # TODO: docstrings and code block needs updating
         """
         Provides access to
@@ -130,14 +525,25 @@ class File(h5py.File):
             :class:`~bapsflib.lapdhdf.hdfreaddata.hdfReadData`
             for details)
         :type add_controls: [str, (str, val), ]
+        :param add_msi: name(s) of MSI diagnostics (see
+            :attr:`list_msi`) whose per-shot data is mated to the
+            digitizer data
+        :type add_msi: str or [str, ]
         :param bool intersection_set: :code:`True` (default) forces the
             returned array to only contain shot numbers that are in the
             intersection of :data:`shotnum`, the digitizer dataset, and
-            all the control device datasets. (see
+            all the control device and MSI datasets. (see
             :class:`~bapsflib.lapdhdf.hdfreaddata.hdfReadData`
             for details)
         :param bool silent: :code:`False` (default). Set :code:`True` to
             suppress command line printout of soft-warnings
+        :param position: read only the shots recorded at a probe
+            position (see
+            :meth:`~bapsflib.lapdhdf.hdfposition.hdfPositionIndex.select`),
+            the probe drive is taken from a :code:`'receptacle'` key,
+            the '6K Compumotor' entry of :data:`add_controls`, or the
+            only deployed drive
+        :type position: tuple or dict
         :return: extracted data from digitizer (and control devices)
         :rtype: :class:`~bapsflib.lapdhdf.hdfreaddata.hdfReadData`
         """
@@ -159,6 +565,9 @@ class File(h5py.File):
         #
         # TODO: write docstrings
         #
+        if position is not None:
+            shotnum = self.__position_shotnum(position, index, shotnum,
+                                              add_controls)
         return hdfReadData(self, board, channel,
                            index=index,
                            shotnum=shotnum,
@@ -167,10 +576,262 @@ class File(h5py.File):
                            config_name=config_name,
                            keep_bits=keep_bits,
                            add_controls=add_controls,
+                           add_msi=add_msi,
                            intersection_set=intersection_set,
                            silent=silent,
                            **kwargs)
 
+    def __position_shotnum(self, position, index, shotnum,
+                           add_controls):
+        """Shot numbers of a read_data `position` query."""
+        if index != slice(None):
+            raise ValueError('position can not be combined with index')
+
+        # resolve the probe drive
+        receptacle = None
+        if isinstance(position, dict):
+            receptacle = position.get('receptacle', None)
+        if receptacle is None and add_controls is not None:
+            for control in add_controls:
+                if isinstance(control, tuple) \
+                        and control[0] == '6K Compumotor':
+                    receptacle = control[1]
+                    break
+
+        # only the selected rows are read, in one coalesced read
+        sn = self.position_index(receptacle).select(position)
+        if shotnum != slice(None):
+            if isinstance(shotnum, slice):
+                stop = shotnum.stop
+                if stop is None:
+                    stop = int(sn.max()) + 1 if sn.size else 0
+                shotnum = range(*shotnum.indices(stop))
+            elif isinstance(shotnum, int):
+                shotnum = [shotnum]
+            sn = np.intersect1d(sn, np.asarray(list(shotnum)))
+        if sn.size == 0:
+            raise ValueError('no shots recorded at position '
+                             '{}'.format(position))
+        return sn.tolist()
+
+    def read_joint(self, channels, shotnum=slice(None),
+                   add_controls=None, keep_bits=False, time_base=None,
+                   silent=False):
+        """
+        Read channels from one or more digitizers aligned by shot
+        number, optionally resampled onto a common time base.  See
+        :class:`~bapsflib.lapdhdf.hdfjoint.hdfJointData` for more
+        detail.
+
+        :param channels: channels to read, each
+            :code:`(digitizer, board, channel)`,
+            :code:`(digitizer, adc, board, channel)`, or a dict
+        :type channels: list
+        :param shotnum: HDF5 global shot number
+        :type shotnum: int, list(int), slice()
+        :param add_controls: control device data to be mated to the
+            digitizer data (see :meth:`read_data`)
+        :type add_controls: [str, (str, val), ]
+        :param bool keep_bits: :code:`True` for output in bits,
+            :code:`False` (default) for output in voltage
+        :param time_base: :code:`None`, :code:`'coarsest'`,
+            :code:`'finest'`, or an array of times (in sec)
+        :param bool silent: :code:`False` (default). Set :code:`True` to
+            suppress command line printout of soft-warnings
+        :rtype: :class:`~bapsflib.lapdhdf.hdfjoint.hdfJointData`
+
+        :Example:
+
+            >>> data = f.read_joint([('SIS 3301', 0, 0),
+            ...                      ('SIS crate', 'SIS 3302', 1, 1)],
+            ...                     time_base='coarsest')
+        """
+        return hdfJointData(self, channels, shotnum=shotnum,
+                            add_controls=add_controls,
+                            keep_bits=keep_bits, time_base=time_base,
+                            silent=silent)
+
+    def iter_data(self, board, channel, block_size=100, shotnum=None,
+                  depth=2, max_bytes=256 * 2 ** 20, **kwargs):
+        """
+        Iterate through digitizer data in blocks of shots while the
+        following blocks are read on a background thread.  See
+        :class:`~bapsflib.lapdhdf.hdfprefetch.hdfPrefetchReader` for
+        more detail.
+
+        :param int board: digitizer board number
+        :param int channel: digitizer channel number
+        :param block_size: number of shots per block, :code:`'auto'`
+            sizes blocks from a read plan (see :meth:`plan_read`)
+        :type block_size: int or :code:`'auto'`
+        :param shotnum: HDF5 global shot numbers to iterate over,
+            :code:`None` (default) for all rows of the dataset
+        :type shotnum: int, list(int), slice()
+        :param int depth: number of blocks read ahead
+        :param int max_bytes: memory budget (in bytes) for read-ahead
+            blocks
+        :param kwargs: keywords passed to
+            :class:`~bapsflib.lapdhdf.hdfreaddata.hdfReadData` (e.g.
+            :code:`add_controls`)
+        :return: the prefetching reader (an iterable of
+            :class:`~bapsflib.lapdhdf.hdfreaddata.hdfReadData` blocks)
+        :rtype: :class:`~bapsflib.lapdhdf.hdfprefetch.hdfPrefetchReader`
+        """
+        return hdfPrefetchReader(self, board, channel,
+                                 block_size=block_size,
+                                 shotnum=shotnum,
+                                 depth=depth,
+                                 max_bytes=max_bytes,
+                                 **kwargs)
+
+    def reduce_data(self, board, channel, by, add_controls,
+                    **kwargs):
+        """
+        Stream a digitizer channel and reduce its shots to per-group
+        statistics (count, mean, variance, min, max), grouping on the
+        mated control device fields :data:`by`.  Memory is
+        proportional to the number of groups, not the number of shots.
+        See :func:`~bapsflib.lapdhdf.hdfreduce.reduce_data` for more
+        detail.
+
+        :param int board: digitizer board number
+        :param int channel: digitizer channel number
+        :param by: name(s) of the fields shots are grouped on (e.g.
+            :code:`'xyz'` or :code:`['xyz', 'command']`)
+        :type by: str or list(str)
+        :param add_controls: control devices mated to the shots (see
+            :meth:`read_data`)
+        :param kwargs: keywords of
+            :func:`~bapsflib.lapdhdf.hdfreduce.reduce_data` (e.g.
+            :code:`stats`, :code:`bits`, :code:`block_size`)
+        :return: structured array with one row per group
+        :rtype: :class:`numpy.ndarray`
+
+        :Example:
+
+            >>> stats = f.reduce_data(0, 0, 'xyz',
+            ...                       add_controls=['6K Compumotor'])
+            >>> stats['xyz'], stats['count'], stats['mean']
+        """
+        return reduce_data(self, board, channel, by, add_controls,
+                           **kwargs)
+
+    def read_grid(self, board, channel, **kwargs):
+        """
+        Read a digitizer channel onto the grid of a '6K Compumotor'
+        motion list, either as a dense
+        :code:`(nx, ny, nrepeat, nt)` array or reduced per grid point
+        to a :code:`(nx, ny, nt)` array.  See
+        :func:`~bapsflib.lapdhdf.hdfgrid.read_grid` for more detail.
+
+        :param int board: digitizer board number
+        :param int channel: digitizer channel number
+        :param kwargs: keywords of
+            :func:`~bapsflib.lapdhdf.hdfgrid.read_grid` (e.g.
+            :code:`receptacle`, :code:`motion_list`, :code:`reduce`)
+        :rtype: :class:`~bapsflib.lapdhdf.hdfgrid.hdfGridData`
+
+        :Example:
+
+            >>> grid = f.read_grid(0, 0, reduce='mean')
+            >>> grid.data.shape, grid.x, grid.y
+        """
+        return read_grid(self, board, channel, **kwargs)
+
+    def welch_data(self, board, channel, **kwargs):
+        """
+        Stream a digitizer channel and average the Welch power
+        spectral densities of its shots, optionally one spectrum per
+        group of mated control device fields (e.g. per probe
+        position).  See
+        :func:`~bapsflib.lapdhdf.hdfspectral.welch_data` for more
+        detail.
+
+        :param int board: digitizer board number
+        :param int channel: digitizer channel number
+        :param kwargs: keywords of
+            :func:`~bapsflib.lapdhdf.hdfspectral.welch_data` (e.g.
+            :code:`nperseg`, :code:`samples`, :code:`by`,
+            :code:`add_controls`)
+        :rtype: :class:`~bapsflib.lapdhdf.hdfspectral.hdfSpectralData`
+
+        :Example:
+
+            >>> spec = f.welch_data(0, 0, nperseg=512, by='xyz',
+            ...                     add_controls=['6K Compumotor'])
+            >>> spec.freq, spec.groups['xyz'], spec.psd
+        """
+        return welch_data(self, board, channel, **kwargs)
+
+    def iter_fft(self, board, channel, **kwargs):
+        """
+        Iterate over the FFTs of the shots of a digitizer channel,
+        one block of shots at a time.  See
+        :func:`~bapsflib.lapdhdf.hdfspectral.iter_fft` for more
+        detail.
+
+        :param int board: digitizer board number
+        :param int channel: digitizer channel number
+        :param kwargs: keywords of
+            :func:`~bapsflib.lapdhdf.hdfspectral.iter_fft` (e.g.
+            :code:`samples`, :code:`window`, :code:`block_size`)
+        :return: generator of :code:`(shotnum, freq, fft)` per block
+
+        :Example:
+
+            >>> for shotnum, freq, fft in f.iter_fft(0, 0):
+            ...     amp = np.abs(fft)
+        """
+        return iter_fft(self, board, channel, **kwargs)
+
+    def read_plasma(self, kTe, kTi, m_i, n_e, Z, **kwargs):
+        """
+        Evaluate the plasma parameters along the recorded axial
+        magnetic field profile (or per-shot peak field) of the
+        'Magnetic field' MSI diagnostic.  See
+        :func:`~bapsflib.lapdhdf.hdfplasma.read_plasma` for more
+        detail.
+
+        :param kTe: electron temperature (in eV)
+        :param kTi: ion temperature (in eV)
+        :param m_i: ion mass (in g)
+        :param n_e: electron number density (in cm^-3)
+        :param Z: ion charge number
+        :param kwargs: keywords of
+            :func:`~bapsflib.lapdhdf.hdfplasma.read_plasma` (e.g.
+            :code:`shotnum`, :code:`profile`, :code:`gamma`)
+        :rtype: :class:`~bapsflib.plasma.parameters.PlasmaParameters`
+        """
+        return read_plasma(self, kTe, kTi, m_i, n_e, Z, **kwargs)
+
+    def plan_read(self, board, channel, **kwargs):
+        """
+        Plan a :meth:`read_data` call without reading any signal data.
+        See :func:`~bapsflib.lapdhdf.hdfplan.plan_read` for more
+        detail.
+
+        :param int board: digitizer board number
+        :param int channel: digitizer channel number
+        :param kwargs: keywords of :meth:`read_data`
+        :return: the shots, rows, hyperslab runs, chunks, disk bytes,
+            and output memory of the read
+        :rtype: :class:`~bapsflib.lapdhdf.hdfplan.hdfReadPlan`
+        """
+        return plan_read(self, board, channel, **kwargs)
+
+    def plan_reads(self, channels, **kwargs):
+        """
+        Plan :meth:`read_data` calls of several digitizer channels
+        without reading any signal data.  See
+        :func:`~bapsflib.lapdhdf.hdfplan.plan_reads` for more detail.
+
+        :param channels: the :code:`(board, channel)` pairs to be read
+        :type channels: list(tuple)
+        :param kwargs: keywords of :meth:`read_data`
+        :rtype: :class:`~bapsflib.lapdhdf.hdfplan.hdfReadPlan`
+        """
+        return plan_reads(self, channels, **kwargs)
+
     def read_controls(self, controls,
                       shotnum=slice(None), intersection_set=True,
                       silent=False, **kwargs):
@@ -233,6 +894,44 @@ class File(h5py.File):
                               silent=silent,
                               **kwargs)
 
+    def read_msi(self, diag, shotnum=slice(None), intersection_set=True,
+                 silent=False, **kwargs):
+        """
+        Reads the per-shot data (traces and summary values) of a MSI
+        diagnostic.  See
+        :class:`~bapsflib.lapdhdf.hdfreadmsi.hdfReadMSI` for more
+        detail.
+
+        :param str diag: name of the MSI diagnostic (see
+            :attr:`list_msi`)
+        :param shotnum: HDF5 file shot number(s) indicating data
+            entries to be extracted
+        :type shotnum: int, list(int), slice()
+        :param bool intersection_set: :code:`True` (DEFAULT) will only
+            return shot numbers recorded by the diagnostic,
+            :code:`False` returns all of :data:`shotnum` with null
+            values for unrecorded shots
+        :param bool silent: :code:`False` (DEFAULT).  Set :code:`True`
+            to suppress command line printout of soft-warnings
+        :return: extracted MSI diagnostic data
+        :rtype: :class:`~bapsflib.lapdhdf.hdfreadmsi.hdfReadMSI`
+
+        :Example:
+
+            >>> # open HDF5 file
+            >>> f = File('sample.hdf5')
+            >>>
+            >>> # discharge current of shots 1 to 99
+            >>> mdata = f.read_msi('Discharge', shotnum=slice(1, 100))
+            >>> mdata['current'].shape
+            (99, 4096)
+        """
+        return hdfReadMSI(self, diag,
+                          shotnum=shotnum,
+                          intersection_set=intersection_set,
+                          silent=silent,
+                          **kwargs)
+
     def save_report(self, sname):
         """
         Save a HDF5 file report based on the HDF5 mappings.
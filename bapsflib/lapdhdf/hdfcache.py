@@ -0,0 +1,325 @@
+# This file is part of the bapsflib package, a Python toolkit for the
+# BaPSF group at UCLA.
+#
+# http://plasma.physics.ucla.edu/
+#
+# Copyright 2017-2018 Erik T. Everson and contributors
+#
+# License: Standard 3-clause BSD; see "LICENSES/LICENSE.txt" for full
+#   license terms and contributor agreement.
+#
+import hashlib
+import numpy as np
+import os
+import threading
+
+from collections import OrderedDict
+
+
+class hdfReadCache(object):
+    """
+    Memory-bounded LRU cache of read results
+    (:class:`~bapsflib.lapdhdf.hdfreaddata.hdfReadData` and
+    :class:`~bapsflib.lapdhdf.hdfreadcontrol.hdfReadControl`) with an
+    optional spill to a local cache directory.
+
+    Entries are keyed on the normalized read request, i.e. the request
+    after control conditioning and shot number resolution, so two calls
+    that resolve to the same rows of the same datasets share a cache
+    entry.  When the RAM budget (:attr:`max_bytes`) is exceeded, the
+    least recently used entries are evicted.  If :attr:`spill_dir` is
+    defined, then evicted entries are written to disk and re-loaded
+    (and promoted back into RAM) on their next hit.
+
+    :Example:
+
+        >>> from bapsflib import lapdhdf
+        >>> cache = lapdhdf.hdfReadCache(max_bytes=512 * 2 ** 20)
+        >>> f = lapdhdf.File('sample.hdf5', read_cache=cache)
+        >>> data = f.read_data(0, 0, shotnum=slice(1, 100))
+        >>> data = f.read_data(0, 0, shotnum=slice(1, 100))
+        >>> cache.stats['hits']
+        1
+    """
+    def __init__(self, max_bytes=256 * 2 ** 20, spill_dir=None,
+                 max_spill_bytes=None):
+        """
+        :param int max_bytes: RAM budget (in bytes) for cached results
+            (default 256 MB)
+        :param str spill_dir: directory for spilling evicted entries to
+            disk, :code:`None` (default) disables spilling
+        :param int max_spill_bytes: disk budget (in bytes) for the spill
+            directory, :code:`None` (default) for no limit
+        """
+        if not isinstance(max_bytes, int) or max_bytes < 0:
+            raise ValueError('max_bytes must be a non-negative int')
+        if max_spill_bytes is not None \
+                and (not isinstance(max_spill_bytes, int)
+                     or max_spill_bytes < 0):
+            raise ValueError(
+                'max_spill_bytes must be a non-negative int or None')
+
+        self._max_bytes = max_bytes
+        self._max_spill_bytes = max_spill_bytes
+        self._spill_dir = spill_dir
+        if spill_dir is not None:
+            os.makedirs(spill_dir, exist_ok=True)
+
+        # _ram   - key -> (array, info)
+        # _spill - key -> (file path, nbytes, info)
+        self._ram = OrderedDict()
+        self._spill = OrderedDict()
+        self._ram_bytes = 0
+        self._spill_bytes = 0
+        self._lock = threading.RLock()
+        self._stats = {'hits': 0,
+                       'misses': 0,
+                       'evictions': 0,
+                       'spill hits': 0,
+                       'spills': 0,
+                       'spill evictions': 0}
+
+    @property
+    def max_bytes(self):
+        """RAM budget (in bytes)"""
+        return self._max_bytes
+
+    @property
+    def max_spill_bytes(self):
+        """Disk budget (in bytes) of the spill directory"""
+        return self._max_spill_bytes
+
+    @property
+    def spill_dir(self):
+        """Spill directory (:code:`None` if spilling is disabled)"""
+        return self._spill_dir
+
+    @property
+    def nbytes(self):
+        """Number of bytes currently held in RAM"""
+        return self._ram_bytes
+
+    @property
+    def stats(self):
+        """
+        Dictionary of cache statistics.  The dict keys are:
+
+        .. list-table::
+            :widths: 5 11
+
+            * - :const:`hits`
+              - number of requests served from the cache (RAM or spill)
+            * - :const:`misses`
+              - number of requests not found in the cache
+            * - :const:`evictions`
+              - number of entries evicted from RAM
+            * - :const:`spill hits`
+              - number of requests served from the spill directory
+            * - :const:`spills`
+              - number of entries written to the spill directory
+            * - :const:`spill evictions`
+              - number of entries removed from the spill directory
+            * - :const:`entries`
+              - number of entries currently held in RAM
+            * - :const:`spilled entries`
+              - number of entries currently held in the spill directory
+            * - :const:`bytes`
+              - number of bytes currently held in RAM
+            * - :const:`spilled bytes`
+              - number of bytes currently held in the spill directory
+        """
+        with self._lock:
+            stats = self._stats.copy()
+            stats.update({'entries': len(self._ram),
+                          'spilled entries': len(self._spill),
+                          'bytes': self._ram_bytes,
+                          'spilled bytes': self._spill_bytes})
+        return stats
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._ram or key in self._spill
+
+    def __len__(self):
+        with self._lock:
+            return len(self._ram) + len(self._spill)
+
+    def get(self, key):
+        """
+        Retrieve a cached result.
+
+        :param key: normalized request key (see :func:`build_key`)
+        :return: :code:`(array, info)` if :data:`key` is cached,
+            otherwise :code:`None`.  The returned array is a copy and
+            can be freely modified by the caller.
+        """
+        with self._lock:
+            if key in self._ram:
+                # move to most recently used position
+                self._ram.move_to_end(key)
+                arr, info = self._ram[key]
+                self._stats['hits'] += 1
+                return arr.copy(), _copy_info(info)
+            elif key in self._spill:
+                path, nbytes, info = self._spill.pop(key)
+                self._spill_bytes -= nbytes
+                try:
+                    arr = np.load(path, allow_pickle=False)
+                except (IOError, OSError, ValueError):
+                    # spill file is gone or corrupt, treat as a miss
+                    self._stats['misses'] += 1
+                    return None
+                finally:
+                    _remove_file(path)
+
+                # promote back into RAM
+                self._stats['hits'] += 1
+                self._stats['spill hits'] += 1
+                self._insert(key, arr, info)
+                return arr.copy(), _copy_info(info)
+            else:
+                self._stats['misses'] += 1
+                return None
+
+    def put(self, key, arr, info):
+        """
+        Add a result to the cache.
+
+        :param key: normalized request key (see :func:`build_key`)
+        :param arr: the read result
+        :type arr: :class:`numpy.ndarray`
+        :param dict info: metadata dictionary associated with
+            :data:`arr`
+        """
+        arr = np.array(arr, copy=True, subok=False)
+        with self._lock:
+            self._discard(key)
+            self._insert(key, arr, _copy_info(info))
+
+    def clear(self):
+        """Remove all entries (RAM and spill) from the cache."""
+        with self._lock:
+            self._ram.clear()
+            self._ram_bytes = 0
+            for path, nbytes, info in self._spill.values():
+                _remove_file(path)
+            self._spill.clear()
+            self._spill_bytes = 0
+
+    def reset_stats(self):
+        """Reset hit, miss, and eviction counters to zero."""
+        with self._lock:
+            for key in self._stats:
+                self._stats[key] = 0
+
+    def _insert(self, key, arr, info):
+        """Insert into RAM and enforce the RAM budget."""
+        if arr.nbytes > self._max_bytes:
+            # entry can never fit in RAM
+            self._stats['evictions'] += 1
+            self._spill_entry(key, arr, info)
+            return
+
+        self._ram[key] = (arr, info)
+        self._ram_bytes += arr.nbytes
+        while self._ram_bytes > self._max_bytes:
+            old_key, (old_arr, old_info) = self._ram.popitem(last=False)
+            self._ram_bytes -= old_arr.nbytes
+            self._stats['evictions'] += 1
+            self._spill_entry(old_key, old_arr, old_info)
+
+    def _discard(self, key):
+        """Remove :data:`key` from RAM and spill (if present)."""
+        if key in self._ram:
+            arr, info = self._ram.pop(key)
+            self._ram_bytes -= arr.nbytes
+        if key in self._spill:
+            path, nbytes, info = self._spill.pop(key)
+            self._spill_bytes -= nbytes
+            _remove_file(path)
+
+    def _spill_entry(self, key, arr, info):
+        """Write an evicted entry to the spill directory."""
+        if self._spill_dir is None:
+            return
+        if self._max_spill_bytes is not None \
+                and arr.nbytes > self._max_spill_bytes:
+            return
+
+        path = os.path.join(self._spill_dir,
+                            '{}.npy'.format(_key_digest(key)))
+        try:
+            np.save(path, arr, allow_pickle=False)
+        except (IOError, OSError, ValueError):
+            _remove_file(path)
+            return
+        self._spill[key] = (path, arr.nbytes, info)
+        self._spill_bytes += arr.nbytes
+        self._stats['spills'] += 1
+
+        # enforce disk budget
+        if self._max_spill_bytes is not None:
+            while self._spill_bytes > self._max_spill_bytes:
+                old_key, (old_path, old_nbytes, old_info) = \
+                    self._spill.popitem(last=False)
+                self._spill_bytes -= old_nbytes
+                self._stats['spill evictions'] += 1
+                _remove_file(old_path)
+
+
+def build_key(reader, hdf_file, *args):
+    """
+    Build a hashable cache key for a normalized read request.
+
+    :param str reader: name of the reading routine (e.g.
+        :code:`'hdfReadData'`)
+    :param hdf_file: the HDF5 file object being read
+    :type hdf_file: :class:`bapsflib.lapdhdf.files.File`
+    :param args: normalized request components; :class:`numpy.ndarray`
+        components are reduced to a digest of their contents
+    :return: cache key
+    :rtype: tuple
+    """
+    # identify the file by its absolute path and modification time so
+    # a re-written file never serves stale entries
+    fname = os.path.abspath(hdf_file.filename)
+    try:
+        mtime = os.path.getmtime(fname)
+    except OSError:
+        mtime = None
+
+    key = [reader, fname, mtime]
+    for arg in args:
+        key.append(_hashable(arg))
+    return tuple(key)
+
+
+def _hashable(arg):
+    """Convert a request component into a hashable equivalent."""
+    if isinstance(arg, np.ndarray):
+        return ('ndarray', arg.dtype.str, arg.shape,
+                hashlib.sha1(arg.tobytes()).hexdigest())
+    elif isinstance(arg, slice):
+        return 'slice', arg.start, arg.stop, arg.step
+    elif isinstance(arg, (list, tuple)):
+        return tuple(_hashable(val) for val in arg)
+    else:
+        return arg
+
+
+def _key_digest(key):
+    """Hex digest of a cache key (used for spill file names)."""
+    return hashlib.sha1(repr(key).encode('utf-8')).hexdigest()
+
+
+def _copy_info(info):
+    """Shallow copy of a meta-info dictionary."""
+    return info.copy() if isinstance(info, dict) else info
+
+
+def _remove_file(path):
+    """Remove a file, ignoring a missing file."""
+    try:
+        os.remove(path)
+    except OSError:
+        pass
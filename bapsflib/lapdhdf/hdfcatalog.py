@@ -0,0 +1,508 @@
+# This file is part of the bapsflib package, a Python toolkit for the
+# BaPSF group at UCLA.
+#
+# http://plasma.physics.ucla.edu/
+#
+# Copyright 2017-2018 Erik T. Everson and contributors
+#
+# License: Standard 3-clause BSD; see "LICENSES/LICENSE.txt" for full
+#   license terms and contributor agreement.
+#
+"""
+SQLite catalog of a directory tree of LaPD HDF5 files.
+"""
+import fnmatch
+import h5py
+import json
+import numpy as np
+import os
+import sqlite3
+
+from concurrent.futures import ProcessPoolExecutor
+
+from .hdfmapper import hdfMap
+
+#: version of the catalog database schema
+CATALOG_VERSION = 1
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS catalog_info (
+    key TEXT PRIMARY KEY,
+    value TEXT);
+CREATE TABLE IF NOT EXISTS files (
+    id INTEGER PRIMARY KEY,
+    path TEXT UNIQUE,
+    size INTEGER,
+    mtime REAL,
+    exp_descr TEXT,
+    hdf_version TEXT,
+    error TEXT);
+CREATE TABLE IF NOT EXISTS digitizers (
+    file_id INTEGER REFERENCES files(id) ON DELETE CASCADE,
+    digitizer TEXT,
+    config TEXT,
+    active INTEGER,
+    adc TEXT,
+    board INTEGER,
+    channel INTEGER,
+    dataset TEXT,
+    shot_min INTEGER,
+    shot_max INTEGER,
+    nshots INTEGER);
+CREATE TABLE IF NOT EXISTS probes (
+    file_id INTEGER REFERENCES files(id) ON DELETE CASCADE,
+    control TEXT,
+    receptacle INTEGER,
+    probe TEXT,
+    port INTEGER,
+    dataset TEXT,
+    shot_min INTEGER,
+    shot_max INTEGER,
+    nshots INTEGER);
+CREATE TABLE IF NOT EXISTS motion_lists (
+    file_id INTEGER REFERENCES files(id) ON DELETE CASCADE,
+    control TEXT,
+    name TEXT,
+    config TEXT);
+CREATE TABLE IF NOT EXISTS waveforms (
+    file_id INTEGER REFERENCES files(id) ON DELETE CASCADE,
+    control TEXT,
+    config TEXT,
+    command_list TEXT,
+    dataset TEXT,
+    shot_min INTEGER,
+    shot_max INTEGER,
+    nshots INTEGER);
+CREATE INDEX IF NOT EXISTS digitizers_idx
+    ON digitizers (digitizer, config, board, channel);
+CREATE INDEX IF NOT EXISTS probes_idx ON probes (probe, receptacle);
+"""
+
+
+def _to_builtin(val):
+    """Convert numpy scalars/arrays (and bytes) to builtin types."""
+    if isinstance(val, (bytes, np.bytes_)):
+        return val.decode('utf-8')
+    if isinstance(val, np.generic):
+        return val.item()
+    if isinstance(val, np.ndarray):
+        return val.tolist()
+    if isinstance(val, (list, tuple)):
+        return [_to_builtin(v) for v in val]
+    if isinstance(val, dict):
+        return {key: _to_builtin(v) for key, v in val.items()}
+    return val
+
+
+def _shot_range(dset, field, config_name=None):
+    """
+    Determine :code:`(min, max, number)` of the shot numbers in
+    :data:`dset`.  If the dataset records a configuration name per
+    row, only rows of :data:`config_name` are considered.
+    """
+    shotnum = dset[field]
+    if config_name is not None \
+            and 'Configuration name' in (dset.dtype.names or ()):
+        names = dset['Configuration name']
+        if names.dtype.kind == 'S':
+            config_name = config_name.encode('utf-8')
+        shotnum = shotnum[names == config_name]
+    if shotnum.size == 0:
+        return None, None, 0
+    return int(shotnum.min()), int(shotnum.max()), int(shotnum.size)
+
+
+def catalog_file(path):
+    """
+    Map a single HDF5 file into a catalog record (this is the process
+    pool worker of :meth:`hdfCatalog.build`).
+
+    :param str path: path to the HDF5 file
+    :return: dictionary of catalog rows for the file (with key
+        :code:`'error'` set if the file could not be mapped)
+    :rtype: dict
+    """
+    record = {'path': path, 'size': None, 'mtime': None,
+              'exp_descr': '', 'hdf_version': '', 'error': None,
+              'digitizers': [], 'probes': [], 'motion_lists': [],
+              'waveforms': []}
+    try:
+        # - a file removed (or made unreadable) after the directory
+        #   walk is recorded with an error, a NULL size and mtime
+        #   make it re-mapped by the next build
+        stat = os.stat(path)
+        record['size'] = stat.st_size
+        record['mtime'] = stat.st_mtime
+        with h5py.File(path, 'r') as hdf_file:
+            _catalog_mapping(hdf_file, record)
+    except Exception as err:
+        record['error'] = '{}: {}'.format(type(err).__name__, err)
+    return record
+
+
+def _catalog_mapping(hdf_file, record):
+    """Fill :data:`record` from the mapping of :data:`hdf_file`."""
+    file_map = hdfMap(hdf_file)
+    record['hdf_version'] = file_map.hdf_version
+    try:
+        edescr = hdf_file['Raw data + config'].attrs['Description']
+        record['exp_descr'] = _to_builtin(edescr)
+    except KeyError:
+        pass
+
+    # digitizers
+    for dname, digi_map in file_map.digitizers.items():
+        dpath = digi_map.info['group path'] + '/'
+        for config_name, config in digi_map.configs.items():
+            for adc in config['adc']:
+                for conn in config[adc]:
+                    for channel in conn[1]:
+                        row = [dname, config_name,
+                               int(config['active']), adc,
+                               _to_builtin(conn[0]),
+                               _to_builtin(channel),
+                               None, None, None, 0]
+                        if config['active']:
+                            try:
+                                dset_name, dhname = \
+                                    digi_map.resolve_dataset(
+                                        conn[0], channel,
+                                        config_name=config_name,
+                                        adc=adc, silent=True)[0:2]
+                                row[6] = dpath + dset_name
+                                row[7:10] = _shot_range(
+                                    hdf_file[dpath + dhname],
+                                    digi_map.shotnum_field)
+                            except (ValueError, KeyError, TypeError):
+                                pass
+                        record['digitizers'].append(row)
+
+    # control devices
+    for cname, cmap in file_map.controls.items():
+        cpath = cmap.info['group path'] + '/'
+        for ml_name, ml_config in getattr(cmap, 'motion_lists',
+                                          {}).items():
+            record['motion_lists'].append(
+                [cname, ml_name, json.dumps(_to_builtin(ml_config))])
+
+        for cspec, config in cmap.configs.items():
+            dset_path = None
+            srange = (None, None, 0)
+            try:
+                dset_name, field = cmap.resolve_dataset(cspec)
+                dset_path = cpath + dset_name
+                if field is not None:
+                    srange = _shot_range(hdf_file[dset_path], field,
+                                         config_name=str(cspec))
+            except (ValueError, KeyError, TypeError):
+                pass
+
+            if 'probe name' in config:
+                record['probes'].append(
+                    [cname, _to_builtin(config['receptacle']),
+                     config['probe name'],
+                     _to_builtin(config['port']), dset_path]
+                    + list(srange))
+            if 'command list' in config:
+                record['waveforms'].append(
+                    [cname, str(cspec),
+                     json.dumps(_to_builtin(config['command list'])),
+                     dset_path] + list(srange))
+
+
+class hdfCatalog(object):
+    """
+    SQLite catalog of the LaPD HDF5 files in a directory tree.  The
+    catalog records, for every file, the experiment description, the
+    LaPD software version, the digitizer configurations with their
+    connected board/channels, the 6K Compumotor probes (receptacles)
+    and motion lists, the Waveform command lists, and the shot number
+    range of every dataset.
+
+    :Example:
+
+        >>> cat = hdfCatalog('campaign.sqlite')
+        >>> cat.build('/data/campaign', processes=8)
+        {'added': 1200, 'updated': 0, 'removed': 0, 'unchanged': 0,
+         'errors': 2}
+        >>> cat.find_probes(probe='LP1', shotnum=(100, 200))
+        [('/data/campaign/run01.hdf5',
+          '/Raw data + config/6K Compumotor/XY[2]: LP1', (1, 6000)),
+         ...]
+    """
+    def __init__(self, filename):
+        """
+        :param str filename: name of the SQLite database file (created
+            if it does not exist)
+        """
+        self._filename = filename
+        self._conn = sqlite3.connect(filename)
+        self._conn.execute('PRAGMA foreign_keys = ON')
+        self._conn.executescript(_SCHEMA)
+        row = self._conn.execute(
+            "SELECT value FROM catalog_info WHERE key = 'version'"
+        ).fetchone()
+        if row is None:
+            with self._conn:
+                self._conn.execute(
+                    "INSERT INTO catalog_info VALUES ('version', ?)",
+                    (str(CATALOG_VERSION),))
+        elif int(row[0]) != CATALOG_VERSION:
+            self._conn.close()
+            raise ValueError('catalog {} was built with schema version '
+                             '{}'.format(filename, row[0]))
+
+    @property
+    def filename(self):
+        """Name of the SQLite database file"""
+        return self._filename
+
+    @property
+    def connection(self):
+        """The :class:`sqlite3.Connection` (for custom queries)"""
+        return self._conn
+
+    def close(self):
+        """Close the database connection."""
+        self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def build(self, directory, patterns=('*.hdf5', '*.h5'),
+              processes=None):
+        """
+        Catalog all HDF5 files in the directory tree :data:`directory`.
+        Files already in the catalog are only re-mapped if their size
+        or modification time changed, and files that no longer exist
+        are removed.
+
+        :param str directory: root of the directory tree
+        :param patterns: file name patterns of HDF5 files
+        :type patterns: tuple(str)
+        :param int processes: size of the process pool, :code:`None`
+            (default) uses :func:`os.cpu_count`, :code:`1` maps the
+            files in this process
+        :return: counts of :code:`'added'`, :code:`'updated'`,
+            :code:`'removed'`, and :code:`'unchanged'` files and of
+            files that could not be mapped (:code:`'errors'`)
+        :rtype: dict
+        """
+        if processes is not None \
+                and (not isinstance(processes, int) or processes < 1):
+            raise ValueError('processes must be a positive int or None')
+
+        # find files
+        paths = []
+        for root, dirs, files in os.walk(directory):
+            dirs.sort()
+            for name in sorted(files):
+                if any(fnmatch.fnmatch(name, pat) for pat in patterns):
+                    paths.append(os.path.abspath(
+                        os.path.join(root, name)))
+
+        # determine which files changed
+        known = {row[0]: (row[1], row[2]) for row in self._conn.execute(
+            'SELECT path, size, mtime FROM files')}
+        todo = []
+        stats = {'added': 0, 'updated': 0, 'removed': 0,
+                 'unchanged': 0, 'errors': 0}
+        for path in paths:
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            if path not in known:
+                todo.append(path)
+                stats['added'] += 1
+            elif known[path] != (stat.st_size, stat.st_mtime):
+                todo.append(path)
+                stats['updated'] += 1
+            else:
+                stats['unchanged'] += 1
+
+        # remove deleted files
+        root = os.path.abspath(directory).rstrip(os.sep) + os.sep
+        found = set(paths)
+        removed = [path for path in known
+                   if path.startswith(root) and path not in found]
+        with self._conn:
+            for path in removed:
+                self._conn.execute('DELETE FROM files WHERE path = ?',
+                                   (path,))
+        stats['removed'] = len(removed)
+
+        # map changed files
+        if processes == 1 or len(todo) <= 1:
+            records = map(catalog_file, todo)
+            self._store(records, stats)
+        else:
+            with ProcessPoolExecutor(max_workers=processes) as pool:
+                self._store(pool.map(catalog_file, todo), stats)
+
+        return stats
+
+    def _store(self, records, stats):
+        """Write mapped file records to the database."""
+        for record in records:
+            if record['error'] is not None:
+                stats['errors'] += 1
+            with self._conn:
+                self._conn.execute('DELETE FROM files WHERE path = ?',
+                                   (record['path'],))
+                cursor = self._conn.execute(
+                    'INSERT INTO files (path, size, mtime, exp_descr, '
+                    'hdf_version, error) VALUES (?, ?, ?, ?, ?, ?)',
+                    (record['path'], record['size'], record['mtime'],
+                     record['exp_descr'], record['hdf_version'],
+                     record['error']))
+                file_id = cursor.lastrowid
+                for table, ncols in (('digitizers', 10),
+                                     ('probes', 8),
+                                     ('motion_lists', 3),
+                                     ('waveforms', 7)):
+                    self._conn.executemany(
+                        'INSERT INTO {} VALUES ({})'.format(
+                            table, ', '.join(['?'] * (ncols + 1))),
+                        [[file_id] + row for row in record[table]])
+
+    @property
+    def files(self):
+        """List of all cataloged file paths"""
+        return [row[0] for row in self._conn.execute(
+            'SELECT path FROM files ORDER BY path')]
+
+    @property
+    def errors(self):
+        """Dictionary of file path to error for unmappable files"""
+        return dict(self._conn.execute(
+            'SELECT path, error FROM files WHERE error IS NOT NULL'))
+
+    def find_files(self, exp_descr=None, hdf_version=None):
+        """
+        Find files by experiment description or LaPD software version.
+
+        :param str exp_descr: sub-string of the experiment description
+        :param str hdf_version: LaPD software version
+        :return: list of file paths
+        :rtype: list(str)
+        """
+        where, args = [], []
+        if exp_descr is not None:
+            where.append("exp_descr LIKE ? ESCAPE '\\'")
+            args.append('%' + _escape_like(exp_descr) + '%')
+        if hdf_version is not None:
+            where.append('hdf_version = ?')
+            args.append(hdf_version)
+        sql = 'SELECT path FROM files'
+        if where:
+            sql += ' WHERE ' + ' AND '.join(where)
+        return [row[0] for row in
+                self._conn.execute(sql + ' ORDER BY path', args)]
+
+    def find_digitizer_data(self, digitizer=None, config=None,
+                            adc=None, board=None, channel=None,
+                            shotnum=None):
+        """
+        Find digitizer datasets of active configurations.
+
+        :param str digitizer: digitizer name (e.g. :code:`'SIS 3301'`)
+        :param str config: digitizer configuration name
+        :param str adc: adc name
+        :param int board: board number
+        :param int channel: channel number
+        :param shotnum: only include datasets recording this shot
+            number (`int`) or any shot in the inclusive range
+            :code:`(start, stop)`
+        :return: list of :code:`(file, dataset, (first shot, last
+            shot))`
+        :rtype: list(tuple)
+        """
+        return self._find('digitizers',
+                          {'digitizer': digitizer, 'config': config,
+                           'adc': adc, 'board': board,
+                           'channel': channel},
+                          shotnum)
+
+    def find_probes(self, probe=None, receptacle=None, shotnum=None):
+        """
+        Find 6K Compumotor probe datasets.
+
+        :param str probe: probe name
+        :param int receptacle: receptacle number
+        :param shotnum: (see :meth:`find_digitizer_data`)
+        :return: list of :code:`(file, dataset, (first shot, last
+            shot))`
+        :rtype: list(tuple)
+        """
+        return self._find('probes',
+                          {'probe': probe, 'receptacle': receptacle},
+                          shotnum)
+
+    def find_waveforms(self, command=None, config=None, shotnum=None):
+        """
+        Find Waveform datasets.
+
+        :param str command: sub-string of a command in the command list
+        :param str config: Waveform configuration name
+        :param shotnum: (see :meth:`find_digitizer_data`)
+        :return: list of :code:`(file, dataset, (first shot, last
+            shot))`
+        :rtype: list(tuple)
+        """
+        where = {'config': config}
+        like = None
+        if command is not None:
+            like = ('command_list',
+                    '%' + _escape_like(json.dumps(command)[1:-1]) + '%')
+        return self._find('waveforms', where, shotnum, like=like)
+
+    def motion_lists(self, path):
+        """
+        Motion lists recorded in a file.
+
+        :param str path: file path
+        :return: dictionary of motion list name to configuration
+        :rtype: dict
+        """
+        rows = self._conn.execute(
+            'SELECT m.name, m.config FROM motion_lists m '
+            'JOIN files f ON m.file_id = f.id WHERE f.path = ?',
+            (os.path.abspath(path),))
+        return {name: json.loads(config) for name, config in rows}
+
+    def _find(self, table, equals, shotnum, like=None):
+        """Query :data:`table` for datasets matching the criteria."""
+        where = ['t.dataset IS NOT NULL']
+        args = []
+        for column, val in equals.items():
+            if val is not None:
+                where.append('t.{} = ?'.format(column))
+                args.append(_to_builtin(val))
+        if like is not None:
+            where.append("t.{} LIKE ? ESCAPE '\\'".format(like[0]))
+            args.append(like[1])
+        if shotnum is not None:
+            if isinstance(shotnum, (tuple, list)):
+                start, stop = shotnum
+            else:
+                start = stop = shotnum
+            where.append('t.shot_min <= ? AND t.shot_max >= ?')
+            args.extend([int(stop), int(start)])
+
+        sql = ('SELECT f.path, t.dataset, t.shot_min, t.shot_max '
+               'FROM {} t JOIN files f ON t.file_id = f.id '
+               'WHERE {} ORDER BY f.path, t.dataset').format(
+            table, ' AND '.join(where))
+        return [(path, dset, (smin, smax))
+                for path, dset, smin, smax in
+                self._conn.execute(sql, args)]
+
+
+def _escape_like(val):
+    """Escape the wildcard characters of an SQL LIKE pattern."""
+    return val.replace('\\', '\\\\').replace('%', '\\%').replace(
+        '_', '\\_')
@@ -0,0 +1,411 @@
+# This file is part of the bapsflib package, a Python toolkit for the
+# BaPSF group at UCLA.
+#
+# http://plasma.physics.ucla.edu/
+#
+# Copyright 2017-2018 Erik T. Everson and contributors
+#
+# License: Standard 3-clause BSD; see "LICENSES/LICENSE.txt" for full
+#   license terms and contributor agreement.
+#
+"""
+Tools for sizing the HDF5 chunk cache of digitizer datasets and for
+sharing decompressed chunks between processes.
+"""
+import h5py
+import hashlib
+import numpy as np
+import os
+import threading
+
+from collections import OrderedDict
+
+from .hdfmmap import condition_index
+
+try:
+    from multiprocessing import shared_memory
+except ImportError:  # pragma: no cover
+    # Python < 3.8
+    shared_memory = None
+
+#: upper bound (in bytes) for an automatically sized chunk cache
+AUTO_RDCC_MAX_NBYTES = 64 * 2 ** 20
+
+
+def auto_chunk_cache(dset, max_nbytes=AUTO_RDCC_MAX_NBYTES):
+    """
+    Determine chunk cache parameters for a chunked dataset.
+
+    Digitizer datasets are read as whole rows (:code:`dset[index, :]`),
+    so the cache is sized to hold one full row of chunks, i.e. all
+    chunks that share the same row range.  Consecutive rows then only
+    decompress each chunk once.
+
+    :param dset: the (chunked) dataset
+    :type dset: :class:`h5py.Dataset`
+    :param int max_nbytes: upper bound for the cache size (in bytes)
+    :return: :code:`(rdcc_nslots, rdcc_nbytes, rdcc_w0)`, or
+        :code:`None` if :data:`dset` is not chunked
+    :rtype: tuple
+    """
+    chunks = dset.chunks
+    if chunks is None:
+        return None
+
+    # number of bytes in a single chunk
+    chunk_nbytes = int(np.prod(chunks)) * dset.dtype.itemsize
+
+    # number of chunks spanning the non-row dimensions
+    nchunks = 1
+    for size, csize in zip(dset.shape[1:], chunks[1:]):
+        nchunks *= -(-size // csize)
+
+    # hold a full row of chunks (plus one for overlap), but never less
+    # than the HDF5 default of 1 MB
+    nbytes = max((nchunks + 1) * chunk_nbytes, 2 ** 20)
+    nbytes = min(nbytes, max(max_nbytes, chunk_nbytes))
+
+    # HDF5 recommends a prime number of slots ~100x the number of chunks
+    # that fit in the cache
+    nslots = _next_prime(100 * max(nbytes // chunk_nbytes, 1))
+
+    # rows are read once, so fully read chunks are evicted first
+    w0 = 1.0
+
+    return nslots, nbytes, w0
+
+
+def open_dataset(hdf_file, path, rdcc_nslots=None, rdcc_nbytes=None,
+                 rdcc_w0=None):
+    """
+    Open a dataset with dataset specific chunk cache parameters.
+
+    Any parameter left as :code:`None` is filled by
+    :func:`auto_chunk_cache`.  If the dataset is not chunked, then it
+    is opened with the file's default access properties.
+
+    :param hdf_file: the HDF5 file object
+    :type hdf_file: :class:`h5py.File`
+    :param str path: path to the dataset
+    :param int rdcc_nslots: number of chunk slots in the cache hash
+        table
+    :param int rdcc_nbytes: total size (in bytes) of the chunk cache
+    :param float rdcc_w0: chunk preemption policy
+    :return: the opened dataset
+    :rtype: :class:`h5py.Dataset`
+    """
+    dset = hdf_file.get(path)
+    if not isinstance(dset, h5py.Dataset):
+        return dset
+
+    auto = auto_chunk_cache(dset)
+    if auto is None:
+        return dset
+    if rdcc_nslots is None:
+        rdcc_nslots = auto[0]
+    if rdcc_nbytes is None:
+        rdcc_nbytes = auto[1]
+    if rdcc_w0 is None:
+        rdcc_w0 = auto[2]
+
+    dapl = h5py.h5p.create(h5py.h5p.DATASET_ACCESS)
+    dapl.set_chunk_cache(rdcc_nslots, rdcc_nbytes, rdcc_w0)
+    dsid = h5py.h5d.open(hdf_file.id, dset.name.encode('utf-8'),
+                         dapl=dapl)
+    return h5py.Dataset(dsid)
+
+
+class hdfSharedChunkCache(object):
+    """
+    Cache of decompressed dataset chunks held in shared memory so that
+    several processes reading the same HDF5 file only decompress each
+    chunk once.
+
+    The cache unit is a *chunk row*, all the chunks of a dataset that
+    share the same row range.  Each chunk row is stored in its own
+    shared memory segment whose name is derived from the file path,
+    file modification time, dataset name, and chunk row number, so
+    independent processes find each other's segments without any
+    coordination.  A segment is only used once its writer has marked
+    it complete.
+
+    Segments are owned by the process that created them and live until
+    that process calls :meth:`close`, evicts them to stay within
+    :attr:`max_bytes`, or exits.
+
+    :Example:
+
+        >>> # in each worker process
+        >>> from bapsflib import lapdhdf
+        >>> scache = lapdhdf.hdfSharedChunkCache(max_bytes=2 ** 30)
+        >>> f = lapdhdf.File('sample.hdf5', shared_chunk_cache=scache)
+        >>> data = f.read_data(0, 0, shotnum=slice(1, 100))
+
+    .. note::
+
+        Requires :mod:`multiprocessing.shared_memory` (Python 3.8+).
+    """
+    # header: [ready flag, number of data bytes]
+    _HEADER = np.dtype([('ready', '<u8'), ('nbytes', '<u8')])
+
+    def __init__(self, max_bytes=512 * 2 ** 20, prefix='bapsf'):
+        """
+        :param int max_bytes: budget (in bytes) for the segments created
+            by this process (default 512 MB)
+        :param str prefix: prefix for the shared memory segment names,
+            processes must use the same prefix to share chunks
+        """
+        if shared_memory is None:
+            raise ImportError('hdfSharedChunkCache requires '
+                              'multiprocessing.shared_memory '
+                              '(Python 3.8+)')
+        if not isinstance(max_bytes, int) or max_bytes < 0:
+            raise ValueError('max_bytes must be a non-negative int')
+        if not isinstance(prefix, str) or len(prefix) > 8:
+            raise ValueError('prefix must be a str of at most 8 '
+                             'characters')
+
+        self._max_bytes = max_bytes
+        self._prefix = prefix
+
+        # segments created (owned) by this process, name -> segment
+        self._owned = OrderedDict()
+        self._owned_bytes = 0
+        self._lock = threading.RLock()
+        self._stats = {'hits': 0,
+                       'misses': 0,
+                       'stores': 0,
+                       'evictions': 0}
+
+    @property
+    def max_bytes(self):
+        """Budget (in bytes) for segments created by this process"""
+        return self._max_bytes
+
+    @property
+    def nbytes(self):
+        """Number of bytes in segments created by this process"""
+        return self._owned_bytes
+
+    @property
+    def stats(self):
+        """
+        Dictionary of cache statistics (:const:`hits`,
+        :const:`misses`, :const:`stores`, :const:`evictions`,
+        :const:`segments`) for this process
+        """
+        with self._lock:
+            stats = self._stats.copy()
+            stats['segments'] = len(self._owned)
+        return stats
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def close(self):
+        """Release all shared memory segments created by this process."""
+        with self._lock:
+            while self._owned:
+                name, shm = self._owned.popitem(last=False)
+                _release(shm, unlink=True)
+            self._owned_bytes = 0
+
+    def read_rows(self, dset, index):
+        """
+        Read :code:`dset[index, ...]` through the shared chunk cache.
+
+        :param dset: the dataset to read from
+        :type dset: :class:`h5py.Dataset`
+        :param index: row index
+        :type index: int, list(int), slice()
+        :return: the requested rows
+        :rtype: :class:`numpy.ndarray`
+        """
+        if dset.chunks is None:
+            # nothing to decompress
+            return dset[index, ...]
+
+        rows, scalar = _resolve_rows(index, dset.shape[0])
+
+        crows = dset.chunks[0]
+        out = np.empty((rows.size,) + dset.shape[1:], dtype=dset.dtype)
+        key_base = _dataset_key(dset)
+        for chunk_row in np.unique(rows // crows):
+            block = self._get_block(dset, key_base, int(chunk_row))
+            mask = (rows // crows) == chunk_row
+            out[mask] = block[rows[mask] - (chunk_row * crows)]
+
+        return out[0] if scalar else out
+
+    def _get_block(self, dset, key_base, chunk_row):
+        """Get (or read and store) a chunk row of :data:`dset`."""
+        crows = dset.chunks[0]
+        start = chunk_row * crows
+        stop = min(start + crows, dset.shape[0])
+        shape = (stop - start,) + dset.shape[1:]
+        nbytes = int(np.prod(shape)) * dset.dtype.itemsize
+        name = self._segment_name(key_base, chunk_row)
+
+        # look for a completed segment
+        block = self._attach(name, shape, dset.dtype, nbytes)
+        if block is not None:
+            with self._lock:
+                self._stats['hits'] += 1
+            return block
+
+        # read (decompress) the chunk row and store it
+        with self._lock:
+            self._stats['misses'] += 1
+        block = dset[start:stop, ...]
+        self._store(name, block)
+        return block
+
+    def _segment_name(self, key_base, chunk_row):
+        """Shared memory segment name for a chunk row."""
+        digest = hashlib.sha1(
+            '{}:{}'.format(key_base, chunk_row).encode('utf-8'))
+        return '{}_{}'.format(self._prefix, digest.hexdigest()[:20])
+
+    def _attach(self, name, shape, dtype, nbytes):
+        """Copy a completed segment into a new array."""
+        try:
+            shm = _open_segment(name)
+        except (FileNotFoundError, OSError, ValueError):
+            return None
+
+        try:
+            hsize = self._HEADER.itemsize
+            if shm.size < hsize + nbytes:
+                return None
+            header = np.frombuffer(shm.buf, dtype=self._HEADER,
+                                   count=1)[0]
+            if header['ready'] != 1 or header['nbytes'] != nbytes:
+                # segment is still being written
+                return None
+            block = np.frombuffer(shm.buf, dtype=dtype,
+                                  count=int(np.prod(shape)),
+                                  offset=hsize).reshape(shape).copy()
+            del header
+        finally:
+            _release(shm, unlink=False)
+
+        return block
+
+    def _store(self, name, block):
+        """Write a chunk row into a new shared memory segment."""
+        nbytes = block.nbytes
+        if nbytes > self._max_bytes:
+            return
+
+        hsize = self._HEADER.itemsize
+        try:
+            shm = shared_memory.SharedMemory(name=name, create=True,
+                                             size=hsize + nbytes)
+        except FileExistsError:
+            # another process is storing the same chunk row
+            return
+        except OSError:
+            # out of shared memory
+            return
+
+        buf = np.frombuffer(shm.buf, dtype=np.uint8,
+                            count=hsize + nbytes)
+        buf[hsize:] = np.frombuffer(
+            np.ascontiguousarray(block).tobytes(), dtype=np.uint8)
+        header = np.frombuffer(shm.buf, dtype=self._HEADER, count=1)
+        header['nbytes'] = nbytes
+        header['ready'] = 1      # mark complete last
+        del buf, header
+
+        with self._lock:
+            self._owned[name] = shm
+            self._owned_bytes += shm.size
+            self._stats['stores'] += 1
+
+            # enforce budget
+            while self._owned_bytes > self._max_bytes:
+                old_name, old_shm = self._owned.popitem(last=False)
+                self._owned_bytes -= old_shm.size
+                self._stats['evictions'] += 1
+                _release(old_shm, unlink=True)
+
+
+def _resolve_rows(index, nrows):
+    """
+    Resolve a row index into an array of row numbers (without
+    allocating an array the size of the dataset).
+
+    :param index: row index
+    :type index: int, list(int), slice()
+    :param int nrows: number of rows of the dataset
+    :return: the row numbers and :code:`True` if :data:`index` selects
+        a single row
+    :rtype: (:class:`numpy.ndarray`, bool)
+    """
+    if isinstance(index, slice):
+        return np.arange(*index.indices(nrows)), False
+    if isinstance(index, (int, np.integer)):
+        row = int(index) + nrows if index < 0 else int(index)
+        if row < 0 or row >= nrows:
+            raise IndexError('Index ({}) out of range '
+                             '(0-{})'.format(index, nrows - 1))
+        return np.array([row]), True
+    index = np.asarray(index)
+    if index.dtype == bool:
+        return np.nonzero(index)[0], False
+    return np.asarray(condition_index(index, nrows)), False
+
+
+def _dataset_key(dset):
+    """Identify a dataset by file path, file mtime, and dataset name."""
+    fname = os.path.abspath(dset.file.filename)
+    try:
+        mtime = os.path.getmtime(fname)
+    except OSError:
+        mtime = None
+    return '{}:{}:{}'.format(fname, mtime, dset.name)
+
+
+def _open_segment(name):
+    """Attach to an existing segment without taking ownership of it."""
+    try:
+        # Python 3.13+
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        pass
+
+    # older versions register attached segments with the resource
+    # tracker, which would unlink them when this process exits, so
+    # undo the registration after attaching
+    shm = shared_memory.SharedMemory(name=name)
+    try:
+        from multiprocessing import resource_tracker
+        resource_tracker.unregister(shm._name, 'shared_memory')
+    except (ImportError, AttributeError):  # pragma: no cover
+        pass
+    return shm
+
+
+def _release(shm, unlink=False):
+    """Close (and unlink) a shared memory segment."""
+    try:
+        shm.close()
+    except BufferError:  # pragma: no cover
+        pass
+    if unlink:
+        try:
+            shm.unlink()
+        except FileNotFoundError:
+            pass
+
+
+def _next_prime(n):
+    """Smallest prime >= n."""
+    n = max(int(n), 2)
+    while True:
+        if all(n % i for i in range(2, int(n ** 0.5) + 1)):
+            return n
+        n += 1
@@ -0,0 +1,59 @@
+# This file is part of the bapsflib package, a Python toolkit for the
+# BaPSF group at UCLA.
+#
+# http://plasma.physics.ucla.edu/
+#
+# Copyright 2017-2018 Erik T. Everson and contributors
+#
+# License: Standard 3-clause BSD; see "LICENSES/LICENSE.txt" for full
+#   license terms and contributor agreement.
+#
+"""
+JSON-serializable form of :mod:`numpy` dtypes, shared by the persisted
+inventory (:mod:`~bapsflib.lapdhdf.hdfinventory`) and the read server
+protocol (:mod:`~bapsflib.lapdhdf.hdfserver`).
+"""
+import numpy as np
+
+
+def encode_dtype(dtype):
+    """
+    Convert a dtype to JSON-serializable form.  Structured dtypes keep
+    their field offsets and itemsize, so padded (aligned) dtypes
+    round-trip exactly.  h5py metadata (e.g. string encodings) is not
+    kept.
+
+    :param dtype: the dtype
+    :type dtype: :class:`numpy.dtype`
+    :return: a type string, a :code:`[base, shape]` list for
+        sub-array dtypes, or a dictionary for structured dtypes
+    """
+    dtype = np.dtype(dtype)
+    if dtype.fields is not None:
+        names = list(dtype.names)
+        return {'names': names,
+                'formats': [encode_dtype(dtype.fields[name][0])
+                            for name in names],
+                'offsets': [dtype.fields[name][1] for name in names],
+                'itemsize': dtype.itemsize}
+    if dtype.subdtype is not None:
+        base, shape = dtype.subdtype
+        return [encode_dtype(base), list(shape)]
+    return dtype.str
+
+
+def decode_dtype(val):
+    """
+    Convert the output of :func:`encode_dtype` back to a dtype.
+
+    :rtype: :class:`numpy.dtype`
+    """
+    if isinstance(val, dict):
+        return np.dtype({'names': val['names'],
+                         'formats': [decode_dtype(fmt)
+                                     for fmt in val['formats']],
+                         'offsets': val['offsets'],
+                         'itemsize': val['itemsize']})
+    if isinstance(val, list):
+        return np.dtype((decode_dtype(val[0]), tuple(val[1])))
+    return np.dtype(val)
@@ -0,0 +1,269 @@
+# This file is part of the bapsflib package, a Python toolkit for the
+# BaPSF group at UCLA.
+#
+# http://plasma.physics.ucla.edu/
+#
+# Copyright 2017-2018 Erik T. Everson and contributors
+#
+# License: Standard 3-clause BSD; see "LICENSES/LICENSE.txt" for full
+#   license terms and contributor agreement.
+#
+"""
+Reconstruction of '6K Compumotor' motion list grids.
+"""
+import numpy as np
+
+from collections import namedtuple
+
+from .hdfprefetch import hdfPrefetchReader
+from .hdfreduce import hdfGroupReducer
+
+hdfGridData = namedtuple('hdfGridData',
+                         ['data', 'x', 'y', 'count', 'shotnum',
+                          'skipped'])
+"""
+Digitizer data arranged on a motion list grid.
+
+:param data: signals of shape :code:`(nx, ny, nrepeat, nt)` (dense,
+    NaN where a grid point has fewer shots) or :code:`(nx, ny, nt)`
+    (reduced)
+:type data: :class:`numpy.ndarray`
+:param x: x positions of the grid points
+:type x: :class:`numpy.ndarray`
+:param y: y positions of the grid points
+:type y: :class:`numpy.ndarray`
+:param count: number of shots at each grid point, shape
+    :code:`(nx, ny)`
+:type count: :class:`numpy.ndarray`
+:param shotnum: shot numbers of the dense signals, shape
+    :code:`(nx, ny, nrepeat)` (:code:`0` where there is no shot),
+    :code:`None` when reduced
+:type shotnum: :class:`numpy.ndarray`
+:param int skipped: number of shots whose position is not on the grid
+"""
+
+
+def grid_axes(ml_config):
+    """
+    Positions of the grid points of a motion list.  A motion list
+    grid has :code:`npoints` points per axis spaced by :code:`delta`
+    and centered on :code:`center`.
+
+    :param dict ml_config: motion list configuration, an entry of
+        the '6K Compumotor' control map :code:`motion_lists`
+    :return: one array of positions per axis (x, y, z)
+    :rtype: tuple(:class:`numpy.ndarray`)
+    """
+    axes = []
+    for center, delta, npts in zip(ml_config['center'],
+                                   ml_config['delta'],
+                                   ml_config['npoints']):
+        npts = max(int(npts), 1)
+        axes.append(center + delta * (np.arange(npts)
+                                      - 0.5 * (npts - 1)))
+    return tuple(axes)
+
+
+def grid_index(xyz, ml_config, tol=0.25):
+    """
+    Map positions to the indices of the nearest motion list grid
+    points.
+
+    :param xyz: positions, shape :code:`(N, 3)`
+    :type xyz: :class:`numpy.ndarray`
+    :param dict ml_config: motion list configuration
+    :param float tol: largest allowed distance of a position from its
+        grid point, as a fraction of the grid spacing of each axis
+    :return: indices of shape :code:`(N, 3)` (:code:`(ix, iy, iz)`)
+        and a mask of the positions on the grid (within :data:`tol`
+        and not NaN)
+    :rtype: (:class:`numpy.ndarray`, :class:`numpy.ndarray`)
+    """
+    xyz = np.asarray(xyz, dtype=np.float64).reshape(-1, 3)
+    index = np.zeros(xyz.shape, dtype=np.intp)
+    valid = ~np.isnan(xyz).any(axis=1)
+    for axis in range(3):
+        center = ml_config['center'][axis]
+        delta = ml_config['delta'][axis]
+        npts = max(int(ml_config['npoints'][axis]), 1)
+        if npts == 1 or delta == 0:
+            # single point axis, positions must match the center when
+            # a spacing is defined
+            if delta != 0:
+                valid &= np.abs(xyz[:, axis] - center) \
+                    <= tol * abs(delta)
+            continue
+        with np.errstate(invalid='ignore'):
+            frac = (xyz[:, axis] - center) / delta + 0.5 * (npts - 1)
+            nearest = np.round(frac)
+            valid &= np.abs(frac - nearest) <= tol
+            valid &= (nearest >= 0) & (nearest < npts)
+        index[valid, axis] = nearest[valid].astype(np.intp)
+    return index, valid
+
+
+def read_grid(hdf_file, board, channel, receptacle=None,
+              motion_list=None, reduce=None, tol=0.25,
+              block_size='auto', shotnum=None, **kwargs):
+    """
+    Read a digitizer channel onto the grid of a '6K Compumotor'
+    motion list in one pass over the data.
+
+    Shots of the motion list are mapped to grid indices
+    :code:`(ix, iy)` from their recorded probe position (see
+    :func:`grid_index`).  Without :data:`reduce` the signals are
+    assembled into a dense :code:`(nx, ny, nrepeat, nt)` array, where
+    :code:`nrepeat` is the largest number of shots at a grid point.
+    With :data:`reduce` each grid point is reduced while streaming
+    (see :class:`~bapsflib.lapdhdf.hdfreduce.hdfGroupReducer`) into a
+    :code:`(nx, ny, nt)` array.
+
+    :param hdf_file: object instance of the HDF5 file
+    :type hdf_file: :class:`~bapsflib.lapdhdf.files.File`
+    :param int board: digitizer board number
+    :param int channel: digitizer channel number
+    :param int receptacle: probe drive receptacle (can be omitted if
+        only one probe drive is deployed)
+    :param str motion_list: name of the motion list (can be omitted
+        if the file has only one)
+    :param str reduce: :code:`None` (default) for the dense array, or
+        one of :code:`'mean'`, :code:`'var'`, :code:`'min'`, and
+        :code:`'max'`
+    :param float tol: largest allowed distance of a position from its
+        grid point, as a fraction of the grid spacing
+    :param block_size: shots per streamed block (see
+        :class:`~bapsflib.lapdhdf.hdfprefetch.hdfPrefetchReader`)
+    :param shotnum: restrict the read to these shot numbers
+    :type shotnum: int, list(int), or slice()
+    :param kwargs: additional keywords of
+        :class:`~bapsflib.lapdhdf.hdfprefetch.hdfPrefetchReader` (e.g.
+        :code:`digitizer`, :code:`adc`, :code:`config_name`)
+    :rtype: :class:`hdfGridData`
+    """
+    try:
+        cmap = hdf_file.file_map.controls['6K Compumotor']
+    except AttributeError:
+        raise AttributeError(
+            'hdf_file needs to be of type lapdhdf.File')
+    except KeyError:
+        raise ValueError("no '6K Compumotor' in the HDF5 file")
+
+    # resolve receptacle and motion list
+    dname = cmap.construct_dataset_name(receptacle)
+    if receptacle is None:
+        receptacle = cmap.list_receptacles[0]
+    motion_lists = cmap.motion_lists
+    if motion_list is None:
+        if len(motion_lists) != 1:
+            raise ValueError(
+                'motion_list must be specified, the file has motion '
+                'lists {}'.format(sorted(motion_lists)))
+        motion_list = list(motion_lists)[0]
+    elif motion_list not in motion_lists:
+        raise ValueError('unknown motion list {}'.format(motion_list))
+    ml_config = motion_lists[motion_list]
+    if reduce is not None and reduce not in hdfGroupReducer._STATS:
+        raise ValueError('unknown reduction {}'.format(reduce))
+
+    # locate the shots of the motion list from the control dataset
+    # - only the 6K dataset is read here, its size is negligible
+    #   compared to the digitizer data
+    cdset = hdf_file.get(cmap.info['group path'] + '/' + dname)
+    names = cdset.dtype.names
+    sn = cdset['Shot number'].astype(np.int64)
+    xyz = np.stack([cdset[ax] for ax in ('x', 'y', 'z')], axis=1)
+    mask = np.ones(sn.shape, dtype=bool)
+    if 'Motion list' in names:
+        # - only the distinct motion list names are decoded
+        ml_names, ml_inv = np.unique(cdset['Motion list'],
+                                     return_inverse=True)
+        match = np.array(
+            [name.decode('utf-8', 'replace').strip('\x00')
+             == motion_list if isinstance(name, bytes)
+             else str(name) == motion_list for name in ml_names],
+            dtype=bool)
+        mask &= match[ml_inv.reshape(-1)]
+    if shotnum is not None:
+        if isinstance(shotnum, int):
+            shotnum = [shotnum]
+        elif isinstance(shotnum, slice):
+            stop = int(sn.max()) + 1 if shotnum.stop is None \
+                else shotnum.stop
+            shotnum = range(*shotnum.indices(stop))
+        mask &= np.isin(sn, np.asarray(list(shotnum), dtype=np.int64))
+    index, on_grid = grid_index(xyz, ml_config, tol=tol)
+    mask &= on_grid
+    shots = np.unique(sn[mask])
+    if shots.size == 0:
+        raise ValueError('no shots of motion list {} on its '
+                         'grid'.format(motion_list))
+
+    x, y = grid_axes(ml_config)[:2]
+    nx, ny = x.shape[0], y.shape[0]
+
+    kwargs.setdefault('silent', True)
+    kwargs['add_controls'] = [('6K Compumotor', receptacle)]
+    reader = hdfPrefetchReader(hdf_file, board, channel,
+                               block_size=block_size,
+                               shotnum=[int(s) for s in shots],
+                               **kwargs)
+
+    skipped = 0
+    count = np.zeros((nx, ny), dtype=np.int64)
+    if reduce is None:
+        # size the repeat axis from the control data
+        pts = index[mask, 0] * ny + index[mask, 1]
+        nrep = int(np.bincount(pts, minlength=nx * ny).max())
+        data = None
+        shotgrid = np.zeros((nx, ny, nrep), dtype=np.uint32)
+        with reader:
+            for block in reader:
+                bidx, valid = grid_index(block['xyz'], ml_config,
+                                         tol=tol)
+                skipped += int(np.count_nonzero(~valid))
+                if not valid.any():
+                    continue
+                bidx = bidx[valid]
+                signal = block['signal'][valid]
+                if data is None:
+                    data = np.full((nx, ny, nrep, signal.shape[1]),
+                                   np.nan, dtype=signal.dtype
+                                   if signal.dtype.kind == 'f'
+                                   else np.float64)
+
+                # repeat index: running count of the grid point plus
+                # the rank of the shot within the block
+                p = bidx[:, 0] * ny + bidx[:, 1]
+                order = np.argsort(p, kind='stable')
+                ps = p[order]
+                first = np.searchsorted(ps, ps, side='left')
+                rank = np.empty_like(p)
+                rank[order] = np.arange(ps.shape[0]) - first
+                rep = count.ravel()[p] + rank
+                keep = rep < nrep
+                ix, iy = bidx[keep, 0], bidx[keep, 1]
+                data[ix, iy, rep[keep]] = signal[keep]
+                shotgrid[ix, iy, rep[keep]] = \
+                    block['shotnum'][valid][keep]
+                np.add.at(count, (bidx[:, 0], bidx[:, 1]), 1)
+        if data is None:
+            data = np.full((nx, ny, nrep, 0), np.nan)
+        return hdfGridData(data, x, y, count, shotgrid, skipped)
+
+    # streaming reduction keyed on the (flat) grid point index
+    reducer = hdfGroupReducer('point', stats=(reduce,))
+    with reader:
+        for block in reader:
+            bidx, valid = grid_index(block['xyz'], ml_config, tol=tol)
+            skipped += int(np.count_nonzero(~valid))
+            if not valid.any():
+                continue
+            reducer.update_groups(bidx[valid, 0] * ny + bidx[valid, 1],
+                                  block['signal'][valid])
+    stats = reducer.result()
+    nt = stats[reduce].shape[1] if stats.shape[0] else 0
+    data = np.full((nx, ny, nt), np.nan)
+    ix, iy = np.divmod(stats['point'], ny)
+    data[ix, iy] = stats[reduce]
+    count[ix, iy] = stats['count']
+    return hdfGridData(data, x, y, count, None, skipped)
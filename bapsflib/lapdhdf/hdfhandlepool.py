@@ -0,0 +1,391 @@
+# This file is part of the bapsflib package, a Python toolkit for the
+# BaPSF group at UCLA.
+#
+# http://plasma.physics.ucla.edu/
+#
+# Copyright 2017-2018 Erik T. Everson and contributors
+#
+# License: Standard 3-clause BSD; see "LICENSES/LICENSE.txt" for full
+#   license terms and contributor agreement.
+#
+"""
+Pool of open :class:`~bapsflib.lapdhdf.files.File` handles for
+long-running services.
+"""
+import os
+import threading
+import time
+
+from contextlib import contextmanager
+
+from .files import File
+
+
+class _PoolEntry(object):
+    """Open handles of one file."""
+    def __init__(self, path):
+        self.path = path
+
+        # idle - list of (File, release time), most recent last
+        # busy - list of checked out File
+        self.idle = []
+        self.busy = []
+
+        # number of handles currently being opened
+        self.opening = 0
+
+        # mapping shared by all handles and the handle that built it
+        self.file_map = None
+        self.owner = None
+
+    @property
+    def nopen(self):
+        """Number of open (or opening) handles."""
+        return len(self.idle) + len(self.busy) + self.opening
+
+
+class hdfHandlePool(object):
+    """
+    Thread-safe pool of open :class:`~bapsflib.lapdhdf.files.File`
+    handles keyed by file path.
+
+    The first handle of a file runs the file checks and mapping, all
+    later handles of the same file are opened with that mapping (see
+    the :data:`file_map` keyword of
+    :class:`~bapsflib.lapdhdf.files.File`), so a checkout only costs an
+    HDF5 open the first few times and nothing once the pool is warm.
+    At most :attr:`max_handles` handles are opened per file; a checkout
+    beyond that waits for a handle to be released.  Handles left idle
+    for longer than :attr:`idle_timeout` are closed the next time the
+    pool is used (or by :meth:`evict_idle`).
+
+    Handles are checked out by one thread (or task) at a time.
+    :mod:`h5py` serializes calls into the HDF5 library, so concurrent
+    reads of chunked datasets still take turns, but reads served from
+    memory maps (see :data:`mmap_reads` of
+    :class:`~bapsflib.lapdhdf.files.File`) and the per-handle dataset
+    caches do not contend.  :mod:`asyncio` code should check out
+    handles and read through :meth:`asyncio.loop.run_in_executor`.
+
+    :Example:
+
+        >>> from bapsflib import lapdhdf
+        >>> pool = lapdhdf.hdfHandlePool(max_handles=4)
+        >>> with pool.checkout('sample.hdf5') as f:
+        ...     data = f.read_data(0, 0, shotnum=slice(1, 100))
+        >>> pool.stats['opens'], pool.stats['checkouts']
+        (1, 1)
+    """
+    def __init__(self, max_handles=4, idle_timeout=300.0,
+                 **file_kwargs):
+        """
+        :param int max_handles: maximum number of open handles per file
+            (default 4)
+        :param float idle_timeout: seconds a handle may stay idle
+            before it is closed, :code:`None` keeps idle handles open
+            (default 300)
+        :param file_kwargs: keywords passed to
+            :class:`~bapsflib.lapdhdf.files.File` when opening handles
+            (e.g. :code:`read_cache` or :code:`rdcc_nbytes`).  Files
+            are always opened read-only.
+        """
+        if not isinstance(max_handles, int) \
+                or isinstance(max_handles, bool) or max_handles < 1:
+            raise ValueError('max_handles must be a positive int')
+        if idle_timeout is not None and idle_timeout < 0:
+            raise ValueError(
+                'idle_timeout must be a non-negative number or None')
+        for key in ('mode', 'file_map'):
+            if key in file_kwargs:
+                raise TypeError(
+                    "keyword '{}' can not be set for pooled "
+                    "handles".format(key))
+
+        self._max_handles = max_handles
+        self._idle_timeout = idle_timeout
+        self._file_kwargs = file_kwargs
+
+        # _entries     - path -> _PoolEntry
+        # _checked_out - id(File) -> _PoolEntry
+        self._entries = {}
+        self._checked_out = {}
+        self._closed = False
+        self._cond = threading.Condition()
+        self._stats = {'checkouts': 0,
+                       'opens': 0,
+                       'reuses': 0,
+                       'waits': 0,
+                       'timeouts': 0,
+                       'evictions': 0,
+                       'open time': 0.0,
+                       'wait time': 0.0}
+
+    @property
+    def max_handles(self):
+        """Maximum number of open handles per file"""
+        return self._max_handles
+
+    @property
+    def idle_timeout(self):
+        """Seconds a handle may stay idle before it is closed"""
+        return self._idle_timeout
+
+    @property
+    def stats(self):
+        """
+        Pool metrics.  A dictionary with the counters
+
+        * :code:`'checkouts'` - number of checkouts
+        * :code:`'opens'` - number of handles opened
+        * :code:`'reuses'` - checkouts served by an idle handle
+        * :code:`'waits'` - checkouts that waited for a handle
+        * :code:`'timeouts'` - checkouts that timed out
+        * :code:`'evictions'` - idle handles closed
+        * :code:`'open time'` - total seconds spent opening (and
+          mapping) files
+        * :code:`'wait time'` - total seconds checkouts waited
+
+        and the current pool state :code:`'files'`,
+        :code:`'open handles'`, and :code:`'busy handles'`.
+        """
+        with self._cond:
+            stats = dict(self._stats)
+            stats['files'] = len(self._entries)
+            stats['open handles'] = sum(
+                len(entry.idle) + len(entry.busy)
+                for entry in self._entries.values())
+            stats['busy handles'] = len(self._checked_out)
+        return stats
+
+    @property
+    def handles(self):
+        """
+        Dictionary of pooled file path to a tuple of the number of open
+        and the number of busy handles.
+        """
+        with self._cond:
+            return {path: (len(entry.idle) + len(entry.busy),
+                           len(entry.busy))
+                    for path, entry in self._entries.items()}
+
+    def acquire(self, filename, timeout=None):
+        """
+        Check out a handle of :data:`filename`.  The handle must be
+        returned with :meth:`release` (or use :meth:`checkout`).
+
+        :param str filename: name of the HDF5 file
+        :param float timeout: seconds to wait for a free handle,
+            :code:`None` (default) waits indefinitely
+        :return: an open handle
+        :rtype: :class:`~bapsflib.lapdhdf.files.File`
+        :raises TimeoutError: if no handle became free within
+            :data:`timeout`
+        """
+        path = os.path.realpath(filename)
+        start = time.monotonic()
+        waited = False
+        hdf_file = None
+        with self._cond:
+            if self._closed:
+                raise ValueError('handle pool is closed')
+            evicted = self._evict_idle(start)
+            while True:
+                # (the entry may be evicted while waiting)
+                entry = self._entries.get(path, None)
+                if entry is None:
+                    entry = _PoolEntry(path)
+                    self._entries[path] = entry
+
+                if entry.idle:
+                    hdf_file = entry.idle.pop()[0]
+                    entry.busy.append(hdf_file)
+                    self._stats['reuses'] += 1
+                    break
+
+                # only one handle builds the mapping, all others wait
+                # for it
+                if entry.nopen < self._max_handles \
+                        and (entry.file_map is not None
+                             or entry.opening == 0):
+                    entry.opening += 1
+                    break
+
+                remaining = None if timeout is None \
+                    else timeout - (time.monotonic() - start)
+                if remaining is not None and remaining <= 0:
+                    self._stats['timeouts'] += 1
+                    for item in evicted:
+                        item.close()
+                    raise TimeoutError(
+                        'no handle of {} became free within {} '
+                        'seconds'.format(path, timeout))
+                waited = True
+                self._cond.wait(remaining)
+                if self._closed:
+                    for item in evicted:
+                        item.close()
+                    raise ValueError('handle pool is closed')
+
+            if waited:
+                self._stats['waits'] += 1
+                self._stats['wait time'] += time.monotonic() - start
+
+        for item in evicted:
+            item.close()
+        if hdf_file is None:
+            hdf_file = self._open(entry)
+
+        with self._cond:
+            self._stats['checkouts'] += 1
+            self._checked_out[id(hdf_file)] = entry
+        return hdf_file
+
+    def release(self, hdf_file):
+        """
+        Return a handle checked out with :meth:`acquire`.
+
+        :param hdf_file: the handle
+        :type hdf_file: :class:`~bapsflib.lapdhdf.files.File`
+        """
+        to_close = []
+        with self._cond:
+            entry = self._checked_out.pop(id(hdf_file), None)
+            if entry is None:
+                raise ValueError(
+                    'handle was not checked out of this pool')
+            entry.busy.remove(hdf_file)
+            now = time.monotonic()
+            entry.idle.append((hdf_file, now))
+            if self._closed:
+                to_close = self._drop_entry(entry)
+            else:
+                to_close = self._evict_idle(now)
+            self._cond.notify_all()
+
+        for item in to_close:
+            item.close()
+
+    @contextmanager
+    def checkout(self, filename, timeout=None):
+        """
+        Context manager form of :meth:`acquire` and :meth:`release`.
+
+        :param str filename: name of the HDF5 file
+        :param float timeout: seconds to wait for a free handle
+        """
+        hdf_file = self.acquire(filename, timeout=timeout)
+        try:
+            yield hdf_file
+        finally:
+            self.release(hdf_file)
+
+    def evict_idle(self):
+        """
+        Close all handles idle for longer than :attr:`idle_timeout`.
+
+        :return: number of closed handles
+        :rtype: int
+        """
+        with self._cond:
+            to_close = self._evict_idle(time.monotonic())
+        for hdf_file in to_close:
+            hdf_file.close()
+        return len(to_close)
+
+    def close(self):
+        """
+        Close the pool.  Idle handles are closed immediately, checked
+        out handles when they are released.
+        """
+        to_close = []
+        with self._cond:
+            self._closed = True
+            for entry in list(self._entries.values()):
+                to_close.extend(self._drop_entry(entry))
+            self._cond.notify_all()
+        for hdf_file in to_close:
+            hdf_file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def _open(self, entry):
+        """Open a new handle of :data:`entry`."""
+        start = time.monotonic()
+        try:
+            hdf_file = File(entry.path, mode='r',
+                            file_map=entry.file_map,
+                            **self._file_kwargs)
+        except BaseException:
+            with self._cond:
+                entry.opening -= 1
+                if entry.nopen == 0 and entry.file_map is None:
+                    self._entries.pop(entry.path, None)
+                self._cond.notify_all()
+            raise
+
+        with self._cond:
+            entry.opening -= 1
+            if entry.file_map is None:
+                entry.file_map = hdf_file.file_map
+                entry.owner = hdf_file
+            entry.busy.append(hdf_file)
+            self._stats['opens'] += 1
+            self._stats['open time'] += time.monotonic() - start
+            self._cond.notify_all()
+        return hdf_file
+
+    def _evict_idle(self, now):
+        """
+        Remove handles idle for longer than :attr:`idle_timeout`.  The
+        handle that built an entry's mapping is kept until it is the
+        last handle of the entry, since the mapping refers to its
+        groups.  Must be called with the pool lock held.
+
+        :return: list of removed handles (the caller must close them
+            after releasing the lock)
+        """
+        if self._idle_timeout is None:
+            return []
+
+        removed = []
+        for entry in list(self._entries.values()):
+            keep = []
+            for hdf_file, released in entry.idle:
+                if now - released >= self._idle_timeout \
+                        and hdf_file is not entry.owner:
+                    removed.append(hdf_file)
+                else:
+                    keep.append((hdf_file, released))
+            entry.idle = keep
+
+            if len(entry.idle) == 1 and not entry.busy \
+                    and entry.opening == 0 \
+                    and now - entry.idle[0][1] >= self._idle_timeout:
+                removed.append(entry.idle[0][0])
+                entry.idle = []
+                entry.file_map = None
+                entry.owner = None
+                del self._entries[entry.path]
+
+        self._stats['evictions'] += len(removed)
+        return removed
+
+    def _drop_entry(self, entry):
+        """
+        Remove all idle handles of :data:`entry` once it has no
+        checked out handles.  Must be called with the pool lock held.
+
+        :return: list of removed handles
+        """
+        if entry.busy or entry.opening:
+            return []
+        removed = [hdf_file for hdf_file, released in entry.idle]
+        entry.idle = []
+        entry.file_map = None
+        entry.owner = None
+        self._entries.pop(entry.path, None)
+        return removed
@@ -0,0 +1,292 @@
+# This file is part of the bapsflib package, a Python toolkit for the
+# BaPSF group at UCLA.
+#
+# http://plasma.physics.ucla.edu/
+#
+# Copyright 2017-2018 Erik T. Everson and contributors
+#
+# License: Standard 3-clause BSD; see "LICENSES/LICENSE.txt" for full
+#   license terms and contributor agreement.
+#
+"""
+Indexed inventory of all objects in an HDF5 file.
+"""
+import h5py
+import json
+import numpy as np
+import os
+
+from collections import namedtuple
+
+from .hdfdtype import (decode_dtype, encode_dtype)
+from .hdftraverse import (_OBJ_TYPES, DATASET)
+
+#: version of the persisted inventory format
+INVENTORY_VERSION = 1
+
+hdfInventoryItem = namedtuple(
+    'hdfInventoryItem',
+    ['path', 'type', 'shape', 'dtype', 'chunks', 'compression',
+     'storage_size', 'nattrs'])
+"""
+Inventory record of one HDF5 object.
+
+:param str path: absolute path of the object
+:param str type: object type (:code:`'group'`, :code:`'dataset'`, or
+    :code:`'datatype'`)
+:param tuple shape: dataset shape (:code:`None` for groups)
+:param dtype: dataset datatype (:code:`None` for groups)
+:type dtype: :class:`numpy.dtype`
+:param tuple chunks: dataset chunk shape (:code:`None` if contiguous)
+:param str compression: name of the first dataset filter (e.g.
+    :code:`'gzip'`), :code:`None` if unfiltered
+:param int storage_size: bytes of storage allocated for the dataset
+    (:code:`0` for groups)
+:param int nattrs: number of attributes attached to the object
+"""
+
+
+def _filter_name(dcpl):
+    """Name of the first filter of a dataset creation plist."""
+    if dcpl.get_nfilters() == 0:
+        return None
+    name = dcpl.get_filter(0)[3]
+    if isinstance(name, bytes):
+        name = name.decode('utf-8', 'replace')
+    return {'deflate': 'gzip'}.get(name, name)
+
+
+def _build_item(hdf_obj, path, obj_type, nattrs):
+    """Build the :class:`hdfInventoryItem` of one object."""
+    if obj_type != DATASET:
+        return hdfInventoryItem(path, obj_type, None, None, None, None,
+                                0, nattrs)
+
+    dset = hdf_obj[path]
+    dcpl = dset.id.get_create_plist()
+    chunks = dset.chunks
+    return hdfInventoryItem(path, obj_type, dset.shape, dset.dtype,
+                            chunks, _filter_name(dcpl),
+                            dset.id.get_storage_size(), nattrs)
+
+
+def iter_inventory(hdf_obj):
+    """
+    Generate the :class:`hdfInventoryItem` of every object below
+    :data:`hdf_obj`.  Object types and attribute counts are gathered in
+    one object-info pass, and datasets are only opened as their records
+    are generated, so huge files can be inventoried without holding all
+    records in memory.
+
+    :param hdf_obj: the HDF5 file or group
+    :type hdf_obj: :class:`h5py.File` or :class:`h5py.Group`
+    :return: generator of inventory records, in :meth:`h5py.Group.visit`
+        order
+    """
+    prefix = hdf_obj.name.rstrip('/') + '/'
+    found = []
+
+    def visitor(name, info):
+        if isinstance(name, bytes):
+            name = name.decode('utf-8')
+        if name != '.':
+            # - h5py 2.x ObjInfo has no num_attrs, those objects
+            #   are counted when their records are generated
+            found.append((name, _OBJ_TYPES.get(info.type, None),
+                          getattr(info, 'num_attrs', None)))
+        return None
+
+    h5py.h5o.visit(hdf_obj.id, visitor, info=True)
+    for name, obj_type, nattrs in found:
+        if nattrs is None:
+            nattrs = len(hdf_obj[name].attrs)
+        yield _build_item(hdf_obj, name, obj_type, nattrs)._replace(
+            path=prefix + name)
+
+
+class hdfInventory(object):
+    """
+    Inventory of all objects (groups, datasets, and named datatypes) in
+    an HDF5 file, indexed by path.  The inventory is built once (see
+    :func:`iter_inventory`) and can be persisted to a JSON file with
+    :meth:`save` so later opens can skip traversing the file.
+
+    :Example:
+
+        >>> f = lapdhdf.File('sample.hdf5')
+        >>> inv = f.inventory
+        >>> inv['/Raw data + config/SIS 3301'].type
+        'group'
+        >>> [item.path for item in inv.filter(
+        ...     prefix='/Raw data + config/SIS 3301', obj_type='dataset')]
+        ['/Raw data + config/SIS 3301/config01 [0:0]', ...]
+        >>> inv.storage_size(prefix='/Raw data + config')
+        40000000
+    """
+    def __init__(self, items, file_id=None):
+        """
+        :param items: inventory records
+        :type items: iterable of :class:`hdfInventoryItem`
+        :param dict file_id: identity of the inventoried file (see
+            :meth:`file_identity`)
+        """
+        self._items = list(items)
+        self._index = {item.path: item for item in self._items}
+        self._file_id = file_id
+
+    @classmethod
+    def build(cls, hdf_file):
+        """
+        Build the inventory of :data:`hdf_file`.
+
+        :param hdf_file: the HDF5 file
+        :type hdf_file: :class:`h5py.File`
+        :rtype: :class:`hdfInventory`
+        """
+        return cls(iter_inventory(hdf_file),
+                   file_id=cls.file_identity(hdf_file.filename))
+
+    @classmethod
+    def load(cls, filename, hdf_file=None):
+        """
+        Load an inventory persisted with :meth:`save`.
+
+        :param str filename: name of the inventory file
+        :param hdf_file: if given, the inventory is only returned if it
+            was built for this (unmodified) file
+        :type hdf_file: :class:`h5py.File`
+        :return: the inventory, or :code:`None` if :data:`filename`
+            does not exist, can not be read, or is stale
+        :rtype: :class:`hdfInventory`
+        """
+        try:
+            with open(filename, 'r') as fobj:
+                content = json.load(fobj)
+            if content['version'] != INVENTORY_VERSION:
+                return None
+            if hdf_file is not None and content['file'] \
+                    != cls.file_identity(hdf_file.filename):
+                return None
+            items = [_decode_item(item) for item in content['items']]
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+        return cls(items, file_id=content['file'])
+
+    def save(self, filename):
+        """
+        Persist the inventory to a JSON file.
+
+        :param str filename: name of the inventory file
+        """
+        content = {'version': INVENTORY_VERSION,
+                   'file': self._file_id,
+                   'items': [_encode_item(item) for item in self._items]}
+        with open(filename, 'w') as fobj:
+            json.dump(content, fobj)
+
+    @staticmethod
+    def file_identity(filename):
+        """
+        Identity (name, size, and modification time) used to detect a
+        stale persisted inventory.
+
+        :param str filename: name of the HDF5 file
+        :rtype: dict
+        """
+        try:
+            stat = os.stat(filename)
+        except (OSError, TypeError):
+            return None
+        return {'name': os.path.basename(filename),
+                'size': stat.st_size,
+                'mtime': stat.st_mtime}
+
+    @property
+    def paths(self):
+        """List of all object paths"""
+        return [item.path for item in self._items]
+
+    def __len__(self):
+        return len(self._items)
+
+    def __iter__(self):
+        return iter(self._items)
+
+    def __contains__(self, path):
+        return self._normalize(path) in self._index
+
+    def __getitem__(self, path):
+        """
+        :param str path: object path
+        :rtype: :class:`hdfInventoryItem`
+        """
+        return self._index[self._normalize(path)]
+
+    def filter(self, prefix=None, obj_type=None, dtype=None):
+        """
+        Filter the inventory records.
+
+        :param str prefix: only include objects below the group
+            :data:`prefix`
+        :param str obj_type: only include objects of this type
+            (:code:`'group'`, :code:`'dataset'`, or :code:`'datatype'`)
+        :param dtype: only include datasets of this datatype
+        :type dtype: :class:`numpy.dtype` or dtype-like
+        :return: list of matching records
+        :rtype: list(:class:`hdfInventoryItem`)
+        """
+        return list(self.iter_filter(prefix=prefix, obj_type=obj_type,
+                                     dtype=dtype))
+
+    def iter_filter(self, prefix=None, obj_type=None, dtype=None):
+        """
+        Generator form of :meth:`filter`.
+        """
+        if prefix is not None:
+            prefix = self._normalize(prefix).rstrip('/') + '/'
+        if dtype is not None:
+            dtype = np.dtype(dtype)
+
+        for item in self._items:
+            if prefix is not None and not item.path.startswith(prefix):
+                continue
+            if obj_type is not None and item.type != obj_type:
+                continue
+            if dtype is not None and item.dtype != dtype:
+                continue
+            yield item
+
+    def storage_size(self, prefix=None):
+        """
+        Total bytes of dataset storage.
+
+        :param str prefix: only include datasets below the group
+            :data:`prefix`
+        :rtype: int
+        """
+        return sum(item.storage_size
+                   for item in self.iter_filter(prefix=prefix,
+                                                obj_type=DATASET))
+
+    @staticmethod
+    def _normalize(path):
+        """Make path absolute."""
+        return path if path.startswith('/') else '/' + path
+
+
+def _encode_item(item):
+    """Convert an inventory record to JSON-serializable form."""
+    record = item._asdict()
+    if item.dtype is not None:
+        record['dtype'] = encode_dtype(item.dtype)
+    return record
+
+
+def _decode_item(record):
+    """Convert a persisted record back to an inventory record."""
+    for key in ('shape', 'chunks'):
+        if record[key] is not None:
+            record[key] = tuple(record[key])
+    if record['dtype'] is not None:
+        record['dtype'] = decode_dtype(record['dtype'])
+    return hdfInventoryItem(**record)
@@ -0,0 +1,428 @@
+# This file is part of the bapsflib package, a Python toolkit for the
+# BaPSF group at UCLA.
+#
+# http://plasma.physics.ucla.edu/
+#
+# Copyright 2017-2018 Erik T. Everson and contributors
+#
+# License: Standard 3-clause BSD; see "LICENSES/LICENSE.txt" for full
+#   license terms and contributor agreement.
+#
+"""
+Joint reads of channels recorded on several digitizers.
+"""
+import numpy as np
+
+from .hdfmetrics import (hdfCountedDataset, hdfReadMetrics)
+from .hdfreadcontrol import (hdfReadControl, condition_controls)
+
+#: sample rate unit conversions
+_RATE_UNITS = {'GHz': 1.E9, 'MHz': 1.E6, 'kHz': 1.E3, 'Hz': 1.0}
+
+
+# noinspection PyInitNewSignature
+class hdfJointData(np.recarray):
+    """
+    Reads channels of one or more digitizers (and, optionally,
+    control device data) aligned by shot number.
+
+    The shot numbers of every channel's header dataset and of the
+    added control devices are intersected in one join, so each row
+    holds the same shot for every channel.  Channel :code:`i` is
+    stored in field :code:`'signal{i}'`; its :code:`dt` and
+    :code:`dv` are given by :attr:`dt`, :attr:`dv`, and
+    :attr:`info`.  With :data:`time_base` every channel is resampled
+    onto a common time base (see :attr:`time`).
+
+    :Example:
+
+        >>> data = f.read_joint([('SIS 3301', 0, 0),
+        ...                      ('SIS crate', 'SIS 3305', 1, 1)],
+        ...                     add_controls=['6K Compumotor'],
+        ...                     time_base='coarsest')
+        >>> data['signal0'].shape == data['signal1'].shape
+        True
+        >>> data.time, data.dt
+    """
+    def __new__(cls, hdf_file, channels, shotnum=slice(None),
+                add_controls=None, keep_bits=False, time_base=None,
+                silent=False, **kwargs):
+        """
+        :param hdf_file: object instance of the HDF5 file
+        :type hdf_file: :class:`bapsflib.lapdhdf.files.File`
+        :param channels: channels to read, each a tuple
+            :code:`(digitizer, board, channel)` or
+            :code:`(digitizer, adc, board, channel)`, or a dict with
+            keys :code:`'digitizer'`, :code:`'board'`,
+            :code:`'channel'`, and optionally :code:`'adc'` and
+            :code:`'config_name'`
+        :type channels: list
+        :param shotnum: global HDF5 shot number(s)
+        :type shotnum: int, list(int), or slice()
+        :param add_controls: control devices whose data will be matched
+            with the digitizer data (see
+            :class:`~bapsflib.lapdhdf.hdfreaddata.hdfReadData`)
+        :type add_controls: [str, (str, val), ]
+        :param bool keep_bits: set :code:`True` to keep data in bits,
+            :code:`False` (default) convert data to voltage
+        :param time_base: :code:`None` (default) keeps each channel's
+            own samples, :code:`'coarsest'` or :code:`'finest'`
+            resamples every channel onto the largest or smallest
+            :code:`dt` over the time span common to all channels, or an
+            array of times (in sec, from the first sample) to resample
+            onto
+        :type time_base: :code:`None`, str, or :class:`numpy.ndarray`
+        :param bool silent: set :code:`True` to suppress command line
+            print out of soft warnings
+        """
+        metrics = hdfReadMetrics('hdfJointData')
+
+        # ---- Condition hdf_file ----
+        try:
+            file_map = hdf_file.file_map
+        except AttributeError:
+            raise AttributeError(
+                'hdf_file needs to be of type lapdhdf.File')
+
+        # ---- Resolve channels ----
+        if isinstance(channels, (tuple, dict)):
+            channels = [channels]
+        if len(channels) == 0:
+            raise ValueError('no channels specified')
+        specs = []
+        for chan in channels:
+            spec = condition_channel(chan)
+            try:
+                digi_map = file_map.digitizers[spec['digitizer']]
+            except KeyError:
+                raise ValueError('Specified Digitizer {} is not among '
+                                 'known digitizers'.format(
+                                     spec['digitizer']))
+            dname, dhname, d_info = digi_map.resolve_dataset(
+                spec['board'], spec['channel'],
+                config_name=spec['config_name'], adc=spec['adc'],
+                silent=silent)
+            dpath = digi_map.info['group path'] + '/'
+            spec.update({
+                'dataset name': dname,
+                'dataset path': dpath,
+                'dset': hdf_file.get_digi_dataset(dpath + dname),
+                'dheader': hdfCountedDataset(
+                    hdf_file.get_digi_dataset(dpath + dhname), metrics,
+                    dpath + dhname),
+                'shotnum field': digi_map.shotnum_field,
+                'info': d_info})
+            specs.append(spec)
+
+        # ---- Condition controls ----
+        controls = []
+        if add_controls is not None:
+            controls = condition_controls(hdf_file, add_controls,
+                                          silent=silent)
+        metrics.mark('conditioning')
+
+        # ---- Join shot numbers ----
+        # - each header's shot numbers are read once, duplicated shot
+        #   numbers resolve to their first row
+        sn = None
+        for spec in specs:
+            hsn = spec['dheader'][:, spec['shotnum field']]
+            hsn, rows = np.unique(hsn, return_index=True)
+            spec['header shotnum'] = hsn
+            spec['header rows'] = rows
+            sn = hsn if sn is None \
+                else np.intersect1d(sn, hsn, assume_unique=True)
+        sn = np.intersect1d(sn, condition_joint_shotnum(shotnum, sn),
+                            assume_unique=True)
+        if sn.size == 0:
+            raise ValueError('Input shotnum would result in a null '
+                             'array')
+        metrics.mark('shot join')
+
+        cdata = None
+        if len(controls) != 0:
+            cdata = hdfReadControl(hdf_file, controls,
+                                   assume_controls_conditioned=True,
+                                   shotnum=sn.tolist(),
+                                   intersection_set=True,
+                                   silent=silent, nested_read=True)
+            metrics.merge(cdata.metrics)
+            sn = sn[np.isin(sn, cdata['shotnum'])]
+            if sn.size == 0:
+                raise ValueError('Input shotnum would result in a null '
+                                 'array')
+            cdata = cdata[np.isin(cdata['shotnum'], sn)]
+            metrics.mark('control read')
+
+        # ---- Read signals ----
+        signals = []
+        for spec in specs:
+            index = spec['header rows'][
+                np.searchsorted(spec['header shotnum'], sn)]
+            signal = hdf_file.read_digi_rows(spec['dset'],
+                                             index.tolist())
+            metrics.record(spec['dataset path'] + spec['dataset name'],
+                           signal.shape[0], signal.nbytes)
+
+            # per-channel time and voltage steps
+            d_info = spec['info']
+            spec['dt'] = sample_dt(d_info)
+            try:
+                voffset = spec['dheader'][0, 'Offset']
+            except ValueError:
+                voffset = None
+            spec['voltage offset'] = voffset
+            spec['dv'] = None if voffset is None \
+                else 2.0 * abs(voffset) / (2. ** d_info['bit'] - 1.)
+            if not keep_bits and spec['dv'] is not None:
+                signal = (spec['dv'] * signal.astype(np.float32)) \
+                    - abs(voffset)
+                spec['signal units'] = 'V'
+            else:
+                spec['signal units'] = 'bits'
+            signals.append(signal)
+        metrics.mark('signal read')
+
+        # ---- Resample onto a common time base ----
+        time = None
+        if time_base is not None:
+            time = common_time_base(
+                time_base, [spec['dt'] for spec in specs],
+                [sig.shape[1] for sig in signals])
+            signals = [resample(sig, spec['dt'], time)
+                       for sig, spec in zip(signals, specs)]
+            metrics.mark('resample')
+
+        # ---- Construct obj ----
+        dtype = [('shotnum', '<u4')]
+        for i, sig in enumerate(signals):
+            dtype.append(('signal{}'.format(i), sig.dtype,
+                          sig.shape[1]))
+        dtype.append(('xyz', '<f4', 3))
+        if cdata is not None:
+            for subdtype in cdata.dtype.descr:
+                if subdtype[0] not in [d[0] for d in dtype]:
+                    dtype.append(subdtype)
+        data = np.empty(sn.shape[0], dtype=dtype)
+        metrics.allocate(data.nbytes)
+        data['shotnum'] = sn
+        for i, sig in enumerate(signals):
+            data['signal{}'.format(i)] = sig
+        del signals
+        data['xyz'] = np.nan
+        if cdata is not None:
+            for field in cdata.dtype.names:
+                if field != 'shotnum':
+                    data[field] = cdata[field]
+        metrics.mark('allocation')
+
+        obj = data.view(cls)
+        obj._info = {
+            'hdf file': hdf_file.filename.split('/')[-1],
+            'channels': [{
+                'field': 'signal{}'.format(i),
+                'digitizer': spec['info']['digitizer'],
+                'configuration name':
+                    spec['info']['configuration name'],
+                'adc': spec['info']['adc'],
+                'board': spec['board'],
+                'channel': spec['channel'],
+                'dataset name': spec['dataset name'],
+                'dataset path': spec['dataset path'],
+                'bit': spec['info']['bit'],
+                'sample rate': spec['info']['sample rate'],
+                'voltage offset': spec['voltage offset'],
+                'dt': spec['dt'],
+                'dv': spec['dv'],
+                'signal units': spec['signal units']}
+                for i, spec in enumerate(specs)],
+            'time base': time,
+            'added controls': controls}
+        obj._metrics = metrics.finish(getattr(hdf_file, 'read_hooks',
+                                              ()))
+        return obj
+
+    def __array_finalize__(self, obj):
+        if obj is None:
+            return
+        self._info = getattr(obj, '_info', {'hdf file': None,
+                                            'channels': [],
+                                            'time base': None,
+                                            'added controls': []})
+        self._metrics = getattr(obj, '_metrics', None)
+
+    @property
+    def info(self):
+        """
+        Dictionary of metadata for the extracted data: :code:`'hdf
+        file'`, :code:`'channels'` (one dictionary per channel with its
+        :code:`'field'`, digitizer, adc, board, channel, :code:`'dt'`,
+        :code:`'dv'`, etc.), :code:`'time base'`, and
+        :code:`'added controls'`
+        """
+        return self._info.copy()
+
+    @property
+    def metrics(self):
+        """
+        Timing and I/O metrics of the read
+        (:class:`~bapsflib.lapdhdf.hdfmetrics.hdfReadMetrics`)
+        """
+        return self._metrics
+
+    @property
+    def dt(self):
+        """
+        Time-step size (in sec) of each channel.  All equal the common
+        time base step when resampled.
+        """
+        if self._info['time base'] is not None:
+            time = self._info['time base']
+            step = time[1] - time[0] if time.shape[0] > 1 else None
+            return tuple(step for _ in self._info['channels'])
+        return tuple(chan['dt'] for chan in self._info['channels'])
+
+    @property
+    def dv(self):
+        """
+        Voltage-step size (in volts) of each channel (:code:`None` if
+        the channel has no voltage offset)
+        """
+        return tuple(chan['dv'] for chan in self._info['channels'])
+
+    @property
+    def time(self):
+        """
+        Common time base (in sec) of all channels, :code:`None` if the
+        channels were not resampled
+        """
+        return self._info['time base']
+
+
+def condition_channel(chan):
+    """
+    Condition a channel specification of :class:`hdfJointData` into a
+    dictionary.
+
+    :param chan: :code:`(digitizer, board, channel)`,
+        :code:`(digitizer, adc, board, channel)`, or a dict
+    :rtype: dict
+    """
+    spec = {'adc': None, 'config_name': None}
+    if isinstance(chan, dict):
+        spec.update(chan)
+    elif isinstance(chan, tuple) and len(chan) == 3:
+        spec.update(zip(('digitizer', 'board', 'channel'), chan))
+    elif isinstance(chan, tuple) and len(chan) == 4:
+        spec.update(zip(('digitizer', 'adc', 'board', 'channel'),
+                        chan))
+    else:
+        raise TypeError('channel must be a 3 or 4-element tuple or a '
+                        'dict, got {}'.format(chan))
+    for key in ('digitizer', 'board', 'channel'):
+        if key not in spec:
+            raise ValueError('channel {} has no {}'.format(chan, key))
+    return spec
+
+
+def condition_joint_shotnum(shotnum, available):
+    """
+    Convert a **shotnum** request into a sorted array.
+
+    :param shotnum: global HDF5 shot number(s)
+    :type shotnum: int, list(int), or slice()
+    :param available: sorted shot numbers of the joined datasets
+    :type available: :class:`numpy.ndarray`
+    :rtype: :class:`numpy.ndarray`
+    """
+    if isinstance(shotnum, slice):
+        last = int(available[-1]) + 1 if available.size else 1
+        stop = last if shotnum.stop is None \
+            else min(shotnum.stop, last)
+        start = 1 if shotnum.start is None else max(shotnum.start, 1)
+        step = 1 if shotnum.step is None else shotnum.step
+        return np.arange(start, stop, step)
+    elif isinstance(shotnum, (int, np.integer)):
+        return np.array([shotnum])
+    elif isinstance(shotnum, (list, np.ndarray)):
+        return np.unique(np.asarray(shotnum, dtype=np.int64))
+    raise ValueError('Valid `shotnum` not passed')
+
+
+def sample_dt(d_info):
+    """
+    Time-step size (in sec) of an adc from its :code:`'sample rate'`
+    and :code:`'sample average (hardware)'` info.
+
+    :param dict d_info: adc information, as returned by the
+        :code:`resolve_dataset` method of the digitizer mappings
+    :rtype: float
+    """
+    rate, units = d_info['sample rate']
+    if rate is None:
+        return None
+    dt = 1.0 / (rate * _RATE_UNITS[units])
+    if d_info.get('sample average (hardware)', None) is not None:
+        dt *= float(d_info['sample average (hardware)'])
+    return dt
+
+
+def common_time_base(time_base, dts, nts):
+    """
+    Build the common time base of several channels.
+
+    :param time_base: :code:`'coarsest'`, :code:`'finest'`, or an
+        array of times (in sec)
+    :param list dts: time-step size of each channel
+    :param list nts: number of samples of each channel
+    :rtype: :class:`numpy.ndarray`
+    """
+    if isinstance(time_base, str):
+        if None in dts:
+            raise ValueError('a channel has no sample rate, can not '
+                             'build a common time base')
+        if time_base == 'coarsest':
+            step = max(dts)
+        elif time_base == 'finest':
+            step = min(dts)
+        else:
+            raise ValueError("time_base must be 'coarsest', 'finest', "
+                             "or an array of times")
+
+        # span covered by every channel
+        span = min(dt * (nt - 1) for dt, nt in zip(dts, nts))
+        npts = int(np.floor(span / step * (1.0 + 1e-12))) + 1
+        return step * np.arange(npts)
+    time = np.asarray(time_base, dtype=np.float64).ravel()
+    if time.size == 0:
+        raise ValueError('time_base is empty')
+    return time
+
+
+def resample(signal, dt, time):
+    """
+    Linearly interpolate signals onto new sample times.  All shots are
+    interpolated in one vectorized pass: each new time is mapped to a
+    sample index and weight once, then applied to every row.  Times
+    outside the recorded span are set to NaN.
+
+    :param signal: signals of shape :code:`(nshots, nt)`, sampled at
+        :code:`dt * arange(nt)`
+    :type signal: :class:`numpy.ndarray`
+    :param float dt: time-step size of :data:`signal`
+    :param time: new sample times
+    :type time: :class:`numpy.ndarray`
+    :return: resampled signals of shape :code:`(nshots, time.size)`
+    :rtype: :class:`numpy.ndarray`
+    """
+    nt = signal.shape[1]
+    pos = time / dt
+    valid = (pos >= 0) & (pos <= nt - 1)
+    lo = np.clip(np.floor(pos).astype(np.intp), 0, max(nt - 2, 0))
+    hi = np.minimum(lo + 1, nt - 1)
+    frac = np.where(valid, pos - lo, 0.0)
+    dtype = signal.dtype if signal.dtype.kind == 'f' else np.float64
+    weight = frac.astype(dtype)
+    out = signal[:, lo] * (1 - weight) + signal[:, hi] * weight
+    out[:, ~valid] = np.nan
+    return out
@@ -246,22 +246,24 @@ class hdfMap(object):
         self.__unknowns = []
 
         # scan through root
+        # - paths are built from the member names rather than opening
+        #   each member for its name
         for item in self.__hdf_obj:
             if item not in [self._MSI_GNAME, self._DATA_GNAME]:
-                self.__unknowns.append(self.__hdf_obj[item].name)
+                self.__unknowns.append('/' + item)
 
         # scan through MSI group
-        for item in self.__hdf_obj[self._MSI_GNAME]:
+        msi_group = self.__hdf_obj[self._MSI_GNAME]
+        for item in msi_group:
             if item not in self.msi:
-                self.__unknowns.append(
-                    self.__hdf_obj[self._MSI_GNAME][item].name)
+                self.__unknowns.append(msi_group.name + '/' + item)
 
         # scan through data group
+        data_group = self.__hdf_obj[self._DATA_GNAME]
         dknowns = list(self.digitizers) + list(self.controls)
-        for item in self.__hdf_obj[self._DATA_GNAME]:
+        for item in data_group:
             if item not in dknowns:
-                self.__unknowns.append(
-                    self.__hdf_obj[self._DATA_GNAME][item].name)
+                self.__unknowns.append(data_group.name + '/' + item)
 
     @property
     def unknowns(self):
@@ -0,0 +1,306 @@
+# This file is part of the bapsflib package, a Python toolkit for the
+# BaPSF group at UCLA.
+#
+# http://plasma.physics.ucla.edu/
+#
+# Copyright 2017-2018 Erik T. Everson and contributors
+#
+# License: Standard 3-clause BSD; see "LICENSES/LICENSE.txt" for full
+#   license terms and contributor agreement.
+#
+"""
+Per-read timing and I/O metrics.
+
+Every :class:`~bapsflib.lapdhdf.hdfreaddata.hdfReadData` and
+:class:`~bapsflib.lapdhdf.hdfreadcontrol.hdfReadControl` read records
+an :class:`hdfReadMetrics`, attaches it to the result (as
+:attr:`metrics`), and passes it to the registered read hooks (see
+:func:`add_read_hook` and
+:attr:`~bapsflib.lapdhdf.files.File.read_hooks`).
+"""
+import numpy as np
+import time
+
+from collections import OrderedDict
+from warnings import warn
+
+# globally registered read hooks
+_READ_HOOKS = []
+
+
+def add_read_hook(hook):
+    """
+    Register a hook called with the :class:`hdfReadMetrics` of every
+    completed read.
+
+    :param hook: callable taking one :class:`hdfReadMetrics` argument
+    """
+    if not callable(hook):
+        raise TypeError('hook must be callable')
+    if hook not in _READ_HOOKS:
+        _READ_HOOKS.append(hook)
+
+
+def remove_read_hook(hook):
+    """
+    Remove a hook registered with :func:`add_read_hook`.
+
+    :param hook: the registered hook
+    """
+    try:
+        _READ_HOOKS.remove(hook)
+    except ValueError:
+        pass
+
+
+class hdfReadMetrics(object):
+    """
+    Timing and I/O metrics of one read.
+
+    Stage timings accumulate the time between successive :meth:`mark`
+    calls, so a reader marks the end of each stage.  Dataset reads are
+    counted with :meth:`record` (or by wrapping the dataset in a
+    :class:`hdfCountedDataset`).  Reads served from memory (a
+    memory-mapped dataset or a warmed-up shot number column) are
+    counted in :attr:`memory_reads`, not :attr:`hdf5_calls`.
+
+    :Example:
+
+        >>> data = f.read_data(0, 0, shotnum=slice(1, 100))
+        >>> data.metrics.stages
+        OrderedDict([('conditioning', 0.0012), ('allocation', 2e-05),
+                     ('signal read', 0.0213), ('conversion', 0.0041)])
+        >>> data.metrics.bytes_read, data.metrics.hdf5_calls
+        (1980792, 4)
+    """
+    def __init__(self, reader):
+        """
+        :param str reader: name of the reader (e.g.
+            :code:`'hdfReadData'`)
+        """
+        self.reader = reader
+        self.stages = OrderedDict()
+        self.datasets = OrderedDict()
+        self.cache_hit = False
+        self.total_time = None
+        self.peak_bytes = 0
+        self._current_bytes = 0
+        self._start = time.perf_counter()
+        self._last = self._start
+
+    def mark(self, stage):
+        """
+        Mark the end of :data:`stage`.  The time since the previous
+        mark is added to the stage.
+
+        :param str stage: name of the stage
+        """
+        now = time.perf_counter()
+        self.stages[stage] = self.stages.get(stage, 0.0) \
+            + (now - self._last)
+        self._last = now
+
+    def record(self, path, rows, nbytes, calls=1, source='hdf5'):
+        """
+        Record a dataset read.
+
+        :param str path: path of the dataset
+        :param int rows: number of rows read
+        :param int nbytes: number of bytes read
+        :param int calls: number of read calls
+        :param str source: where the read was served from,
+            :code:`'hdf5'` (default) for HDF5 read calls, or e.g.
+            :code:`'mmap'` and :code:`'warm-up'` for reads served
+            from memory
+        """
+        entry = self.datasets.get(path, None)
+        if entry is None:
+            entry = {'calls': 0, 'memory reads': 0, 'rows': 0,
+                     'bytes': 0}
+            self.datasets[path] = entry
+        if source == 'hdf5':
+            entry['calls'] += calls
+        else:
+            entry['memory reads'] += calls
+        entry['rows'] += int(rows)
+        entry['bytes'] += int(nbytes)
+
+    def allocate(self, nbytes):
+        """Record the allocation of an :data:`nbytes` array."""
+        self._current_bytes += int(nbytes)
+        self.peak_bytes = max(self.peak_bytes, self._current_bytes)
+
+    def release(self, nbytes):
+        """Record the release of an :data:`nbytes` array."""
+        self._current_bytes -= int(nbytes)
+
+    def merge(self, other):
+        """
+        Fold the dataset reads and allocations of a nested read (e.g.
+        the control device read of an
+        :class:`~bapsflib.lapdhdf.hdfreaddata.hdfReadData`) into these
+        metrics.
+
+        :param other: metrics of the nested read
+        :type other: :class:`hdfReadMetrics`
+        """
+        for path, entry in other.datasets.items():
+            self.record(path, entry['rows'], entry['bytes'],
+                        calls=entry['calls'])
+            self.record(path, 0, 0, calls=entry['memory reads'],
+                        source='memory')
+        self.peak_bytes = max(self.peak_bytes,
+                              self._current_bytes + other.peak_bytes)
+
+    @property
+    def hdf5_calls(self):
+        """Total number of HDF5 read calls"""
+        return sum(entry['calls'] for entry in self.datasets.values())
+
+    @property
+    def memory_reads(self):
+        """
+        Total number of reads served from memory (memory-mapped
+        datasets and warmed-up shot number columns)
+        """
+        return sum(entry['memory reads']
+                   for entry in self.datasets.values())
+
+    @property
+    def rows_read(self):
+        """Total number of rows read"""
+        return sum(entry['rows'] for entry in self.datasets.values())
+
+    @property
+    def bytes_read(self):
+        """Total number of bytes read"""
+        return sum(entry['bytes'] for entry in self.datasets.values())
+
+    def finish(self, hooks=(), emit=True):
+        """
+        Close the metrics and pass them to the global read hooks and
+        :data:`hooks`.  Hook errors are turned into warnings so they
+        never fail a read.
+
+        :param hooks: additional hooks (e.g.
+            :attr:`~bapsflib.lapdhdf.files.File.read_hooks`)
+        :param bool emit: :code:`False` closes the metrics without
+            calling any hook (used for nested reads, whose metrics are
+            merged into the outer read)
+        :return: the metrics
+        :rtype: :class:`hdfReadMetrics`
+        """
+        self.total_time = time.perf_counter() - self._start
+        if not emit:
+            return self
+        for hook in list(_READ_HOOKS) + list(hooks):
+            try:
+                hook(self)
+            except Exception as err:
+                warn('read hook {} failed: {}'.format(hook, err))
+        return self
+
+    def as_dict(self):
+        """
+        Metrics as a JSON-serializable dictionary.
+
+        :rtype: dict
+        """
+        return {'reader': self.reader,
+                'cache hit': self.cache_hit,
+                'total time': self.total_time,
+                'stages': dict(self.stages),
+                'datasets': {path: dict(entry)
+                             for path, entry in self.datasets.items()},
+                'hdf5 calls': self.hdf5_calls,
+                'memory reads': self.memory_reads,
+                'rows read': self.rows_read,
+                'bytes read': self.bytes_read,
+                'peak bytes': self.peak_bytes}
+
+    def report(self):
+        """
+        Human-readable report of the stage timings.
+
+        :rtype: str
+        """
+        lines = ['{} - {}: {} ms'.format(self.reader, stage,
+                                         elapsed * 1.E3)
+                 for stage, elapsed in self.stages.items()]
+        if self.total_time is not None:
+            lines.append('{} - total: {} ms'.format(
+                self.reader, self.total_time * 1.E3))
+        return '\n'.join(lines)
+
+    def __repr__(self):
+        return ('hdfReadMetrics(reader={!r}, total_time={}, '
+                'hdf5_calls={}, bytes_read={}, peak_bytes={})'.format(
+                    self.reader, self.total_time, self.hdf5_calls,
+                    self.bytes_read, self.peak_bytes))
+
+
+class hdfCountedDataset(object):
+    """
+    Stand-in for a dataset that records every read into an
+    :class:`hdfReadMetrics`, tagged with the wrapped dataset's
+    :code:`read_source` (if it has one).  Everything else is forwarded
+    to the wrapped dataset.
+    """
+    def __init__(self, dset, metrics, path):
+        """
+        :param dset: the wrapped dataset
+        :type dset: :class:`h5py.Dataset` (or a stand-in)
+        :param metrics: metrics reads are recorded into
+        :type metrics: :class:`hdfReadMetrics`
+        :param str path: path of the dataset
+        """
+        self._dset = dset
+        self._metrics = metrics
+        self._path = path
+
+    @property
+    def dataset(self):
+        """The wrapped dataset"""
+        return self._dset
+
+    @property
+    def shape(self):
+        """Dataset shape"""
+        return self._dset.shape
+
+    @property
+    def dtype(self):
+        """Dataset dtype"""
+        return self._dset.dtype
+
+    def __len__(self):
+        return len(self._dset)
+
+    def __getattr__(self, item):
+        return getattr(self._dset, item)
+
+    def __getitem__(self, args):
+        arr = self._dset[args]
+        source = read_source(self._dset, args)
+        if isinstance(arr, np.ndarray):
+            rows = arr.shape[0] if arr.ndim else 1
+            self._metrics.record(self._path, rows, arr.nbytes,
+                                 source=source)
+        else:
+            self._metrics.record(self._path, 1,
+                                 np.asarray(arr).nbytes, source=source)
+        return arr
+
+
+def read_source(dset, args):
+    """
+    Where a read of :code:`dset[args]` is served from.
+
+    :param dset: the dataset
+    :type dset: :class:`h5py.Dataset` (or a stand-in)
+    :return: :code:`'hdf5'` or the stand-in's source (e.g.
+        :code:`'mmap'` or :code:`'warm-up'`)
+    :rtype: str
+    """
+    source = getattr(dset, 'read_source', None)
+    return 'hdf5' if source is None else source(args)
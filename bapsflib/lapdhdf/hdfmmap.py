@@ -0,0 +1,195 @@
+# This file is part of the bapsflib package, a Python toolkit for the
+# BaPSF group at UCLA.
+#
+# http://plasma.physics.ucla.edu/
+#
+# Copyright 2017-2018 Erik T. Everson and contributors
+#
+# License: Standard 3-clause BSD; see "LICENSES/LICENSE.txt" for full
+#   license terms and contributor agreement.
+#
+"""
+Memory-mapped access to contiguous, unfiltered HDF5 datasets.
+"""
+import h5py
+import numpy as np
+
+#: HDF5 file drivers whose on-disk layout is a single plain file
+MMAP_DRIVERS = ('sec2', 'stdio')
+
+
+def mmap_dataset(dset):
+    """
+    Create a memory-mapped view of a dataset.
+
+    A dataset qualifies if
+
+    * its file is opened read-only with the :code:`'sec2'` or
+      :code:`'stdio'` driver,
+    * it has a contiguous layout with no filters and its storage is
+      allocated,
+    * its datatype is a fixed-size type whose numpy representation
+      matches the file datatype byte-for-byte.
+
+    As a final safeguard, the first and last rows of the view are
+    compared against an h5py read.
+
+    :param dset: the dataset to map
+    :type dset: :class:`h5py.Dataset`
+    :return: the memory-mapped dataset, or :code:`None` if
+        :data:`dset` does not qualify
+    :rtype: :class:`hdfMMapDataset`
+    """
+    try:
+        hdf_file = dset.file
+        if hdf_file.mode != 'r' or hdf_file.driver not in MMAP_DRIVERS:
+            return None
+
+        dcpl = dset.id.get_create_plist()
+        if dcpl.get_layout() != h5py.h5d.CONTIGUOUS \
+                or dcpl.get_nfilters() != 0:
+            return None
+
+        dtype = dset.dtype
+        if dtype.hasobject \
+                or dtype.itemsize != dset.id.get_type().get_size():
+            return None
+
+        offset = dset.id.get_offset()
+        nbytes = int(np.prod(dset.shape)) * dtype.itemsize
+        if offset is None or nbytes == 0 \
+                or dset.id.get_storage_size() != nbytes:
+            return None
+
+        mmap = np.memmap(hdf_file.filename, dtype=dtype, mode='r',
+                         offset=offset, shape=dset.shape)
+    except (AttributeError, TypeError, ValueError, OSError):
+        return None
+
+    # verify the mapping against the HDF5 library
+    try:
+        for row in (0, dset.shape[0] - 1):
+            if np.asarray(mmap[row]).tobytes() \
+                    != np.asarray(dset[row]).tobytes():
+                return None
+    except (TypeError, ValueError, OSError):  # pragma: no cover
+        return None
+
+    return hdfMMapDataset(dset, mmap)
+
+
+class hdfMMapDataset(object):
+    """
+    Read-only stand-in for an :class:`h5py.Dataset` that serves reads
+    from a :class:`numpy.memmap` of the file (see
+    :func:`mmap_dataset`).
+
+    Indexing follows the :class:`h5py.Dataset` conventions used in
+    :mod:`bapsflib`, e.g. :code:`dset[index, 'Shot']` and
+    :code:`dset[index, :]`.  Slices and field selections return
+    read-only views into the mapped file, while list selections are
+    gathered (in increasing row order, as with h5py).  All other
+    attributes are forwarded to the wrapped :class:`h5py.Dataset`.
+    """
+    def __init__(self, dset, mmap):
+        """
+        :param dset: the wrapped dataset
+        :type dset: :class:`h5py.Dataset`
+        :param mmap: memory map of the dataset
+        :type mmap: :class:`numpy.memmap`
+        """
+        self._dset = dset
+        self._mmap = mmap
+
+    @property
+    def dataset(self):
+        """The wrapped :class:`h5py.Dataset`"""
+        return self._dset
+
+    @property
+    def dtype(self):
+        """Dataset dtype"""
+        return self._mmap.dtype
+
+    @property
+    def shape(self):
+        """Dataset shape"""
+        return self._mmap.shape
+
+    @property
+    def ndim(self):
+        """Number of dataset dimensions"""
+        return self._mmap.ndim
+
+    @property
+    def size(self):
+        """Number of elements in the dataset"""
+        return self._mmap.size
+
+    def __len__(self):
+        return self._mmap.shape[0]
+
+    def __getattr__(self, item):
+        return getattr(self._dset, item)
+
+    def read_source(self, args):
+        """
+        Where a read of :code:`self[args]` is served from (see
+        :meth:`~bapsflib.lapdhdf.hdfmetrics.hdfReadMetrics.record`).
+
+        :return: :code:`'mmap'`
+        :rtype: str
+        """
+        return 'mmap'
+
+    def __getitem__(self, args):
+        if not isinstance(args, tuple):
+            args = (args,)
+
+        # separate field names from indices
+        fields = [arg for arg in args if isinstance(arg, str)]
+        indices = tuple(
+            condition_index(arg, self._mmap.shape[axis])
+            if axis < self._mmap.ndim else arg
+            for axis, arg in enumerate(
+                [arg for arg in args if not isinstance(arg, str)]))
+
+        arr = self._mmap
+        if len(fields) == 1:
+            arr = arr[fields[0]]
+        elif len(fields) > 1:
+            arr = arr[fields]
+        if len(indices) != 0:
+            arr = arr[indices]
+
+        # return plain ndarray views (not np.memmap)
+        if isinstance(arr, np.ndarray):
+            arr = arr.view(np.ndarray)
+        return arr
+
+
+def condition_index(arg, size):
+    """
+    Normalize a list index to :mod:`h5py` semantics, i.e. the list
+    must be in increasing order (a :exc:`TypeError` is raised
+    otherwise, as :mod:`h5py` does), negative indices are wrapped, and
+    the selection is returned in file order.  All other index types
+    are returned unchanged.
+
+    :param arg: index along one axis
+    :param int size: length of the axis
+    :return: the conditioned index
+    """
+    if isinstance(arg, (list, np.ndarray)) \
+            and np.asarray(arg).dtype != bool:
+        index = np.asarray(arg, dtype=np.int64)
+        if index.ndim == 1:
+            if np.any(np.diff(index) <= 0):
+                raise TypeError(
+                    'Indexing elements must be in increasing order')
+            index = np.where(index < 0, index + size, index)
+            if np.any(index < 0) or np.any(index >= size):
+                raise IndexError('Index ({}) out of range '
+                                 '(0-{})'.format(arg, size - 1))
+            arg = np.sort(index)
+    return arg
@@ -0,0 +1,470 @@
+# This file is part of the bapsflib package, a Python toolkit for the
+# BaPSF group at UCLA.
+#
+# http://plasma.physics.ucla.edu/
+#
+# Copyright 2017-2018 Erik T. Everson and contributors
+#
+# License: Standard 3-clause BSD; see "LICENSES/LICENSE.txt" for full
+#   license terms and contributor agreement.
+#
+"""
+Read a run that is split across several HDF5 files as if it were
+recorded in a single file.
+"""
+import numpy as np
+
+from .files import File
+from .hdfreadcontrol import (condition_controls, hdfReadControl)
+from .hdfreaddata import hdfReadData
+from .hdfwarmup import shotnum_datasets
+
+
+def mapping_signature(file_map):
+    """
+    Summarize the parts of a file mapping that must agree for files to
+    be read as one run: the digitizer configurations (active state,
+    adc's, connected boards/channels, bit resolution, and sample rate)
+    and the control device configurations (dataset fields).
+
+    :param file_map: the file mapping
+    :type file_map: :class:`~bapsflib.lapdhdf.hdfmapper.hdfMap`
+    :rtype: dict
+    """
+    digis = {}
+    for dname, digi_map in file_map.digitizers.items():
+        configs = {}
+        for config_name, config in digi_map.configs.items():
+            adcs = {}
+            for adc in config['adc']:
+                adcs[adc] = [(int(conn[0]),
+                              tuple(int(ch) for ch in conn[1]),
+                              conn[2].get('bit', None),
+                              conn[2].get('sample rate', None))
+                             for conn in config[adc]]
+            configs[config_name] = (config['active'], adcs)
+        digis[dname] = configs
+
+    controls = {}
+    for cname, cmap in file_map.controls.items():
+        controls[cname] = {
+            cspec: tuple(config.get('dataset fields', ()))
+            for cspec, config in cmap.configs.items()}
+
+    return {'digitizers': digis, 'controls': controls}
+
+
+def file_shot_range(hdf_file):
+    """
+    First and last shot number recorded in a file, taken over all
+    mapped datasets that record shot numbers (see
+    :func:`~bapsflib.lapdhdf.hdfwarmup.shotnum_datasets`).
+
+    :param hdf_file: object instance of the HDF5 file
+    :type hdf_file: :class:`bapsflib.lapdhdf.files.File`
+    :return: :code:`(first, last)`, :code:`(None, None)` if no shot
+        numbers are recorded
+    :rtype: tuple
+    """
+    first, last = [], []
+    for path, field in shotnum_datasets(hdf_file):
+        dset = hdf_file.get(path)
+        if dset is None or dset.shape[0] == 0:
+            continue
+        first.append(int(dset[0, field]))
+        last.append(int(dset[-1, field]))
+    if len(first) == 0:
+        return None, None
+    return min(first), max(last)
+
+
+def _digi_header(hdf_file, board, channel, digitizer, adc,
+                 config_name):
+    """
+    Header dataset of a digitizer channel and the name of its shot
+    number field.
+    """
+    file_map = hdf_file.file_map
+    digi_map = file_map.main_digitizer if digitizer is None \
+        else file_map.digitizers[digitizer]
+    dhname = digi_map.resolve_dataset(
+        board, channel, config_name=config_name, adc=adc,
+        silent=True)[1]
+    return (hdf_file.get(digi_map.info['group path'] + '/' + dhname),
+            digi_map.shotnum_field)
+
+
+def _control_shots(hdf_file, controls):
+    """Shot numbers recorded by all of the control devices."""
+    file_map = hdf_file.file_map
+    shots = None
+    for cname, cspec in condition_controls(hdf_file, controls,
+                                           silent=True):
+        cmap = file_map.controls[cname]
+        cdset_name, field = cmap.resolve_dataset(cspec)
+        if field is None:
+            raise ValueError(
+                'no shot number field defined for control device')
+        cdset = hdf_file.get_control_dataset(
+            cmap.info['group path'] + '/' + cdset_name)
+        sn = cdset[field]
+        shots = sn if shots is None else np.intersect1d(shots, sn)
+    return shots
+
+
+def _is_all(val):
+    """:code:`True` if :data:`val` is :code:`slice(None)`"""
+    return isinstance(val, slice) and val == slice(None)
+
+
+class hdfMultiFile(object):
+    """
+    A run split across several HDF5 files, read as if it were one file.
+
+    The file mappings must be compatible (see
+    :func:`mapping_signature`).  Shot numbers are global: with
+    :code:`renumber=False` (default) the files' own shot numbers are
+    used and must increase from file to file without overlapping;
+    with :code:`renumber=True` the shot numbers of each file are
+    offset by the last shot number of the preceding files.
+
+    Reads are served by an internal concatenation index: each request
+    is split into per-file requests
+    (:class:`~bapsflib.lapdhdf.hdfreaddata.hdfReadData` and
+    :class:`~bapsflib.lapdhdf.hdfreadcontrol.hdfReadControl`), and
+    the per-file results are either streamed (:meth:`iter_data`) or
+    copied into a single pre-allocated array (:meth:`read_data` and
+    :meth:`read_controls`).
+
+    :Example:
+
+        >>> run = hdfMultiFile(['run_a.hdf5', 'run_b.hdf5'],
+        ...                    renumber=True)
+        >>> run.shot_ranges
+        [(1, 1000), (1001, 2000)]
+        >>> data = run.read_data(0, 0, shotnum=slice(990, 1010))
+        >>> run.close()
+    """
+    def __init__(self, files, renumber=False, **kwargs):
+        """
+        :param files: the files of the run, in order
+        :type files: list of str or :class:`~bapsflib.lapdhdf.files.File`
+        :param bool renumber: :code:`True` makes shot numbers
+            continuous across files (see above)
+        :param kwargs: keywords for
+            :class:`~bapsflib.lapdhdf.files.File` when opening files
+            given by name
+        """
+        if isinstance(files, (str, File)) or len(files) == 0:
+            raise ValueError('files must be a non-empty list of file '
+                             'names or File objects')
+
+        self._files = []
+        self._owned = []
+        try:
+            for item in files:
+                if isinstance(item, File):
+                    self._files.append(item)
+                elif isinstance(item, str):
+                    hdf_file = File(item, **kwargs)
+                    self._files.append(hdf_file)
+                    self._owned.append(hdf_file)
+                else:
+                    raise TypeError('files must be file names or File '
+                                    'objects')
+
+            self._check_compatible()
+            self._build_shot_index(renumber)
+        except Exception:
+            self.close()
+            raise
+
+    def _check_compatible(self):
+        """Ensure all file mappings agree with the first file."""
+        ref = mapping_signature(self._files[0].file_map)
+        for hdf_file in self._files[1:]:
+            sig = mapping_signature(hdf_file.file_map)
+            for key in ('digitizers', 'controls'):
+                if sig[key] != ref[key]:
+                    raise ValueError(
+                        'The {} mapping of {} does not match '.format(
+                            key, hdf_file.filename)
+                        + 'that of {}'.format(self._files[0].filename))
+
+    def _build_shot_index(self, renumber):
+        """Determine per-file shot ranges and global offsets."""
+        self._local_ranges = [file_shot_range(hdf_file)
+                              for hdf_file in self._files]
+        self._offsets = []
+        offset = 0
+        prev_last = None
+        for hdf_file, (first, last) in zip(self._files,
+                                           self._local_ranges):
+            if first is None:
+                raise ValueError('{} records no shot numbers'.format(
+                    hdf_file.filename))
+            if renumber:
+                self._offsets.append(offset)
+                offset += last
+            else:
+                if prev_last is not None and first <= prev_last:
+                    raise ValueError(
+                        'Shot numbers of {} overlap '.format(
+                            hdf_file.filename)
+                        + 'the preceding file, use renumber=True')
+                self._offsets.append(0)
+                prev_last = last
+
+    @property
+    def files(self):
+        """List of the :class:`~bapsflib.lapdhdf.files.File` objects"""
+        return list(self._files)
+
+    @property
+    def offsets(self):
+        """Global shot number offset of each file"""
+        return list(self._offsets)
+
+    @property
+    def shot_ranges(self):
+        """Global :code:`(first, last)` shot number of each file"""
+        return [(first + off, last + off)
+                for (first, last), off in zip(self._local_ranges,
+                                              self._offsets)]
+
+    def close(self):
+        """Close the files opened by this object."""
+        for hdf_file in self._owned:
+            hdf_file.close()
+        self._owned = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def _split_shotnum(self, shotnum):
+        """
+        Split a global shot number request into per-file local shot
+        number lists.
+        """
+        ranges = self.shot_ranges
+        if isinstance(shotnum, slice):
+            start, stop, step = shotnum.start, shotnum.stop, \
+                shotnum.step
+            start = ranges[0][0] if start is None else max(start, 1)
+            stop = ranges[-1][1] + 1 if stop is None else stop
+            shotnum = np.arange(start, stop,
+                                1 if step is None else step)
+        elif isinstance(shotnum, (int, np.integer)):
+            shotnum = np.array([shotnum])
+        elif isinstance(shotnum, (list, np.ndarray)):
+            shotnum = np.asarray(shotnum)
+            if shotnum.ndim != 1 \
+                    or not np.issubdtype(shotnum.dtype, np.integer):
+                raise ValueError('Valid `shotnum` not passed')
+        else:
+            raise ValueError('Valid `shotnum` not passed')
+
+        requests = []
+        for ifile, (first, last) in enumerate(ranges):
+            mask = np.logical_and(shotnum >= first, shotnum <= last)
+            if np.any(mask):
+                local = shotnum[mask] - self._offsets[ifile]
+                requests.append((ifile, 'shotnum', local.tolist()))
+        return requests
+
+    def _split_index(self, index, nrows):
+        """
+        Split a global row index request into per-file local row
+        lists.
+        """
+        total = sum(nrows)
+        if isinstance(index, slice):
+            index = np.arange(*index.indices(total))
+        elif isinstance(index, (int, np.integer)):
+            if index < -total or index >= total:
+                raise IndexError('index {} out of range'.format(index))
+            index = np.array([index % total])
+        elif isinstance(index, (list, np.ndarray)):
+            index = np.asarray(index)
+            if index.ndim != 1 \
+                    or not np.issubdtype(index.dtype, np.integer):
+                raise ValueError('Valid `index` not passed')
+            index = np.where(index < 0, index + total, index)
+            if np.any(index < 0) or np.any(index >= total):
+                raise IndexError('index out of range')
+        else:
+            raise ValueError('Valid `index` not passed')
+
+        requests = []
+        start = 0
+        for ifile, nrow in enumerate(nrows):
+            mask = np.logical_and(index >= start, index < start + nrow)
+            if np.any(mask):
+                requests.append((ifile, 'index',
+                                 (index[mask] - start).tolist()))
+            start += nrow
+        return requests
+
+    def _digi_nrows(self, board, channel, digitizer, adc, config_name):
+        """Number of rows of the requested digitizer dataset per file."""
+        return [_digi_header(hdf_file, board, channel, digitizer, adc,
+                             config_name)[0].shape[0]
+                for hdf_file in self._files]
+
+    def iter_data(self, board, channel, index=slice(None),
+                  shotnum=slice(None), digitizer=None, adc=None,
+                  config_name=None, silent=False, **kwargs):
+        """
+        Stream digitizer data across the files.  Takes the same
+        arguments as :meth:`read_data` and yields one
+        :class:`~bapsflib.lapdhdf.hdfreaddata.hdfReadData` per file
+        that holds requested data, with global shot numbers.
+        """
+        requests = self._digi_requests(board, channel, index, shotnum,
+                                       digitizer, adc, config_name)
+        return self._iter_requests(requests, board, channel,
+                                   digitizer=digitizer, adc=adc,
+                                   config_name=config_name,
+                                   silent=silent, **kwargs)
+
+    def _digi_requests(self, board, channel, index, shotnum,
+                       digitizer, adc, config_name):
+        """Split a digitizer read into per-file requests."""
+        if _is_all(index) and not _is_all(shotnum):
+            return self._split_shotnum(shotnum)
+        return self._split_index(
+            index, self._digi_nrows(board, channel, digitizer, adc,
+                                    config_name))
+
+    def _iter_requests(self, requests, board, channel, digitizer=None,
+                       adc=None, config_name=None, silent=False,
+                       **kwargs):
+        """Read per-file requests (see :meth:`iter_data`)."""
+        intersection_set = kwargs.get('intersection_set', True)
+        for ifile, key, local in requests:
+            if key == 'shotnum' and intersection_set:
+                # drop shot numbers the dataset does not record, a
+                # file without any is skipped
+                # - without intersection_set they are null-filled by
+                #   hdfReadData
+                dheader, field = _digi_header(
+                    self._files[ifile], board, channel, digitizer, adc,
+                    config_name)
+                local = np.asarray(local)
+                local = local[np.isin(local, dheader[field])].tolist()
+                if len(local) == 0:
+                    continue
+            data = hdfReadData(self._files[ifile], board, channel,
+                               digitizer=digitizer, adc=adc,
+                               config_name=config_name, silent=silent,
+                               **{key: local}, **kwargs)
+            if self._offsets[ifile] != 0:
+                data['shotnum'] += self._offsets[ifile]
+            yield data
+
+    def read_data(self, board, channel, index=slice(None),
+                  shotnum=slice(None), digitizer=None, adc=None,
+                  config_name=None, keep_bits=False, add_controls=None,
+                  intersection_set=True, silent=False, **kwargs):
+        """
+        Read digitizer (and mated control device) data across all
+        files.  Arguments are those of
+        :meth:`bapsflib.lapdhdf.files.File.read_data` with
+
+        * :data:`index` -- row index of the virtual dataset formed by
+          concatenating the file datasets, and
+        * :data:`shotnum` -- global shot numbers (shot numbers that do
+          not fall in any file's shot range are dropped).
+
+        :return: the data, :code:`info['hdf file']` lists the files
+            that contributed
+        :rtype: :class:`~bapsflib.lapdhdf.hdfreaddata.hdfReadData`
+        """
+        requests = self._digi_requests(board, channel, index, shotnum,
+                                       digitizer, adc, config_name)
+        segments = self._iter_requests(
+            requests, board, channel, digitizer=digitizer, adc=adc,
+            config_name=config_name, keep_bits=keep_bits,
+            add_controls=add_controls,
+            intersection_set=intersection_set, silent=silent,
+            **kwargs)
+        return self._assemble(segments, hdfReadData, '_info',
+                              sum(len(req[2]) for req in requests))
+
+    def read_controls(self, controls, shotnum=slice(None),
+                      intersection_set=True, silent=False, **kwargs):
+        """
+        Read control device data across all files.  Arguments are
+        those of :meth:`bapsflib.lapdhdf.files.File.read_controls`
+        with :data:`shotnum` as global shot numbers.
+
+        :rtype: :class:`~bapsflib.lapdhdf.hdfreadcontrol.hdfReadControl`
+        """
+        requests = self._split_shotnum(shotnum)
+
+        def segments():
+            for ifile, key, local in requests:
+                if intersection_set:
+                    # drop shot numbers not recorded by all control
+                    # devices, a file without any is skipped
+                    local = np.asarray(local)
+                    local = local[np.isin(local, _control_shots(
+                        self._files[ifile], controls))].tolist()
+                    if len(local) == 0:
+                        continue
+                cdata = hdfReadControl(
+                    self._files[ifile], controls, shotnum=local,
+                    intersection_set=intersection_set, silent=silent,
+                    **kwargs)
+                if self._offsets[ifile] != 0:
+                    cdata['shotnum'] += self._offsets[ifile]
+                yield cdata
+
+        return self._assemble(segments(), hdfReadControl, 'info',
+                              sum(len(req[2]) for req in requests))
+
+    @staticmethod
+    def _assemble(segments, cls, info_attr, size_hint):
+        """
+        Copy per-file segments into one array.  The array is allocated
+        (with :data:`size_hint` rows, the number of requested rows)
+        when the first segment arrives, so each segment is copied once
+        and released.
+        """
+        out = None
+        nfilled = 0
+        info = None
+        names = []
+        for seg in segments:
+            if out is None:
+                out = np.empty(max(size_hint, seg.shape[0]),
+                               dtype=seg.dtype)
+                info_type = type(getattr(seg, info_attr))
+                info = dict(getattr(seg, info_attr))
+            elif seg.dtype != out.dtype:
+                raise ValueError('Data from {} does not match the '
+                                 'data type of the preceding '
+                                 'files'.format(
+                                     getattr(seg, info_attr)['hdf file']))
+            if nfilled + seg.shape[0] > out.shape[0]:
+                grown = np.empty(max(2 * out.shape[0],
+                                     nfilled + seg.shape[0]),
+                                 dtype=out.dtype)
+                grown[:nfilled] = out[:nfilled]
+                out = grown
+            out[nfilled:nfilled + seg.shape[0]] = seg.view(np.ndarray)
+            nfilled += seg.shape[0]
+            names.append(getattr(seg, info_attr)['hdf file'])
+            del seg
+
+        if out is None:
+            raise ValueError('Input shotnum would result in a null '
+                             'array')
+
+        obj = out[:nfilled].view(cls)
+        info['hdf file'] = names
+        setattr(obj, info_attr, info_type(info))
+        return obj
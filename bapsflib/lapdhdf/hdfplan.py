@@ -0,0 +1,326 @@
+# This file is part of the bapsflib package, a Python toolkit for the
+# BaPSF group at UCLA.
+#
+# http://plasma.physics.ucla.edu/
+#
+# Copyright 2017-2018 Erik T. Everson and contributors
+#
+# License: Standard 3-clause BSD; see "LICENSES/LICENSE.txt" for full
+#   license terms and contributor agreement.
+#
+"""
+Dry-run planning of digitizer reads.
+"""
+import numpy as np
+
+from collections import namedtuple
+
+from .hdfreadcontrol import (hdfReadControl, condition_controls)
+from .hdfreaddata import (build_dtype, resolve_rows)
+
+hdfDatasetPlan = namedtuple(
+    'hdfDatasetPlan',
+    ['path', 'board', 'channel', 'shotnum', 'index', 'nruns',
+     'chunk_rows', 'nchunks', 'disk_bytes', 'output_bytes', 'dtype'])
+"""
+Plan of the read of one digitizer dataset.
+
+:param str path: path of the digitizer dataset
+:param int board: digitizer board number
+:param int channel: digitizer channel number
+:param shotnum: resolved shot numbers (the rows of the output array)
+:type shotnum: :class:`numpy.ndarray`
+:param index: dataset rows to be read (sorted)
+:type index: :class:`numpy.ndarray`
+:param int nruns: number of contiguous runs of rows (hyperslab runs)
+:param int chunk_rows: number of rows per chunk (:code:`None` if the
+    dataset is contiguous)
+:param int nchunks: number of chunks touched (:code:`0` if the dataset
+    is contiguous)
+:param int disk_bytes: bytes read from disk (the stored, i.e.
+    compressed, size of the touched chunks)
+:param int output_bytes: size (in bytes) of the output array
+:param dtype: dtype of the output array
+:type dtype: :class:`numpy.dtype`
+"""
+
+
+class hdfReadPlan(object):
+    """
+    Dry-run plan of one or more digitizer reads.  A plan resolves the
+    requested shots to dataset rows (reading only shot number columns
+    and, if controls are added, control device datasets) and estimates
+    the cost of the read without touching any signal data.
+
+    :Example:
+
+        >>> f = lapdhdf.File('sample.hdf5')
+        >>> plan = f.plan_read(0, 0, shotnum=slice(1, 1001),
+        ...                    add_controls=['6K Compumotor'])
+        >>> plan.nshots, plan.nchunks, plan.disk_bytes
+        (1000, 40, 12058960)
+        >>> plan.output_bytes
+        80016000
+        >>> plan.block_size(max_bytes=16 * 2 ** 20)
+        200
+    """
+    def __init__(self, datasets):
+        """
+        :param datasets: plans of the dataset reads
+        :type datasets: list(:class:`hdfDatasetPlan`)
+        """
+        self._datasets = list(datasets)
+
+    @property
+    def datasets(self):
+        """Plans of the dataset reads (:class:`hdfDatasetPlan`)"""
+        return list(self._datasets)
+
+    @property
+    def shotnum(self):
+        """Shot numbers read by any of the dataset reads"""
+        if not self._datasets:
+            return np.empty(0, dtype=np.uint32)
+        return np.unique(np.concatenate(
+            [dplan.shotnum for dplan in self._datasets]))
+
+    @property
+    def nshots(self):
+        """Number of shot numbers read"""
+        return self.shotnum.shape[0]
+
+    @property
+    def rows(self):
+        """Dictionary of dataset path to number of rows read"""
+        return {dplan.path: dplan.index.shape[0]
+                for dplan in self._datasets}
+
+    @property
+    def nruns(self):
+        """Total number of contiguous runs of rows (hyperslab runs)"""
+        return sum(dplan.nruns for dplan in self._datasets)
+
+    @property
+    def nchunks(self):
+        """Total number of chunks touched"""
+        return sum(dplan.nchunks for dplan in self._datasets)
+
+    @property
+    def disk_bytes(self):
+        """Total bytes read from disk"""
+        return sum(dplan.disk_bytes for dplan in self._datasets)
+
+    @property
+    def output_bytes(self):
+        """
+        Peak output memory (in bytes), i.e. the size of all output
+        arrays
+        """
+        return sum(dplan.output_bytes for dplan in self._datasets)
+
+    def block_size(self, max_bytes):
+        """
+        Number of shots per block for streaming the read within a
+        memory budget.  When a block holds at least one chunk of rows,
+        the block size is rounded down to a multiple of the chunk rows
+        so every chunk is decompressed once.
+
+        :param int max_bytes: memory budget (in bytes) of one block
+        :rtype: int
+        """
+        nshots = self.nshots
+        if nshots == 0:
+            return 1
+        shot_bytes = max(self.output_bytes / nshots, 1)
+        size = max(1, min(nshots, int(max_bytes // shot_bytes)))
+
+        chunk_rows = [dplan.chunk_rows for dplan in self._datasets
+                      if dplan.chunk_rows is not None]
+        if chunk_rows and size < nshots:
+            crows = max(chunk_rows)
+            if size >= crows:
+                size -= size % crows
+        return size
+
+    def __repr__(self):
+        return ('hdfReadPlan(nshots={}, datasets={}, nruns={}, '
+                'nchunks={}, disk_bytes={}, output_bytes={})'.format(
+                    self.nshots, len(self._datasets), self.nruns,
+                    self.nchunks, self.disk_bytes, self.output_bytes))
+
+
+def plan_read(hdf_file, board, channel, index=slice(None),
+              shotnum=slice(None), digitizer=None, adc=None,
+              config_name=None, keep_bits=False, add_controls=None,
+              intersection_set=True, silent=False):
+    """
+    Plan a :meth:`~bapsflib.lapdhdf.files.File.read_data` call without
+    reading any signal data.  Takes the same arguments as
+    :meth:`~bapsflib.lapdhdf.files.File.read_data`.
+
+    :param hdf_file: object instance of the HDF5 file
+    :type hdf_file: :class:`~bapsflib.lapdhdf.files.File`
+    :rtype: :class:`hdfReadPlan`
+    """
+    return plan_reads(hdf_file, [(board, channel)], index=index,
+                      shotnum=shotnum, digitizer=digitizer, adc=adc,
+                      config_name=config_name, keep_bits=keep_bits,
+                      add_controls=add_controls,
+                      intersection_set=intersection_set,
+                      silent=silent)
+
+
+def plan_reads(hdf_file, channels, index=slice(None),
+               shotnum=slice(None), digitizer=None, adc=None,
+               config_name=None, keep_bits=False, add_controls=None,
+               intersection_set=True, silent=False):
+    """
+    Plan the reads of several digitizer channels (one
+    :meth:`~bapsflib.lapdhdf.files.File.read_data` call per channel)
+    without reading any signal data.
+
+    :param hdf_file: object instance of the HDF5 file
+    :type hdf_file: :class:`~bapsflib.lapdhdf.files.File`
+    :param channels: the :code:`(board, channel)` pairs to be read
+    :type channels: list(tuple)
+    :rtype: :class:`hdfReadPlan`
+
+    The remaining keywords are those of
+    :meth:`~bapsflib.lapdhdf.files.File.read_data` and apply to every
+    channel.
+    """
+    try:
+        file_map = hdf_file.file_map
+    except AttributeError:
+        raise AttributeError(
+            'hdf_file needs to be of type lapdhdf.File')
+
+    if digitizer is None:
+        digi_map = file_map.main_digitizer
+    else:
+        try:
+            digi_map = file_map.digitizers[digitizer]
+        except KeyError:
+            raise ValueError('Specified Digitizer is not among '
+                             'known digitizers')
+
+    controls = []
+    if add_controls is not None:
+        controls = condition_controls(hdf_file, add_controls,
+                                      silent=silent)
+
+    index_with = 'shotnum' \
+        if shotnum != slice(None) and index == slice(None) \
+        else 'index'
+
+    dplans = []
+    for board, channel in channels:
+        dname, dhname, d_info = digi_map.resolve_dataset(
+            board, channel, config_name=config_name, adc=adc,
+            silent=silent)
+        dpath = digi_map.info['group path'] + '/'
+        dset = hdf_file.get(dpath + dname)
+        dheader = hdf_file.get(dpath + dhname)
+
+        rows, sn, sni = resolve_rows(index_with, index, shotnum,
+                                     dheader, digi_map.shotnum_field,
+                                     intersection_set)
+
+        # mate controls as hdfReadData does (this reads the control
+        # datasets, which carry no signal data)
+        cdtype = None
+        if controls:
+            cdata = hdfReadControl(hdf_file, controls,
+                                   assume_controls_conditioned=True,
+                                   shotnum=sn.tolist(),
+                                   intersection_set=intersection_set,
+                                   silent=True)
+            cdtype = cdata.dtype
+            if intersection_set:
+                mask = np.isin(sn, cdata['shotnum'])
+                if not mask.any():
+                    raise ValueError(
+                        'Input shotnum would result in a null array')
+                sn = sn[mask]
+                rows = rows[mask]
+
+        kbits = keep_bits or 'Offset' not in dheader.dtype.names
+        dtype = np.dtype(build_dtype(dset, kbits, cdtype))
+        dplans.append(plan_dataset(dset, rows, sn, dtype,
+                                   board=board, channel=channel))
+
+    return hdfReadPlan(dplans)
+
+
+def plan_dataset(dset, index, shotnum, dtype, board=None,
+                 channel=None):
+    """
+    Plan the read of rows :data:`index` of dataset :data:`dset`.
+
+    :param dset: the dataset
+    :type dset: :class:`h5py.Dataset`
+    :param index: rows to be read
+    :type index: :class:`numpy.ndarray`
+    :param shotnum: shot numbers of the output rows
+    :type shotnum: :class:`numpy.ndarray`
+    :param dtype: dtype of the output array
+    :type dtype: :class:`numpy.dtype`
+    :rtype: :class:`hdfDatasetPlan`
+    """
+    index = np.unique(np.asarray(index, dtype=np.int64))
+    shotnum = np.asarray(shotnum)
+    nruns = 0 if index.size == 0 \
+        else 1 + int(np.count_nonzero(np.diff(index) != 1))
+
+    if dset.chunks is None:
+        # contiguous dataset, only the requested rows are read
+        row_bytes = dset.dtype.itemsize * int(np.prod(dset.shape[1:]))
+        chunk_rows = None
+        nchunks = 0
+        disk_bytes = index.shape[0] * row_bytes
+    else:
+        chunk_rows = dset.chunks[0]
+        row_chunks = np.unique(index // chunk_rows)
+        col_chunks = [int(np.ceil(size / csize))
+                      for size, csize in zip(dset.shape[1:],
+                                             dset.chunks[1:])]
+        ncol_chunks = int(np.prod(col_chunks))
+        nchunks = row_chunks.shape[0] * ncol_chunks
+        disk_bytes = _chunk_storage(dset, row_chunks, col_chunks)
+
+    return hdfDatasetPlan(dset.name, board, channel, shotnum, index,
+                          nruns, chunk_rows, nchunks, disk_bytes,
+                          shotnum.shape[0] * dtype.itemsize, dtype)
+
+
+def _chunk_storage(dset, row_chunks, col_chunks):
+    """
+    Stored size (in bytes) of the chunks in chunk rows
+    :data:`row_chunks`.  Uses the chunk query API when the HDF5
+    library provides it, otherwise the dataset's storage size is
+    split evenly over its chunks.
+    """
+    ncol_chunks = int(np.prod(col_chunks))
+    dsid = dset.id
+    if hasattr(dsid, 'get_chunk_info_by_coord'):
+        try:
+            col_offsets = [
+                tuple(int(i) * csize
+                      for i, csize in zip(idx, dset.chunks[1:]))
+                for idx in np.ndindex(*col_chunks)]
+            total = 0
+            for rchunk in row_chunks:
+                roffset = int(rchunk) * dset.chunks[0]
+                for coffset in col_offsets:
+                    info = dsid.get_chunk_info_by_coord(
+                        (roffset,) + coffset)
+                    total += info.size or 0
+            return total
+        except (RuntimeError, ValueError, KeyError):
+            pass
+
+    # estimate from the average chunk size
+    nrow_chunks = int(np.ceil(dset.shape[0] / dset.chunks[0]))
+    total_chunks = max(nrow_chunks * ncol_chunks, 1)
+    return int(dsid.get_storage_size() * row_chunks.shape[0]
+               * ncol_chunks / total_chunks)
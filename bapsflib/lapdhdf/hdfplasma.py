@@ -0,0 +1,90 @@
+# This file is part of the bapsflib package, a Python toolkit for the
+# BaPSF group at UCLA.
+#
+# http://plasma.physics.ucla.edu/
+#
+# Copyright 2017-2018 Erik T. Everson and contributors
+#
+# License: Standard 3-clause BSD; see "LICENSES/LICENSE.txt" for full
+#   license terms and contributor agreement.
+#
+"""
+Plasma parameters evaluated on the recorded MSI magnetic field.
+"""
+import numpy as np
+
+from .hdfreadmsi import hdfReadMSI
+
+from bapsflib.plasma.parameters import PlasmaParameters
+
+
+def read_plasma(hdf_file, kTe, kTi, m_i, n_e, Z, shotnum=slice(None),
+                profile=True, gamma=None, silent=False, **kwargs):
+    """
+    Build the plasma parameters of the shots recorded by the
+    'Magnetic field' MSI diagnostic.
+
+    With :code:`profile=True` the magnetic field is the axial profile
+    of every shot, shape :code:`(nshots, nz)`, and the calculated
+    parameters are evaluated along the machine axis.  With
+    :code:`profile=False` it is the per-shot peak field, shape
+    :code:`(nshots,)`.
+
+    The remaining base values may be scalars or arrays that broadcast
+    against the magnetic field.  A 1-D array of length
+    :code:`nshots` is taken as a per-shot value (e.g. a density from
+    the 'Interferometer array' diagnostic) and is broadcast along the
+    profile.
+
+    :param hdf_file: object instance of the HDF5 file
+    :type hdf_file: :class:`bapsflib.lapdhdf.files.File`
+    :param kTe: electron temperature (in eV)
+    :param kTi: ion temperature (in eV)
+    :param m_i: ion mass (in g)
+    :param n_e: electron number density (in cm^-3)
+    :param Z: ion charge number
+    :param shotnum: HDF5 file shot number(s) to be evaluated
+    :type shotnum: int, list(int), or slice(start, stop, step)
+    :param bool profile: :code:`True` (DEFAULT) to use the axial field
+        profile, :code:`False` to use the per-shot peak field
+    :param float gamma: adiabatic index (arb.)
+    :param bool silent: :code:`False` (DEFAULT).  Set :code:`True`
+        to suppress command line printout of soft-warnings
+    :return: plasma parameters with the additional keys
+        :code:`'shotnum'` and, for :code:`profile=True`, :code:`'z'`
+        (axial locations of the profile)
+    :rtype: :class:`~bapsflib.plasma.parameters.PlasmaParameters`
+
+    :Example:
+
+        >>> from bapsflib.plasma.core import AMU
+        >>> params = read_plasma(f, kTe=5.0, kTi=1.0, m_i=4 * AMU,
+        ...                      n_e=1e12, Z=1)
+        >>> params['fci'].shape     # (nshots, nz)
+    """
+    mdata = hdfReadMSI(hdf_file, 'Magnetic field', shotnum=shotnum,
+                       silent=silent, **kwargs)
+    nshots = mdata.shape[0]
+    if profile:
+        Bo = mdata['profile']
+    else:
+        Bo = mdata['peak magnetic field']
+
+    def per_shot(val):
+        # broadcast per-shot values along the profile
+        if profile and np.ndim(val) == 1 and len(val) == nshots:
+            return np.asarray(val)[:, np.newaxis]
+        return val
+
+    params = PlasmaParameters(Bo=Bo, kTe=per_shot(kTe),
+                              kTi=per_shot(kTi), m_i=per_shot(m_i),
+                              n_e=per_shot(n_e), Z=per_shot(Z))
+    params['n_i'] = params['n_e'] / params['Z']
+    params['kT'] = params['kTe']
+    params['n'] = params['n_e']
+    if gamma is not None:
+        params['gamma'] = gamma
+    params['shotnum'] = np.array(mdata['shotnum'])
+    if profile:
+        params['z'] = np.asarray(mdata.info['attrs']['z'])
+    return params
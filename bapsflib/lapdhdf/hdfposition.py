@@ -0,0 +1,360 @@
+# This file is part of the bapsflib package, a Python toolkit for the
+# BaPSF group at UCLA.
+#
+# http://plasma.physics.ucla.edu/
+#
+# Copyright 2017-2018 Erik T. Everson and contributors
+#
+# License: Standard 3-clause BSD; see "LICENSES/LICENSE.txt" for full
+#   license terms and contributor agreement.
+#
+"""
+Spatial index of the probe positions recorded by the
+'6K Compumotor'.
+"""
+import numpy as np
+
+#: fields of a '6K Compumotor' dataset held in the index
+_COORDS = ('x', 'y', 'z', 'theta', 'phi')
+
+#: largest number of cell rings :meth:`hdfPositionIndex.nearest`
+#: searches before comparing against all positions
+_MAX_RINGS = 16
+
+
+class hdfPositionIndex(object):
+    """
+    Spatial index of the shots of one '6K Compumotor' probe drive.
+
+    Shots are grouped by their recorded position
+    :code:`(x, y, z, theta, phi)`, and the distinct positions are
+    hashed into square :code:`(x, y)` cells of size :attr:`cell`.
+    Queries only visit the cells they overlap and return the
+    (sorted, unique) shot numbers of the matching positions, so they
+    can be passed straight to
+    :meth:`~bapsflib.lapdhdf.files.File.read_data` as
+    :code:`shotnum`.
+
+    :Example:
+
+        >>> pindex = f.position_index()
+        >>> pindex.within((0.0, 0.0), 2.0)
+        array([  1,   2, ...], dtype=uint32)
+        >>> pindex.on_line(y=0.0)
+        >>> pos, shots = pindex.nearest((1.1, -0.4))
+        >>> data = f.read_data(0, 0, position={'y': 0.0})
+    """
+    def __init__(self, shotnum, coords, cell=None, decimals=6):
+        """
+        :param shotnum: shot numbers, shape :code:`(N,)`
+        :type shotnum: :class:`numpy.ndarray`
+        :param coords: positions of the shots, shape :code:`(N, 3)`
+            (:code:`x, y, z`) or :code:`(N, 5)` (:code:`x, y, z,
+            theta, phi`)
+        :type coords: :class:`numpy.ndarray`
+        :param float cell: size of the hash cells (default is the
+            typical spacing of the distinct x and y positions, see
+            :meth:`_auto_cell`)
+        :param int decimals: decimals positions are rounded to when
+            grouping shots
+        """
+        shotnum = np.asarray(shotnum).ravel()
+        coords = np.asarray(coords, dtype=np.float64)
+        if coords.ndim != 2 or coords.shape[1] not in (3, 5) \
+                or coords.shape[0] != shotnum.shape[0]:
+            raise ValueError('coords must have shape (N, 3) or (N, 5) '
+                             'matching shotnum')
+        if coords.shape[1] == 3:
+            coords = np.concatenate(
+                [coords, np.zeros((coords.shape[0], 2))], axis=1)
+
+        # drop shots without a recorded position
+        keep = ~np.isnan(coords).any(axis=1)
+        shotnum = shotnum[keep]
+        coords = np.round(coords[keep], decimals) + 0.0
+
+        # group shots by position
+        # - shots of position i are shotnum[order[start[i]:start[i+1]]]
+        positions, inverse = np.unique(coords, axis=0,
+                                       return_inverse=True)
+        inverse = inverse.ravel()
+        order = np.argsort(inverse, kind='stable')
+        self._positions = positions
+        self._shotnum = shotnum[order]
+        self._start = np.searchsorted(inverse[order],
+                                      np.arange(positions.shape[0] + 1))
+
+        # hash positions into (x, y) cells
+        if cell is None:
+            cell = self._auto_cell(positions)
+        elif cell <= 0:
+            raise ValueError('cell must be positive')
+        self._cell = float(cell)
+        cells = np.floor(positions[:, :2] / self._cell).astype(np.int64)
+        self._cells = {}
+        for i, key in enumerate(map(tuple, cells.tolist())):
+            self._cells.setdefault(key, []).append(i)
+        self._cells = {key: np.asarray(ids, dtype=np.intp)
+                       for key, ids in self._cells.items()}
+        if cells.shape[0]:
+            self._cell_min = cells.min(axis=0)
+            self._cell_max = cells.max(axis=0)
+
+    @classmethod
+    def build(cls, hdf_file, receptacle=None, **kwargs):
+        """
+        Build the index of a '6K Compumotor' probe drive from its
+        control dataset (no digitizer data is read).  Unless given,
+        :data:`cell` is the smallest motion list delta.
+
+        :param hdf_file: object instance of the HDF5 file
+        :type hdf_file: :class:`~bapsflib.lapdhdf.files.File`
+        :param int receptacle: probe drive receptacle (can be omitted
+            if only one probe drive is deployed)
+        :param kwargs: keywords of :class:`hdfPositionIndex`
+        :rtype: :class:`hdfPositionIndex`
+        """
+        try:
+            cmap = hdf_file.file_map.controls['6K Compumotor']
+        except AttributeError:
+            raise AttributeError(
+                'hdf_file needs to be of type lapdhdf.File')
+        except KeyError:
+            raise ValueError("no '6K Compumotor' in the HDF5 file")
+        dname = cmap.construct_dataset_name(receptacle)
+        dset = hdf_file.get(cmap.info['group path'] + '/' + dname)
+        names = dset.dtype.names
+        fields = [name for name in _COORDS if name in names]
+        if fields[:3] != ['x', 'y', 'z']:
+            raise ValueError('dataset {} has no x, y, z '
+                             'fields'.format(dname))
+        if len(fields) != 5:
+            fields = fields[:3]
+        coords = np.stack([dset[name] for name in fields], axis=1)
+        if kwargs.get('cell', None) is None:
+            deltas = [abs(float(delta))
+                      for ml in (cmap.motion_lists or {}).values()
+                      for delta in ml['delta'][:2]]
+            deltas = [delta for delta in deltas if delta > 0]
+            if deltas:
+                kwargs['cell'] = min(deltas)
+        return cls(dset['Shot number'], coords, **kwargs)
+
+    @property
+    def cell(self):
+        """size of the :code:`(x, y)` hash cells"""
+        return self._cell
+
+    @property
+    def positions(self):
+        """
+        distinct positions, shape :code:`(npositions, 5)`
+        (:code:`x, y, z, theta, phi`)
+        """
+        return self._positions
+
+    @property
+    def counts(self):
+        """number of shots at each of :attr:`positions`"""
+        return np.diff(self._start)
+
+    @property
+    def nshots(self):
+        """number of indexed shots"""
+        return self._shotnum.shape[0]
+
+    def shots(self, ids):
+        """
+        Shot numbers recorded at the given :attr:`positions`.
+
+        :param ids: indices into :attr:`positions`
+        :return: sorted, unique shot numbers
+        :rtype: :class:`numpy.ndarray`
+        """
+        ids = np.asarray(ids, dtype=np.intp).ravel()
+        if ids.size == 0:
+            return self._shotnum[:0]
+        return np.unique(np.concatenate(
+            [self._shotnum[self._start[i]:self._start[i + 1]]
+             for i in ids]))
+
+    def within(self, center, radius, ids=False):
+        """
+        Shots recorded within :data:`radius` of :data:`center`.
+
+        :param center: :code:`(x, y)` for a distance in the xy-plane or
+            :code:`(x, y, z)` for a 3D distance
+        :param float radius: search radius
+        :param bool ids: :code:`True` to return the indices of the
+            matching :attr:`positions` instead of shot numbers
+        :rtype: :class:`numpy.ndarray`
+        """
+        center = self._condition_point(center)
+        if radius < 0:
+            raise ValueError('radius must be non-negative')
+        found = self._candidates(center[:2], radius)
+        pos = self._positions[found, :center.shape[0]]
+        dist = np.sqrt(((pos - center) ** 2).sum(axis=1))
+        found = np.sort(found[dist <= radius])
+        return found if ids else self.shots(found)
+
+    def on_line(self, tol=None, ids=False, **coords):
+        """
+        Shots recorded where the given coordinates have the given
+        values, e.g. :code:`on_line(y=0.0)` is the line
+        :math:`y = 0`.
+
+        :param float tol: largest allowed deviation from the given
+            values (default is a quarter of :attr:`cell`)
+        :param bool ids: :code:`True` to return the indices of the
+            matching :attr:`positions` instead of shot numbers
+        :param coords: values of any of :code:`x`, :code:`y`,
+            :code:`z`, :code:`theta`, and :code:`phi`
+        :rtype: :class:`numpy.ndarray`
+        """
+        if not coords:
+            raise ValueError('no coordinate specified')
+        if tol is None:
+            tol = 0.25 * self._cell
+        mask = np.ones(self._positions.shape[0], dtype=bool)
+        for name, val in coords.items():
+            if name not in _COORDS:
+                raise ValueError('unknown coordinate {}'.format(name))
+            axis = _COORDS.index(name)
+            mask &= np.abs(self._positions[:, axis] - val) <= tol
+        found = np.nonzero(mask)[0]
+        return found if ids else self.shots(found)
+
+    def nearest(self, point):
+        """
+        Position nearest to :data:`point` (e.g. the nearest motion
+        list grid point) and its shots.
+
+        :param point: :code:`(x, y)` or :code:`(x, y, z)`
+        :return: the position (:code:`x, y, z, theta, phi`) and its
+            shot numbers
+        :rtype: (:class:`numpy.ndarray`, :class:`numpy.ndarray`)
+        """
+        point = self._condition_point(point)
+        if not self._cells:
+            raise ValueError('index has no positions')
+
+        # search rings of cells around the point until the next ring
+        # cannot hold a closer position
+        # - the search is capped at _MAX_RINGS rings, past that all
+        #   positions are compared at once
+        home = np.floor(point[:2] / self._cell).astype(np.int64)
+        reach = int(max(np.abs(self._cell_min - home).max(),
+                        np.abs(self._cell_max - home).max()))
+        best, best_dist = None, np.inf
+        for ring in range(min(reach, _MAX_RINGS) + 1):
+            if (ring - 1) * self._cell > best_dist:
+                break
+            found = self._ring(home, ring)
+            if found.size == 0:
+                continue
+            pos = self._positions[found, :point.shape[0]]
+            dist = np.sqrt(((pos - point) ** 2).sum(axis=1))
+            i = int(np.argmin(dist))
+            if dist[i] < best_dist:
+                best, best_dist = found[i], dist[i]
+        else:
+            if reach > _MAX_RINGS:
+                pos = self._positions[:, :point.shape[0]]
+                best = int(np.argmin(((pos - point) ** 2).sum(axis=1)))
+        return self._positions[best], self.shots([best])
+
+    def select(self, position):
+        """
+        Shots matching a position query, as used by the
+        :code:`position` keyword of
+        :meth:`~bapsflib.lapdhdf.files.File.read_data`.
+
+        :param position: one of
+
+            * :code:`(x, y)` or :code:`(x, y, z)` -- shots at the
+              nearest position (see :meth:`nearest`)
+            * :code:`{'center': (x, y), 'radius': r}` -- shots within
+              a radius (see :meth:`within`)
+            * :code:`{'y': y0, 'tol': tol}` -- shots on a line (see
+              :meth:`on_line`)
+
+        :rtype: :class:`numpy.ndarray`
+        """
+        if not isinstance(position, dict):
+            return self.nearest(position)[1]
+        position = dict(position)
+        position.pop('receptacle', None)
+        if 'center' in position or 'radius' in position:
+            try:
+                return self.within(position.pop('center'),
+                                   position.pop('radius'), **position)
+            except KeyError:
+                raise ValueError("position needs both 'center' and "
+                                 "'radius'")
+        return self.on_line(**position)
+
+    def _condition_point(self, point):
+        point = np.asarray(point, dtype=np.float64).ravel()
+        if point.shape[0] not in (2, 3):
+            raise ValueError('point must be (x, y) or (x, y, z)')
+        return point
+
+    def _candidates(self, xy, radius):
+        """indices of positions in the cells overlapping a circle"""
+        if not self._cells:
+            return np.zeros(0, dtype=np.intp)
+        lo = np.floor((xy - radius) / self._cell).astype(np.int64)
+        hi = np.floor((xy + radius) / self._cell).astype(np.int64)
+        lo = np.maximum(lo, self._cell_min)
+        hi = np.minimum(hi, self._cell_max)
+        if np.any(hi < lo):
+            return np.zeros(0, dtype=np.intp)
+        if np.prod(hi - lo + 1) > len(self._cells):
+            # the box spans more cells than are occupied
+            keys = [key for key in self._cells
+                    if lo[0] <= key[0] <= hi[0]
+                    and lo[1] <= key[1] <= hi[1]]
+        else:
+            keys = [(i, j) for i in range(lo[0], hi[0] + 1)
+                    for j in range(lo[1], hi[1] + 1)]
+        found = [self._cells[key] for key in keys if key in self._cells]
+        if not found:
+            return np.zeros(0, dtype=np.intp)
+        return np.concatenate(found)
+
+    def _ring(self, home, ring):
+        """indices of positions in the cells of a square ring"""
+        if ring == 0:
+            keys = [tuple(home.tolist())]
+        else:
+            i0, j0 = home.tolist()
+            keys = [(i0 + i, j0 + j)
+                    for i in range(-ring, ring + 1)
+                    for j in (-ring, ring)]
+            keys += [(i0 + i, j0 + j)
+                     for i in (-ring, ring)
+                     for j in range(-ring + 1, ring)]
+        found = [self._cells[key] for key in keys if key in self._cells]
+        if not found:
+            return np.zeros(0, dtype=np.intp)
+        return np.concatenate(found)
+
+    @staticmethod
+    def _auto_cell(positions):
+        """
+        Typical spacing of the distinct x and y positions, the median
+        gap between sorted values.  Gaps smaller than the axis extent
+        divided by the number of positions are position jitter and
+        are ignored.
+        """
+        spacing = []
+        for axis in (0, 1):
+            vals = np.unique(positions[:, axis])
+            if vals.size < 2:
+                continue
+            diff = np.diff(vals)
+            diff = diff[diff > (vals[-1] - vals[0]) / positions.shape[0]]
+            if diff.size:
+                spacing.append(np.median(diff))
+        return float(min(spacing)) if spacing else 1.0
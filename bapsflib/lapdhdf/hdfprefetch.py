@@ -0,0 +1,259 @@
+# This file is part of the bapsflib package, a Python toolkit for the
+# BaPSF group at UCLA.
+#
+# http://plasma.physics.ucla.edu/
+#
+# Copyright 2017-2018 Erik T. Everson and contributors
+#
+# License: Standard 3-clause BSD; see "LICENSES/LICENSE.txt" for full
+#   license terms and contributor agreement.
+#
+import numpy as np
+import queue
+import threading
+
+from .hdfplan import plan_read
+from .hdfreaddata import hdfReadData
+
+
+class hdfPrefetchReader(object):
+    """
+    Iterate through a digitizer dataset in blocks of shots while a
+    background thread reads the following blocks.
+
+    Each block is an :class:`~bapsflib.lapdhdf.hdfreaddata.hdfReadData`
+    (with any requested control device data mated to it).  Up to
+    :attr:`depth` blocks are read ahead of the block being analyzed, so
+    the HDF5 I/O of the next block overlaps with the analysis of the
+    current block.
+
+    :Example:
+
+        >>> f = lapdhdf.File('sample.hdf5')
+        >>> reader = hdfPrefetchReader(f, 0, 0, block_size=200,
+        ...                            add_controls=['Waveform'])
+        >>> with reader:
+        ...     for data in reader:
+        ...         analyze(data)
+    """
+    _DONE = object()
+
+    def __init__(self, hdf_file, board, channel, block_size=100,
+                 shotnum=None, depth=2, max_bytes=256 * 2 ** 20,
+                 digitizer=None, adc=None, config_name=None,
+                 **kwargs):
+        """
+        :param hdf_file: object instance of the HDF5 file
+        :type hdf_file: :class:`bapsflib.lapdhdf.files.File`
+        :param int board: digitizer board number
+        :param int channel: digitizer channel number
+        :param block_size: number of shots per block.  :code:`'auto'`
+            sizes blocks from a read plan (see
+            :meth:`~bapsflib.lapdhdf.hdfplan.hdfReadPlan.block_size`)
+            so :attr:`depth` blocks fit in :data:`max_bytes`.
+        :type block_size: int or :code:`'auto'`
+        :param shotnum: global HDF5 shot numbers to iterate over.
+            :code:`None` (default) iterates over every row of the
+            digitizer dataset.
+        :type shotnum: :code:`None`, int, list(int), or slice() (with
+            a defined stop)
+        :param int depth: maximum number of blocks read ahead of the
+            block being analyzed (default 2, i.e. double buffering)
+        :param int max_bytes: memory budget (in bytes) for blocks held
+            by the reader; :attr:`depth` is reduced so that
+            :code:`depth * (block size in bytes)` stays within budget
+            (but is never less than 1)
+        :param str digitizer: name of digitizer
+        :param str adc: name of the digitizer's analog-digital converter
+        :param str config_name: name of digitizer configuration
+        :param kwargs: additional keywords passed to
+            :class:`~bapsflib.lapdhdf.hdfreaddata.hdfReadData` (e.g.
+            :code:`add_controls`, :code:`keep_bits`,
+            :code:`intersection_set`, :code:`silent`)
+        """
+        # condition keywords
+        if block_size != 'auto' \
+                and (not isinstance(block_size, int) or block_size < 1):
+            raise ValueError("block_size must be an int >= 1 or 'auto'")
+        if not isinstance(depth, int) or depth < 1:
+            raise ValueError('depth must be an int >= 1')
+        if not isinstance(max_bytes, int) or max_bytes < 0:
+            raise ValueError('max_bytes must be a non-negative int')
+
+        self._hdf_file = hdf_file
+        self._board = board
+        self._channel = channel
+        self._read_kwargs = kwargs.copy()
+        self._read_kwargs.update({'digitizer': digitizer,
+                                  'adc': adc,
+                                  'config_name': config_name})
+
+        # get digitizer dataset
+        dset = self._get_dataset(hdf_file, board, channel, digitizer,
+                                 adc, config_name)
+
+        # size blocks from a read plan
+        # - all read-ahead blocks (depth) share the memory budget
+        if block_size == 'auto':
+            plan_kwargs = {
+                key: val for key, val in kwargs.items()
+                if key in ('keep_bits', 'add_controls',
+                           'intersection_set', 'silent')}
+            plan = plan_read(
+                hdf_file, board, channel,
+                shotnum=slice(None) if shotnum is None else shotnum,
+                digitizer=digitizer, adc=adc, config_name=config_name,
+                **plan_kwargs)
+            block_size = plan.block_size(max_bytes // depth)
+
+        # build the list of block requests
+        # - each request is a kwarg dict for hdfReadData
+        if shotnum is None:
+            nrows = dset.shape[0]
+            self._requests = [
+                {'index': slice(start, min(start + block_size, nrows))}
+                for start in range(0, nrows, block_size)]
+        else:
+            if isinstance(shotnum, int):
+                shotnum = [shotnum]
+            elif isinstance(shotnum, slice):
+                if shotnum.stop is None:
+                    raise ValueError('shotnum slice must have a defined '
+                                     'stop')
+                shotnum = list(range(*shotnum.indices(shotnum.stop)))
+            elif not isinstance(shotnum, list) \
+                    or not all(isinstance(sn, int) for sn in shotnum):
+                raise ValueError('Valid `shotnum` not passed')
+            self._requests = [
+                {'shotnum': shotnum[start:start + block_size]}
+                for start in range(0, len(shotnum), block_size)]
+
+        # tie depth to the memory budget
+        # - signal is converted to float32 unless keep_bits
+        keep_bits = kwargs.get('keep_bits', False)
+        itemsize = dset.dtype.itemsize if keep_bits else 4
+        block_nbytes = block_size * int(np.prod(dset.shape[1:])) \
+            * itemsize
+        self._depth = max(1, min(depth,
+                                 max_bytes // max(block_nbytes, 1)))
+        self._block_nbytes = block_nbytes
+
+        # threading
+        self._queue = None
+        self._thread = None
+        self._stop = threading.Event()
+
+    @property
+    def depth(self):
+        """Number of blocks read ahead (after the memory budget)"""
+        return self._depth
+
+    @property
+    def nblocks(self):
+        """Number of blocks"""
+        return len(self._requests)
+
+    @property
+    def block_nbytes(self):
+        """Estimated size (in bytes) of the signal in a full block"""
+        return self._block_nbytes
+
+    def __len__(self):
+        return len(self._requests)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def __iter__(self):
+        self.close()
+        self._stop.clear()
+        self._queue = queue.Queue(maxsize=self._depth)
+        self._thread = threading.Thread(target=self._worker,
+                                        name='hdfPrefetchReader',
+                                        daemon=True)
+        self._thread.start()
+
+        try:
+            while True:
+                item = self._queue.get()
+                if item is self._DONE:
+                    break
+                elif isinstance(item, BaseException):
+                    raise item
+                yield item
+        finally:
+            # also runs if the consumer stops iterating early
+            self.close()
+
+    def close(self):
+        """Stop the background reads and release queued blocks."""
+        if self._thread is None:
+            return
+
+        self._stop.set()
+        while self._thread.is_alive():
+            # unblock the worker if it is waiting on a full queue
+            try:
+                self._queue.get(timeout=0.1)
+            except queue.Empty:
+                pass
+        self._thread.join()
+        self._thread = None
+        self._queue = None
+
+    def _worker(self):
+        """Read blocks and place them on the queue."""
+        try:
+            for request in self._requests:
+                if self._stop.is_set():
+                    return
+                data = hdfReadData(self._hdf_file, self._board,
+                                   self._channel, **request,
+                                   **self._read_kwargs)
+                if not self._put(data):
+                    return
+        except Exception as err:
+            self._put(err)
+            return
+        self._put(self._DONE)
+
+    def _put(self, item):
+        """Put an item on the queue unless the reader is stopped."""
+        while not self._stop.is_set():
+            try:
+                self._queue.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    @staticmethod
+    def _get_dataset(hdf_file, board, channel, digitizer, adc,
+                     config_name):
+        """Get the digitizer dataset to be iterated over."""
+        try:
+            file_map = hdf_file.file_map
+        except AttributeError:
+            raise AttributeError(
+                'hdf_file needs to be of type lapdhdf.File')
+
+        if digitizer is None:
+            digi_map = file_map.main_digitizer
+        else:
+            try:
+                digi_map = file_map.digitizers[digitizer]
+            except KeyError:
+                raise ValueError('Specified Digitizer is not among '
+                                 'known digitizers')
+
+        kwargs = {'silent': True}
+        if config_name is not None:
+            kwargs['config_name'] = config_name
+        if adc is not None:
+            kwargs['adc'] = adc
+        dname = digi_map.construct_dataset_name(board, channel,
+                                                **kwargs)
+        return hdf_file.get(digi_map.info['group path'] + '/' + dname)
@@ -9,8 +9,9 @@
 #   license terms and contributor agreement.
 #
 import numpy as np
-import time
 
+from .hdfcache import build_key
+from .hdfmetrics import (hdfCountedDataset, hdfReadMetrics)
 from functools import reduce
 from warnings import warn
 
@@ -97,15 +98,18 @@ class hdfReadControl(np.recarray):
         #       contorls = ['Waveform, ('6K Compumotor', 1)]
         #
 
-        # initialize timing
+        # initialize read metrics
+        # - keyword `timeit` (deprecated) prints the metrics report
+        # - keyword `nested_read` marks a read made on behalf of
+        #   another reader, whose metrics are only emitted by that
+        #   reader
+        metrics = hdfReadMetrics('hdfReadControl')
+        timeit = bool(kwargs.get('timeit', False))
         if 'timeit' in kwargs:
-            timeit = kwargs['timeit']
-            if timeit:
-                tt = [time.time()]
-            else:
-                timeit = False
-        else:
-            timeit = False
+            warn('keyword timeit is deprecated, use the metrics '
+                 'attribute or a read hook instead', DeprecationWarning)
+        hooks = getattr(hdf_file, 'read_hooks', ())
+        emit = not kwargs.get('nested_read', False)
 
         # initiate warning string
         warn_str = ''
@@ -123,12 +127,6 @@ class hdfReadControl(np.recarray):
             raise ValueError(
                 'There are no control devices in the HDF5 file.')
 
-        # print execution timing
-        if timeit:
-            tt.append(time.time())
-            print('tt - hdf_file conditioning: '
-                  '{} ms'.format((tt[-1] - tt[-2]) * 1.E3))
-
         # ---- Condition 'controls' Argument ----
         # - some calling routines (such as, lapdhdf.File.read_data)
         #   already properly condition 'controls', so passing a keyword
@@ -147,12 +145,6 @@ class hdfReadControl(np.recarray):
         if not controls:
             raise ValueError("improper 'controls' arg passed")
 
-        # print execution timing
-        if timeit:
-            tt.append(time.time())
-            print('tt - condition controls: '
-                  '{} ms'.format((tt[-1] - tt[-2]) * 1.E3))
-
         # ---- Condition shotnum ----
         # TODO: REVIEW THIS COMMENT BLOCK
         # shotnum -- global HDF5 file shot number
@@ -218,17 +210,14 @@ class hdfReadControl(np.recarray):
             cspec = control[1]
 
             # gather control datasets and shotnumkey's
+            # - resolved through the mapping's name-resolution index
             cmap = file_map.controls[cname]
-            cdset_name = cmap.construct_dataset_name(cspec)
+            cdset_name, shotnumkey = cmap.resolve_dataset(cspec)
             cdset_path = cmap.info['group path'] + '/' + cdset_name
-            cdset_dict[cname] = hdf_file.get(cdset_path)
-            shotnumkey = ''
-            for item in \
-                    cmap.configs[cspec]['dset field to numpy field']:
-                if item[1][0] == 'shotnum':
-                    shotnumkey = item[0]
-                    break
-            if shotnumkey == '':
+            cdset_dict[cname] = hdfCountedDataset(
+                hdf_file.get_control_dataset(cdset_path), metrics,
+                cdset_path)
+            if shotnumkey is None:
                 raise ValueError(
                     'no shot number field defined for control device')
             else:
@@ -330,11 +319,30 @@ class hdfReadControl(np.recarray):
                                         sni_dict,
                                         index_dict)
 
-        # print execution timing
-        if timeit:
-            tt.append(time.time())
-            print('tt - condition shotnum: '
-                  '{} ms'.format((tt[-1] - tt[-2]) * 1.E3))
+        metrics.mark('conditioning')
+
+        # ---- Check Read Cache ----
+        # - the cache key is built from the normalized request, i.e.
+        #   the conditioned controls and the resolved shot numbers, so
+        #   equivalent `shotnum` requests (e.g. a slice and the
+        #   matching list) share an entry
+        # - a cached result skips all remaining HDF5 reads
+        # - nested reads (made on behalf of hdfReadData, which caches
+        #   its own result) look up the cache but do not store in it
+        #
+        read_cache = getattr(hdf_file, 'read_cache', None)
+        if read_cache is not None:
+            cache_key = build_key('hdfReadControl', hdf_file, controls,
+                                  intersection_set,
+                                  np.asarray(shotnum, dtype=np.int64))
+            cached = read_cache.get(cache_key)
+            if cached is not None:
+                obj = cached[0].view(cls)
+                obj.info = cached[1]
+                metrics.cache_hit = True
+                metrics.mark('cache lookup')
+                obj.metrics = metrics.finish(hooks, emit=emit)
+                return obj
 
         # ---- Build obj ----
         # Determine fields for numpy array
@@ -371,21 +379,11 @@ class hdfReadControl(np.recarray):
             dtype.append((key, npfields[key][0], npfields[key][1]))
         shape = shotnum.shape
 
-        # print execution timing
-        if timeit:
-            tt.append(time.time())
-            print('tt - define dtype: '
-                  '{} ms'.format((tt[-1] - tt[-2]) * 1.E3))
-
         # Initialize Control Data
         data = np.empty(shape, dtype=dtype)
         data['shotnum'] = shotnum.view()
-
-        # print execution timing
-        if timeit:
-            tt.append(time.time())
-            print('tt - initialize data np.ndarray: '
-                  '{} ms'.format((tt[-1] - tt[-2]) * 1.E3))
+        metrics.allocate(data.nbytes)
+        metrics.mark('allocation')
 
         # Assign Control Data to Numpy array
         for control in controls:
@@ -542,20 +540,7 @@ class hdfReadControl(np.recarray):
                                      + '{} has no Nan '.format(fname)
                                      + 'concept...no NaN fill done')
 
-            # print execution timing
-            if timeit:
-                tt.append(time.time())
-                print('tt - fill data - '
-                      + '{}: '.format(cname)
-                      + '{} ms'.format((tt[-1] - tt[-2]) * 1.E3))
-
-        # print execution timing
-        if timeit:
-            n_controls = len(controls)
-            tt.append(time.time())
-            print('tt - fill data array: '
-                  '{} ms'.format((tt[-1] - tt[-n_controls-2]) * 1.E3)
-                  + ' (intersection_set={})'.format(intersection_set))
+        metrics.mark('control read')
 
         # Construct obj
         obj = data.view(cls)
@@ -577,15 +562,19 @@ class hdfReadControl(np.recarray):
         # TODO: populate info from controls.configs
         #
 
+        # add to read cache
+        if read_cache is not None and emit:
+            read_cache.put(cache_key, obj, obj.info)
+            metrics.mark('cache store')
+
         # print warnings
         if not silent and warn_str != '':
             print(warn_str)
 
-        # print execution timing
+        # finish metrics
+        obj.metrics = metrics.finish(hooks, emit=emit)
         if timeit:
-            tt.append(time.time())
-            print('tt - total execution time: '
-                  '{} ms'.format((tt[-1] - tt[0]) * 1.E3))
+            print(metrics.report())
 
         # return obj
         return obj
@@ -612,6 +601,9 @@ class hdfReadControl(np.recarray):
                              'probe name': None,
                              'port': (None, None)})
 
+        # Define metrics attribute
+        self.metrics = getattr(obj, 'metrics', None)
+
 
 def condition_controls(hdf_file, controls, **kwargs):
 
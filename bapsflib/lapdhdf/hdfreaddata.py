@@ -10,15 +10,141 @@
 #
 #
 import numpy as np
-import time
 
+from collections.abc import Mapping
+
+from .hdfcache import build_key
+from .hdfmetrics import (hdfCountedDataset, hdfReadMetrics,
+                         read_source)
 from .hdfreadcontrol import (hdfReadControl,
                              condition_controls)
+from .hdfreadmsi import (hdfReadMSI, condition_msi)
 
-from bapsflib.plasma import core
+from bapsflib.plasma.parameters import PlasmaParameters
 from warnings import warn
 
 
+class hdfDataInfo(Mapping):
+    """
+    Read-only meta-info of a :class:`hdfReadData` array (see
+    :attr:`hdfReadData.info` for the keys).
+
+    One instance is shared by an array and every view, slice, and
+    cached copy of it, so it can not be modified.  Use :meth:`copy`
+    for a modifiable :class:`dict`, or :meth:`replace` for a new
+    instance with some items changed.
+    """
+    __slots__ = ('_items', '_dt', '_dv')
+
+    def __init__(self, items):
+        """
+        :param items: meta-info items
+        :type items: dict
+        """
+        object.__setattr__(self, '_items', dict(items))
+        object.__setattr__(self, '_dt', None)
+        object.__setattr__(self, '_dv', None)
+
+    def __getitem__(self, key):
+        return self._items[key]
+
+    def __iter__(self):
+        return iter(self._items)
+
+    def __len__(self):
+        return len(self._items)
+
+    def __setattr__(self, key, value):
+        raise AttributeError('hdfDataInfo is immutable')
+
+    def __reduce__(self):
+        return self.__class__, (self._items,)
+
+    def __repr__(self):
+        return '{}({!r})'.format(self.__class__.__name__, self._items)
+
+    def copy(self):
+        """
+        :return: modifiable copy of the items
+        :rtype: dict
+        """
+        return self._items.copy()
+
+    def replace(self, **kwargs):
+        """
+        :param kwargs: items to change, use
+            :code:`replace(**{'probe name': 'LP1'})` for keys with
+            spaces
+        :return: new meta-info with the items of :data:`kwargs`
+            changed
+        :rtype: :class:`hdfDataInfo`
+        """
+        items = self._items.copy()
+        items.update(kwargs)
+        return self.__class__(items)
+
+    @property
+    def dt(self):
+        """
+        :return: time-step size (in sec) calculated from the
+            'sample rate' and 'sample average' items
+        :rtype: float
+        """
+        if self._dt is None:
+            # define unit conversions
+            units = {'GHz': 1.E9, 'MHz': 1.E6, 'kHz': 1.E3, 'Hz': 1.0}
+
+            # calc base dt
+            rate = self._items['sample rate']
+            dt = 1.0 / (rate[0] * units[rate[1]])
+
+            # adjust for hardware averaging
+            if self._items['sample average'] is not None:
+                dt = dt * float(self._items['sample average'])
+            else:
+                print('no sample average')
+            object.__setattr__(self, '_dt', dt)
+        return self._dt
+
+    @property
+    def dv(self):
+        """
+        :return: voltage-step size (in volts) calculated from the
+            'bit' and 'voltage offset' items
+        :rtype: float
+        """
+        if self._dv is None:
+            dv = (2.0 * abs(self._items['voltage offset']) /
+                  (2. ** self._items['bit'] - 1.))
+            object.__setattr__(self, '_dv', dv)
+        return self._dv
+
+
+#: meta-info of an array not produced by a read
+_NULL_INFO = hdfDataInfo({
+    'hdf file': None,
+    'dataset name': None,
+    'dataset path': None,
+    'configuration name': None,
+    'adc': None,
+    'bit': None,
+    'sample rate': (None, 'MHz'),
+    'sample average': None,
+    'shot average': None,
+    'board': None,
+    'channel': None,
+    'voltage offset': None,
+    'probe name': None,
+    'port': (None, None),
+    'signal units': '',
+    'added controls': [],
+    'added msi': {}
+})
+
+#: meta-info of an object with no instance dictionary
+_NO_META = {}
+
+
 # noinspection PyInitNewSignature
 class hdfReadData(np.recarray):
     """
@@ -36,7 +162,8 @@ class hdfReadData(np.recarray):
                 index=slice(None), shotnum=slice(None),
                 digitizer=None, adc=None,
                 config_name=None, keep_bits=False, add_controls=None,
-                intersection_set=True, silent=False, **kwargs):
+                add_msi=None, intersection_set=True, silent=False,
+                **kwargs):
         """
         When inheriting from numpy, the object creation and
         initialization is handled by __new__ instead of __init__.
@@ -66,6 +193,11 @@ class hdfReadData(np.recarray):
             device name. If an element is a 2-element tuple, then
             tuple[0] is the control device name and tuple[1] is a unique
             specifier for that control device.
+        :param add_msi: name(s) of MSI diagnostics whose per-shot data
+            will be matched with the digitizer data, each is added as
+            a nested field named after the diagnostic (e.g.
+            :code:`data['Discharge']['current']`)
+        :type add_msi: str or list(str)
         :param bool intersection_set:
         :param bool silent: set :code:`True` to suppress command line
             print out of soft warnings
@@ -81,16 +213,13 @@ class hdfReadData(np.recarray):
         # not necessary
         #
 
-        # initialize timing
-        tt = []
+        # initialize read metrics
+        # - keyword `timeit` (deprecated) prints the metrics report
+        metrics = hdfReadMetrics('hdfReadData')
+        timeit = bool(kwargs.get('timeit', False))
         if 'timeit' in kwargs:
-            timeit = kwargs['timeit']
-            if timeit:
-                tt.append(time.time())
-            else:
-                timeit = False
-        else:
-            timeit = False
+            warn('keyword timeit is deprecated, use the metrics '
+                 'attribute or a read hook instead', DeprecationWarning)
 
         # initiate warning string
         warn_str = ''
@@ -118,12 +247,6 @@ class hdfReadData(np.recarray):
                 raise ValueError('Specified Digitizer is not among '
                                  'known digitizers')
 
-        # print execution timing
-        if timeit:
-            tt.append(time.time())
-            print('tt - hdf_file conditioning: '
-                  '{} ms'.format((tt[-1]-tt[-2])*1.E3))
-
         # ---- Check for Control Device Addition ---
         # condition controls
         if add_controls is not None:
@@ -138,15 +261,12 @@ class hdfReadData(np.recarray):
         else:
             controls = []
 
-        # print execution timing
-        if timeit:
-            tt.append(time.time())
-            print('tt - add_controls conditioning: '
-                  '{} ms'.format((tt[-1] - tt[-2]) * 1.E3))
+        # ---- Check for MSI Diagnostic Addition ---
+        msi = [] if add_msi is None else condition_msi(hdf_file, add_msi)
 
         # ---- Gather Digi Dataset Info ----
         #
-        # Note: digi_map.construct_dataset_name has conditioning for
+        # Note: digi_map.resolve_dataset has conditioning for
         #       board, channel, adc, and
         #
         # dname      - digitizer dataset name
@@ -159,30 +279,18 @@ class hdfReadData(np.recarray):
         # shotnumkey - field name for shot number column in the digi
         #              header dataset (dheader)
         #
-        # Build kwargs for construct_dataset_name()
-        kwargs = {'return_info': True,
-                  'silent': silent}
-        if config_name is not None:
-            kwargs['config_name'] = config_name
-        if adc is not None:
-            kwargs['adc'] = adc
-
         # Get dataset
-        dname, d_info = digi_map.construct_dataset_name(
-            board, channel, **kwargs)
-        dhname = digi_map.construct_header_dataset_name(
-            board, channel, **kwargs)
+        # - resolved through the mapping's name-resolution index
+        dname, dhname, d_info = digi_map.resolve_dataset(
+            board, channel, config_name=config_name, adc=adc,
+            silent=silent)
         dpath = digi_map.info['group path'] + '/'
-        dset = hdf_file.get(dpath + dname)
-        dheader = hdf_file.get(dpath + dhname)
+        dset = hdf_file.get_digi_dataset(dpath + dname)
+        dheader = hdfCountedDataset(
+            hdf_file.get_digi_dataset(dpath + dhname), metrics,
+            dpath + dhname)
         shotnumkey = digi_map.shotnum_field
 
-        # print execution timing
-        if timeit:
-            tt.append(time.time())
-            print('tt - get dset and dheader: '
-                  '{} ms'.format((tt[-1] - tt[-2]) * 1.E3))
-
         # ---- Condition `keep_bits` ----
         if 'Offset' not in dheader.dtype.names:
             # there's no voltage offset value to calculate dv
@@ -193,12 +301,6 @@ class hdfReadData(np.recarray):
             # force keep_bits True
             keep_bits = True
 
-        # print execution timing
-        if timeit:
-            tt.append(time.time())
-            print('tt - condition keep_bits kwarg: '
-                  '{} ms'.format((tt[-1] - tt[-2]) * 1.E3))
-
         # ---- Condition shots, index, and shotnum ----
         # shots   -- same as index (legacy, do NOT use)
         #            ~ overridden by index and shotnum
@@ -269,92 +371,43 @@ class hdfReadData(np.recarray):
         # Condition `index` and `shotnum` keywords
         # - Valid indexing types are: int, list(int), and slice()
         #
-        if index_with == 'index':
-            # Condition `index` keyword
-            #
-            # Note: I'm letting the slicing of dset[index, shotnumkey]
-            #       to throw the appropriate errors
-            #
-            # Define `shotnum`
-            shotnum = dheader[index, shotnumkey].view()
-            if shotnum.shape == () and shotnum.size == 1:
-                shotnum = np.array([shotnum]).view()
-
-            # define sni
-            sni = np.ones(shotnum.shape[0], dtype=bool)
-
-            # convert `index` to np.ndarray
-            if type(index) is int:
-                index = np.array([index])
-            elif type(index) is list:
-                index = np.array(index)
-            elif type(index) is slice:
-                start, stop, step = index.indices(dheader.shape[0])
-                index = np.arange(start, stop, step)
-
-            # print execution timing
-            if timeit:
-                tt.append(time.time())
-                print('tt - condition index: '
-                      '{} ms'.format((tt[-1] - tt[-2]) * 1.E3))
-        else:
-            # Condition `shotnum` keyword
-            #
-            # convert `shotnum` to list
-            if isinstance(shotnum, slice):
-                # determine largest possible shot number
-                last_sn = dheader[-1, shotnumkey]
-                if shotnum.stop is not None:
-                    stop_sn = max(shotnum.stop, last_sn + 1)
-                else:
-                    stop_sn = last_sn + 1
-
-                # get the start, stop, and step for the shot number
-                # array
-                start, stop, step = shotnum.indices(stop_sn)
-
-                # determine smallest possible shot number
-                # - intersection_set = True
-                #   * start = max of first_sn and shotnum.start
-                # - intersection_set = False
-                #   * start = min of first_sn and shotnum.start
-                first_sn = [dheader[0, shotnumkey]]
-                if shotnum.start is not None:
-                    # ensure shot numbers are >= 1
-                    if start <= 0:
-                        start = 1
-                else:
-                    # start wasn't specified in slice object
-                    start = min(first_sn)
-
-                # adjust start for intersection_set
-                if intersection_set:
-                    first_sn.append(start)
-                    start = max(first_sn)
-
-                # re-define shotnum as a list
-                shotnum = np.arange(start, stop, step).tolist()
-            elif isinstance(shotnum, int):
-                shotnum = [shotnum]
-            elif isinstance(shotnum, list):
-                # ensure all elements are int
-                if not all(isinstance(sn, int) for sn in shotnum):
-                    raise ValueError('Valid `shotnum` not passed')
-            else:
-                raise ValueError('Valid `shotnum` not passed')
-
-            # Calc. the corresponding `index` and `sni`
-            # - `shotnum` will be converted from list to np.array
-            # - `index` and `sni` will be np.array's
-            index, shotnum, sni = \
-                condition_shotnum(shotnum, dheader, shotnumkey,
-                                  intersection_set)
-
-            # print execution timing
-            if timeit:
-                tt.append(time.time())
-                print('tt - condition shotnum: '
-                      '{} ms'.format((tt[-1] - tt[-2]) * 1.E3))
+        index, shotnum, sni = resolve_rows(index_with, index, shotnum,
+                                           dheader, shotnumkey,
+                                           intersection_set)
+
+        metrics.mark('conditioning')
+
+        # ---- Check Read Cache ----
+        # - the cache key is built from the normalized request, i.e.
+        #   the resolved dataset, conditioned controls, and the
+        #   resolved row indices and shot numbers, so equivalent
+        #   `index`/`shotnum` requests (e.g. a slice and the matching
+        #   list) share an entry
+        # - a cached result skips all remaining HDF5 reads
+        #
+        read_cache = getattr(hdf_file, 'read_cache', None)
+        if read_cache is not None:
+            cache_key = build_key(
+                'hdfReadData', hdf_file, dpath + dname, controls, msi,
+                keep_bits, intersection_set,
+                np.asarray(index, dtype=np.int64),
+                np.asarray(shotnum, dtype=np.int64), sni)
+            cached = read_cache.get(cache_key)
+            if cached is not None:
+                obj = cached[0].view(cls)
+                obj._info = cached[1] \
+                    if isinstance(cached[1], hdfDataInfo) \
+                    else hdfDataInfo(cached[1])
+                metrics.cache_hit = True
+                metrics.mark('cache lookup')
+                obj._metrics = metrics.finish(
+                    getattr(hdf_file, 'read_hooks', ()))
+
+                # print warnings
+                if not silent and warn_str != '':
+                    print(warn_str)
+
+                return obj
 
         # ---- Retrieve Control Data ---
         # 1. retrieve the numpy array for control data
@@ -371,13 +424,9 @@ class hdfReadData(np.recarray):
                                    assume_controls_conditioned=True,
                                    shotnum=shotnum.tolist(),
                                    intersection_set=intersection_set,
-                                   silent=silent)
-
-            # print execution timing
-            if timeit:
-                tt.append(time.time())
-                print('tt - read in cdata (control data): '
-                      '{} ms'.format((tt[-1] - tt[-2]) * 1.E3))
+                                   silent=silent, nested_read=True)
+            metrics.merge(cdata.metrics)
+            metrics.mark('control read')
 
             # re-filter index, shotnum, and sni
             # - only need to be filtered if intersection_set=True
@@ -396,6 +445,32 @@ class hdfReadData(np.recarray):
         else:
             cdata = None
 
+        # ---- Retrieve MSI Data ---
+        # - same matching as the control data, each diagnostic is read
+        #   for the (possibly re-filtered) shot numbers
+        #
+        mdata = {}
+        for mname in msi:
+            mdata[mname] = hdfReadMSI(hdf_file, mname,
+                                      shotnum=shotnum.tolist(),
+                                      intersection_set=intersection_set,
+                                      silent=silent, nested_read=True)
+            metrics.merge(mdata[mname].metrics)
+
+            # re-filter index, shotnum, and sni
+            if intersection_set:
+                new_sn_mask = np.isin(shotnum, mdata[mname]['shotnum'])
+                if True not in new_sn_mask:
+                    raise ValueError(
+                        'Input shotnum would result in a null array')
+                shotnum = shotnum[new_sn_mask]
+                index = index[new_sn_mask]
+                sni = np.ones(shotnum.shape[0], dtype=bool)
+                if cdata is not None:
+                    cdata = cdata[np.isin(cdata['shotnum'], shotnum)]
+        if len(msi) != 0:
+            metrics.mark('msi read')
+
         # ---- Construct obj ---
         # - obj will be a numpy record array
         #
@@ -404,24 +479,20 @@ class hdfReadData(np.recarray):
         #   file shot number
         # - shotkey = is the field name/key of the dheader shot number
         #   column
-        sigtype = '<f4' if not keep_bits else dset.dtype
         shape = shotnum.shape[0]
-        dtype = [('shotnum', '<u4'),
-                 ('signal', sigtype, dset.shape[1]),
-                 ('xyz', '<f4', 3)]
-        if len(controls) != 0:
-            for subdtype in cdata.dtype.descr:
-                if subdtype[0] not in [d[0] for d in dtype]:
-                    dtype.append(subdtype)
+        dtype = build_dtype(dset, keep_bits,
+                            None if cdata is None else cdata.dtype)
+        for mname in msi:
+            mdtype = mdata[mname].dtype
+            dtype.append((mname, [(field, mdtype[field].base,
+                                   mdtype[field].shape)
+                                  for field in mdtype.names
+                                  if field != 'shotnum']))
 
         # Define numpy array
         data = np.empty(shape, dtype=dtype)
-
-        # print execution timing
-        if timeit:
-            tt.append(time.time())
-            print('tt - define data: '
-                  '{} ms'.format((tt[-1] - tt[-2]) * 1.E3))
+        metrics.allocate(data.nbytes)
+        metrics.mark('allocation')
 
         # make sure index is not an ndarray
         if type(index) is np.ndarray:
@@ -431,17 +502,24 @@ class hdfReadData(np.recarray):
         data['shotnum'] = shotnum
 
         # fill 'signal' fields of data array
+        signal = hdf_file.read_digi_rows(dset, index)
+        metrics.record(dpath + dname, signal.shape[0], signal.nbytes,
+                       source=read_source(dset, (index, slice(None))))
+        metrics.allocate(signal.nbytes)
         if intersection_set:
             # fill signal
-            data['signal'] = dset[index, :]
+            data['signal'] = signal
         else:
             # fill signal
-            data['signal'][sni] = dset[index, :]
+            data['signal'][sni] = signal
             if np.issubdtype(data['signal'].dtype, np.integer):
                 data['signal'][np.logical_not(sni)] = -99999
             else:
                 # dtype is np.floating
                 data['signal'][np.logical_not(sni)] = np.nan
+        metrics.release(signal.nbytes)
+        del signal
+        metrics.mark('signal read')
 
         # fill fields related to controls
         if len(controls) != 0:
@@ -468,11 +546,15 @@ class hdfReadData(np.recarray):
             # fill xyz
             data['xyz'] = np.nan
 
-        # print execution timing
-        if timeit:
-            tt.append(time.time())
-            print('tt - fill data array: '
-                  '{} ms'.format((tt[-1] - tt[-2]) * 1.E3))
+        metrics.mark('control fill')
+
+        # fill fields of MSI diagnostics
+        # - an earlier diagnostic may hold shot numbers trimmed by a
+        #   later one
+        for mname in msi:
+            rows = np.isin(mdata[mname]['shotnum'], shotnum)
+            for field in data.dtype[mname].names:
+                data[mname][field] = mdata[mname][field][rows]
 
         # Define obj to be returned
         obj = data.view(cls)
@@ -484,7 +566,8 @@ class hdfReadData(np.recarray):
             voffset = None
 
         # assign dataset meta-info
-        obj._info = {
+        # - one immutable object shared by obj and all its views
+        obj._info = hdfDataInfo({
             'hdf file': hdf_file.filename.split('/')[-1],
             'dataset name': dname,
             'dataset path': dpath,
@@ -500,24 +583,10 @@ class hdfReadData(np.recarray):
             'voltage offset': voffset,
             'probe name': None,
             'port': (None, None),
-            'signal units': 'bits',
-            'added controls': controls
-        }
-
-        # plasma parameter dict
-        obj._plasma = {
-            'Bo': None,
-            'kT': None,
-            'kTe': None,
-            'kTi': None,
-            'gamma': core.FloatUnit(1.0, 'arb'),
-            'm_e': core.ME,
-            'm_i': None,
-            'n': None,
-            'n_e': None,
-            'n_i': None,
-            'Z': None
-        }
+            'signal units': 'bits' if keep_bits else 'V',
+            'added controls': controls,
+            'added msi': {mname: mdata[mname].info for mname in msi}
+        })
 
         # convert to voltage
         # - 'signal' dtype is assigned based on keep_bit
@@ -530,19 +599,21 @@ class hdfReadData(np.recarray):
 
             # calc voltage
             obj['signal'] = (obj.dv * obj['signal']) - offset
+        metrics.mark('conversion')
 
-            # update 'signal units'
-            obj._info['signal units'] = 'V'
+        # add to read cache
+        if read_cache is not None:
+            read_cache.put(cache_key, obj, obj._info)
+            metrics.mark('cache store')
 
         # print warnings
         if not silent and warn_str != '':
             print(warn_str)
 
-        # print execution timing
+        # finish metrics
+        obj._metrics = metrics.finish(getattr(hdf_file, 'read_hooks', ()))
         if timeit:
-            tt.append(time.time())
-            print('tt - execution time: '
-                  '{} ms'.format((tt[-1] - tt[0]) * 1.E3))
+            print(metrics.report())
 
         # return obj
         return obj
@@ -559,43 +630,18 @@ class hdfReadData(np.recarray):
         if obj is None:
             return
 
-        # Define _info attribute
-        # - getattr() searches obj for the '_info' attribute. If the
-        #   attribute exists, then it's returned. If the attribute does
-        #   NOT exist, then the 3rd arg is returned as a default value.
-        self._info = getattr(obj, '_info', {
-            'hdf file': None,
-            'dataset name': None,
-            'dataset path': None,
-            'configuration name': None,
-            'adc': None,
-            'bit': None,
-            'sample rate': (None, 'MHz'),
-            'sample average': None,
-            'shot average': None,
-            'board': None,
-            'channel': None,
-            'voltage offset': None,
-            'probe name': None,
-            'port': (None, None),
-            'signal units': '',
-            'added controls': []
-        })
-
-        # Define plasma attribute
-        self._plasma = getattr(obj, '_plasma', {
-            'Bo': None,
-            'kT': None,
-            'kTe': None,
-            'kTi': None,
-            'gamma': core.FloatUnit(1.0, 'arb'),
-            'm_e': core.ME,
-            'm_i': None,
-            'n': None,
-            'n_e': None,
-            'n_i': None,
-            'Z': None
-        })
+        # Define _info, _plasma, and _metrics attributes
+        # - views reference the meta-info objects of obj, nothing is
+        #   copied or constructed
+        # - an array not produced by a read gets the shared
+        #   _NULL_INFO, and a plasma dict on first use
+        # - the instance __dict__ is accessed directly since the
+        #   np.recarray __getattribute__/__setattr__ overrides are
+        #   costly, and this runs several times per slice
+        meta = getattr(obj, '__dict__', _NO_META)
+        self.__dict__.update(_info=meta.get('_info', _NULL_INFO),
+                             _plasma=meta.get('_plasma', None),
+                             _metrics=meta.get('_metrics', None))
 
     def convert_signal(self, to_volt=False, to_bits=False, force=False):
         """converts signal from volts (bits) to bits (volts)"""
@@ -612,8 +658,9 @@ class hdfReadData(np.recarray):
     @property
     def info(self):
         """
-        A dictionary of metadata for the extracted data. The
-        dict() keys are:
+        A read-only dictionary (:class:`hdfDataInfo`) of metadata for
+        the extracted data, shared with all views of the array.  The
+        keys are:
 
         .. list-table::
             :widths: 5 3 11
@@ -682,7 +729,15 @@ class hdfReadData(np.recarray):
                      'E'  = east
                      'TE' = top-east
         """
-        return self._info.copy()
+        return self._info
+
+    @property
+    def metrics(self):
+        """
+        Timing and I/O metrics of the read that produced the array
+        (:class:`~bapsflib.lapdhdf.hdfmetrics.hdfReadMetrics`)
+        """
+        return self._metrics
 
     @property
     def dt(self):
@@ -691,20 +746,7 @@ class hdfReadData(np.recarray):
             'sample rate' item in :attr:`info`.
         :rtype: float
         """
-        # define unit conversions
-        units = {'GHz': 1.E9, 'MHz': 1.E6, 'kHz': 1.E3, 'Hz': 1.0}
-
-        # calc base dt
-        dt = 1.0 / (self.info['sample rate'][0] *
-                    units[self.info['sample rate'][1]])
-
-        # adjust for hardware averaging
-        if self.info['sample average'] is not None:
-            dt = dt * float(self.info['sample average'])
-        else:
-            print('no sample average')
-
-        return dt
+        return self._info.dt
 
     @property
     def dv(self):
@@ -713,15 +755,15 @@ class hdfReadData(np.recarray):
             and 'voltage offset' items in :attr:`info`.
         :rtype: float
         """
-        dv = (2.0 * abs(self.info['voltage offset']) /
-              (2. ** self.info['bit'] - 1.))
-        return dv
+        return self._info.dv
 
     @property
     def plasma(self):
         """
         Dictionary of plasma parameters. (All quantities are in cgs
-        units except temperature is in eV)
+        units except temperature is in eV)  Calculated values are
+        evaluated when first accessed (see
+        :class:`~bapsflib.plasma.parameters.PlasmaParameters`).
 
         +----------------+---------------------------------------------+
         | Base Values                                                  |
@@ -779,123 +821,212 @@ class hdfReadData(np.recarray):
         | :const:`vTi`   | ion thermal velocity                        |
         +----------------+---------------------------------------------+
         """
+        if self._plasma is None:
+            self._plasma = PlasmaParameters()
         return self._plasma
 
     def set_plasma(self, Bo, kTe, kTi, m_i, n_e, Z, gamma=None,
                    **kwargs):
         """
-        Set :attr:`plasma` and add key frequency, length, and velocity
-        parameters. (all quantities in cgs except temperature is in eV)
-
-        :param float Bo: magnetic field (in Gauss)
-        :param float kTe: electron temperature (in eV)
-        :param float kTi: ion temperature (in eV)
-        :param float m_i: ion mass (in g)
-        :param float n_e: electron number density (in cm^-3)
-        :param int Z: ion charge number
+        Set :attr:`plasma` base values, the key frequency, length, and
+        velocity parameters are calculated from them when accessed.
+        (all quantities in cgs except temperature is in eV)
+
+        Every value can be a scalar or an array (e.g. a per-shot
+        magnetic field such as
+        :code:`data['Magnetic field']['peak magnetic field']`), the
+        calculated parameters broadcast over the arrays.
+
+        :param Bo: magnetic field (in Gauss)
+        :type Bo: float or array_like
+        :param kTe: electron temperature (in eV)
+        :type kTe: float or array_like
+        :param kTi: ion temperature (in eV)
+        :type kTi: float or array_like
+        :param m_i: ion mass (in g)
+        :type m_i: float or array_like
+        :param n_e: electron number density (in cm^-3)
+        :type n_e: float or array_like
+        :param Z: ion charge number
+        :type Z: int or array_like
         :param float gamma: adiabatic index (arb.)
         """
         # define base values
-        self._plasma['Bo'] = core.FloatUnit(Bo, 'G')
-        self._plasma['kTe'] = core.FloatUnit(kTe, 'eV')
-        self._plasma['kTi'] = core.FloatUnit(kTi, 'eV')
-        self._plasma['m_i'] = core.FloatUnit(m_i, 'g')
-        self._plasma['n_e'] = core.FloatUnit(n_e, 'cm^-3')
-        self._plasma['Z'] = core.IntUnit(Z, 'arb')
+        plasma = self.plasma
+        plasma['Bo'] = Bo
+        plasma['kTe'] = kTe
+        plasma['kTi'] = kTi
+        plasma['m_i'] = m_i
+        plasma['n_e'] = n_e
+        plasma['Z'] = Z
 
         # define ion number density
-        self._plasma['n_i'] = core.FloatUnit(
-            self._plasma['n_e'] / self._plasma['Z'], 'cm^-3')
+        plasma['n_i'] = plasma['n_e'] / plasma['Z']
 
         # define gamma (adiabatic index)
         # - default = 1.0
         if gamma is not None:
-            self._plasma['gamma'] = core.FloatUnit(gamma, 'arb')
+            plasma['gamma'] = gamma
 
         # define plasma temperature
         # - if omitted then assumed kTe
         # TODO: double check assumption
-        if 'kT' in kwargs:
-            self._plasma['kT'] = core.FloatUnit(kwargs['kT'], 'eV')
-        else:
-            self._plasma['kT'] = core.FloatUnit(kTe, 'eV')
+        plasma['kT'] = kwargs.get('kT', kTe)
 
         # define plasma number density
         # - if omitted then assumed n_e
-        if 'n' in kwargs:
-            self._plasma['n'] = core.FloatUnit(kwargs['n'], 'cm^-3')
-        else:
-            self._plasma['n'] = core.FloatUnit(n_e, 'cm^-3')
-
-        # add key plasma constants
-        self._update_plasma_constants()
+        plasma['n'] = kwargs.get('n', n_e)
 
     def set_plasma_value(self, key, value):
         """
         Re-define one of the base plasma values (Bo, gamma, kT, kTe,
         kTi, m_i, n, n_e, or Z) in the :attr:`plasma` dictionary.
+        Only the calculated values depending on :data:`key` are
+        re-calculated, and only when next accessed.
 
         :param str key: one of the base plasma values
         :param value: value for key
         """
-        # set plasma value
-        if key == 'Bo':
-            self._plasma['Bo'] = core.FloatUnit(value, 'G')
-        elif key == 'gamma':
-            self._plasma['gamma'] = core.FloatUnit(value, 'arb')
-        elif key in ['kT', 'kTe', 'kTi']:
-            self._plasma[key] = core.FloatUnit(value, 'eV')
-
-            if key == 'kTe' and self._plasma['kt'] is None:
-                self._plasma['kT'] = self._plasma[key]
-        elif key == 'm_i':
-            self._plasma[key] = core.FloatUnit(value, 'g')
-        elif key in ['n', 'n_e']:
-            self._plasma[key] = core.FloatUnit(value, 'cm^-3')
+        if key not in ('Bo', 'gamma', 'kT', 'kTe', 'kTi', 'm_i', 'n',
+                       'n_e', 'Z'):
+            raise ValueError(
+                "'{}' is not a base plasma value".format(key))
 
+        # set plasma value
+        plasma = self.plasma
+        plasma[key] = value
+        if key == 'kTe' and plasma['kT'] is None:
+            plasma['kT'] = plasma[key]
+        elif key in ('n_e', 'Z') and plasma['n_e'] is not None \
+                and plasma['Z'] is not None:
             # re-calc n_i and n
-            if key == 'n_e':
-                self._plasma['n_i'] = core.FloatUnit(
-                    self._plasma['n_e'] / self._plasma['Z'], 'cm^-3')
+            plasma['n_i'] = plasma['n_e'] / plasma['Z']
+            if plasma['n'] is None:
+                plasma['n'] = plasma['n_e']
 
-                if self._plasma['n'] is None:
-                    self._plasma['n'] = self._plasma['n_e']
-        elif key == 'Z':
-            self._plasma[key] = core.IntUnit(value, 'arb')
 
-            # re-calc n_i
-            self._plasma['n_i'] = \
-                core.FloatUnit(self._plasma['n_e'] / self._plasma['Z'],
-                               'cm^-3')
+def build_dtype(dset, keep_bits, cdtype=None):
+    """
+    Build the dtype of the :class:`hdfReadData` array.
+
+    :param dset: digitizer dataset
+    :type dset: :class:`h5py.Dataset`
+    :param bool keep_bits: :code:`True` if the signal is kept in bits
+    :param cdtype: dtype of the mated control device data,
+        :code:`None` if no controls are added
+    :type cdtype: :class:`numpy.dtype`
+    :rtype: list
+    """
+    # - 1st column of the digi data header contains the global HDF5
+    #   file shot number
+    sigtype = '<f4' if not keep_bits else dset.dtype
+    dtype = [('shotnum', '<u4'),
+             ('signal', sigtype, dset.shape[1]),
+             ('xyz', '<f4', 3)]
+    if cdtype is not None:
+        for subdtype in cdtype.descr:
+            if subdtype[0] not in [d[0] for d in dtype]:
+                dtype.append(subdtype)
+    return dtype
+
+
+def resolve_rows(index_with, index, shotnum, dheader, shotnumkey,
+                 intersection_set):
+    """
+    Resolve the **index** or **shotnum** request of
+    :class:`hdfReadData` into digitizer dataset rows.  Only the shot
+    number column of the header dataset is read.
+
+    :param str index_with: :code:`'index'` or :code:`'shotnum'`, the
+        keyword the request is made with
+    :param index: row index/indices of the dataset
+    :type index: int, list(int), or slice()
+    :param shotnum: global HDF5 shot number(s)
+    :type shotnum: int, list(int), or slice()
+    :param dheader: digitizer header dataset
+    :type dheader: :class:`h5py.Dataset`
+    :param str shotnumkey: field name in **dheader** that contains the
+        shot numbers
+    :param bool intersection_set: Set :code:`True` to intersect
+        **shotnum** with the shot numbers in :code:`dheader[shotnumkey]`
+    :return: index, shotnum, sni (see :func:`condition_shotnum`)
+    """
+    if index_with == 'index':
+        # Condition `index` keyword
+        #
+        # Note: I'm letting the slicing of dset[index, shotnumkey]
+        #       to throw the appropriate errors
+        #
+        # Define `shotnum`
+        shotnum = dheader[index, shotnumkey].view()
+        if shotnum.shape == () and shotnum.size == 1:
+            shotnum = np.array([shotnum]).view()
+
+        # define sni
+        sni = np.ones(shotnum.shape[0], dtype=bool)
+
+        # convert `index` to np.ndarray
+        if type(index) is int:
+            index = np.array([index])
+        elif type(index) is list:
+            index = np.array(index)
+        elif type(index) is slice:
+            start, stop, step = index.indices(dheader.shape[0])
+            index = np.arange(start, stop, step)
+    else:
+        # Condition `shotnum` keyword
+        #
+        # convert `shotnum` to list
+        if isinstance(shotnum, slice):
+            # determine largest possible shot number
+            last_sn = dheader[-1, shotnumkey]
+            if shotnum.stop is not None:
+                stop_sn = max(shotnum.stop, last_sn + 1)
+            else:
+                stop_sn = last_sn + 1
+
+            # get the start, stop, and step for the shot number
+            # array
+            start, stop, step = shotnum.indices(stop_sn)
+
+            # determine smallest possible shot number
+            # - intersection_set = True
+            #   * start = max of first_sn and shotnum.start
+            # - intersection_set = False
+            #   * start = min of first_sn and shotnum.start
+            first_sn = [dheader[0, shotnumkey]]
+            if shotnum.start is not None:
+                # ensure shot numbers are >= 1
+                if start <= 0:
+                    start = 1
+            else:
+                # start wasn't specified in slice object
+                start = min(first_sn)
+
+            # adjust start for intersection_set
+            if intersection_set:
+                first_sn.append(start)
+                start = max(first_sn)
+
+            # re-define shotnum as a list
+            shotnum = np.arange(start, stop, step).tolist()
+        elif isinstance(shotnum, int):
+            shotnum = [shotnum]
+        elif isinstance(shotnum, list):
+            # ensure all elements are int
+            if not all(isinstance(sn, int) for sn in shotnum):
+                raise ValueError('Valid `shotnum` not passed')
+        else:
+            raise ValueError('Valid `shotnum` not passed')
 
-        # update key plasma constants
-        self._update_plasma_constants()
+        # Calc. the corresponding `index` and `sni`
+        # - `shotnum` will be converted from list to np.array
+        # - `index` and `sni` will be np.array's
+        index, shotnum, sni = \
+            condition_shotnum(shotnum, dheader, shotnumkey,
+                              intersection_set)
 
-    def _update_plasma_constants(self):
-        """
-        Updates the calculated plasma constants (fci, fce, fpe, etc.) in
-        :attr:`plasma`.
-        """
-        # add key frequencies
-        self._plasma['fce'] = core.fce(**self._plasma)
-        self._plasma['fci'] = core.fci(**self._plasma)
-        self._plasma['fpe'] = core.fpe(**self._plasma)
-        self._plasma['fpi'] = core.fpi(**self._plasma)
-        self._plasma['fUH'] = core.fUH(**self._plasma)
-        self._plasma['fLH'] = core.fLH(**self._plasma)
-
-        # add key lengths
-        self._plasma['lD'] = core.lD(**self._plasma)
-        self._plasma['lpe'] = core.lpe(**self._plasma)
-        self._plasma['lpi'] = core.lpi(**self._plasma)
-        self._plasma['rce'] = core.rce(**self._plasma)
-        self._plasma['rci'] = core.rci(**self._plasma)
-
-        # add key velocities
-        self._plasma['cs'] = core.cs(**self._plasma)
-        self._plasma['VA'] = core.VA(**self._plasma)
-        self._plasma['vTe'] = core.vTe(**self._plasma)
-        self._plasma['vTi'] = core.vTi(**self._plasma)
+    return index, shotnum, sni
 
 
 def condition_shotnum(shotnum, dheader, shotnumkey,
@@ -0,0 +1,271 @@
+# This file is part of the bapsflib package, a Python toolkit for the
+# BaPSF group at UCLA.
+#
+# http://plasma.physics.ucla.edu/
+#
+# Copyright 2017-2018 Erik T. Everson and contributors
+#
+# License: Standard 3-clause BSD; see "LICENSES/LICENSE.txt" for full
+#   license terms and contributor agreement.
+#
+import numpy as np
+
+from .hdfcache import build_key
+from .hdfmetrics import (hdfCountedDataset, hdfReadMetrics)
+from .hdfreadcontrol import (condition_shotnum_list_simple,
+                             do_shotnum_intersection)
+
+
+# noinspection PyInitNewSignature
+class hdfReadMSI(np.recarray):
+    """
+    Reads MSI diagnostic data from the HDF5 file.
+
+    The requested shot numbers are matched against the shot number
+    dataset(s) of the diagnostic with the same join logic used for
+    control devices, then every dataset is read with one bulk
+    (fancy-indexed) read.  The returned array has a :code:`'shotnum'`
+    field plus one field per signal and meta quantity of the
+    diagnostic mapping (see
+    :class:`~bapsflib.lapdhdf.map_msi.msi_template.hdfMap_msi_template`).
+    """
+    def __new__(cls, hdf_file, dname, shotnum=slice(None),
+                intersection_set=True, silent=False, **kwargs):
+        """
+        :param hdf_file: object instance of the HDF5 file
+        :type hdf_file: :class:`bapsflib.lapdhdf.files.File`
+        :param str dname: name of the MSI diagnostic (e.g.
+            :code:`'Discharge'`)
+        :param shotnum: HDF5 file shot number(s) indicating data
+            entries to be extracted
+        :type shotnum: int, list(int), or slice(start, stop, step)
+        :param bool intersection_set: :code:`True` (DEFAULT) will force
+            the returned shot numbers to be the intersection of
+            :data:`shotnum` and the shot numbers recorded by the
+            diagnostic. :code:`False` will return all :data:`shotnum`,
+            giving unrecorded entries null values of :code:`-99999`,
+            :code:`numpy.nan`, or :code:`''`, depending on
+            :code:`numpy.dtype`.
+        :param bool silent: :code:`False` (DEFAULT).  Set :code:`True`
+            to suppress command line printout of soft-warnings
+        """
+        # initialize read metrics
+        # - keyword `nested_read` marks a read made on behalf of
+        #   another reader, whose metrics are only emitted by that
+        #   reader
+        metrics = hdfReadMetrics('hdfReadMSI')
+        hooks = getattr(hdf_file, 'read_hooks', ())
+        emit = not kwargs.get('nested_read', False)
+
+        # ---- Condition hdf_file and dname ----
+        try:
+            file_map = hdf_file.file_map
+        except AttributeError:
+            raise AttributeError(
+                'hdf_file needs to be of type lapdhdf.File')
+        try:
+            msi_map = file_map.msi[dname]
+        except (KeyError, TypeError):
+            raise ValueError(
+                'MSI diagnostic {} is not among the mapped MSI '
+                'diagnostics {}'.format(dname, list(file_map.msi)))
+
+        # ---- Condition shotnum ----
+        # - each sub-device (e.g. each interferometer) has its own
+        #   shot number dataset, they are joined like the datasets of
+        #   multiple control devices
+        sn_paths = msi_map.configs['shotnum']['dset paths']
+        sn_field = msi_map.configs['shotnum']['dset field']
+        sdsets = [hdfCountedDataset(hdf_file.get_control_dataset(path),
+                                    metrics, path)
+                  for path in sn_paths]
+        first_sn = [int(sdset[0, sn_field]) for sdset in sdsets]
+        last_sn = [int(sdset[-1, sn_field]) for sdset in sdsets]
+        if isinstance(shotnum, slice):
+            start = max(first_sn) if intersection_set \
+                else min(first_sn)
+            if shotnum.start is not None:
+                start = max(shotnum.start, start, 1) \
+                    if intersection_set else max(shotnum.start, 1)
+            stop = max(last_sn) + 1
+            if shotnum.stop is not None:
+                stop = shotnum.stop
+            step = 1 if shotnum.step is None else shotnum.step
+            shotnum = np.arange(start, stop, step)
+        elif isinstance(shotnum, (int, np.integer)):
+            shotnum = np.array([shotnum])
+        elif isinstance(shotnum, (list, np.ndarray)):
+            shotnum = np.asarray(shotnum)
+            if shotnum.dtype.kind not in 'iu':
+                raise ValueError('Valid shotnum not passed')
+        else:
+            raise ValueError('Valid shotnum not passed')
+        shotnum = np.unique(shotnum[shotnum > 0]).astype(np.int64)
+        if shotnum.size == 0:
+            raise ValueError('Valid shotnum not passed')
+        if intersection_set:
+            # only shot numbers recorded by all datasets are kept
+            shotnum = shotnum[np.logical_and(shotnum >= max(first_sn),
+                                             shotnum <= min(last_sn))]
+            if shotnum.size == 0:
+                raise ValueError(
+                    'Input shotnum would result in a null array')
+
+        # - shot numbers outside of a dataset's recorded range are not
+        #   passed to condition_shotnum_list_simple, they are
+        #   null-filled
+        index_dict = {}
+        shotnum_dict = {}
+        sni_dict = {}
+        for i, sdset in enumerate(sdsets):
+            in_range = np.logical_and(shotnum >= first_sn[i],
+                                      shotnum <= last_sn[i])
+            sni = np.zeros(shotnum.shape, dtype=bool)
+            if np.any(in_range):
+                index, _, sni[in_range] = \
+                    condition_shotnum_list_simple(shotnum[in_range],
+                                                  sdset, sn_field)
+            else:
+                index = np.empty(shape=0, dtype=np.uint32)
+            index_dict[i] = index
+            shotnum_dict[i] = shotnum
+            sni_dict[i] = sni
+        if intersection_set:
+            shotnum, shotnum_dict, sni_dict, index_dict = \
+                do_shotnum_intersection(shotnum, shotnum_dict,
+                                        sni_dict, index_dict)
+        metrics.mark('conditioning')
+
+        # ---- Check Read Cache ----
+        # - the cache key is built from the resolved shot numbers, so
+        #   equivalent `shotnum` requests (e.g. a slice and the
+        #   matching list) share an entry
+        read_cache = getattr(hdf_file, 'read_cache', None)
+        if read_cache is not None:
+            cache_key = build_key('hdfReadMSI', hdf_file, dname,
+                                  intersection_set,
+                                  np.asarray(shotnum, dtype=np.int64))
+            cached = read_cache.get(cache_key)
+            if cached is not None:
+                obj = cached[0].view(cls)
+                obj.info = cached[1]
+                metrics.cache_hit = True
+                metrics.mark('cache lookup')
+                obj.metrics = metrics.finish(hooks, emit=emit)
+                return obj
+
+        # ---- Build obj ----
+        mdtype = msi_map.dtype
+        dtype = [('shotnum', '<u4')] + \
+            [(name, mdtype[name].base, mdtype[name].shape)
+             for name in mdtype.names]
+        data = np.empty(shotnum.shape[0], dtype=dtype)
+        data['shotnum'] = shotnum
+        metrics.allocate(data.nbytes)
+        metrics.mark('allocation')
+
+        # ---- Read datasets ----
+        # - every dataset is read once for all requested rows, fields
+        #   of a structured dataset share that read
+        fields = msi_map.fields
+        multi = len(sn_paths) > 1
+        for i in range(len(sn_paths)):
+            index = index_dict[i]
+            sni = sni_dict[i]
+            rows = {}
+            for name, spec in fields.items():
+                path = spec['dset paths'][i]
+                if path not in rows:
+                    if index.shape[0] == 0:
+                        rows[path] = None
+                    else:
+                        dset = hdfCountedDataset(
+                            hdf_file.get_control_dataset(path), metrics,
+                            path)
+                        rows[path] = dset[index.tolist()]
+                values = rows[path]
+                column = data[name][:, i] if multi else data[name]
+                if values is not None:
+                    if spec['dset field'] is not None:
+                        values = values[spec['dset field']]
+                    column[sni] = values
+                if not np.all(sni):
+                    null_fill(column, np.logical_not(sni))
+        metrics.mark('msi read')
+
+        obj = data.view(cls)
+        obj.info = {
+            'hdf file': hdf_file.filename.split('/')[-1],
+            'device name': dname,
+            'device group path': msi_map.info['group path'],
+            'attrs': dict(msi_map.configs['attrs'])}
+
+        # add to read cache
+        # - nested reads (made on behalf of hdfReadData, which caches
+        #   its own result) do not store in it
+        if read_cache is not None and emit:
+            read_cache.put(cache_key, obj, obj.info)
+            metrics.mark('cache store')
+
+        obj.metrics = metrics.finish(hooks, emit=emit)
+        return obj
+
+    def __array_finalize__(self, obj):
+        if obj is None:
+            return
+
+        # Define info attribute
+        self.info = getattr(obj, 'info',
+                            {'hdf file': None,
+                             'device name': None,
+                             'device group path': None,
+                             'attrs': {}})
+
+        # Define metrics attribute
+        self.metrics = getattr(obj, 'metrics', None)
+
+
+def condition_msi(hdf_file, msi):
+    """
+    Condition the :code:`add_msi` argument of
+    :class:`~bapsflib.lapdhdf.hdfreaddata.hdfReadData`.
+
+    :param hdf_file: object instance of the HDF5 file
+    :type hdf_file: :class:`bapsflib.lapdhdf.files.File`
+    :param msi: name(s) of MSI diagnostics
+    :type msi: str or list(str)
+    :return: list of unique diagnostic names
+    :rtype: list(str)
+    """
+    if isinstance(msi, str):
+        msi = [msi]
+    names = []
+    for name in msi:
+        if not isinstance(name, str):
+            raise TypeError('MSI diagnostics must be given by name')
+        if name not in hdf_file.file_map.msi:
+            raise ValueError(
+                'MSI diagnostic {} is not among the mapped MSI '
+                'diagnostics {}'.format(name,
+                                        list(hdf_file.file_map.msi)))
+        if name not in names:
+            names.append(name)
+    return names
+
+
+def null_fill(column, mask):
+    """
+    Fill the masked entries of **column** with the null value of its
+    dtype (see :class:`hdfReadMSI`).  Integer types too narrow to hold
+    :code:`-99999` are filled with :code:`0`.
+    """
+    dtype = column.dtype.base
+    if np.issubdtype(dtype, np.integer):
+        column[mask] = -99999 if dtype.itemsize >= 4 \
+            and np.issubdtype(dtype, np.signedinteger) else 0
+    elif np.issubdtype(dtype, np.floating):
+        column[mask] = np.nan
+    elif np.issubdtype(dtype, np.flexible):
+        column[mask] = ''
+    else:
+        column[mask] = 0
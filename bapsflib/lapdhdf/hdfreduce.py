@@ -0,0 +1,432 @@
+# This file is part of the bapsflib package, a Python toolkit for the
+# BaPSF group at UCLA.
+#
+# http://plasma.physics.ucla.edu/
+#
+# Copyright 2017-2018 Erik T. Everson and contributors
+#
+# License: Standard 3-clause BSD; see "LICENSES/LICENSE.txt" for full
+#   license terms and contributor agreement.
+#
+"""
+Streaming group-by reductions of digitizer data.
+"""
+import numpy as np
+
+from .hdfprefetch import hdfPrefetchReader
+
+
+class hdfGroupReducer(object):
+    """
+    Running per-group statistics of digitizer signals, where shots are
+    grouped on mated control device fields (e.g. :code:`'xyz'` and
+    :code:`'command'`).
+
+    Blocks of shots (:class:`~bapsflib.lapdhdf.hdfreaddata.hdfReadData`
+    with the control fields mated to them) are folded in with
+    :meth:`update`, so memory is proportional to the number of groups
+    and not the number of shots.  For each group the reducer keeps the
+    shot count and, per sample, the mean and variance (Welford's
+    algorithm, merged block-wise), and the minimum and maximum.
+
+    With :data:`bits` the blocks must be read in bits
+    (:code:`keep_bits=True`) and the reducer keeps exact integer sums
+    and sums of squares instead, which are converted to volts by
+    :meth:`result`.
+
+    :Example:
+
+        >>> f = lapdhdf.File('sample.hdf5')
+        >>> reducer = hdfGroupReducer(['xyz'])
+        >>> for data in f.iter_data(0, 0, block_size=500,
+        ...                         add_controls=['6K Compumotor']):
+        ...     reducer.update(data)
+        >>> stats = reducer.result()
+        >>> stats['xyz'][0], stats['count'][0], stats['mean'][0]
+
+    (or use :meth:`~bapsflib.lapdhdf.files.File.reduce_data`)
+    """
+    _STATS = ('mean', 'var', 'min', 'max')
+
+    def __init__(self, by, stats=('mean', 'var', 'min', 'max'),
+                 bits=False, decimals=None):
+        """
+        :param by: name(s) of the fields shots are grouped on
+        :type by: str or list(str)
+        :param stats: statistics kept per group, any of
+            :code:`'mean'`, :code:`'var'`, :code:`'min'`, and
+            :code:`'max'` (the shot count is always kept)
+        :type stats: tuple(str)
+        :param bool bits: :code:`True` accumulates integer signals
+            (read with :code:`keep_bits=True`) in bit space
+        :param int decimals: number of decimals floating point key
+            fields are rounded to before grouping (:code:`None` groups
+            on exact values)
+        """
+        if isinstance(by, str):
+            by = [by]
+        by = list(by)
+        if not by:
+            raise ValueError('at least one field to group on is needed')
+        if 'signal' in by:
+            raise ValueError("can not group on field 'signal'")
+        stats = tuple(stats)
+        for stat in stats:
+            if stat not in self._STATS:
+                raise ValueError('unknown statistic {}'.format(stat))
+
+        self._by = by
+        self._stats = stats
+        self._bits = bool(bits)
+        self._decimals = decimals
+
+        # group bookkeeping
+        # - _index maps the key bytes of a group to its row
+        # - _keys holds the key record of every group
+        self._index = {}
+        self._keys = []
+        self._key_dtype = None
+        self._ngroups = 0
+        self._nshots = 0
+        self._skipped = 0
+
+        # accumulators, allocated on the first update
+        self._count = None
+        self._acc = {}
+        self._nt = None
+        self._conversion = None
+
+    @property
+    def by(self):
+        """Fields shots are grouped on"""
+        return list(self._by)
+
+    @property
+    def ngroups(self):
+        """Number of groups seen"""
+        return self._ngroups
+
+    @property
+    def nshots(self):
+        """Number of shots reduced"""
+        return self._nshots
+
+    @property
+    def skipped(self):
+        """
+        Number of shots skipped because a key field was NaN (i.e. no
+        control device data was mated to the shot)
+        """
+        return self._skipped
+
+    @property
+    def nbytes(self):
+        """Memory (in bytes) held by the accumulators"""
+        total = 0 if self._count is None else self._count.nbytes
+        return total + sum(arr.nbytes for arr in self._acc.values())
+
+    def update(self, data):
+        """
+        Fold a block of shots into the running statistics.
+
+        :param data: block of shots with the :attr:`by` fields
+        :type data: :class:`~bapsflib.lapdhdf.hdfreaddata.hdfReadData`
+            or structured :class:`numpy.ndarray`
+        """
+        names = data.dtype.names or ()
+        for field in self._by + ['signal']:
+            if field not in names:
+                raise ValueError(
+                    "data has no field '{}'".format(field))
+        signal = np.asarray(data['signal'])
+        if signal.ndim != 2 or signal.shape[0] == 0:
+            return
+        if self._bits and signal.dtype.kind not in 'iu':
+            raise ValueError('bits=True needs integer signals (read '
+                             'with keep_bits=True)')
+
+        # build group keys
+        keys, valid = self._block_keys(data)
+        if not valid.all():
+            self._skipped += int(np.count_nonzero(~valid))
+            keys = keys[valid]
+            signal = signal[valid]
+            if keys.shape[0] == 0:
+                return
+        self._update_keyed(keys, signal, data)
+
+    def update_groups(self, keys, signal):
+        """
+        Fold a block of shots whose group keys are already known (e.g.
+        grid point indices), without building a structured block.
+
+        :param keys: group key of every shot, either a structured array
+            with the :attr:`by` fields or (if grouping on one field)
+            a 1D array of that field
+        :type keys: :class:`numpy.ndarray`
+        :param signal: signals of the shots, shape
+            :code:`(nshots, nt)`
+        :type signal: :class:`numpy.ndarray`
+        """
+        keys = np.ascontiguousarray(keys)
+        signal = np.asarray(signal)
+        if keys.dtype.names is None:
+            if len(self._by) != 1 or keys.ndim != 1:
+                raise ValueError('keys must be a structured array with '
+                                 'fields {}'.format(self._by))
+            keys = keys.view(np.dtype([(self._by[0], keys.dtype)]))
+        elif list(keys.dtype.names) != self._by:
+            raise ValueError('keys must be a structured array with '
+                             'fields {}'.format(self._by))
+        if self._key_dtype is None:
+            self._key_dtype = keys.dtype
+        elif keys.dtype != self._key_dtype:
+            raise ValueError('keys do not match the key type of the '
+                             'preceding blocks')
+        if signal.ndim != 2 or signal.shape[0] != keys.shape[0]:
+            raise ValueError('signal must have shape (nshots, nt) '
+                             'matching keys')
+        if signal.shape[0] == 0:
+            return
+        if self._bits and signal.dtype.kind not in 'iu':
+            raise ValueError('bits=True needs integer signals (read '
+                             'with keep_bits=True)')
+        self._update_keyed(keys, signal, None)
+
+    def _update_keyed(self, keys, signal, data):
+        """
+        Fold shots with group :data:`keys` into the running statistics
+        (:data:`data` provides the voltage conversion in bit space).
+        """
+        if self._nt is None:
+            self._allocate(signal.shape[1], data)
+        elif signal.shape[1] != self._nt:
+            raise ValueError('blocks have different number of samples')
+
+        # sort shots by group
+        kbytes = keys.view(np.dtype((np.void, keys.dtype.itemsize)))
+        ukeys, first, inv = np.unique(kbytes, return_index=True,
+                                      return_inverse=True)
+        inv = inv.reshape(-1)
+        order = np.argsort(inv, kind='stable')
+        counts = np.bincount(inv, minlength=ukeys.shape[0])
+        starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+        block = signal[order]
+
+        # map block groups to global groups
+        gidx = np.empty(ukeys.shape[0], dtype=np.intp)
+        for i, kb in enumerate(ukeys):
+            kb = kb.tobytes()
+            g = self._index.get(kb, None)
+            if g is None:
+                g = self._new_group(keys[first[i]])
+                self._index[kb] = g
+            gidx[i] = g
+
+        self._merge(gidx, counts, starts, block)
+        self._nshots += int(block.shape[0])
+
+    def result(self):
+        """
+        The per-group statistics as a structured array with one row
+        per group (in the order groups were first seen).  Fields are
+        the :attr:`by` fields, :code:`'count'`, and the requested
+        statistics (one value per sample).  Variances are population
+        variances (:code:`ddof=0`).  In bit space, statistics are
+        converted to volts with the digitizer's voltage step and
+        offset.
+
+        :rtype: :class:`numpy.ndarray`
+        """
+        ng = self._ngroups
+        nt = 0 if self._nt is None else self._nt
+        dtype = [] if self._key_dtype is None \
+            else [(name, self._key_dtype.fields[name][0])
+                  for name in self._key_dtype.names]
+        dtype.append(('count', np.int64))
+        for stat in self._stats:
+            dtype.append((stat, np.float64, (nt,)))
+        out = np.zeros(ng, dtype=dtype)
+        if ng == 0:
+            return out
+
+        keys = np.array(self._keys, dtype=self._key_dtype)
+        for name in self._key_dtype.names:
+            out[name] = keys[name]
+        count = self._count[:ng]
+        out['count'] = count
+
+        if self._bits:
+            dv, offset = self._conversion
+            mean = self._acc['sum'][:ng] / count[:, None]
+            if 'mean' in self._stats:
+                out['mean'] = dv * mean - offset
+            if 'var' in self._stats:
+                var = self._acc['sumsq'][:ng] / count[:, None] \
+                    - mean ** 2
+                out['var'] = dv ** 2 * np.maximum(var, 0.0)
+            for stat in ('min', 'max'):
+                if stat in self._stats:
+                    out[stat] = dv * self._acc[stat][:ng] - offset
+        else:
+            if 'mean' in self._stats:
+                out['mean'] = self._acc['mean'][:ng]
+            if 'var' in self._stats:
+                out['var'] = self._acc['m2'][:ng] / count[:, None]
+            for stat in ('min', 'max'):
+                if stat in self._stats:
+                    out[stat] = self._acc[stat][:ng]
+        return out
+
+    def _block_keys(self, data):
+        """
+        Key record of every shot of :data:`data` and a mask of the
+        shots with valid (non-NaN) keys.
+        """
+        if self._key_dtype is None:
+            self._key_dtype = np.dtype(
+                [(name, data.dtype.fields[name][0])
+                 for name in self._by])
+        keys = np.zeros(data.shape[0], dtype=self._key_dtype)
+        valid = np.ones(data.shape[0], dtype=bool)
+        for name in self._by:
+            field = np.asarray(data[name])
+            if field.dtype.kind == 'f':
+                if self._decimals is not None:
+                    field = np.round(field, self._decimals)
+
+                # - adding 0.0 turns -0.0 into 0.0 so equal values
+                #   have equal bytes
+                field = field + 0.0
+                nan = np.isnan(field)
+                if nan.ndim > 1:
+                    nan = nan.reshape(nan.shape[0], -1).any(axis=1)
+                valid &= ~nan
+            keys[name] = field
+        return keys, valid
+
+    def _allocate(self, nt, data):
+        """Allocate the accumulators for nt samples."""
+        self._nt = nt
+        cap = 16
+        self._count = np.zeros(cap, dtype=np.int64)
+        if self._bits:
+            self._acc['sum'] = np.zeros((cap, nt), dtype=np.int64)
+            if 'var' in self._stats:
+                self._acc['sumsq'] = np.zeros((cap, nt),
+                                              dtype=np.int64)
+            try:
+                dv = data.dv
+                offset = abs(data.info['voltage offset'])
+            except (AttributeError, KeyError, TypeError):
+                dv, offset = 1.0, 0.0
+            self._conversion = (dv, offset)
+        else:
+            self._acc['mean'] = np.zeros((cap, nt))
+            if 'var' in self._stats:
+                self._acc['m2'] = np.zeros((cap, nt))
+        if 'min' in self._stats:
+            self._acc['min'] = np.full((cap, nt), np.inf)
+        if 'max' in self._stats:
+            self._acc['max'] = np.full((cap, nt), -np.inf)
+
+    def _new_group(self, key):
+        """Register a new group and return its row."""
+        g = self._ngroups
+        if g == self._count.shape[0]:
+            # grow accumulators (doubling)
+            cap = 2 * g
+            self._count = np.concatenate(
+                (self._count, np.zeros(cap - g, dtype=np.int64)))
+            for name, arr in self._acc.items():
+                fill = np.inf if name == 'min' \
+                    else -np.inf if name == 'max' else 0
+                grown = np.full((cap,) + arr.shape[1:], fill,
+                                dtype=arr.dtype)
+                grown[:g] = arr
+                self._acc[name] = grown
+        self._keys.append(key.copy())
+        self._ngroups += 1
+        return g
+
+    def _merge(self, gidx, counts, starts, block):
+        """
+        Merge the statistics of the sorted :data:`block` (groups
+        starting at rows :data:`starts`) into groups :data:`gidx`.
+        """
+        n_b = counts[:, None].astype(np.float64)
+        acc = self._acc
+        if self._bits:
+            wide = block.astype(np.int64)
+            acc['sum'][gidx] += np.add.reduceat(wide, starts, axis=0)
+            if 'sumsq' in acc:
+                acc['sumsq'][gidx] += np.add.reduceat(wide * wide,
+                                                      starts, axis=0)
+        else:
+            wide = block.astype(np.float64)
+            mean_b = np.add.reduceat(wide, starts, axis=0) / n_b
+
+            # combine running (a) and block (b) statistics
+            # - Chan et al. parallel form of Welford's update
+            n_a = self._count[gidx][:, None].astype(np.float64)
+            n = n_a + n_b
+            delta = mean_b - acc['mean'][gidx]
+            if 'm2' in acc:
+                dev = wide - np.repeat(mean_b, counts, axis=0)
+                m2_b = np.add.reduceat(dev * dev, starts, axis=0)
+                acc['m2'][gidx] += m2_b + delta ** 2 * n_a * n_b / n
+            acc['mean'][gidx] += delta * n_b / n
+
+        if 'min' in acc:
+            acc['min'][gidx] = np.minimum(
+                acc['min'][gidx],
+                np.minimum.reduceat(block, starts, axis=0))
+        if 'max' in acc:
+            acc['max'][gidx] = np.maximum(
+                acc['max'][gidx],
+                np.maximum.reduceat(block, starts, axis=0))
+        self._count[gidx] += counts
+
+
+def reduce_data(hdf_file, board, channel, by, add_controls,
+                shotnum=None, block_size='auto',
+                stats=('mean', 'var', 'min', 'max'), bits=False,
+                decimals=None, **kwargs):
+    """
+    Stream a digitizer channel in blocks and reduce its shots to
+    per-group statistics, grouping on mated control device fields.
+
+    :param hdf_file: object instance of the HDF5 file
+    :type hdf_file: :class:`~bapsflib.lapdhdf.files.File`
+    :param int board: digitizer board number
+    :param int channel: digitizer channel number
+    :param by: name(s) of the fields shots are grouped on (e.g.
+        :code:`'xyz'` or :code:`['xyz', 'command']`)
+    :type by: str or list(str)
+    :param add_controls: control devices mated to the shots (see
+        :meth:`~bapsflib.lapdhdf.files.File.read_data`)
+    :param shotnum: shot numbers to reduce, :code:`None` (default) for
+        every shot
+    :param block_size: shots per block (see
+        :class:`~bapsflib.lapdhdf.hdfprefetch.hdfPrefetchReader`)
+    :param stats: statistics kept per group (see
+        :class:`hdfGroupReducer`)
+    :param bool bits: :code:`True` accumulates in bit space
+    :param int decimals: decimals floating point key fields are
+        rounded to
+    :param kwargs: additional keywords of
+        :class:`~bapsflib.lapdhdf.hdfprefetch.hdfPrefetchReader`
+    :return: per-group statistics (see :meth:`hdfGroupReducer.result`)
+    :rtype: :class:`numpy.ndarray`
+    """
+    reducer = hdfGroupReducer(by, stats=stats, bits=bits,
+                              decimals=decimals)
+    kwargs.setdefault('silent', True)
+    reader = hdfPrefetchReader(hdf_file, board, channel,
+                               block_size=block_size, shotnum=shotnum,
+                               add_controls=add_controls,
+                               keep_bits=bits, **kwargs)
+    with reader:
+        for data in reader:
+            reducer.update(data)
+    return reducer.result()
@@ -0,0 +1,523 @@
+# This file is part of the bapsflib package, a Python toolkit for the
+# BaPSF group at UCLA.
+#
+# http://plasma.physics.ucla.edu/
+#
+# Copyright 2017-2018 Erik T. Everson and contributors
+#
+# License: Standard 3-clause BSD; see "LICENSES/LICENSE.txt" for full
+#   license terms and contributor agreement.
+#
+"""
+Local read server and client.
+
+A :class:`hdfReadServer` keeps LaPD HDF5 files open and mapped (through
+a :class:`~bapsflib.lapdhdf.hdfhandlepool.hdfHandlePool`) and answers
+:meth:`~bapsflib.lapdhdf.files.File.read_data` and
+:meth:`~bapsflib.lapdhdf.files.File.read_controls` requests of
+:class:`hdfReadClient` instances over a Unix domain socket (or a local
+TCP socket).  All clients share the server's mappings and caches.
+
+Every message is framed as
+
+==========  ========  ================================================
+field       size      content
+==========  ========  ================================================
+magic       4 bytes   :code:`b'BPSF'`
+header      4 bytes   length of the JSON header (big-endian uint32)
+payload     8 bytes   length of the binary payload (big-endian uint64)
+            *n* bytes UTF-8 JSON header
+            *m* bytes payload (the raw rows of a structured array)
+==========  ========  ================================================
+
+Array payloads are the raw C-ordered bytes of the array, so the client
+rebuilds the array with a single :func:`numpy.frombuffer` and no
+per-element decoding.  The header carries the array's dtype and shape
+and the read's metadata.
+
+The sizes in the prefix come from the peer, so the server rejects a
+request whose header exceeds its :code:`max_request_bytes` limit, or
+that carries a payload, before allocating it, and closes the
+connection.
+"""
+import base64
+import json
+import numpy as np
+import os
+import socket
+import socketserver
+import struct
+import threading
+
+from .hdfdtype import (decode_dtype, encode_dtype)
+from .hdfhandlepool import hdfHandlePool
+from .hdfreadcontrol import hdfReadControl
+from .hdfreaddata import (hdfDataInfo, hdfReadData)
+
+#: version of the message protocol
+PROTOCOL_VERSION = 1
+
+_MAGIC = b'BPSF'
+_PREFIX = struct.Struct('!4sIQ')
+
+# exceptions re-raised by the client as their own type
+_ERRORS = {err.__name__: err
+           for err in (AttributeError, IndexError, KeyError, OSError,
+                       TimeoutError, TypeError, ValueError)}
+
+
+def encode_value(val):
+    """
+    Convert :data:`val` to JSON-serializable form.  Tuples, slices,
+    byte strings, :mod:`numpy` arrays, and dictionaries with
+    non-string keys are tagged so :func:`decode_value` restores them.
+    :mod:`numpy` scalars are converted to Python scalars.
+    """
+    if val is None or isinstance(val, (bool, int, float, str)):
+        return val
+    if isinstance(val, np.generic):
+        return val.item()
+    if isinstance(val, tuple):
+        return {'__tuple__': [encode_value(item) for item in val]}
+    if isinstance(val, list):
+        return [encode_value(item) for item in val]
+    if isinstance(val, slice):
+        return {'__slice__': [encode_value(val.start),
+                              encode_value(val.stop),
+                              encode_value(val.step)]}
+    if isinstance(val, bytes):
+        return {'__bytes__': base64.b64encode(val).decode('ascii')}
+    if isinstance(val, np.ndarray):
+        return {'__ndarray__': val.tolist(), 'dtype': val.dtype.str}
+    if isinstance(val, dict):
+        if all(isinstance(key, str) for key in val):
+            return {key: encode_value(item) for key, item in val.items()}
+        return {'__items__': [[encode_value(key), encode_value(item)]
+                              for key, item in val.items()]}
+    raise TypeError('can not encode value of type {}'.format(type(val)))
+
+
+def decode_value(val):
+    """Convert the output of :func:`encode_value` back."""
+    if isinstance(val, list):
+        return [decode_value(item) for item in val]
+    if not isinstance(val, dict):
+        return val
+    if '__tuple__' in val:
+        return tuple(decode_value(item) for item in val['__tuple__'])
+    if '__slice__' in val:
+        return slice(*val['__slice__'])
+    if '__bytes__' in val:
+        return base64.b64decode(val['__bytes__'])
+    if '__ndarray__' in val:
+        return np.array(val['__ndarray__'], dtype=val['dtype'])
+    if '__items__' in val:
+        return {decode_value(key): decode_value(item)
+                for key, item in val['__items__']}
+    return {key: decode_value(item) for key, item in val.items()}
+
+
+def send_message(sock, header, payload=None):
+    """
+    Send one framed message.
+
+    :param sock: connected socket
+    :type sock: :class:`socket.socket`
+    :param dict header: JSON-serializable message header
+    :param payload: binary payload
+    :type payload: bytes-like
+    """
+    hbytes = json.dumps(header).encode('utf-8')
+    if payload is None:
+        payload = b''
+    payload = memoryview(payload)
+    sock.sendall(_PREFIX.pack(_MAGIC, len(hbytes), payload.nbytes)
+                 + hbytes)
+    if payload.nbytes:
+        sock.sendall(payload)
+
+
+def recv_message(sock, max_header=None, max_payload=None):
+    """
+    Receive one framed message.
+
+    :param sock: connected socket
+    :type sock: :class:`socket.socket`
+    :param int max_header: maximum accepted header size (in bytes),
+        :code:`None` (default) for no limit
+    :param int max_payload: maximum accepted payload size (in bytes),
+        :code:`None` (default) for no limit
+    :return: the header and the payload
+    :rtype: (dict, bytearray)
+    :raises EOFError: if the peer closed the connection
+    :raises ValueError: if the message is not framed or exceeds the
+        size limits (nothing past the prefix is received)
+    """
+    magic, hsize, psize = _PREFIX.unpack(
+        _recv_exactly(sock, _PREFIX.size))
+    if magic != _MAGIC:
+        raise ValueError('not a bapsflib server message')
+    if max_header is not None and hsize > max_header:
+        raise ValueError('message header of {} bytes exceeds the limit '
+                         'of {} bytes'.format(hsize, max_header))
+    if max_payload is not None and psize > max_payload:
+        raise ValueError('message payload of {} bytes exceeds the '
+                         'limit of {} bytes'.format(psize, max_payload))
+    header = json.loads(_recv_exactly(sock, hsize).decode('utf-8'))
+    return header, _recv_exactly(sock, psize)
+
+
+def _recv_exactly(sock, nbytes):
+    """Receive exactly :data:`nbytes` bytes into a bytearray."""
+    buf = bytearray(nbytes)
+    view = memoryview(buf)
+    nread = 0
+    while nread < nbytes:
+        n = sock.recv_into(view[nread:], nbytes - nread)
+        if n == 0:
+            raise EOFError('connection closed by peer')
+        nread += n
+    return buf
+
+
+def _array_message(arr, info):
+    """Build the header and payload of a structured array reply."""
+    arr = np.ascontiguousarray(arr.view(np.ndarray))
+    header = {'status': 'ok',
+              'dtype': encode_dtype(arr.dtype),
+              'shape': list(arr.shape),
+              'info': encode_value(info)}
+    return header, arr.reshape(-1).view(np.uint8)
+
+
+class _RequestHandler(socketserver.BaseRequestHandler):
+    """Serve all requests of one client connection."""
+    def handle(self):
+        read_server = self.server.read_server
+        while True:
+            # - requests never carry a payload
+            try:
+                request, payload = recv_message(
+                    self.request,
+                    max_header=read_server.max_request_bytes,
+                    max_payload=0)
+            except (EOFError, ConnectionError):
+                return
+            except ValueError as err:
+                # the stream can not be re-synchronized, report and
+                # drop the connection
+                send_message(self.request,
+                             {'status': 'error', 'error': 'ValueError',
+                              'message': str(err)})
+                return
+            header, payload = read_server.handle_request(request)
+            send_message(self.request, header, payload)
+
+
+class _UnixServer(socketserver.ThreadingMixIn,
+                  socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+class _TCPServer(socketserver.ThreadingMixIn, socketserver.TCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+class hdfReadServer(object):
+    """
+    Server process that keeps LaPD HDF5 files open and mapped and
+    answers read requests of :class:`hdfReadClient` instances.
+
+    Each connection is served by its own thread, which checks out a
+    handle of the requested file from the server's
+    :class:`~bapsflib.lapdhdf.hdfhandlepool.hdfHandlePool` for the
+    duration of the read.  Caches passed in :data:`file_kwargs` (e.g.
+    a :class:`~bapsflib.lapdhdf.hdfcache.hdfReadCache` or
+    :class:`~bapsflib.lapdhdf.hdfchunkcache.hdfSharedChunkCache`) are
+    shared by all handles and therefore by all clients.
+
+    :Example:
+
+        >>> # in the server process
+        >>> from bapsflib import lapdhdf
+        >>> server = lapdhdf.hdfReadServer(
+        ...     '/tmp/bapsflib.sock', root='/data/lapd',
+        ...     read_cache=lapdhdf.hdfReadCache(max_bytes=2 * 2 ** 30))
+        >>> server.serve_forever()
+        >>>
+        >>> # in a notebook kernel
+        >>> client = lapdhdf.hdfReadClient('/tmp/bapsflib.sock')
+        >>> data = client.read_data('run01.hdf5', 0, 0,
+        ...                         shotnum=slice(1, 100))
+    """
+    def __init__(self, address, root=None, max_handles=4,
+                 idle_timeout=300.0, max_request_bytes=2 ** 20,
+                 **file_kwargs):
+        """
+        :param address: path of the Unix domain socket, or a
+            :code:`(host, port)` tuple for a TCP socket
+        :type address: str or tuple
+        :param str root: directory served files are looked up in.
+            Requests for files outside of :data:`root` are rejected.
+            :code:`None` (default) serves any path.
+        :param int max_handles: maximum number of open handles per file
+            (see :class:`~bapsflib.lapdhdf.hdfhandlepool.hdfHandlePool`)
+        :param float idle_timeout: seconds before an idle handle is
+            closed
+        :param int max_request_bytes: maximum size (in bytes) of a
+            request header, larger requests are rejected (default
+            1 MB)
+        :param file_kwargs: keywords passed to
+            :class:`~bapsflib.lapdhdf.files.File`
+        """
+        if not isinstance(max_request_bytes, int) \
+                or max_request_bytes <= 0:
+            raise ValueError('max_request_bytes must be a positive int')
+        self._max_request_bytes = max_request_bytes
+        self._root = None if root is None else os.path.realpath(root)
+        self._pool = hdfHandlePool(max_handles=max_handles,
+                                   idle_timeout=idle_timeout,
+                                   **file_kwargs)
+        self._thread = None
+
+        if isinstance(address, str):
+            # remove a stale socket file of a previous server
+            if os.path.exists(address):
+                os.unlink(address)
+            self._server = _UnixServer(address, _RequestHandler)
+        elif isinstance(address, tuple):
+            self._server = _TCPServer(address, _RequestHandler)
+        else:
+            raise TypeError('address must be a socket path or a '
+                            '(host, port) tuple')
+        self._server.read_server = self
+
+    @property
+    def address(self):
+        """Address the server is bound to"""
+        return self._server.server_address
+
+    @property
+    def max_request_bytes(self):
+        """Maximum size (in bytes) of a request header"""
+        return self._max_request_bytes
+
+    @property
+    def pool(self):
+        """
+        Handle pool of the server
+        (:class:`~bapsflib.lapdhdf.hdfhandlepool.hdfHandlePool`)
+        """
+        return self._pool
+
+    def serve_forever(self):
+        """Serve requests until :meth:`shutdown` is called."""
+        self._server.serve_forever()
+
+    def start(self):
+        """
+        Serve requests on a background thread.
+
+        :return: the server
+        :rtype: :class:`hdfReadServer`
+        """
+        if self._thread is None:
+            self._thread = threading.Thread(target=self.serve_forever,
+                                            daemon=True)
+            self._thread.start()
+        return self
+
+    def shutdown(self):
+        """Stop serving, close the socket, and close all files."""
+        if self._thread is not None:
+            self._server.shutdown()
+            self._thread.join()
+            self._thread = None
+        self._server.server_close()
+        if isinstance(self.address, str) and os.path.exists(self.address):
+            os.unlink(self.address)
+        self._pool.close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.shutdown()
+
+    def handle_request(self, request):
+        """
+        Answer one request.
+
+        :param dict request: decoded request header with keys
+            :code:`'op'` (:code:`'read_data'`,
+            :code:`'read_controls'`, :code:`'file_info'`, or
+            :code:`'stats'`), :code:`'file'`, and :code:`'args'`
+        :return: reply header and payload
+        :rtype: (dict, bytes-like)
+        """
+        try:
+            if request.get('version', None) != PROTOCOL_VERSION:
+                raise ValueError('unsupported protocol version')
+            op = request['op']
+            if op == 'stats':
+                return {'status': 'ok',
+                        'result': encode_value(self._pool.stats)}, None
+            if op not in ('read_data', 'read_controls', 'file_info'):
+                raise ValueError("unknown request '{}'".format(op))
+
+            args = decode_value(request.get('args', {}))
+            with self._pool.checkout(self._resolve(request['file'])) \
+                    as hdf_file:
+                if op == 'file_info':
+                    return {'status': 'ok',
+                            'result': encode_value(
+                                {'digitizers': hdf_file.list_digitizers,
+                                 'controls': hdf_file.list_controls,
+                                 'msi': hdf_file.list_msi})}, None
+                if op == 'read_data':
+                    data = hdf_file.read_data(*args['args'],
+                                              **args['kwargs'])
+                    return _array_message(data, data.info.copy())
+                data = hdf_file.read_controls(*args['args'],
+                                              **args['kwargs'])
+                return _array_message(data, data.info)
+        except Exception as err:
+            # report the nearest exception type the client re-raises
+            error = [cls.__name__ for cls in type(err).__mro__
+                     if cls.__name__ in _ERRORS]
+            return {'status': 'error',
+                    'error': error[0] if error
+                    else type(err).__name__,
+                    'message': str(err)}, None
+
+    def _resolve(self, filename):
+        """Resolve the requested file name against :attr:`root`."""
+        if self._root is None:
+            return os.path.realpath(filename)
+        path = os.path.realpath(os.path.join(self._root, filename))
+        if os.path.commonpath([path, self._root]) != self._root:
+            raise ValueError('file is outside of the served directory')
+        return path
+
+
+class hdfReadClient(object):
+    """
+    Client of a :class:`hdfReadServer`.  The read methods mirror
+    :meth:`~bapsflib.lapdhdf.files.File.read_data` and
+    :meth:`~bapsflib.lapdhdf.files.File.read_controls`, with the name
+    of the HDF5 file (relative to the server's root) as the first
+    argument.  One connection is kept open and shared by all threads
+    of the client (requests are serialized).
+    """
+    def __init__(self, address, timeout=None):
+        """
+        :param address: address of the server (see
+            :class:`hdfReadServer`)
+        :type address: str or tuple
+        :param float timeout: socket timeout (in seconds),
+            :code:`None` (default) blocks
+        """
+        if isinstance(address, str):
+            self._sock = socket.socket(socket.AF_UNIX,
+                                       socket.SOCK_STREAM)
+        elif isinstance(address, tuple):
+            self._sock = socket.socket(socket.AF_INET,
+                                       socket.SOCK_STREAM)
+        else:
+            raise TypeError('address must be a socket path or a '
+                            '(host, port) tuple')
+        self._sock.settimeout(timeout)
+        self._sock.connect(address)
+        self._lock = threading.Lock()
+
+    def close(self):
+        """Close the connection."""
+        self._sock.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def read_data(self, filename, board, channel, **kwargs):
+        """
+        Read digitizer data through the server (see
+        :meth:`~bapsflib.lapdhdf.files.File.read_data`).
+
+        :param str filename: name of the HDF5 file
+        :param int board: digitizer board number
+        :param int channel: digitizer channel number
+        :param kwargs: keywords of
+            :meth:`~bapsflib.lapdhdf.files.File.read_data`
+        :rtype: :class:`~bapsflib.lapdhdf.hdfreaddata.hdfReadData`
+        """
+        header, payload = self._request(
+            'read_data', filename,
+            {'args': (board, channel), 'kwargs': kwargs})
+        obj = self._build_array(header, payload).view(hdfReadData)
+        obj._info = hdfDataInfo(decode_value(header['info']))
+        return obj
+
+    def read_controls(self, filename, controls, **kwargs):
+        """
+        Read control device data through the server (see
+        :meth:`~bapsflib.lapdhdf.files.File.read_controls`).
+
+        :param str filename: name of the HDF5 file
+        :param controls: control devices to read
+        :type controls: [str, (str, val), ]
+        :param kwargs: keywords of
+            :meth:`~bapsflib.lapdhdf.files.File.read_controls`
+        :rtype: :class:`~bapsflib.lapdhdf.hdfreadcontrol.hdfReadControl`
+        """
+        header, payload = self._request(
+            'read_controls', filename,
+            {'args': (controls,), 'kwargs': kwargs})
+        obj = self._build_array(header, payload).view(hdfReadControl)
+        obj.info = decode_value(header['info'])
+        return obj
+
+    def file_info(self, filename):
+        """
+        Mapped digitizers, control devices, and MSI diagnostics of a
+        file.
+
+        :param str filename: name of the HDF5 file
+        :return: dictionary with keys :code:`'digitizers'`,
+            :code:`'controls'`, and :code:`'msi'`
+        :rtype: dict
+        """
+        header = self._request('file_info', filename, {})[0]
+        return decode_value(header['result'])
+
+    def stats(self):
+        """
+        Handle pool metrics of the server (see
+        :attr:`~bapsflib.lapdhdf.hdfhandlepool.hdfHandlePool.stats`).
+
+        :rtype: dict
+        """
+        return decode_value(self._request('stats', None, {})[0]['result'])
+
+    def _request(self, op, filename, args):
+        """Send a request and receive its reply."""
+        request = {'version': PROTOCOL_VERSION,
+                   'op': op,
+                   'file': filename,
+                   'args': encode_value(args)}
+        with self._lock:
+            send_message(self._sock, request)
+            header, payload = recv_message(self._sock)
+        if header['status'] != 'ok':
+            raise _ERRORS.get(header['error'], RuntimeError)(
+                header['message'])
+        return header, payload
+
+    @staticmethod
+    def _build_array(header, payload):
+        """Rebuild a structured array from a reply."""
+        dtype = decode_dtype(header['dtype'])
+        return np.frombuffer(payload, dtype=dtype).reshape(
+            header['shape'])
@@ -0,0 +1,460 @@
+# This file is part of the bapsflib package, a Python toolkit for the
+# BaPSF group at UCLA.
+#
+# http://plasma.physics.ucla.edu/
+#
+# Copyright 2017-2018 Erik T. Everson and contributors
+#
+# License: Standard 3-clause BSD; see "LICENSES/LICENSE.txt" for full
+#   license terms and contributor agreement.
+#
+"""
+Streaming spectral analysis (FFT and Welch power spectra) of digitizer
+data.
+"""
+import numpy as np
+
+from collections import namedtuple
+
+from .hdfprefetch import hdfPrefetchReader
+from .hdfreduce import hdfGroupReducer
+
+hdfSpectralData = namedtuple('hdfSpectralData',
+                             ['freq', 'psd', 'count', 'groups'])
+"""
+Ensemble-averaged power spectral densities.
+
+:param freq: frequencies (in Hz) of the spectra
+:type freq: :class:`numpy.ndarray`
+:param psd: averaged power spectral densities, shape
+    :code:`(nfreq,)` or, when grouped, :code:`(ngroups, nfreq)`
+:type psd: :class:`numpy.ndarray`
+:param count: number of shots averaged (per group)
+:type count: int or :class:`numpy.ndarray`
+:param groups: key fields of every group (e.g. :code:`'xyz'`),
+    :code:`None` when not grouped
+:type groups: :class:`numpy.ndarray`
+"""
+
+
+def get_window(window, nperseg):
+    """
+    Periodic (DFT-even) window of length :data:`nperseg`.
+
+    :param window: :code:`'hann'`, :code:`'hamming'`,
+        :code:`'blackman'`, :code:`'boxcar'`, or the window values
+    :type window: str or array_like
+    :param int nperseg: window length
+    :rtype: :class:`numpy.ndarray`
+    """
+    if not isinstance(window, str):
+        win = np.asarray(window, dtype=np.float64)
+        if win.shape != (nperseg,):
+            raise ValueError('window must have nperseg ({}) '
+                             'values'.format(nperseg))
+        return win
+    phase = 2.0 * np.pi * np.arange(nperseg) / nperseg
+    if window == 'hann':
+        return 0.5 - 0.5 * np.cos(phase)
+    elif window == 'hamming':
+        return 0.54 - 0.46 * np.cos(phase)
+    elif window == 'blackman':
+        return 0.42 - 0.5 * np.cos(phase) + 0.08 * np.cos(2.0 * phase)
+    elif window == 'boxcar':
+        return np.ones(nperseg)
+    raise ValueError('unknown window {}'.format(window))
+
+
+class hdfSpectralReducer(object):
+    """
+    Running ensemble average of Welch power spectral densities of
+    digitizer signals, optionally grouped on mated control device
+    fields (e.g. one spectrum per probe position :code:`'xyz'`).
+
+    Blocks of shots
+    (:class:`~bapsflib.lapdhdf.hdfreaddata.hdfReadData`) are folded in
+    with :meth:`update`.  The Welch spectrum of every shot is the
+    average of the periodograms of overlapping, windowed segments of
+    its :data:`samples` window; only the running sums of the spectra
+    are kept, so memory is proportional to the number of groups and
+    not the number of shots.
+
+    The window, segment layout, and scaling are computed once, and the
+    segments of a chunk of shots are detrended and windowed in a reused
+    work buffer and transformed with a single batched FFT.  The
+    frequency axis is derived from the :attr:`dt` of the first block.
+
+    Spectra are one-sided with the :code:`'density'` (V^2/Hz) or
+    :code:`'spectrum'` (V^2) scaling of :func:`scipy.signal.welch`.
+
+    :Example:
+
+        >>> f = lapdhdf.File('sample.hdf5')
+        >>> reducer = hdfSpectralReducer(nperseg=512, by='xyz')
+        >>> for data in f.iter_data(0, 0, block_size=500,
+        ...                         add_controls=['6K Compumotor']):
+        ...     reducer.update(data)
+        >>> spec = reducer.result()
+        >>> spec.freq, spec.groups['xyz'][0], spec.psd[0]
+
+    (or use :meth:`~bapsflib.lapdhdf.files.File.welch_data`)
+    """
+    def __init__(self, nperseg=256, noverlap=None, window='hann',
+                 samples=None, detrend='constant', scaling='density',
+                 by=None, decimals=None, dt=None,
+                 max_bytes=64 * 2 ** 20):
+        """
+        :param int nperseg: samples per Welch segment
+        :param int noverlap: samples shared by adjacent segments,
+            :code:`None` (default) for :code:`nperseg // 2`
+        :param window: segment window (see :func:`get_window`)
+        :type window: str or array_like
+        :param samples: sample window of each shot that is analyzed,
+            :code:`None` (default) for the whole trace
+        :type samples: slice
+        :param detrend: :code:`'constant'` (default) removes the mean
+            of every segment, :code:`None` keeps it
+        :type detrend: str or None
+        :param str scaling: :code:`'density'` (default) or
+            :code:`'spectrum'`
+        :param by: name(s) of the fields shots are grouped on,
+            :code:`None` (default) averages all shots
+        :type by: str or list(str)
+        :param int decimals: decimals floating point key fields are
+            rounded to before grouping
+        :param float dt: sample time step (in sec), :code:`None`
+            (default) takes :attr:`dt` of the first block
+        :param int max_bytes: memory budget (in bytes) for the FFT work
+            buffers, blocks are transformed in chunks of shots that fit
+        """
+        if not isinstance(nperseg, (int, np.integer)) or nperseg < 2:
+            raise ValueError('nperseg must be an int >= 2')
+        noverlap = nperseg // 2 if noverlap is None else noverlap
+        if not 0 <= noverlap < nperseg:
+            raise ValueError('noverlap must be in [0, nperseg)')
+        if samples is None:
+            samples = slice(None)
+        elif not isinstance(samples, slice):
+            raise TypeError('samples must be a slice')
+        if detrend not in ('constant', None):
+            raise ValueError("detrend must be 'constant' or None")
+        if scaling not in ('density', 'spectrum'):
+            raise ValueError("scaling must be 'density' or 'spectrum'")
+
+        self._nperseg = int(nperseg)
+        self._noverlap = int(noverlap)
+        self._samples = samples
+        self._detrend = detrend
+        self._scaling = scaling
+        self._max_bytes = max_bytes
+        self._dt_given = dt
+        self._window = get_window(window, self._nperseg)
+
+        # grouping
+        # - grouped spectra are averaged by a hdfGroupReducer, whose
+        #   'mean' of the per-shot spectra is the ensemble average
+        if isinstance(by, str):
+            by = [by]
+        self._reducer = None if by is None \
+            else hdfGroupReducer(by, stats=('mean',), decimals=decimals)
+        self._sum = None
+        self._count = 0
+
+        # set on the first block
+        self._dt = None
+        self._nt = None
+        self._nseg = None
+        self._scale = None
+        self._buffer = None
+
+    @property
+    def nperseg(self):
+        """Samples per Welch segment"""
+        return self._nperseg
+
+    @property
+    def noverlap(self):
+        """Samples shared by adjacent segments"""
+        return self._noverlap
+
+    @property
+    def window(self):
+        """Segment window values"""
+        return self._window.copy()
+
+    @property
+    def dt(self):
+        """Sample time step (in sec), :code:`None` before a block"""
+        return self._dt
+
+    @property
+    def freq(self):
+        """
+        Frequencies (in Hz) of the spectra, :code:`None` before a
+        block
+        """
+        if self._dt is None:
+            return None
+        return np.fft.rfftfreq(self._nperseg, self._dt)
+
+    @property
+    def nshots(self):
+        """Number of shots averaged"""
+        if self._reducer is not None:
+            return self._reducer.nshots
+        return self._count
+
+    @property
+    def nbytes(self):
+        """Memory (in bytes) held by the accumulators and buffers"""
+        total = 0 if self._buffer is None else self._buffer.nbytes
+        if self._reducer is not None:
+            return total + self._reducer.nbytes
+        return total + (0 if self._sum is None else self._sum.nbytes)
+
+    def psd(self, data):
+        """
+        Welch power spectral density of every shot of a block.
+
+        :param data: block of shots
+        :type data: :class:`~bapsflib.lapdhdf.hdfreaddata.hdfReadData`
+        :return: spectra, shape :code:`(nshots, nfreq)`
+        :rtype: :class:`numpy.ndarray`
+        """
+        signal = self._setup(data)
+        nshots = signal.shape[0]
+        nfreq = self._nperseg // 2 + 1
+        out = np.empty((nshots, nfreq))
+
+        # transform in chunks of shots whose segments fit the buffer
+        rows = self._buffer.shape[0] // self._nseg
+        for start in range(0, nshots, rows):
+            stop = min(start + rows, nshots)
+            out[start:stop] = self._chunk_psd(signal[start:stop])
+        return out
+
+    def update(self, data):
+        """
+        Fold a block of shots into the averaged spectra.
+
+        :param data: block of shots, with the grouping fields when
+            grouped
+        :type data: :class:`~bapsflib.lapdhdf.hdfreaddata.hdfReadData`
+        """
+        if data.shape[0] == 0:
+            return
+        spectra = self.psd(data)
+        if self._reducer is None:
+            if self._sum is None:
+                self._sum = np.zeros(spectra.shape[1])
+            self._sum += spectra.sum(axis=0)
+            self._count += spectra.shape[0]
+        else:
+            # hand the spectra to the group reducer as its 'signal'
+            names = self._reducer.by
+            block = np.empty(
+                data.shape[0],
+                dtype=[(name, data.dtype.fields[name][0])
+                       for name in names]
+                + [('signal', np.float64, (spectra.shape[1],))])
+            for name in names:
+                block[name] = data[name]
+            block['signal'] = spectra
+            self._reducer.update(block)
+
+    def result(self):
+        """
+        The ensemble-averaged spectra.
+
+        :rtype: :class:`hdfSpectralData`
+        """
+        if self._reducer is None:
+            psd = np.zeros(0) if self._sum is None \
+                else self._sum / max(self._count, 1)
+            return hdfSpectralData(self.freq, psd, self._count, None)
+        stats = self._reducer.result()
+        names = [name for name in self._reducer.by
+                 if name in stats.dtype.names]
+        groups = np.empty(stats.shape[0],
+                          dtype=[(name, stats.dtype.fields[name][0])
+                                 for name in names])
+        for name in names:
+            groups[name] = stats[name]
+        return hdfSpectralData(self.freq, stats['mean'],
+                               stats['count'], groups)
+
+    def _setup(self, data):
+        """
+        Check a block against the first one, define the segment
+        layout, scaling, and work buffer on the first block, and
+        return the analyzed samples.
+        """
+        signal = np.asarray(data['signal'])[:, self._samples]
+        if signal.dtype.kind not in 'f':
+            raise ValueError('signals must be in volts (read with '
+                             'keep_bits=False)')
+        dt = self._dt_given
+        if dt is None:
+            try:
+                dt = data.dt
+            except AttributeError:
+                raise ValueError('data has no sample time step, give '
+                                 'dt')
+        if self._nt is None:
+            nt = signal.shape[1]
+            if nt < self._nperseg:
+                raise ValueError(
+                    'sample window ({}) is shorter than nperseg '
+                    '({})'.format(nt, self._nperseg))
+            self._nt = nt
+            self._dt = dt
+            step = self._nperseg - self._noverlap
+            self._nseg = (nt - self._noverlap) // step
+
+            # one-sided scaling, averaged over segments
+            if self._scaling == 'density':
+                scale = 1.0 / ((1.0 / dt) * np.sum(self._window ** 2))
+            else:
+                scale = 1.0 / np.sum(self._window) ** 2
+            scale = np.full(self._nperseg // 2 + 1, scale / self._nseg)
+            scale[1:] *= 2.0
+            if self._nperseg % 2 == 0:
+                scale[-1] /= 2.0
+            self._scale = scale
+
+            # work buffer, at least one shot
+            rows = max(1, self._max_bytes
+                       // (16 * self._nseg * self._nperseg))
+            self._buffer = np.empty((rows * self._nseg, self._nperseg))
+        elif signal.shape[1] != self._nt:
+            raise ValueError('blocks have different number of samples')
+        elif not np.isclose(dt, self._dt):
+            raise ValueError('blocks have different sample time steps')
+        return signal
+
+    def _chunk_psd(self, signal):
+        """Welch spectra of a chunk of shots that fits the buffer."""
+        nshots = signal.shape[0]
+        step = self._nperseg - self._noverlap
+
+        # strided view of the segments (no copy)
+        signal = np.ascontiguousarray(signal, dtype=np.float64)
+        segments = np.lib.stride_tricks.as_strided(
+            signal, shape=(nshots, self._nseg, self._nperseg),
+            strides=(signal.strides[0], step * signal.strides[1],
+                     signal.strides[1]),
+            writeable=False)
+
+        # detrend and window in the reused buffer
+        buf = self._buffer[:nshots * self._nseg].reshape(
+            nshots, self._nseg, self._nperseg)
+        if self._detrend == 'constant':
+            np.subtract(segments, segments.mean(axis=-1, keepdims=True),
+                        out=buf)
+            np.multiply(buf, self._window, out=buf)
+        else:
+            np.multiply(segments, self._window, out=buf)
+
+        # batched transform of all segments
+        spec = np.fft.rfft(buf, axis=-1)
+        power = spec.real ** 2
+        power += spec.imag ** 2
+        return power.sum(axis=1) * self._scale
+
+
+def iter_fft(hdf_file, board, channel, samples=None, window='boxcar',
+             shotnum=None, block_size='auto', **kwargs):
+    """
+    Stream the FFT of every shot of a digitizer channel, block by
+    block.  Each block is transformed with one batched FFT and
+    released before the next one is read.
+
+    :param hdf_file: object instance of the HDF5 file
+    :type hdf_file: :class:`~bapsflib.lapdhdf.files.File`
+    :param int board: digitizer board number
+    :param int channel: digitizer channel number
+    :param samples: sample window of each shot that is transformed,
+        :code:`None` (default) for the whole trace
+    :type samples: slice
+    :param window: taper applied to the sample window (see
+        :func:`get_window`)
+    :param shotnum: shot numbers to transform, :code:`None` (default)
+        for every shot
+    :param block_size: shots per block (see
+        :class:`~bapsflib.lapdhdf.hdfprefetch.hdfPrefetchReader`)
+    :param kwargs: additional keywords of
+        :class:`~bapsflib.lapdhdf.hdfprefetch.hdfPrefetchReader`
+    :return: generator of :code:`(shotnum, freq, fft)` per block, with
+        :code:`fft` of shape :code:`(nshots, nfreq)`
+    """
+    samples = slice(None) if samples is None else samples
+    kwargs.setdefault('silent', True)
+    reader = hdfPrefetchReader(hdf_file, board, channel,
+                               block_size=block_size, shotnum=shotnum,
+                               keep_bits=False, **kwargs)
+    win = None
+    freq = None
+    with reader:
+        for data in reader:
+            signal = np.asarray(data['signal'])[:, samples]
+            if win is None:
+                win = get_window(window, signal.shape[1])
+                freq = np.fft.rfftfreq(signal.shape[1], data.dt)
+            yield (np.array(data['shotnum']), freq,
+                   np.fft.rfft(signal * win, axis=-1))
+
+
+def welch_data(hdf_file, board, channel, nperseg=256, noverlap=None,
+               window='hann', samples=None, by=None, add_controls=None,
+               shotnum=None, block_size='auto', decimals=None,
+               reduce_max_bytes=64 * 2 ** 20, **kwargs):
+    """
+    Stream a digitizer channel in blocks and average the Welch power
+    spectral densities of its shots, optionally grouped on mated
+    control device fields.
+
+    :param hdf_file: object instance of the HDF5 file
+    :type hdf_file: :class:`~bapsflib.lapdhdf.files.File`
+    :param int board: digitizer board number
+    :param int channel: digitizer channel number
+    :param int nperseg: samples per Welch segment
+    :param int noverlap: samples shared by adjacent segments
+    :param window: segment window (see :func:`get_window`)
+    :param samples: sample window of each shot that is analyzed
+    :type samples: slice
+    :param by: name(s) of the fields shots are grouped on (e.g.
+        :code:`'xyz'`), :code:`None` (default) averages all shots
+    :type by: str or list(str)
+    :param add_controls: control devices mated to the shots (see
+        :meth:`~bapsflib.lapdhdf.files.File.read_data`)
+    :param shotnum: shot numbers to average, :code:`None` (default)
+        for every shot
+    :param block_size: shots per block (see
+        :class:`~bapsflib.lapdhdf.hdfprefetch.hdfPrefetchReader`)
+    :param int decimals: decimals floating point key fields are
+        rounded to
+    :param int reduce_max_bytes: memory budget (in bytes) for the FFT
+        work arrays of the reducer (:code:`max_bytes` of
+        :class:`hdfSpectralReducer`)
+    :param kwargs: additional keywords of :class:`hdfSpectralReducer`
+        (:code:`detrend`, :code:`scaling`, :code:`dt`) or
+        :class:`~bapsflib.lapdhdf.hdfprefetch.hdfPrefetchReader`
+        (e.g. :code:`max_bytes`, the read-ahead memory budget)
+    :rtype: :class:`hdfSpectralData`
+    """
+    rkwargs = {key: kwargs.pop(key)
+               for key in ('detrend', 'scaling', 'dt')
+               if key in kwargs}
+    reducer = hdfSpectralReducer(nperseg=nperseg, noverlap=noverlap,
+                                 window=window, samples=samples,
+                                 by=by, decimals=decimals,
+                                 max_bytes=reduce_max_bytes, **rkwargs)
+    kwargs.setdefault('silent', True)
+    reader = hdfPrefetchReader(hdf_file, board, channel,
+                               block_size=block_size, shotnum=shotnum,
+                               add_controls=add_controls,
+                               keep_bits=False, **kwargs)
+    with reader:
+        for data in reader:
+            reducer.update(data)
+    return reducer.result()
@@ -0,0 +1,157 @@
+# This file is part of the bapsflib package, a Python toolkit for the
+# BaPSF group at UCLA.
+#
+# http://plasma.physics.ucla.edu/
+#
+# Copyright 2017-2018 Erik T. Everson and contributors
+#
+# License: Standard 3-clause BSD; see "LICENSES/LICENSE.txt" for full
+#   license terms and contributor agreement.
+#
+"""
+Low-level traversal helpers used by the mapping classes.
+
+Determining a member's type with
+:code:`isinstance(group[key], h5py.Dataset)` opens the member and
+instantiates an :mod:`h5py` object for it.  The helpers here get
+object types from the HDF5 link/object-info iteration routines (one
+pass per group) and read attributes in bulk, so mapping a file only
+opens the objects whose attributes are actually needed.
+"""
+import h5py
+
+#: object type of a group member that is a group
+GROUP = 'group'
+
+#: object type of a group member that is a dataset
+DATASET = 'dataset'
+
+#: object type of a group member that is a named datatype
+DATATYPE = 'datatype'
+
+_OBJ_TYPES = {h5py.h5o.TYPE_GROUP: GROUP,
+              h5py.h5o.TYPE_DATASET: DATASET,
+              h5py.h5o.TYPE_NAMED_DATATYPE: DATATYPE}
+
+
+def _decode(name):
+    """Decode a byte string name returned by the low-level API."""
+    if isinstance(name, bytes):
+        name = name.decode('utf-8')
+    return name
+
+
+def member_types(group):
+    """
+    Determine the object type of every member of :data:`group` without
+    opening the members.
+
+    :param group: the HDF5 group
+    :type group: :class:`h5py.Group`
+    :return: dictionary of member name to object type
+        (:data:`GROUP`, :data:`DATASET`, :data:`DATATYPE`, or
+        :code:`None` for dangling and external links), in the same
+        order as :code:`group.keys()`
+    :rtype: dict
+    """
+    names = []
+    group.id.links.iterate(names.append)
+
+    types = {}
+    for name in names:
+        try:
+            otype = h5py.h5o.get_info(group.id, name).type
+        except (KeyError, ValueError, RuntimeError):
+            otype = None
+        types[_decode(name)] = _OBJ_TYPES.get(otype, None)
+    return types
+
+
+def list_members(group, obj_type):
+    """
+    List the names of the members of :data:`group` that are of type
+    :data:`obj_type`.
+
+    :param group: the HDF5 group
+    :type group: :class:`h5py.Group`
+    :param str obj_type: :data:`GROUP`, :data:`DATASET`, or
+        :data:`DATATYPE`
+    :return: list of member names
+    :rtype: list(str)
+    """
+    if obj_type not in (GROUP, DATASET, DATATYPE):
+        raise ValueError('obj_type must be one of {}'.format(
+            (GROUP, DATASET, DATATYPE)))
+    return [name for name, otype in member_types(group).items()
+            if otype == obj_type]
+
+
+def walk(group, max_depth=None):
+    """
+    Walk all objects below :data:`group` in a single object-info
+    iteration.  Each object is listed once, ordered by name.
+
+    :param group: the HDF5 group
+    :type group: :class:`h5py.Group`
+    :param int max_depth: maximum depth (number of path components)
+        to list, :code:`None` (default) lists every object
+    :return: list of :code:`(relative path, object type)` tuples
+    :rtype: list(tuple)
+    """
+    items = []
+
+    def visitor(name, info):
+        name = _decode(name)
+        if name == '.':
+            return None
+        if max_depth is None or name.count('/') < max_depth:
+            items.append((name, _OBJ_TYPES.get(info.type, None)))
+        return None
+
+    h5py.h5o.visit(group.id, visitor, info=True)
+    return items
+
+
+def read_attrs(obj, names=None):
+    """
+    Read the attributes of :data:`obj` in one pass.
+
+    :param obj: the HDF5 object
+    :type obj: :class:`h5py.Group` or :class:`h5py.Dataset`
+    :param names: attribute names to read, :code:`None` (default)
+        reads all attributes.  Names not attached to :data:`obj` are
+        skipped.
+    :type names: list(str)
+    :return: dictionary of attribute name to value
+    :rtype: dict
+    """
+    attrs = obj.attrs
+    keys = list(attrs.keys())
+    if names is not None:
+        keys = [key for key in keys if key in names]
+    return {key: attrs[key] for key in keys}
+
+
+def member_attrs(group, names=None, obj_type=GROUP, max_depth=1):
+    """
+    Read attributes of every member of :data:`group` of type
+    :data:`obj_type`.
+
+    :param group: the HDF5 group
+    :type group: :class:`h5py.Group`
+    :param names: attribute names to read (see :func:`read_attrs`)
+    :type names: list(str)
+    :param str obj_type: type of members to read (default
+        :data:`GROUP`)
+    :param int max_depth: depth of members to include (see
+        :func:`walk`), default is the direct members of :data:`group`
+    :return: dictionary of member path (relative to :data:`group`) to
+        attribute dictionary, ordered by path
+    :rtype: dict
+    """
+    if max_depth == 1:
+        paths = list_members(group, obj_type)
+    else:
+        paths = [path for path, otype in walk(group, max_depth)
+                 if otype == obj_type]
+    return {path: read_attrs(group[path], names) for path in paths}
@@ -0,0 +1,305 @@
+# This file is part of the bapsflib package, a Python toolkit for the
+# BaPSF group at UCLA.
+#
+# http://plasma.physics.ucla.edu/
+#
+# Copyright 2017-2018 Erik T. Everson and contributors
+#
+# License: Standard 3-clause BSD; see "LICENSES/LICENSE.txt" for full
+#   license terms and contributor agreement.
+#
+import numpy as np
+import threading
+
+from .hdfmmap import condition_index
+
+
+class hdfWarmup(object):
+    """
+    Background warm-up of a :class:`~bapsflib.lapdhdf.files.File`.
+
+    A background thread opens the header dataset of every active
+    digitizer configuration and the dataset of every control device
+    configuration listed in the file mapping, and reads their shot
+    number columns into memory.  Subsequent reads
+    (:class:`~bapsflib.lapdhdf.hdfreaddata.hdfReadData` and
+    :class:`~bapsflib.lapdhdf.hdfreadcontrol.hdfReadControl`) resolve
+    shot numbers from the warmed columns instead of the file.
+
+    :Example:
+
+        >>> f = lapdhdf.File('sample.hdf5', warmup=True)
+        >>> # ... other setup ...
+        >>> f.warmup.progress
+        (12, 40)
+        >>> f.warmup.wait()
+        True
+    """
+    def __init__(self, hdf_file, start=True):
+        """
+        :param hdf_file: object instance of the HDF5 file
+        :type hdf_file: :class:`bapsflib.lapdhdf.files.File`
+        :param bool start: :code:`True` (default) starts the warm-up
+            thread immediately, otherwise call :meth:`start`
+        """
+        self._hdf_file = hdf_file
+        self._tasks = self._gather_tasks(hdf_file)
+
+        # warmed items
+        # _columns - dataset path -> (shot number field, np.ndarray)
+        # _handles - dataset path -> h5py.Dataset
+        self._columns = {}
+        self._handles = {}
+        self._errors = {}
+        self._ndone = 0
+
+        self._lock = threading.Lock()
+        self._finished = threading.Event()
+        self._cancel = threading.Event()
+        self._thread = None
+
+        if start:
+            self.start()
+
+    @property
+    def progress(self):
+        """:code:`(number of datasets warmed, total number)`"""
+        return self._ndone, len(self._tasks)
+
+    @property
+    def fraction(self):
+        """Fraction (0 to 1) of datasets warmed"""
+        if len(self._tasks) == 0:
+            return 1.0
+        return self._ndone / len(self._tasks)
+
+    @property
+    def done(self):
+        """:code:`True` if the warm-up has finished (or was cancelled)"""
+        return self._finished.is_set()
+
+    @property
+    def errors(self):
+        """Dictionary of dataset path to error for failed datasets"""
+        with self._lock:
+            return self._errors.copy()
+
+    @property
+    def paths(self):
+        """List of dataset paths to be warmed"""
+        return [task[0] for task in self._tasks]
+
+    def start(self):
+        """Start the warm-up thread (if not already started)."""
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._worker,
+                                        name='hdfWarmup',
+                                        daemon=True)
+        self._thread.start()
+
+    def wait(self, timeout=None):
+        """
+        Wait for the warm-up to finish.
+
+        :param float timeout: maximum time (in seconds) to wait,
+            :code:`None` (default) waits indefinitely
+        :return: :code:`True` if the warm-up finished
+        :rtype: bool
+        """
+        if self._thread is None:
+            self.start()
+        return self._finished.wait(timeout)
+
+    def cancel(self):
+        """Stop the warm-up after the dataset currently being read."""
+        self._cancel.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def get_column(self, path):
+        """
+        Get a warmed shot number column.
+
+        :param str path: dataset path
+        :return: :code:`(field name, shot numbers)` or :code:`None` if
+            the dataset has not been warmed (yet)
+        :rtype: tuple
+        """
+        with self._lock:
+            return self._columns.get(path, None)
+
+    def get_handle(self, path):
+        """
+        Get a warmed dataset handle.
+
+        :param str path: dataset path
+        :return: the dataset, :code:`None` if not warmed (yet)
+        :rtype: :class:`h5py.Dataset`
+        """
+        with self._lock:
+            return self._handles.get(path, None)
+
+    def _worker(self):
+        """Open datasets and read their shot number columns."""
+        try:
+            for path, field in self._tasks:
+                if self._cancel.is_set():
+                    break
+                try:
+                    dset = self._hdf_file.get(path)
+                    column = dset[field]
+                except Exception as err:
+                    with self._lock:
+                        self._errors[path] = err
+                else:
+                    with self._lock:
+                        self._handles[path] = dset
+                        self._columns[path] = (field, column)
+                finally:
+                    self._ndone += 1
+        finally:
+            self._finished.set()
+
+    @staticmethod
+    def _gather_tasks(hdf_file):
+        """Build the list of (dataset path, shot number field)."""
+        return shotnum_datasets(hdf_file)
+
+
+def shotnum_datasets(hdf_file):
+    """
+    List every mapped dataset that records shot numbers, i.e. the
+    header dataset of each connected channel of the active digitizer
+    configurations and the dataset of each control device
+    configuration.
+
+    :param hdf_file: object instance of the HDF5 file
+    :type hdf_file: :class:`bapsflib.lapdhdf.files.File`
+    :return: list of :code:`(dataset path, shot number field name)`
+    :rtype: list(tuple)
+    """
+    file_map = hdf_file.file_map
+    dsets = []
+
+    # digitizer header datasets
+    for digi_map in file_map.digitizers.values():
+        dpath = digi_map.info['group path'] + '/'
+        for config_name in digi_map.active_configs:
+            config = digi_map.configs[config_name]
+            for adc in config['adc']:
+                for conn in config[adc]:
+                    for channel in conn[1]:
+                        try:
+                            dhname = digi_map.resolve_dataset(
+                                conn[0], channel,
+                                config_name=config_name,
+                                adc=adc, silent=True)[1]
+                        except (ValueError, KeyError, TypeError):
+                            continue
+                        dsets.append((dpath + dhname,
+                                     digi_map.shotnum_field))
+
+    # control device datasets
+    for cmap in file_map.controls.values():
+        for cspec in cmap.configs:
+            try:
+                cdset_name, field = cmap.resolve_dataset(cspec)
+            except (ValueError, KeyError, TypeError):
+                continue
+            if field is None:
+                continue
+            dsets.append((cmap.info['group path'] + '/' + cdset_name,
+                         field))
+
+    # remove duplicates (keeping order)
+    seen = set()
+    unique = []
+    for dset in dsets:
+        if dset[0] not in seen:
+            seen.add(dset[0])
+            unique.append(dset)
+    return unique
+
+
+class hdfShotnumDataset(object):
+    """
+    Stand-in for a dataset whose shot number column has been read into
+    memory (see :class:`hdfWarmup`).  Reads of only the shot number
+    field are served from memory using :mod:`h5py` indexing semantics,
+    everything else is forwarded to the wrapped dataset.
+    """
+    def __init__(self, dset, field, column):
+        """
+        :param dset: the wrapped dataset
+        :type dset: :class:`h5py.Dataset` or
+            :class:`~bapsflib.lapdhdf.hdfmmap.hdfMMapDataset`
+        :param str field: name of the shot number field
+        :param column: the shot number column
+        :type column: :class:`numpy.ndarray`
+        """
+        self._dset = dset
+        self._field = field
+        self._column = column
+        self._column.flags.writeable = False
+
+    @property
+    def dataset(self):
+        """The wrapped dataset"""
+        return self._dset
+
+    @property
+    def shape(self):
+        """Dataset shape"""
+        return self._dset.shape
+
+    @property
+    def dtype(self):
+        """Dataset dtype"""
+        return self._dset.dtype
+
+    def __len__(self):
+        return len(self._dset)
+
+    def __getattr__(self, item):
+        return getattr(self._dset, item)
+
+    def _serves(self, args):
+        """:code:`True` if :code:`self[args]` is served from memory."""
+        if not isinstance(args, tuple):
+            args = (args,)
+        fields = [arg for arg in args if isinstance(arg, str)]
+        indices = [arg for arg in args if not isinstance(arg, str)]
+        return fields == [self._field] and len(indices) <= 1
+
+    def read_source(self, args):
+        """
+        Where a read of :code:`self[args]` is served from (see
+        :meth:`~bapsflib.lapdhdf.hdfmetrics.hdfReadMetrics.record`).
+
+        :return: :code:`'warm-up'` for shot number reads, otherwise
+            the source of the wrapped dataset (e.g. :code:`'mmap'` or
+            :code:`'hdf5'`)
+        :rtype: str
+        """
+        if self._serves(args):
+            return 'warm-up'
+        source = getattr(self._dset, 'read_source', None)
+        return 'hdf5' if source is None else source(args)
+
+    def __getitem__(self, args):
+        # only serve requests for the shot number field
+        if not self._serves(args):
+            return self._dset[args]
+        if not isinstance(args, tuple):
+            args = (args,)
+        indices = [arg for arg in args if not isinstance(arg, str)]
+
+        if len(indices) == 0:
+            return self._column.view()
+
+        index = condition_index(indices[0], self._column.shape[0])
+        arr = self._column[index]
+        if isinstance(arr, np.ndarray) and arr.base is self._column:
+            arr = arr.copy()
+        return arr
@@ -12,6 +12,8 @@ import h5py
 
 from abc import ABC, abstractmethod
 
+from ..hdftraverse import (DATASET, GROUP, list_members)
+
 
 class hdfMap_control_template(ABC):
     """
@@ -42,6 +44,9 @@ class hdfMap_control_template(ABC):
             #
             self._verify_map()
 
+            # index dataset names for fast resolution
+            self._build_dataset_index()
+
     .. note::
 
         Any method that raises a :exc:`NotImplementedError` is intended
@@ -198,6 +203,10 @@ class hdfMap_control_template(ABC):
                 }
         """
 
+        # name-resolution index (see resolve_dataset)
+        # - cspec -> (dataset name, shot number field name)
+        self._dataset_index = {}
+
     @property
     def contype(self):
         """
@@ -213,10 +222,7 @@ class hdfMap_control_template(ABC):
         :return: list of names of the HDF5 datasets in the control group
         :rtype: [str, ]
         """
-        dnames = [name
-                  for name in self.group
-                  if type(self.group[name]) is h5py.Dataset]
-        return dnames
+        return list_members(self.group, DATASET)
 
     @property
     def group(self):
@@ -256,10 +262,7 @@ class hdfMap_control_template(ABC):
         :return: list of names of the HDF5 groups in the control group
         :rtype: [str, ]
         """
-        sgroup_names = [name
-                        for name in self.group
-                        if type(self.group[name]) is h5py.Group]
-        return sgroup_names
+        return list_members(self.group, GROUP)
 
     @property
     def name(self):
@@ -281,6 +284,54 @@ class hdfMap_control_template(ABC):
         """
         raise NotImplementedError
 
+    def resolve_dataset(self, cspec):
+        """
+        Resolves the dataset name and shot number field name for the
+        control configuration :data:`cspec`.  Results are held in a
+        name-resolution index (pre-populated at mapping time by
+        :meth:`_build_dataset_index`).
+
+        :param cspec: unique specifier (configuration name) for the
+            control device
+        :return: :code:`(dataset name, shot number field name)`, the
+            field name is :code:`None` if no shot number field is
+            defined
+        :rtype: tuple
+        """
+        try:
+            return self._dataset_index[cspec]
+        except (KeyError, TypeError):
+            pass
+
+        dset_name = self.construct_dataset_name(cspec)
+        shotnumkey = None
+        try:
+            for item in self.configs[cspec]['dset field to numpy field']:
+                if item[1][0] == 'shotnum':
+                    shotnumkey = item[0]
+                    break
+        except (KeyError, TypeError):
+            pass
+
+        try:
+            self._dataset_index[cspec] = (dset_name, shotnumkey)
+        except TypeError:
+            # unhashable cspec
+            pass
+        return dset_name, shotnumkey
+
+    def _build_dataset_index(self):
+        """
+        Pre-populates the name-resolution index used by
+        :meth:`resolve_dataset` for every configuration.
+        """
+        self._dataset_index = {}
+        for cspec in self.configs:
+            try:
+                self.resolve_dataset(cspec)
+            except (ValueError, KeyError, TypeError):
+                pass
+
     @property
     def unique_specifiers(self):
         """
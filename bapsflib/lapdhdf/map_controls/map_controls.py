@@ -13,6 +13,7 @@ import h5py
 
 from .sixk import hdfMap_control_6k
 from .waveform import hdfMap_control_waveform
+from ..hdftraverse import (GROUP, list_members)
 
 class hdfMap_controls(dict):
     """
@@ -57,10 +58,7 @@ class hdfMap_controls(dict):
         #   4. unknown
         #
         #: list of all group names in the HDF5 data group
-        self.data_group_subgnames = []
-        for item in data_group:
-            if type(data_group[item]) is h5py.Group:
-                self.data_group_subgnames.append(item)
+        self.data_group_subgnames = list_members(data_group, GROUP)
 
         # Build the self dictionary
         dict.__init__(self, self.__build_dict)
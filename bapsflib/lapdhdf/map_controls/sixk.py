@@ -25,6 +25,9 @@ class hdfMap_control_6k(hdfMap_control_template):
         # populate self.configs
         self._build_configs()
 
+        # index dataset names for fast resolution
+        self._build_dataset_index()
+
         # remove self.info and self.configs items that
         #  self._verify_map()
 
@@ -135,6 +138,16 @@ class hdfMap_control_6k(hdfMap_control_template):
         """
         return list(self.configs)
 
+    @property
+    def motion_lists(self):
+        """
+        :return: dictionary of motion list name to motion list
+            configuration (:code:`'delta'`, :code:`'center'`, and
+            :code:`'npoints'`)
+        :rtype: dict
+        """
+        return self._motion_lists
+
     # @property
     # def name(self):
     #     """
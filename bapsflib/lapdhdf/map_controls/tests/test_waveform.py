@@ -65,6 +65,18 @@ class TestWaveform(ControlTestCase):
         # assert details
         self.assertWaveformDetails()
 
+    def test_resolve_dataset(self):
+        # reset to 3 configs
+        if self.controls.knobs.n_configs != 3:
+            self.controls.knobs.n_configs = 3
+
+        _map = self.map
+        for cspec in _map.configs:
+            self.assertIn(cspec, _map._dataset_index)
+            self.assertEqual(_map.resolve_dataset(cspec),
+                             (_map.construct_dataset_name(cspec),
+                              'Shot number'))
+
     def assertWaveformDetails(self):
         # test dataset names
         self.assertEqual(self.map.dataset_names, ['Run time list'])
@@ -32,6 +32,9 @@ class hdfMap_control_waveform(hdfMap_control_template):
         # populate self.configs
         self._build_configs()
 
+        # index dataset names for fast resolution
+        self._build_dataset_index()
+
         # verify self.info and self.configs
         # self._verify_map()
 
@@ -26,6 +26,9 @@ class hdfMap_digi_template(ABC):
             # populate self.configs
             self._build_configs()
 
+            # index dataset names for fast resolution
+            self._build_dataset_index()
+
     .. note::
 
         Any method that raises a :exc:`NotImplementedError` is intended
@@ -90,6 +93,11 @@ class hdfMap_digi_template(ABC):
             }), ]
         """
 
+        # name-resolution index (see resolve_dataset)
+        # - (config_name, adc, board, channel) ->
+        #   (dataset name, header dataset name, adc info, warnings)
+        self._dataset_index = {}
+
     @property
     def active_configs(self):
         """
@@ -105,6 +113,82 @@ class hdfMap_digi_template(ABC):
                 pass
         return afigs
 
+    def resolve_dataset(self, board, channel, config_name=None,
+                        adc=None, silent=False):
+        """
+        Resolves the dataset name, header dataset name, and adc
+        information for the given inputs.  Results are held in a
+        name-resolution index (pre-populated at mapping time by
+        :meth:`_build_dataset_index`), so repeated calls skip
+        :meth:`construct_dataset_name` and
+        :meth:`construct_header_dataset_name`.
+
+        :param int board: board number
+        :param int channel: channel number
+        :param str config_name: name of configuration
+        :param str adc: name of adc
+        :param bool silent: :code:`False` (default). Set :code:`True` to
+            suppress command line printout of soft-warnings
+        :return: :code:`(dataset name, header dataset name,
+            adc information dictionary)`
+        :rtype: tuple
+        """
+        key = (config_name, adc, board, channel)
+        try:
+            dname, dhname, d_info, warn_out = self._dataset_index[key]
+        except (KeyError, TypeError):
+            kwargs = {}
+            if config_name is not None:
+                kwargs['config_name'] = config_name
+            if adc is not None:
+                kwargs['adc'] = adc
+
+            # keep the soft-warnings so they can be re-printed for
+            # index hits
+            dname, d_info, warn_out = self.construct_dataset_name(
+                board, channel, return_info=True, silent=True,
+                return_warnings=True, **kwargs)
+            dhname = self.construct_header_dataset_name(
+                board, channel, silent=True, **kwargs)
+
+            try:
+                self._dataset_index[key] = (dname, dhname, d_info,
+                                            warn_out)
+            except TypeError:
+                # unhashable inputs
+                pass
+
+        # print warnings
+        if not silent:
+            print(warn_out)
+
+        return dname, dhname, d_info.copy()
+
+    def _build_dataset_index(self):
+        """
+        Pre-populates the name-resolution index used by
+        :meth:`resolve_dataset` for every connected (board, channel)
+        of every active configuration and adc.  The keys of the
+        default configuration and adc (i.e. :code:`config_name=None`
+        and/or :code:`adc=None`) are indexed as well.
+        """
+        self._dataset_index = {}
+        for config_name in self.active_configs:
+            for adc in self.configs[config_name]['adc']:
+                for conn in self.configs[config_name][adc]:
+                    for channel in conn[1]:
+                        for cname, aname in ((config_name, adc),
+                                             (config_name, None),
+                                             (None, adc),
+                                             (None, None)):
+                            try:
+                                self.resolve_dataset(
+                                    conn[0], channel,
+                                    config_name=cname, adc=aname,
+                                    silent=True)
+                            except ValueError:
+                                pass
+
     @property
     def digi_name(self):
         """Name of digitizer"""
@@ -280,7 +364,8 @@ class hdfMap_digi_template(ABC):
     @abstractmethod
     def construct_dataset_name(self, board, channel,
                                config_name=None, adc=None,
-                               return_info=False):
+                               return_info=False, silent=False,
+                               return_warnings=False):
         """
         Constructs the dataset name corresponding to the input
         arguments.
@@ -291,8 +376,13 @@ class hdfMap_digi_template(ABC):
         :param str adc: name of adc
         :param bool return_info: Set :code:`True` to also return an adc
             information dictionary
+        :param bool silent: :code:`False` (default). Set :code:`True` to
+            suppress command line printout of soft-warnings
+        :param bool return_warnings: Set :code:`True` to also return
+            the soft-warning text (as the last item)
         :return: dataset name (and adc information dictionary if
-            :code:`return_info=True`)
+            :code:`return_info=True`, and soft-warnings if
+            :code:`return_warnings=True`)
 
         The returned adc information dictionary should look like::
 
@@ -306,7 +396,7 @@ class hdfMap_digi_template(ABC):
                 'digitizer': str
             }
 
-        :rtype: str (Default) or (str, adc_dict)
+        :rtype: str (Default), (str, adc_dict), or (str, adc_dict, str)
 
         :data:`config_name` behavior:
             * If only one configuration is active for the digitizer,
@@ -13,6 +13,7 @@
 import h5py
 
 from .sis3301 import hdfMap_digi_sis3301
+from ..hdftraverse import (GROUP, list_members)
 from .siscrate import hdfMap_digi_siscrate
 
 
@@ -59,10 +60,7 @@ class hdfMap_digitizers(dict):
         #   4. unknown
         #
         #: list of all group names in the HDF5 data group
-        self.data_group_subgnames = []
-        for name in data_group:
-            if type(data_group[name]) is h5py.Group:
-                self.data_group_subgnames.append(name)
+        self.data_group_subgnames = list_members(data_group, GROUP)
 
         # Build the self dictionary
         dict.__init__(self, self.__build_dict)
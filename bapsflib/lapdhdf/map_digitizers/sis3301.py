@@ -8,9 +8,9 @@
 # License: Standard 3-clause BSD; see "LICENSES/LICENSE.txt" for full
 #   license terms and contributor agreement.
 #
-import h5py
-
 from .digi_template import hdfMap_digi_template
+from ..hdftraverse import (DATASET, GROUP, member_attrs,
+                           member_types, read_attrs)
 
 
 class hdfMap_digi_sis3301(hdfMap_digi_template):
@@ -28,6 +28,9 @@ class hdfMap_digi_sis3301(hdfMap_digi_template):
         # populate self.configs
         self._build_configs()
 
+        # index dataset names for fast resolution
+        self._build_dataset_index()
+
     @property
     def shotnum_field(self):
         """Field name for shot number column in header dataset"""
@@ -55,18 +58,20 @@ class hdfMap_digi_sis3301(hdfMap_digi_template):
         # self.configs is initialized in the template
 
         # collect digi_group's dataset names and sub-group names
-        subgroup_names = []
-        dataset_names = []
-        for key in self.group.keys():
-            if isinstance(self.group[key], h5py.Dataset):
-                dataset_names.append(key)
-            if isinstance(self.group[key], h5py.Group):
-                subgroup_names.append(key)
+        # - member types are gathered in one pass without opening
+        #   the members
+        mtypes = member_types(self.group)
+        subgroup_names = [key for key, otype in mtypes.items()
+                          if otype == GROUP]
+        dataset_names = [key for key, otype in mtypes.items()
+                         if otype == DATASET]
 
         # populate self.configs
         for name in subgroup_names:
             is_config, config_name = self._parse_config_name(name)
             if is_config:
+                config_group = self.group[name]
+
                 # initialize configuration name in the config dict
                 self.configs[config_name] = {}
 
@@ -76,18 +81,18 @@ class hdfMap_digi_sis3301(hdfMap_digi_template):
 
                 # assign active adc's to the configuration
                 self.configs[config_name]['adc'] = \
-                    self._find_config_adc(self.group[name])
+                    self._find_config_adc(config_group)
 
                 # add 'group name'
                 self.configs[config_name]['group name'] = name
 
                 # add 'group path'
                 self.configs[config_name]['group path'] = \
-                    self.group[name].name
+                    config_group.name
 
                 # add adc info
                 self.configs[config_name]['SIS 3301'] = \
-                    self._adc_info('SIS 3301', self.group[name])
+                    self._adc_info('SIS 3301', config_group)
 
     @staticmethod
     def _parse_config_name(name):
@@ -148,14 +153,18 @@ class hdfMap_digi_sis3301(hdfMap_digi_template):
         # structure as adc_info
         conns = self._find_adc_connections(adc_name, config_group)
 
+        # read averaging attributes once for all connections
+        config_attrs = read_attrs(config_group, ['Shots to average',
+                                                 'Samples to average'])
+
         for conn in conns:
             # define 'bit' and 'sample rate'
             conn[2]['bit'] = 14
             conn[2]['sample rate'] = (100.0, 'MHz')
 
             # add shot average to dict
-            if 'Shots to average' in config_group.attrs:
-                shtave = config_group.attrs['Shots to average']
+            if 'Shots to average' in config_attrs:
+                shtave = config_attrs['Shots to average']
                 if shtave == 0 or shtave == 1:
                     shtave = None
             else:
@@ -163,8 +172,8 @@ class hdfMap_digi_sis3301(hdfMap_digi_template):
             conn[2]['shot average (software)'] = shtave
 
             # add sample average to dict
-            if 'Samples to average' in config_group.attrs:
-                avestr = config_group.attrs['Samples to average']
+            if 'Samples to average' in config_attrs:
+                avestr = config_attrs['Samples to average']
                 if isinstance(avestr, bytes):
                     avestr = avestr.decode('utf-8')
                 if avestr == 'No averaging':
@@ -211,16 +220,25 @@ class hdfMap_digi_sis3301(hdfMap_digi_template):
         chs = []
 
         # Determine connected (brd, ch) combinations
-        for ibrd, board in enumerate(config_group.keys()):
-            brd_group = config_group[board]
-            for ich, ch_key in enumerate(brd_group.keys()):
-                ch_group = brd_group[ch_key]
-
+        # - the 'Board' and 'Channel' attributes of every channel
+        #   subgroup are gathered in one traversal of config_group
+        ch_attrs = member_attrs(config_group, ['Board', 'Channel'],
+                                max_depth=2)
+        boards = {}
+        for path, attrs in ch_attrs.items():
+            if '/' not in path:
+                # board group
+                boards.setdefault(path, [])
+                continue
+            boards.setdefault(path.split('/')[0], []).append(attrs)
+
+        for board, channels in boards.items():
+            for ich, attrs in enumerate(channels):
                 if ich == 0:
-                    brd = ch_group.attrs['Board']
-                    chs = [ch_group.attrs['Channel']]
+                    brd = attrs['Board']
+                    chs = [attrs['Channel']]
                 else:
-                    chs.append(ch_group.attrs['Channel'])
+                    chs.append(attrs['Channel'])
 
             # build subconn tuple with connected board, channels, and
             # acquisition parameters
@@ -232,7 +250,8 @@ class hdfMap_digi_sis3301(hdfMap_digi_template):
 
     def construct_dataset_name(self, board, channel,
                                config_name=None, adc='SIS 3301',
-                               return_info=False, silent=False):
+                               return_info=False, silent=False,
+                               return_warnings=False):
         """
         Constructs the HDF5 dataset name based on inputs.  The dataset
         name follows the format:
@@ -316,10 +335,12 @@ class hdfMap_digi_sis3301(hdfMap_digi_template):
         if not silent:
             print(warn_str)
 
+        rtn = (dataset_name,)
         if return_info is True:
-            return dataset_name, d_info
-        else:
-            return dataset_name
+            rtn += (d_info,)
+        if return_warnings is True:
+            rtn += (warn_str,)
+        return rtn if len(rtn) > 1 else dataset_name
 
     def construct_header_dataset_name(self, board, channel, **kwargs):
         """"Name of header dataset"""
@@ -8,9 +8,9 @@
 # License: Standard 3-clause BSD; see "LICENSES/LICENSE.txt" for full
 #   license terms and contributor agreement.
 #
-import h5py
-
 from .digi_template import hdfMap_digi_template
+from ..hdftraverse import (DATASET, GROUP, list_members,
+                           member_types, read_attrs)
 
 
 class hdfMap_digi_siscrate(hdfMap_digi_template):
@@ -28,6 +28,9 @@ class hdfMap_digi_siscrate(hdfMap_digi_template):
         # populate self.configs
         self._build_configs()
 
+        # index dataset names for fast resolution
+        self._build_dataset_index()
+
     @property
     def shotnum_field(self):
         """Field name for shot number column in header dataset"""
@@ -55,18 +58,20 @@ class hdfMap_digi_siscrate(hdfMap_digi_template):
         # self.configs is initialized in the template
 
         # collect digi_group's dataset names and sub-group names
-        subgroup_names = []
-        dataset_names = []
-        for key in self.group.keys():
-            if isinstance(self.group[key], h5py.Dataset):
-                dataset_names.append(key)
-            if isinstance(self.group[key], h5py.Group):
-                subgroup_names.append(key)
+        # - member types are gathered in one pass without opening
+        #   the members
+        mtypes = member_types(self.group)
+        subgroup_names = [key for key, otype in mtypes.items()
+                          if otype == GROUP]
+        dataset_names = [key for key, otype in mtypes.items()
+                         if otype == DATASET]
 
         # populate self.configs
         for name in subgroup_names:
             is_config, config_name = self._parse_config_name(name)
             if is_config:
+                config_group = self.group[name]
+
                 # initialize configuration name in the config dict
                 self.configs[config_name] = {}
 
@@ -76,19 +81,19 @@ class hdfMap_digi_siscrate(hdfMap_digi_template):
 
                 # assign active adc's to the configuration
                 self.configs[config_name]['adc'] = \
-                    self._find_config_adc(self.group[name])
+                    self._find_config_adc(config_group)
 
                 # add 'group name'
                 self.configs[config_name]['group name'] = name
 
                 # add 'group path'
                 self.configs[config_name]['group path'] = \
-                    self.group[name].name
+                    config_group.name
 
                 # add adc info
                 for adc in self.configs[config_name]['adc']:
                     self.configs[config_name][adc] = \
-                        self._adc_info(adc, self.group[name])
+                        self._adc_info(adc, config_group)
 
     @staticmethod
     def _parse_config_name(name):
@@ -223,8 +228,11 @@ class hdfMap_digi_siscrate(hdfMap_digi_template):
         # Build a tuple relating the adc name (adc), adc slot number
         # (slot), associated data configuration unique identifier index
         # (index), and board number (brd)
-        active_slots = config_group.attrs['SIS crate slot numbers']
-        config_indices = config_group.attrs['SIS crate config indices']
+        config_attrs = read_attrs(config_group,
+                                  ['SIS crate slot numbers',
+                                   'SIS crate config indices'])
+        active_slots = config_attrs['SIS crate slot numbers']
+        config_indices = config_attrs['SIS crate config indices']
         info_list = []
         for slot, index in zip(active_slots, config_indices):
             if slot != 3:
@@ -235,7 +243,7 @@ class hdfMap_digi_siscrate(hdfMap_digi_template):
         # groups
         sis3302_gnames = []
         sis3305_gnames = []
-        for key in config_group.keys():
+        for key in list_members(config_group, GROUP):
             if 'configurations' in key:
                 if '3302' in key:
                     sis3302_gnames.append(key)
@@ -255,19 +263,20 @@ class hdfMap_digi_siscrate(hdfMap_digi_template):
                         brd = board
                         break
 
+                # read all configuration attributes in one pass
+                attrs = read_attrs(config_group[name])
+
                 # Find active channels
                 chs = []
-                for key in config_group[name].attrs:
+                for key in attrs:
                     if 'Enable' in key:
-                        tf_str = config_group[name].attrs[key]
+                        tf_str = attrs[key]
                         if 'TRUE' in tf_str.decode('utf-8'):
                             chs.append(int(key[-1]))
 
                 # determine 'shot average (software)'
-                if 'Shot averaging (software)' \
-                        in config_group[name].attrs:
-                    shtave = config_group[name].attrs[
-                        'Shot averaging (software)']
+                if 'Shot averaging (software)' in attrs:
+                    shtave = attrs['Shot averaging (software)']
                     if shtave == 0 or shtave == 1:
                         shtave = None
                 else:
@@ -277,10 +286,8 @@ class hdfMap_digi_siscrate(hdfMap_digi_template):
                 # - the HDF5 attribute is the power to 2
                 # - So, a hardware sample of 5 actually means the number
                 #   of points sampled is 2^5
-                if 'Sample averaging (hardware)'\
-                        in config_group[name].attrs:
-                    splave = config_group[name].attrs[
-                        'Sample averaging (hardware)']
+                if 'Sample averaging (hardware)' in attrs:
+                    splave = attrs['Sample averaging (hardware)']
                     if splave == 0:
                         splave = None
                     else:
@@ -318,17 +325,20 @@ class hdfMap_digi_siscrate(hdfMap_digi_template):
                         brd = board
                         break
 
+                # read all configuration attributes in one pass
+                attrs = read_attrs(config_group[name])
+
                 # Find active channels and clock mode
                 chs = []
-                for key in config_group[name].attrs.keys():
+                for key in attrs.keys():
                     # channels
                     if 'Enable' in key:
                         if 'FPGA 1' in key:
-                            tf_str = config_group[name].attrs[key]
+                            tf_str = attrs[key]
                             if 'TRUE' in tf_str.decode('utf-8'):
                                 chs.append(int(key[-1]))
                         elif 'FPGA 2' in key:
-                            tf_str = config_group[name].attrs[key]
+                            tf_str = attrs[key]
                             if 'TRUE' in tf_str.decode('utf-8'):
                                 chs.append(int(key[-1]) + 4)
 
@@ -342,13 +352,11 @@ class hdfMap_digi_siscrate(hdfMap_digi_template):
                               (2.5, 'GHz'),
                               (5.0, 'GHz')]
                     if 'Channel mode' in key:
-                        cmode = cmodes[config_group[name].attrs[key]]
+                        cmode = cmodes[attrs[key]]
 
                 # determine 'shot average (software)'
-                if 'Shot averaging (software)' \
-                        in config_group[name].attrs:
-                    shtave = config_group[name].attrs[
-                        'Shot averaging (software)']
+                if 'Shot averaging (software)' in attrs:
+                    shtave = attrs['Shot averaging (software)']
                     if shtave == 0 or shtave == 1:
                         shtave = None
                 else:
@@ -375,7 +383,8 @@ class hdfMap_digi_siscrate(hdfMap_digi_template):
 
     def construct_dataset_name(self, board, channel,
                                config_name=None, adc=None,
-                               return_info=False, silent=False):
+                               return_info=False, silent=False,
+                               return_warnings=False):
         """
         Constructs the HDF5 dataset name based on inputs.  The dataset
         name follows the format:
@@ -478,10 +487,12 @@ class hdfMap_digi_siscrate(hdfMap_digi_template):
         if not silent:
             print(warn_str)
 
+        rtn = (dataset_name,)
         if return_info is True:
-            return dataset_name, d_info
-        else:
-            return dataset_name
+            rtn += (d_info,)
+        if return_warnings is True:
+            rtn += (warn_str,)
+        return rtn if len(rtn) > 1 else dataset_name
 
     def construct_header_dataset_name(self, board, channel, **kwargs):
         """"Name of header dataset"""
@@ -20,6 +20,8 @@ from .common import DigitizerTestCase
 
 from bapsflib.lapdhdf.tests import FauxHDFBuilder
 
+import contextlib
+import io
 import unittest as ut
 
 
@@ -233,6 +235,52 @@ class TestSIS3301(DigitizerTestCase):
         self.assertEqual(dset_tup[1]['configuration name'], 'config01')
         self.assertEqual(dset_tup[1]['digitizer'], 'SIS 3301')
 
+    def test_resolve_dataset(self):
+        """
+        Test behavior of the map's :meth:`resolve_dataset` method.
+        """
+        _map = self.map
+        config = _map.active_configs[0]
+
+        # connections are indexed at mapping time
+        key = (config, 'SIS 3301', 0, 0)
+        self.assertIn(key, _map._dataset_index)
+
+        # so is the default config/adc key used by read_data
+        self.assertIn((None, None, 0, 0), _map._dataset_index)
+
+        # soft-warnings are returned, not captured from stdout
+        dname, warn_str = _map.construct_dataset_name(
+            0, 0, silent=True, return_warnings=True)
+        self.assertIn('config_name not specified', warn_str)
+        out = io.StringIO()
+        with contextlib.redirect_stdout(out):
+            _map.resolve_dataset(0, 0)
+        self.assertEqual(out.getvalue(), warn_str + '\n')
+
+        # resolved names match construct_*_name()
+        dname, dhname, d_info = _map.resolve_dataset(0, 0, silent=True)
+        self.assertEqual(dname, _map.construct_dataset_name(0, 0))
+        self.assertEqual(dhname,
+                         _map.construct_header_dataset_name(0, 0))
+        self.assertEqual(
+            d_info,
+            _map.construct_dataset_name(0, 0, return_info=True)[1])
+        self.assertEqual(
+            _map.resolve_dataset(0, 0, config_name=config,
+                                 adc='SIS 3301', silent=True),
+            (dname, dhname, d_info))
+
+        # the returned info dict is a copy
+        d_info['bit'] = None
+        self.assertEqual(_map.resolve_dataset(0, 0, silent=True)[2]['bit'],
+                         14)
+
+        # errors are not cached
+        self.assertRaises(ValueError, _map.resolve_dataset, 0, 1)
+        self.assertRaises(ValueError, _map.resolve_dataset, 0, 1)
+        self.assertNotIn((None, None, 0, 1), _map._dataset_index)
+
 
 if __name__ == '__main__':
     ut.main()
@@ -0,0 +1,57 @@
+# This file is part of the bapsflib package, a Python toolkit for the
+# BaPSF group at UCLA.
+#
+# http://plasma.physics.ucla.edu/
+#
+# Copyright 2017-2018 Erik T. Everson and contributors
+#
+# License: Standard 3-clause BSD; see "LICENSES/LICENSE.txt" for full
+#   license terms and contributor agreement.
+#
+from .msi_template import hdfMap_msi_template
+
+
+class hdfMap_msi_discharge(hdfMap_msi_template):
+    """
+    Mapping class for the 'Discharge' MSI diagnostic.
+
+    Signals :code:`'voltage'` (cathode-anode voltage) and
+    :code:`'current'` (discharge current) are traces sampled every
+    :code:`configs['attrs']['dt']` starting at
+    :code:`configs['attrs']['t0']`.
+    """
+    def __init__(self, diag_group):
+        """
+        :param diag_group: the HDF5 MSI diagnostic group
+        :type diag_group: :class:`h5py.Group`
+        """
+        # initialize
+        hdfMap_msi_template.__init__(self, diag_group)
+
+        # populate self.configs
+        self._build_configs()
+
+        # verify self.configs
+        self._verify_map()
+
+    def _build_configs(self):
+        summary = 'Discharge summary'
+        self.configs['shotnum'] = self._dset_spec(summary,
+                                                  'Shot number')
+        self.configs['signals'] = {
+            'voltage': self._dset_spec('Cathode-anode voltage'),
+            'current': self._dset_spec('Discharge current')}
+        self.configs['meta'] = {
+            'timestamp': self._dset_spec(summary, 'Timestamp'),
+            'data valid': self._dset_spec(summary, 'Data valid'),
+            'pulse length': self._dset_spec(summary, 'Pulse length'),
+            'peak current': self._dset_spec(summary, 'Peak current'),
+            'bank voltage': self._dset_spec(summary, 'Bank voltage')}
+        self.configs['attrs'] = {
+            'calibration tag': self._attr('Calibration tag'),
+            'current conversion factor':
+                self._attr('Current conversion factor'),
+            'voltage conversion factor':
+                self._attr('Voltage conversion factor'),
+            't0': self._attr('Start time'),
+            'dt': self._attr('Timestep')}
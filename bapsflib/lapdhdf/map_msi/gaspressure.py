@@ -0,0 +1,54 @@
+# This file is part of the bapsflib package, a Python toolkit for the
+# BaPSF group at UCLA.
+#
+# http://plasma.physics.ucla.edu/
+#
+# Copyright 2017-2018 Erik T. Everson and contributors
+#
+# License: Standard 3-clause BSD; see "LICENSES/LICENSE.txt" for full
+#   license terms and contributor agreement.
+#
+from .msi_template import hdfMap_msi_template
+
+
+class hdfMap_msi_gaspressure(hdfMap_msi_template):
+    """
+    Mapping class for the 'Gas pressure' MSI diagnostic.
+
+    Signal :code:`'partial pressures'` holds the RGA partial pressure
+    of each AMU in :code:`configs['attrs']['RGA AMUs']`.
+    """
+    def __init__(self, diag_group):
+        """
+        :param diag_group: the HDF5 MSI diagnostic group
+        :type diag_group: :class:`h5py.Group`
+        """
+        # initialize
+        hdfMap_msi_template.__init__(self, diag_group)
+
+        # populate self.configs
+        self._build_configs()
+
+        # verify self.configs
+        self._verify_map()
+
+    def _build_configs(self):
+        summary = 'Gas pressure summary'
+        self.configs['shotnum'] = self._dset_spec(summary,
+                                                  'Shot number')
+        self.configs['signals'] = {
+            'partial pressures':
+                self._dset_spec('RGA partial pressures')}
+        self.configs['meta'] = {
+            'timestamp': self._dset_spec(summary, 'Timestamp'),
+            'data valid': self._dset_spec(summary, 'Data valid'),
+            'ion gauge data': self._dset_spec(summary,
+                                              'Ion gauge data'),
+            'RGA valid': self._dset_spec(summary, 'RGA valid'),
+            'fill pressure': self._dset_spec(summary, 'Fill pressure'),
+            'peak AMU': self._dset_spec(summary, 'Peak AMU')}
+        self.configs['attrs'] = {
+            'ion gauge calibration tag':
+                self._attr('Ion gauge calibration tag'),
+            'RGA calibration tag': self._attr('RGA calibration tag'),
+            'RGA AMUs': self._attr('RGA AMUs')}
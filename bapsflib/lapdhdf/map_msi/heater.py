@@ -0,0 +1,46 @@
+# This file is part of the bapsflib package, a Python toolkit for the
+# BaPSF group at UCLA.
+#
+# http://plasma.physics.ucla.edu/
+#
+# Copyright 2017-2018 Erik T. Everson and contributors
+#
+# License: Standard 3-clause BSD; see "LICENSES/LICENSE.txt" for full
+#   license terms and contributor agreement.
+#
+from .msi_template import hdfMap_msi_template
+
+
+class hdfMap_msi_heater(hdfMap_msi_template):
+    """
+    Mapping class for the 'Heater' MSI diagnostic.  The heater only
+    records summary values (no traces).
+    """
+    def __init__(self, diag_group):
+        """
+        :param diag_group: the HDF5 MSI diagnostic group
+        :type diag_group: :class:`h5py.Group`
+        """
+        # initialize
+        hdfMap_msi_template.__init__(self, diag_group)
+
+        # populate self.configs
+        self._build_configs()
+
+        # verify self.configs
+        self._verify_map()
+
+    def _build_configs(self):
+        summary = 'Heater summary'
+        self.configs['shotnum'] = self._dset_spec(summary,
+                                                  'Shot number')
+        self.configs['signals'] = {}
+        self.configs['meta'] = {
+            'timestamp': self._dset_spec(summary, 'Timestamp'),
+            'data valid': self._dset_spec(summary, 'Data valid'),
+            'current': self._dset_spec(summary, 'Heater current'),
+            'voltage': self._dset_spec(summary, 'Heater voltage'),
+            'temperature': self._dset_spec(summary,
+                                           'Heater temperature')}
+        self.configs['attrs'] = {
+            'calibration tag': self._attr('Heater calibration tag')}
@@ -0,0 +1,65 @@
+# This file is part of the bapsflib package, a Python toolkit for the
+# BaPSF group at UCLA.
+#
+# http://plasma.physics.ucla.edu/
+#
+# Copyright 2017-2018 Erik T. Everson and contributors
+#
+# License: Standard 3-clause BSD; see "LICENSES/LICENSE.txt" for full
+#   license terms and contributor agreement.
+#
+from .msi_template import hdfMap_msi_template
+
+
+class hdfMap_msi_interferometerarray(hdfMap_msi_template):
+    """
+    Mapping class for the 'Interferometer array' MSI diagnostic.
+
+    Each interferometer (sub-group :code:`'Interferometer [i]'`)
+    records its own trace and summary list, so :code:`'signal'` and
+    :code:`'peak density'` are read with one entry per
+    interferometer.  The per-interferometer :code:`'t0'`,
+    :code:`'dt'`, :code:`'n_bar_L'`, and :code:`'z'` are lists in
+    :code:`configs['attrs']`.
+    """
+    def __init__(self, diag_group):
+        """
+        :param diag_group: the HDF5 MSI diagnostic group
+        :type diag_group: :class:`h5py.Group`
+        """
+        # initialize
+        hdfMap_msi_template.__init__(self, diag_group)
+
+        # populate self.configs
+        self._build_configs()
+
+        # verify self.configs
+        self._verify_map()
+
+    def _build_configs(self):
+        # interferometer sub-groups, in index order
+        inames = [name for name in self.sgroup_names
+                  if name.startswith('Interferometer [')]
+        inames.sort(key=lambda name: int(name[16:].strip('] ')))
+        if len(inames) == 0:
+            raise ValueError('no interferometer groups found')
+        summaries = tuple(name + '/Interferometer summary list'
+                          for name in inames)
+        traces = tuple(name + '/Interferometer trace'
+                       for name in inames)
+
+        self.configs['shotnum'] = self._dset_spec(summaries,
+                                                  'Shot number')
+        self.configs['signals'] = {'signal': self._dset_spec(traces)}
+        self.configs['meta'] = {
+            'timestamp': self._dset_spec(summaries, 'Timestamp'),
+            'data valid': self._dset_spec(summaries, 'Data valid'),
+            'peak density': self._dset_spec(summaries, 'Peak density')}
+        igroups = [self.group[name] for name in inames]
+        self.configs['attrs'] = {
+            'calibration tag': self._attr('Calibration tag'),
+            'interferometer count': len(inames),
+            't0': [self._attr('Start time', ig) for ig in igroups],
+            'dt': [self._attr('Timestep', ig) for ig in igroups],
+            'n_bar_L': [self._attr('n_bar_L', ig) for ig in igroups],
+            'z': [self._attr('z location', ig) for ig in igroups]}
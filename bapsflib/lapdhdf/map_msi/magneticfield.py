@@ -0,0 +1,51 @@
+# This file is part of the bapsflib package, a Python toolkit for the
+# BaPSF group at UCLA.
+#
+# http://plasma.physics.ucla.edu/
+#
+# Copyright 2017-2018 Erik T. Everson and contributors
+#
+# License: Standard 3-clause BSD; see "LICENSES/LICENSE.txt" for full
+#   license terms and contributor agreement.
+#
+from .msi_template import hdfMap_msi_template
+
+
+class hdfMap_msi_magneticfield(hdfMap_msi_template):
+    """
+    Mapping class for the 'Magnetic field' MSI diagnostic.
+
+    Signal :code:`'profile'` is the axial magnetic field profile at
+    the positions :code:`configs['attrs']['z']` and
+    :code:`'supply currents'` are the magnet power supply currents.
+    """
+    def __init__(self, diag_group):
+        """
+        :param diag_group: the HDF5 MSI diagnostic group
+        :type diag_group: :class:`h5py.Group`
+        """
+        # initialize
+        hdfMap_msi_template.__init__(self, diag_group)
+
+        # populate self.configs
+        self._build_configs()
+
+        # verify self.configs
+        self._verify_map()
+
+    def _build_configs(self):
+        summary = 'Magnetic field summary'
+        self.configs['shotnum'] = self._dset_spec(summary,
+                                                  'Shot number')
+        self.configs['signals'] = {
+            'profile': self._dset_spec('Magnetic field profile'),
+            'supply currents':
+                self._dset_spec('Magnet power supply currents')}
+        self.configs['meta'] = {
+            'timestamp': self._dset_spec(summary, 'Timestamp'),
+            'data valid': self._dset_spec(summary, 'Data valid'),
+            'peak magnetic field':
+                self._dset_spec(summary, 'Peak magnetic field')}
+        self.configs['attrs'] = {
+            'calibration tag': self._attr('Calibration tag'),
+            'z': self._attr('Profile z locations')}
@@ -5,23 +5,45 @@
 #
 # Copyright 2017-2018 Erik T. Everson and contributors
 #
-# License:
-#
-# TODO: determine a default structure for all diagnostic msi classes
+# License: Standard 3-clause BSD; see "LICENSES/LICENSE.txt" for full
+#   license terms and contributor agreement.
 #
 import h5py
 
+from warnings import warn
+
+from .discharge import hdfMap_msi_discharge
+from .gaspressure import hdfMap_msi_gaspressure
+from .heater import hdfMap_msi_heater
+from .interferometerarray import hdfMap_msi_interferometerarray
+from .magneticfield import hdfMap_msi_magneticfield
+from ..hdftraverse import (GROUP, list_members)
+
 
 class hdfMap_msi(dict):
+    """
+    A dictionary that contains mapping objects for all the discovered
+    MSI diagnostics in the HDF5 MSI group.  The dictionary keys are
+    the names of the discovered diagnostics.
+
+    For example,
+
+        >>> msi_maps = hdfMap_msi(msi_group)
+        >>> msi_maps['Discharge']
+        Out: <bapsflib.lapdhdf.map_msi.discharge.hdfMap_msi_discharge>
+    """
     __defined_diagnostic_mappings = {
-        'Discharge': 'discharge map',
-        'Gas pressure': 'gas pressure map',
-        'Heater': 'heater map',
-        'Interferometer array': 'inter map',
-        'Magnetic field': 'magnetic field map'}
+        'Discharge': hdfMap_msi_discharge,
+        'Gas pressure': hdfMap_msi_gaspressure,
+        'Heater': hdfMap_msi_heater,
+        'Interferometer array': hdfMap_msi_interferometerarray,
+        'Magnetic field': hdfMap_msi_magneticfield}
 
     def __init__(self, msi_group):
-
+        """
+        :param msi_group: HDF5 group containing the MSI diagnostics
+        :type msi_group: :class:`h5py.Group`
+        """
         # condition msi_group arg
         if not isinstance(msi_group, h5py.Group):
             raise TypeError('msi_group is not of type h5py.Group')
@@ -31,10 +53,7 @@ class hdfMap_msi(dict):
         # Determine Diagnostics in msi
         # - it is assumed that any subgroup of 'MSI/' is a diagnostic
         # - any dataset directly under 'MSI/' is ignored
-        self.found_diagnostics = []
-        for key in msi_group.keys():
-            if isinstance(msi_group[key], h5py.Group):
-                self.found_diagnostics.append(key)
+        self.found_diagnostics = list_members(msi_group, GROUP)
 
         if len(self.found_diagnostics) == 0:
             self.found_diagnostics = None
@@ -44,24 +63,49 @@ class hdfMap_msi(dict):
 
     @property
     def group(self):
+        """
+        :return: the HDF5 MSI group
+        :rtype: :class:`h5py.Group`
+        """
         return self.__msi_group
 
     @property
     def predefined_diagnostic_groups(self):
+        """
+        :return: list of the predefined MSI diagnostic group names
+        :rtype: list(str)
+        """
         return list(self.__defined_diagnostic_mappings.keys())
 
     def is_diagnostic_in_context(self, diag_name):
+        """
+        :return: :code:`True` if a mapping is defined for diagnostic
+            :data:`diag_name`
+        :rtype: bool
+        """
         return diag_name in self.predefined_diagnostic_groups
 
     @property
     def __build_dict(self):
-        # do not attach item if mapping is not known
+        """
+        Builds the dictionary of MSI diagnostic mapping objects.  A
+        known diagnostic whose group does not follow the expected
+        layout is skipped with a warning.
+
+        :return: MSI diagnostic mapping dictionary
+        :rtype: dict
+        """
         msi_dict = {}
         try:
             for item in self.found_diagnostics:
-                if item in self.__defined_diagnostic_mappings.keys():
-                    msi_dict[item] = \
-                        self.__defined_diagnostic_mappings[item]
+                if item in self.__defined_diagnostic_mappings:
+                    try:
+                        msi_dict[item] = \
+                            self.__defined_diagnostic_mappings[item](
+                                self.__msi_group[item])
+                    except (KeyError, ValueError, TypeError) as err:
+                        warn("MSI diagnostic '{}' could not be "
+                             "mapped: {}".format(item, err))
         except TypeError:
             pass
 
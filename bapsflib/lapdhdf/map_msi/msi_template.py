@@ -0,0 +1,240 @@
+# This file is part of the bapsflib package, a Python toolkit for the
+# BaPSF group at UCLA.
+#
+# http://plasma.physics.ucla.edu/
+#
+# Copyright 2017-2018 Erik T. Everson and contributors
+#
+# License: Standard 3-clause BSD; see "LICENSES/LICENSE.txt" for full
+#   license terms and contributor agreement.
+#
+import h5py
+import numpy as np
+
+from abc import ABC, abstractmethod
+
+from ..hdftraverse import (DATASET, GROUP, list_members)
+
+
+class hdfMap_msi_template(ABC):
+    """
+    Template class for all MSI diagnostic mapping classes to inherit
+    from.
+
+    Any inheriting class should define :code:`__init__` as::
+
+        def __init__(self, diag_group):
+            # initialize
+            hdfMap_msi_template.__init__(self, diag_group)
+
+            # populate self.configs
+            self._build_configs()
+
+            # verify self.configs
+            self._verify_map()
+
+    .. note::
+
+        Any method that raises a :exc:`NotImplementedError` is intended
+        to be overwritten by the inheriting class.
+    """
+    def __init__(self, diag_group):
+        """
+        :param diag_group: the MSI diagnostic HDF5 group
+        :type diag_group: :class:`h5py.Group`
+        """
+        # condition diag_group arg
+        if isinstance(diag_group, h5py.Group):
+            self.__diag_group = diag_group
+        else:
+            raise TypeError('arg diag_group is not of type h5py.Group')
+
+        # define info attribute
+        self.info = {'group name': diag_group.name.split('/')[-1],
+                     'group path': diag_group.name}
+        """
+        Information dictionary of the MSI diagnostic
+
+        .. code-block:: python
+
+            info = {
+                'group name': str, # name of diagnostic group
+                'group path': str, # full path to diagnostic group
+            }
+        """
+
+        self.configs = {}
+        """
+        Configuration dictionary of the MSI diagnostic.  Every per-shot
+        quantity is described by a field specification, a dictionary
+
+        .. code-block:: python
+
+            spec = {
+                'dset paths': (str, ), # paths of the datasets holding
+                                       # the quantity, one per
+                                       # sub-device (e.g. one per
+                                       # interferometer)
+                'dset field': str,     # field of a structured dataset
+                                       # (None if the dataset rows are
+                                       # the values, e.g. traces)
+                'shape': tuple,        # shape of one value per
+                                       # sub-device
+                'dtype': numpy.dtype,  # numpy dtype of the values
+            }
+
+        and :code:`configs` is
+
+        .. code-block:: python
+
+            configs = {
+                'shotnum': spec, # shot numbers, row i of every dataset
+                                 # in spec['dset paths'][j] belongs to
+                                 # row i of shotnum['dset paths'][j]
+                'signals': {     # traces, e.g. 'discharge current'
+                    name: spec, },
+                'meta': {        # summary values, e.g. 'peak current'
+                    name: spec, },
+                'attrs': {       # per-diagnostic (not per-shot)
+                    name: value, }, # metadata, e.g. calibration tags
+            }
+
+        A quantity recorded by :code:`n > 1` sub-devices is read into a
+        field of shape :code:`(n,) + spec['shape']`.
+        """
+
+    @property
+    def group(self):
+        """
+        :return: HDF5 MSI diagnostic group
+        :rtype: :class:`h5py.Group`
+        """
+        return self.__diag_group
+
+    @property
+    def name(self):
+        """
+        :return: name of the MSI diagnostic
+        :rtype: str
+        """
+        return self.info['group name']
+
+    @property
+    def dataset_names(self):
+        """
+        :return: list of names of the HDF5 datasets in the diagnostic
+            group
+        :rtype: [str, ]
+        """
+        return list_members(self.group, DATASET)
+
+    @property
+    def sgroup_names(self):
+        """
+        :return: list of names of the HDF5 groups in the diagnostic
+            group
+        :rtype: [str, ]
+        """
+        return list_members(self.group, GROUP)
+
+    @property
+    def fields(self):
+        """
+        :return: field specifications of all per-shot quantities
+            (:code:`'signals'` and :code:`'meta'`), keyed by the numpy
+            field name
+        :rtype: dict
+        """
+        fields = dict(self.configs['signals'])
+        fields.update(self.configs['meta'])
+        return fields
+
+    @property
+    def dtype(self):
+        """
+        :return: numpy dtype of the per-shot quantities (without the
+            shot number)
+        :rtype: :class:`numpy.dtype`
+        """
+        npaths = len(self.configs['shotnum']['dset paths'])
+        dtype = []
+        for name, spec in self.fields.items():
+            shape = tuple(spec['shape'])
+            if npaths > 1:
+                shape = (npaths,) + shape
+            dtype.append((name, spec['dtype'], shape))
+        return np.dtype(dtype)
+
+    @abstractmethod
+    def _build_configs(self):
+        """
+        Gathers the necessary metadata and fills :data:`configs`.
+
+        :raise: :exc:`NotImplementedError`
+        """
+        raise NotImplementedError
+
+    def _dset_spec(self, dset_paths, field=None):
+        """
+        Build the field specification of a quantity held in datasets
+        :data:`dset_paths` (relative to :attr:`group`).
+
+        :param dset_paths: dataset path(s)
+        :type dset_paths: str or tuple(str)
+        :param str field: field of a structured dataset
+        :rtype: dict
+        """
+        if isinstance(dset_paths, str):
+            dset_paths = (dset_paths,)
+        dset = self.group[dset_paths[0]]
+        if field is None:
+            shape = dset.shape[1:]
+            dtype = dset.dtype
+        else:
+            if dset.dtype.names is None \
+                    or field not in dset.dtype.names:
+                raise ValueError('dataset {} has no field '
+                                 '{}'.format(dset.name, field))
+            shape = dset.dtype[field].shape
+            dtype = dset.dtype[field].base
+        return {'dset paths': tuple(self.group[path].name
+                                    for path in dset_paths),
+                'dset field': field,
+                'shape': tuple(shape),
+                'dtype': dtype}
+
+    def _attr(self, name, obj=None, default=None):
+        """Attribute :data:`name` of :data:`obj` (strings decoded)."""
+        obj = self.group if obj is None else obj
+        val = obj.attrs.get(name, default)
+        if isinstance(val, bytes):
+            val = val.decode('utf-8', 'replace')
+        elif isinstance(val, np.ndarray) and val.size == 1 \
+                and val.dtype.kind in 'iuf':
+            val = val.item()
+        return val
+
+    def _verify_map(self):
+        """
+        Verify :data:`configs` is properly formatted for the rest of
+        :mod:`bapsflib.lapdhdf`.
+        """
+        for key in ('shotnum', 'signals', 'meta', 'attrs'):
+            if key not in self.configs:
+                raise NotImplementedError(
+                    "self.configs['{}'] must be defined".format(key))
+        npaths = len(self.configs['shotnum']['dset paths'])
+        if npaths == 0:
+            raise ValueError('no shot number dataset defined')
+        for name, spec in self.fields.items():
+            for key in ('dset paths', 'dset field', 'shape', 'dtype'):
+                if key not in spec:
+                    raise NotImplementedError(
+                        "field spec of '{}' has no key "
+                        "'{}'".format(name, key))
+            if len(spec['dset paths']) != npaths:
+                raise ValueError(
+                    "field '{}' is not recorded for every "
+                    "sub-device".format(name))
+            if name == 'shotnum':
+                raise ValueError("'shotnum' is a reserved field name")
@@ -0,0 +1,204 @@
+# This file is part of the bapsflib package, a Python toolkit for the
+# BaPSF group at UCLA.
+#
+# http://plasma.physics.ucla.edu/
+#
+# Copyright 2017-2018 Erik T. Everson and contributors
+#
+# License: Standard 3-clause BSD; see "LICENSES/LICENSE.txt" for full
+#   license terms and contributor agreement.
+#
+import h5py
+import numpy as np
+
+from warnings import warn
+
+
+class FauxMSIDiagnostic(h5py.Group):
+    """
+    Base class of the Faux MSI diagnostic groups.  Inheriting classes
+    define :attr:`_GROUP_NAME` and :meth:`_update`.
+    """
+    _GROUP_NAME = NotImplemented
+
+    class _knobs(object):
+        """
+        A class that contains all the controls for specifying the
+        diagnostic group structure.
+        """
+        def __init__(self, val):
+            super().__init__()
+            self._faux = val
+
+        @property
+        def sn_size(self):
+            """Number of shot numbers in the datasets"""
+            return self._faux._sn_size
+
+        @sn_size.setter
+        def sn_size(self, val):
+            """Set the number of shot numbers in the datasets"""
+            if isinstance(val, int) and val >= 1:
+                if val != self._faux._sn_size:
+                    self._faux._sn_size = val
+                    self._faux._update()
+            else:
+                warn('`val` not valid, no update performed')
+
+        @property
+        def nt(self):
+            """Number of samples per trace"""
+            return self._faux._nt
+
+        @nt.setter
+        def nt(self, val):
+            """Set the number of samples per trace"""
+            if isinstance(val, int) and val >= 1:
+                if val != self._faux._nt:
+                    self._faux._nt = val
+                    self._faux._update()
+            else:
+                warn('`val` not valid, no update performed')
+
+    def __init__(self, id, sn_size=100, nt=64, **kwargs):
+        # ensure id is for a HDF5 group
+        if not isinstance(id, h5py.h5g.GroupID):
+            raise ValueError('{} is not a GroupID'.format(id))
+
+        # create diagnostic group
+        gid = h5py.h5g.create(id, self._GROUP_NAME.encode())
+        h5py.Group.__init__(self, gid)
+
+        self._sn_size = sn_size
+        self._nt = nt
+
+        # build sub-groups, datasets, and attributes
+        self._update()
+
+    @property
+    def knobs(self):
+        """Knobs for controlling structure of the diagnostic group"""
+        return self._knobs(self)
+
+    @property
+    def shotnum(self):
+        """Recorded shot numbers (every other shot is recorded)"""
+        return 2 * np.arange(self._sn_size, dtype=np.int32) + 1
+
+    def _summary(self, group, name, fields):
+        """
+        Write a summary dataset with the common 'Shot number',
+        'Timestamp', and 'Data valid' fields plus the scalar
+        :data:`fields`, whose values are derived from the shot
+        numbers.
+        """
+        sn = self.shotnum
+        dtype = [('Shot number', '<i4'), ('Timestamp', '<f8'),
+                 ('Data valid', 'i1')] + fields
+        data = np.zeros(self._sn_size, dtype=dtype)
+        data['Shot number'] = sn
+        data['Timestamp'] = 3.7e9 + sn
+        data['Data valid'] = 1
+        for i, field in enumerate(fields):
+            data[field[0]] = sn * (i + 1)
+        group.create_dataset(name, data=data)
+
+    def _trace(self, group, name, scale, shape=None):
+        """Write a trace dataset derived from the shot numbers."""
+        shape = (self._nt,) if shape is None else shape
+        npts = int(np.prod(shape))
+        data = np.outer(self.shotnum, np.arange(npts)) * scale
+        group.create_dataset(name, data=data.reshape(
+            (self._sn_size,) + shape).astype(np.float32))
+
+    def _update(self):
+        raise NotImplementedError
+
+
+class FauxDischarge(FauxMSIDiagnostic):
+    """Creates a Faux 'Discharge' MSI diagnostic group"""
+    _GROUP_NAME = 'Discharge'
+
+    def _update(self):
+        self.clear()
+        self.attrs.update({
+            'Calibration tag': b'08/27/2015',
+            'Current conversion factor': np.float32(1000.0),
+            'Voltage conversion factor': np.float32(100.0),
+            'Start time': np.float32(-0.0015),
+            'Timestep': np.float32(4.88e-5)})
+        self._trace(self, 'Cathode-anode voltage', 0.5)
+        self._trace(self, 'Discharge current', 2.0)
+        self._summary(self, 'Discharge summary',
+                      [('Pulse length', '<f4'),
+                       ('Peak current', '<f4'),
+                       ('Bank voltage', '<f4')])
+
+
+class FauxGasPressure(FauxMSIDiagnostic):
+    """Creates a Faux 'Gas pressure' MSI diagnostic group"""
+    _GROUP_NAME = 'Gas pressure'
+
+    def _update(self):
+        self.clear()
+        self.attrs.update({
+            'Ion gauge calibration tag': b'08/27/2015',
+            'RGA calibration tag': b'08/27/2015',
+            'RGA AMUs': np.arange(1, 51, dtype=np.int32)})
+        self._trace(self, 'RGA partial pressures', 1e-9, shape=(50,))
+        self._summary(self, 'Gas pressure summary',
+                      [('Ion gauge data', '<f4'),
+                       ('RGA valid', 'i1'),
+                       ('Fill pressure', '<f4'),
+                       ('Peak AMU', '<f4')])
+
+
+class FauxHeater(FauxMSIDiagnostic):
+    """Creates a Faux 'Heater' MSI diagnostic group"""
+    _GROUP_NAME = 'Heater'
+
+    def _update(self):
+        self.clear()
+        self.attrs['Heater calibration tag'] = b'08/27/2015'
+        self._summary(self, 'Heater summary',
+                      [('Heater current', '<f4'),
+                       ('Heater voltage', '<f4'),
+                       ('Heater temperature', '<f4')])
+
+
+class FauxInterferometerArray(FauxMSIDiagnostic):
+    """Creates a Faux 'Interferometer array' MSI diagnostic group"""
+    _GROUP_NAME = 'Interferometer array'
+    _N_INTERFEROMETERS = 7
+
+    def _update(self):
+        self.clear()
+        self.attrs.update({
+            'Calibration tag': b'08/27/2015',
+            'Interferometer count': self._N_INTERFEROMETERS})
+        for i in range(self._N_INTERFEROMETERS):
+            igroup = self.create_group('Interferometer [{}]'.format(i))
+            igroup.attrs.update({
+                'Start time': np.float32(-0.0015),
+                'Timestep': np.float32(4.88e-5),
+                'n_bar_L': np.float32(2.1e13),
+                'z location': np.float32(-300.0 + 100.0 * i)})
+            self._trace(igroup, 'Interferometer trace', float(i + 1))
+            self._summary(igroup, 'Interferometer summary list',
+                          [('Peak density', '<f4')])
+
+
+class FauxMagneticField(FauxMSIDiagnostic):
+    """Creates a Faux 'Magnetic field' MSI diagnostic group"""
+    _GROUP_NAME = 'Magnetic field'
+
+    def _update(self):
+        self.clear()
+        self.attrs.update({
+            'Calibration tag': b'08/27/2015',
+            'Profile z locations': np.linspace(-300.0, 2000.0, 1024)})
+        self._trace(self, 'Magnetic field profile', 0.1, shape=(1024,))
+        self._trace(self, 'Magnet power supply currents', 10.0,
+                    shape=(10,))
+        self._summary(self, 'Magnetic field summary',
+                      [('Peak magnetic field', '<f4')])
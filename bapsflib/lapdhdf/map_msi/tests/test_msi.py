@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# This file is part of the bapsflib package, a Python toolkit for the
+# BaPSF group at UCLA.
+#
+# http://plasma.physics.ucla.edu/
+#
+# Copyright 2017-2018 Erik T. Everson and contributors
+#
+# License: Standard 3-clause BSD; see "LICENSES/LICENSE.txt" for full
+#   license terms and contributor agreement.
+#
+import numpy as np
+import unittest as ut
+
+from ..discharge import hdfMap_msi_discharge
+from ..gaspressure import hdfMap_msi_gaspressure
+from ..heater import hdfMap_msi_heater
+from ..interferometerarray import hdfMap_msi_interferometerarray
+from ..magneticfield import hdfMap_msi_magneticfield
+from ..map_msi import hdfMap_msi
+from ..msi_template import hdfMap_msi_template
+
+from bapsflib.lapdhdf.tests import FauxHDFBuilder
+
+
+class TestMSIMaps(ut.TestCase):
+    """Test Case for the MSI diagnostic mapping classes"""
+
+    def setUp(self):
+        self.f = FauxHDFBuilder(
+            add_modules={'Discharge': {'sn_size': 20, 'nt': 32},
+                         'Gas pressure': {'sn_size': 20},
+                         'Heater': {'sn_size': 20},
+                         'Interferometer array': {'sn_size': 20,
+                                                  'nt': 32},
+                         'Magnetic field': {'sn_size': 20}})
+
+    def tearDown(self):
+        self.f.cleanup()
+
+    def group(self, name):
+        return self.f['MSI/' + name]
+
+    def assertMSIMapBasics(self, _map, group):
+        self.assertIsInstance(_map, hdfMap_msi_template)
+        self.assertEqual(_map.info['group name'], group.name.split('/')[-1])
+        self.assertEqual(_map.info['group path'], group.name)
+        self.assertIs(_map.group, group)
+        for key in ('shotnum', 'signals', 'meta', 'attrs'):
+            self.assertIn(key, _map.configs)
+
+        # every field spec points to existing datasets with the
+        # advertised shape and dtype
+        for name, spec in _map.fields.items():
+            for path in spec['dset paths']:
+                dset = self.f[path]
+                if spec['dset field'] is None:
+                    self.assertEqual(dset.shape[1:], spec['shape'])
+                else:
+                    self.assertIn(spec['dset field'], dset.dtype.names)
+            self.assertIn(name, _map.dtype.names)
+        self.assertNotIn('shotnum', _map.dtype.names)
+
+    def test_discharge(self):
+        group = self.group('Discharge')
+        _map = hdfMap_msi_discharge(group)
+        self.assertMSIMapBasics(_map, group)
+        self.assertEqual(set(_map.configs['signals']),
+                         {'voltage', 'current'})
+        self.assertEqual(_map.dtype['current'].shape, (32,))
+        self.assertIn('peak current', _map.configs['meta'])
+        self.assertEqual(_map.configs['attrs']['calibration tag'],
+                         '08/27/2015')
+        self.assertAlmostEqual(_map.configs['attrs']['dt'], 4.88e-5)
+
+    def test_gaspressure(self):
+        group = self.group('Gas pressure')
+        _map = hdfMap_msi_gaspressure(group)
+        self.assertMSIMapBasics(_map, group)
+        self.assertEqual(_map.dtype['partial pressures'].shape, (50,))
+        self.assertTrue(np.array_equal(
+            _map.configs['attrs']['RGA AMUs'], np.arange(1, 51)))
+
+    def test_heater(self):
+        group = self.group('Heater')
+        _map = hdfMap_msi_heater(group)
+        self.assertMSIMapBasics(_map, group)
+        self.assertEqual(_map.configs['signals'], {})
+        self.assertIn('temperature', _map.configs['meta'])
+
+    def test_interferometerarray(self):
+        group = self.group('Interferometer array')
+        _map = hdfMap_msi_interferometerarray(group)
+        self.assertMSIMapBasics(_map, group)
+        self.assertEqual(len(_map.configs['shotnum']['dset paths']), 7)
+        self.assertEqual(_map.dtype['signal'].shape, (7, 32))
+        self.assertEqual(_map.dtype['peak density'].shape, (7,))
+        self.assertEqual(len(_map.configs['attrs']['z']), 7)
+
+    def test_magneticfield(self):
+        group = self.group('Magnetic field')
+        _map = hdfMap_msi_magneticfield(group)
+        self.assertMSIMapBasics(_map, group)
+        self.assertEqual(_map.dtype['profile'].shape, (1024,))
+        self.assertEqual(_map.dtype['supply currents'].shape, (10,))
+        self.assertEqual(_map.configs['attrs']['z'].shape, (1024,))
+
+    def test_map_msi(self):
+        msi = hdfMap_msi(self.f['MSI'])
+        self.assertEqual(set(msi), {'Discharge', 'Gas pressure',
+                                    'Heater', 'Interferometer array',
+                                    'Magnetic field'})
+        self.assertIsInstance(msi['Heater'], hdfMap_msi_heater)
+
+        # a malformed group is skipped with a warning
+        del self.f['MSI/Heater/Heater summary']
+        with self.assertWarns(UserWarning):
+            msi = hdfMap_msi(self.f['MSI'])
+        self.assertNotIn('Heater', msi)
+
+    def test_errors(self):
+        self.assertRaises(TypeError, hdfMap_msi_discharge,
+                          self.f['MSI/Discharge/Discharge summary'])
+        _map = hdfMap_msi_discharge(self.group('Discharge'))
+        self.assertRaises(ValueError, _map._dset_spec,
+                          'Discharge summary', 'Not a field')
+
+
+if __name__ == '__main__':
+    ut.main()
@@ -9,3 +9,4 @@
 #   license terms and contributor agreement.
 #
 from .fauxhdfbuilder import FauxHDFBuilder
+from .fauxsynthetic import FauxSyntheticBuilder
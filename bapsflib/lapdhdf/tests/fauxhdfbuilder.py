@@ -16,13 +16,20 @@ import inspect
 from ..map_controls.tests import FauxWaveform
 from ..map_controls.tests import FauxSixK
 from ..map_digitizers.tests import FauxSIS3301
+from ..map_msi.tests import (FauxDischarge, FauxGasPressure, FauxHeater,
+                             FauxInterferometerArray,
+                             FauxMagneticField)
 
 
 class FauxHDFBuilder(h5py.File):
     """
     Builds a Faux HDF5 file that simulates a HDF5 build by the LaPD.
     """
-    _KNOWN_MSI = {}
+    _KNOWN_MSI = {'Discharge': FauxDischarge,
+                  'Gas pressure': FauxGasPressure,
+                  'Heater': FauxHeater,
+                  'Interferometer array': FauxInterferometerArray,
+                  'Magnetic field': FauxMagneticField}
     _KNOWN_DIGITIZERS = {'SIS 3301': FauxSIS3301}
     _KNOWN_CONTROLS = {'Waveform': FauxWaveform,
                        '6K Compumotor': FauxSixK}
@@ -0,0 +1,549 @@
+# This file is part of the bapsflib package, a Python toolkit for the
+# BaPSF group at UCLA.
+#
+# http://plasma.physics.ucla.edu/
+#
+# Copyright 2017-2018 Erik T. Everson and contributors
+#
+# License: Standard 3-clause BSD; see "LICENSES/LICENSE.txt" for full
+#   license terms and contributor agreement.
+#
+import h5py
+import numpy as np
+import os
+import tempfile
+
+
+class FauxSyntheticBuilder(object):
+    """
+    Writes a large, realistic, synthetic HDF5 file that simulates a
+    HDF5 file built by the LaPD.
+
+    Unlike :class:`~bapsflib.lapdhdf.tests.FauxHDFBuilder`, which
+    builds small files in memory, all datasets are written in blocks
+    of rows (bounding memory to roughly :data:`block_bytes`) so files
+    of many GB can be generated.  The file content is fully determined
+    by the keywords and :data:`seed`:
+
+    * digitizer 'SIS 3301' and/or 'SIS crate' (with 'SIS 3302' and
+      'SIS 3305' boards), with :data:`n_configs` configurations of
+      which the first is active
+    * chunked and compressed datasets
+    * shot number gaps and duplicates (shared by all devices, see
+      :attr:`shotnum`)
+    * '6K Compumotor' probes whose positions step through the
+      motion list grid (see :meth:`position`)
+    * 'Waveform' configurations interleaved in the 'Run time list'
+      and cycling through their command lists (see :meth:`command`)
+    * digitizer signals whose amplitude follows the probe position
+
+    :Example:
+
+        >>> fsynth = FauxSyntheticBuilder(
+        ...     nshots=20000, nt=10000, shot_gaps=0.01,
+        ...     channels={'SIS 3301': [(0, 0), (0, 1)]}, grid=(21, 21))
+        >>> f = lapdhdf.File(fsynth.path)
+        >>> ...
+        >>> fsynth.cleanup()
+    """
+    def __init__(self, name=None, nshots=1000, nt=10000,
+                 digitizer='SIS 3301', channels=None, n_configs=1,
+                 chunk_rows='auto', compression='gzip',
+                 compression_opts=None, shot_gaps=0.0,
+                 shot_duplicates=0.0, sixk_probes=1, grid=(5, 5),
+                 shots_per_position=None, waveform_configs=1,
+                 n_commands=3, shots_per_command=5,
+                 block_bytes=64 * 2 ** 20, seed=0):
+        """
+        :param str name: name of HDF5 file (a temporary file is
+            created if :code:`None`)
+        :param int nshots: shot numbers span :code:`1` to
+            :data:`nshots` (before gaps and duplicates)
+        :param int nt: number of samples per shot
+        :param digitizer: :code:`'SIS 3301'`, :code:`'SIS crate'`, or
+            a list of both for a run recorded on both digitizers
+        :type digitizer: str or list(str)
+        :param channels: dictionary of adc name to a list of
+            :code:`(board, channel)` tuples of the active channels.
+            The default is :code:`{'SIS 3301': [(0, 0)]}` for the
+            'SIS 3301' and :code:`{'SIS 3302': [(1, 1)],
+            'SIS 3305': [(1, 1)]}` for the 'SIS crate'.
+        :type channels: dict
+        :param int n_configs: number of digitizer configurations
+        :param chunk_rows: rows per chunk of the digitizer datasets,
+            :code:`'auto'` targets 1 MB chunks and :code:`None` writes
+            contiguous (uncompressed) datasets
+        :type chunk_rows: int, :code:`'auto'`, or :code:`None`
+        :param str compression: compression filter of chunked
+            datasets (:code:`None` for no compression)
+        :param compression_opts: options of the compression filter
+        :param float shot_gaps: fraction of shot numbers not recorded
+        :param float shot_duplicates: fraction of recorded shot
+            numbers recorded twice
+        :param int sixk_probes: number of '6K Compumotor' probes
+            (:code:`0` omits the device)
+        :param tuple grid: :code:`(Nx, Ny)` points of the motion list
+        :param int shots_per_position: shots taken at each grid point
+            (default spreads :data:`nshots` over the grid)
+        :param int waveform_configs: number of 'Waveform'
+            configurations (:code:`0` omits the device)
+        :param int n_commands: commands per 'Waveform' command list
+        :param int shots_per_command: shots taken per command
+        :param int block_bytes: approximate memory (in bytes) used
+            while writing a dataset
+        :param int seed: seed of all random content
+        """
+        digitizers = [digitizer] if isinstance(digitizer, str) \
+            else list(digitizer)
+        adcs = {'SIS 3301': ['SIS 3301'],
+                'SIS crate': ['SIS 3302', 'SIS 3305']}
+        if not digitizers \
+                or any(digi not in adcs for digi in digitizers):
+            raise ValueError("digitizer must be 'SIS 3301' and/or "
+                             "'SIS crate'")
+        if channels is None:
+            channels = {}
+            if 'SIS 3301' in digitizers:
+                channels['SIS 3301'] = [(0, 0)]
+            if 'SIS crate' in digitizers:
+                channels.update({'SIS 3302': [(1, 1)],
+                                 'SIS 3305': [(1, 1)]})
+        valid_adc = [adc for digi in digitizers for adc in adcs[digi]]
+        for adc in channels:
+            if adc not in valid_adc:
+                raise ValueError('adc {} is not an adc of '
+                                 '{}'.format(adc, digitizer))
+        if not 0.0 <= shot_gaps < 1.0 \
+                or not 0.0 <= shot_duplicates <= 1.0:
+            raise ValueError('shot_gaps and shot_duplicates must be '
+                             'fractions')
+        if chunk_rows is None:
+            compression = None
+
+        self._nt = nt
+        self._digitizers = digitizers
+        self._channels = {adc: sorted(set(brdch))
+                          for adc, brdch in channels.items()}
+        self._n_configs = n_configs
+        self._chunk_rows = chunk_rows
+        self._compression = compression
+        self._compression_opts = compression_opts
+        self._sixk_probes = sixk_probes
+        self._grid = (int(grid[0]), int(grid[1]))
+        self._waveform_configs = waveform_configs
+        self._n_commands = n_commands
+        self._shots_per_command = shots_per_command
+        self._block_bytes = block_bytes
+        self._seed = seed
+        self._shots_per_position = shots_per_position \
+            if shots_per_position is not None \
+            else max(1, nshots // (self._grid[0] * self._grid[1]))
+
+        # define the recorded shot numbers
+        rng = np.random.RandomState(seed)
+        shotnum = np.arange(1, nshots + 1, dtype=np.uint32)
+        shotnum = shotnum[rng.random_sample(nshots) >= shot_gaps]
+        dups = rng.random_sample(shotnum.size) < shot_duplicates
+        self._shotnum = np.repeat(shotnum, 1 + dups.astype(np.intp))
+
+        # define file name, directory, and path
+        if name is None:
+            self._tempdir = \
+                tempfile.TemporaryDirectory(prefix='hdf-test_')
+            self._path = os.path.join(self._tempdir.name,
+                                      'synthetic.hdf5')
+        else:
+            self._tempdir = None
+            self._path = name
+
+        # write file
+        try:
+            with h5py.File(self._path, 'w') as f:
+                self._build(f)
+        except BaseException:
+            self.cleanup()
+            raise
+
+    @property
+    def path(self):
+        """Path to HDF5 file"""
+        return self._path
+
+    @property
+    def tempdir(self):
+        """
+        Temporary directory containing :attr:`path`.  :code:`None` if
+        a file name was specified upon creation.
+        """
+        return self._tempdir
+
+    @property
+    def shotnum(self):
+        """Recorded shot numbers (the rows of every dataset)"""
+        return self._shotnum.copy()
+
+    @property
+    def channels(self):
+        """Dictionary of adc name to active (board, channel) tuples"""
+        return {adc: list(brdch)
+                for adc, brdch in self._channels.items()}
+
+    def cleanup(self):
+        """Remove the temporary directory and file (if any)."""
+        if self._tempdir is not None:
+            self._tempdir.cleanup()
+
+    def position(self, shotnum):
+        """
+        Probe :code:`(x, y, z)` positions of shots :data:`shotnum`.
+        Positions step through the motion list grid (x fastest),
+        spending :data:`shots_per_position` shots at each point.
+
+        :param shotnum: shot numbers
+        :type shotnum: :class:`numpy.ndarray`
+        :rtype: :class:`numpy.ndarray` of shape :code:`(N, 3)`
+        """
+        nx, ny = self._grid
+        point = ((np.asarray(shotnum, dtype=np.int64) - 1)
+                 // self._shots_per_position) % (nx * ny)
+        xyz = np.zeros((point.shape[0], 3))
+        xyz[:, 0] = (point % nx) - 0.5 * (nx - 1)
+        xyz[:, 1] = (point // nx) - 0.5 * (ny - 1)
+        return xyz
+
+    def command(self, shotnum, config=0):
+        """
+        'Waveform' command index of shots :data:`shotnum` for
+        configuration number :data:`config` (each configuration
+        cycles through the command list with a different offset).
+
+        :param shotnum: shot numbers
+        :type shotnum: :class:`numpy.ndarray`
+        :param int config: configuration number (starting at 0)
+        :rtype: :class:`numpy.ndarray`
+        """
+        sn = np.asarray(shotnum, dtype=np.int64)
+        return (((sn - 1) // self._shots_per_command) + config) \
+            % self._n_commands
+
+    def _build(self, f):
+        """Write all groups and datasets into file :data:`f`."""
+        f.create_group('MSI')
+        f.create_group('Raw data + config')
+        f.attrs['LaPD HDF5 software version'] = b'0.0.0'
+        f['Raw data + config'].attrs['Description'] = \
+            b'synthetic LaPD data run'
+
+        rdc = f['Raw data + config']
+        if 'SIS 3301' in self._digitizers:
+            self._build_sis3301(rdc.create_group('SIS 3301'))
+        if 'SIS crate' in self._digitizers:
+            self._build_siscrate(rdc.create_group('SIS crate'))
+        if self._sixk_probes:
+            self._build_sixk(rdc.create_group('6K Compumotor'))
+        if self._waveform_configs:
+            self._build_waveform(rdc.create_group('Waveform'))
+
+    def _dataset_kwargs(self, row_bytes=None):
+        """
+        h5py dataset creation keywords.  Digitizer datasets pass their
+        :data:`row_bytes` and get :data:`chunk_rows` rows per chunk
+        (the caller adds the sample dimension), all other datasets
+        are chunked automatically.
+        """
+        if self._chunk_rows is None:
+            return {}
+        elif row_bytes is None:
+            kwargs = {'chunks': True}
+        else:
+            crows = max(1, 2 ** 20 // row_bytes) \
+                if self._chunk_rows == 'auto' \
+                else int(self._chunk_rows)
+            kwargs = {'chunks': min(crows,
+                                    max(self._shotnum.shape[0], 1))}
+        if self._compression is not None:
+            kwargs['compression'] = self._compression
+            if self._compression_opts is not None:
+                kwargs['compression_opts'] = self._compression_opts
+        return kwargs
+
+    def _blocks(self, row_bytes):
+        """Yield (start, stop) row blocks of about block_bytes."""
+        nrows = self._shotnum.shape[0]
+        step = max(1, self._block_bytes // max(row_bytes, 1))
+        for start in range(0, nrows, step):
+            yield start, min(start + step, nrows)
+
+    def _write_digitizer_dataset(self, group, dset_name, sn_field,
+                                 dtype, bits, rng):
+        """
+        Write one digitizer dataset and its header dataset.  The
+        signal is a damped oscillation whose amplitude peaks at the
+        center of the probe grid, plus noise.
+        """
+        nrows = self._shotnum.shape[0]
+        nt = self._nt
+        dtype = np.dtype(dtype)
+        kwargs = self._dataset_kwargs(nt * dtype.itemsize)
+        if 'chunks' in kwargs:
+            kwargs['chunks'] = (kwargs['chunks'], nt)
+        dset = group.create_dataset(dset_name, shape=(nrows, nt),
+                                    dtype=dtype, **kwargs)
+
+        hdtype = np.dtype([(sn_field, np.uint32),
+                           ('Scale', np.float64),
+                           ('Offset', np.float64),
+                           ('Min', dtype),
+                           ('Max', dtype),
+                           ('Clipped', np.uint8)])
+        hkwargs = self._dataset_kwargs()
+        dheader = group.create_dataset(dset_name + ' headers',
+                                       shape=(nrows,), dtype=hdtype,
+                                       **hkwargs)
+
+        # signal model
+        # - counts span the adc bits and are centered on the
+        #   mid-range, a count c is c * Scale + Offset volts
+        full = 2 ** (bits - 1)
+        tt = np.arange(nt, dtype=np.float64)
+        base = np.exp(-tt / (0.5 * nt)) * np.sin(2. * np.pi * tt / 200.)
+        nx, ny = self._grid
+        width = 0.25 * max(nx, ny)
+
+        step_bytes = nt * 8
+        for start, stop in self._blocks(step_bytes):
+            sn = self._shotnum[start:stop]
+            xyz = self.position(sn)
+            amp = 0.6 * full * np.exp(
+                -(xyz[:, 0] ** 2 + xyz[:, 1] ** 2) / (2. * width ** 2))
+            block = amp[:, None] * base[None, :]
+            block += rng.normal(scale=0.01 * full, size=block.shape)
+            block += full
+            np.clip(block, 0, 2 * full - 1, out=block)
+            block = block.astype(dtype)
+            dset[start:stop] = block
+
+            header = np.empty(stop - start, dtype=hdtype)
+            header[sn_field] = sn
+            header['Scale'] = 5.0 / (2 * full - 1)
+            header['Offset'] = -2.5
+            header['Min'] = block.min(axis=1)
+            header['Max'] = block.max(axis=1)
+            header['Clipped'] = 0
+            dheader[start:stop] = header
+
+    def _build_sis3301(self, group):
+        """Write the 'SIS 3301' digitizer."""
+        group.attrs.update({
+            'Created date': b'8/21/2012 6:26:06 PM',
+            'Description': b'Hardware interface for SIS 3301 digitizer '
+                           b'boards.',
+            'Device name': b'SIS 3301',
+            'Module IP address': b'192.168.7.3',
+            'Type': b'Data acquisition'})
+
+        brdch = self._channels.get('SIS 3301', [])
+        rng = np.random.RandomState(self._seed + 1)
+        for i in range(self._n_configs):
+            config_name = 'config{:02}'.format(i + 1)
+            cgroup = group.create_group('Configuration: ' + config_name)
+            cgroup.attrs.update({
+                'Clock rate': b'Internal 100 MHz',
+                'Configuration': config_name.encode(),
+                'Samples to average': b'No averaging',
+                'Shots to average': 1,
+                'Software start': b'TRUE',
+                'Stop delay': 0,
+                'Trigger mode': b'Start/stop'})
+            boards = sorted(set(brd for brd, ch in brdch))
+            for ib, brd in enumerate(boards):
+                bgroup = cgroup.create_group('Board[{}]'.format(ib))
+                bgroup.attrs.update({'Board': brd,
+                                     'Board samples': self._nt})
+                chs = [ch for b, ch in brdch if b == brd]
+                for ic, ch in enumerate(chs):
+                    chgroup = bgroup.create_group(
+                        'Channels[{}]'.format(ic))
+                    chgroup.attrs.update({'Board': brd,
+                                          'Channel': ch,
+                                          'DC offset (mV)': 0.0,
+                                          'Data type': b'type info'})
+
+        # only the first configuration recorded data
+        for brd, ch in brdch:
+            self._write_digitizer_dataset(
+                group, 'config01 [{}:{}]'.format(brd, ch), 'Shot',
+                np.int16, 14, rng)
+
+    def _build_siscrate(self, group):
+        """Write the 'SIS crate' digitizer."""
+        group.attrs.update({
+            'Description': b'SIS crate digitizer',
+            'Device name': b'SIS crate',
+            'Type': b'Data acquisition'})
+
+        slots = {('SIS 3302', brd): 3 + 2 * brd for brd in range(1, 5)}
+        slots.update({('SIS 3305', brd): 11 + 2 * brd
+                      for brd in range(1, 3)})
+        btypes = {'SIS 3302': 2, 'SIS 3305': 3}
+        boards = []
+        for adc in ('SIS 3302', 'SIS 3305'):
+            for brd in sorted(set(brd for brd, ch
+                                  in self._channels.get(adc, []))):
+                if (adc, brd) not in slots:
+                    raise ValueError('{} has no board {}'.format(adc,
+                                                                 brd))
+                boards.append((adc, brd))
+
+        rng = np.random.RandomState(self._seed + 1)
+        for i in range(self._n_configs):
+            config_name = 'config{:02}'.format(i + 1)
+            cgroup = group.create_group(config_name)
+            indices = {'SIS 3302': 0, 'SIS 3305': 0}
+            board_types = []
+            slot_numbers = []
+            config_indices = []
+            for adc, brd in boards:
+                index = indices[adc]
+                indices[adc] += 1
+                board_types.append(btypes[adc])
+                slot_numbers.append(slots[(adc, brd)])
+                config_indices.append(index)
+
+                chs = [ch for b, ch in self._channels[adc] if b == brd]
+                sgroup = cgroup.create_group(
+                    'SIS crate {} configurations[{}]'.format(adc[-4:],
+                                                             index))
+                sgroup.attrs['Shot averaging (software)'] = 1
+                if adc == 'SIS 3302':
+                    sgroup.attrs['Sample averaging (hardware)'] = 0
+                    for ch in range(1, 9):
+                        sgroup.attrs['Enable {}'.format(ch)] = \
+                            b'TRUE' if ch in chs else b'FALSE'
+                else:
+                    sgroup.attrs['Channel mode'] = 0
+                    for ch in range(1, 9):
+                        key = 'FPGA {} Enable {}'.format(
+                            1 if ch <= 4 else 2, (ch - 1) % 4 + 1)
+                        sgroup.attrs[key] = \
+                            b'TRUE' if ch in chs else b'FALSE'
+            cgroup.attrs.update({
+                'SIS crate board types': np.array(board_types,
+                                                  dtype=np.int32),
+                'SIS crate slot numbers': np.array(slot_numbers,
+                                                   dtype=np.int32),
+                'SIS crate config indices': np.array(config_indices,
+                                                     dtype=np.int32)})
+
+        # only the first configuration recorded data
+        for adc, brd in boards:
+            slot = slots[(adc, brd)]
+            for b, ch in self._channels[adc]:
+                if b != brd:
+                    continue
+                if adc == 'SIS 3302':
+                    dname = 'config01 [Slot {}: SIS 3302 ch {}]'.format(
+                        slot, ch)
+                    bits = 16
+                else:
+                    dname = ('config01 [Slot {}: SIS 3305 FPGA {} '
+                             'ch {}]'.format(slot, 1 if ch <= 4 else 2,
+                                             (ch - 1) % 4 + 1))
+                    bits = 10
+                self._write_digitizer_dataset(group, dname,
+                                              'Shot number', np.uint16,
+                                              bits, rng)
+
+    def _build_sixk(self, group):
+        """Write the '6K Compumotor' control device."""
+        group.attrs.update({
+            'Created date': b'5/21/2004 4:09:05 PM',
+            'Description': b'Controls XY probe drives using the 6K '
+                           b'Compumotor motor controller.',
+            'Device name': b'6K Compumotor',
+            'Module IP address': b'192.168.7.6',
+            'Type': b'Motion'})
+
+        nx, ny = self._grid
+        ml_name = 'ml-0001'
+        group.create_group('Motion list: ' + ml_name).attrs.update({
+            'Created date': b'1/1/2018 12:00:00 PM',
+            'Grid center x': 0.0,
+            'Grid center y': 0.0,
+            'Delta x': 1.0,
+            'Delta y': 1.0,
+            'Nx': nx,
+            'Ny': ny,
+            'Motion list': ml_name.encode(),
+            'Data motion count': nx * ny,
+            'Motion count': -99999})
+
+        dtype = np.dtype([('Shot number', np.int32),
+                          ('x', np.float64),
+                          ('y', np.float64),
+                          ('z', np.float64),
+                          ('theta', np.float64),
+                          ('phi', np.float64),
+                          ('Motion list', np.bytes_, 120),
+                          ('Probe name', np.bytes_, 120)])
+        nrows = self._shotnum.shape[0]
+        for i in range(self._sixk_probes):
+            receptacle = i + 1
+            pname = 'probe{:02}'.format(i + 1)
+            pgroup = group.create_group(
+                'Probe: XY[{}]: {}'.format(receptacle, pname))
+            pgroup.create_group('Axes[0]')
+            pgroup.create_group('Axes[1]')
+            pgroup.attrs.update({'Port': 20 + 2 * i,
+                                 'Probe': pname.encode(),
+                                 'Probe type': b'LaPD probe',
+                                 'Receptacle': receptacle})
+
+            dname = 'XY[{}]: {}'.format(receptacle, pname)
+            dset = group.create_dataset(dname, shape=(nrows,),
+                                        dtype=dtype,
+                                        **self._dataset_kwargs())
+            for start, stop in self._blocks(dtype.itemsize):
+                sn = self._shotnum[start:stop]
+                xyz = self.position(sn)
+                data = np.zeros(stop - start, dtype=dtype)
+                data['Shot number'] = sn
+                data['x'] = xyz[:, 0]
+                data['y'] = xyz[:, 1]
+                data['z'] = xyz[:, 2]
+                data['Motion list'] = ml_name.encode()
+                data['Probe name'] = dname.encode()
+                dset[start:stop] = data
+
+    def _build_waveform(self, group):
+        """Write the 'Waveform' control device."""
+        commands = ''.join(
+            'FREQ {:f} \n'.format(40000. * (i + 1))
+            for i in range(self._n_commands)).encode()
+        config_names = []
+        for i in range(self._waveform_configs):
+            config_name = 'config{:02}'.format(i + 1)
+            config_names.append(config_name)
+            group.create_group(config_name).attrs.update({
+                'IP address': '192.168.1.{}'.format(i + 1).encode(),
+                'Generator type': b'Agilent 33220A - LAN',
+                'Waveform command list': commands})
+
+        # configurations are interleaved, one row per configuration
+        # per shot
+        nconf = self._waveform_configs
+        dtype = np.dtype([('Shot number', '<i4'),
+                          ('Configuration name', 'S120'),
+                          ('Command index', '<i4')])
+        nrows = self._shotnum.shape[0]
+        dset = group.create_dataset('Run time list',
+                                    shape=(nrows * nconf,), dtype=dtype,
+                                    **self._dataset_kwargs())
+        for start, stop in self._blocks(dtype.itemsize * nconf):
+            sn = self._shotnum[start:stop]
+            data = np.empty((stop - start, nconf), dtype=dtype)
+            for i, config_name in enumerate(config_names):
+                data[:, i]['Shot number'] = sn
+                data[:, i]['Configuration name'] = config_name.encode()
+                data[:, i]['Command index'] = self.command(sn, config=i)
+            dset[start * nconf:stop * nconf] = data.reshape(-1)
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# This file is part of the bapsflib package, a Python toolkit for the
+# BaPSF group at UCLA.
+#
+# http://plasma.physics.ucla.edu/
+#
+# Copyright 2017-2018 Erik T. Everson and contributors
+#
+# License: Standard 3-clause BSD; see "LICENSES/LICENSE.txt" for full
+#   license terms and contributor agreement.
+#
+import contextlib
+import h5py
+import io
+import numpy as np
+import unittest as ut
+
+from ..files import File
+from .fauxsynthetic import FauxSyntheticBuilder
+
+
+class TestFauxSynthetic(ut.TestCase):
+    """Test Case for the synthetic file generator"""
+
+    def setUp(self):
+        self.builders = []
+
+    def tearDown(self):
+        for fsynth in self.builders:
+            fsynth.cleanup()
+
+    def build(self, **kwargs):
+        fsynth = FauxSyntheticBuilder(**kwargs)
+        self.builders.append(fsynth)
+        return fsynth
+
+    @staticmethod
+    def open(fsynth):
+        with contextlib.redirect_stdout(io.StringIO()):
+            return File(fsynth.path)
+
+    def test_shotnum(self):
+        """Test shot number gaps and duplicates"""
+        fsynth = self.build(nshots=500, nt=16, shot_gaps=0.2,
+                            shot_duplicates=0.1, seed=3)
+        sn = fsynth.shotnum
+        unique = np.unique(sn)
+        self.assertTrue(np.all(np.diff(sn.astype(np.int64)) >= 0))
+        self.assertLess(unique.shape[0], 450)
+        self.assertGreater(sn.shape[0], unique.shape[0])
+
+        with h5py.File(fsynth.path, 'r') as f:
+            dheader = f['Raw data + config/SIS 3301/'
+                        'config01 [0:0] headers']
+            self.assertTrue(np.array_equal(dheader['Shot'], sn))
+            rtl = f['Raw data + config/Waveform/Run time list']
+            self.assertTrue(np.array_equal(rtl['Shot number'], sn))
+
+    def test_deterministic(self):
+        """Test content depends only on the seed"""
+        kwargs = {'nshots': 100, 'nt': 64, 'shot_gaps': 0.1}
+        fs1 = self.build(seed=7, **kwargs)
+        fs2 = self.build(seed=7, block_bytes=1000, **kwargs)
+        fs3 = self.build(seed=8, **kwargs)
+        dname = 'Raw data + config/SIS 3301/config01 [0:0]'
+        with h5py.File(fs1.path, 'r') as f1, \
+                h5py.File(fs2.path, 'r') as f2, \
+                h5py.File(fs3.path, 'r') as f3:
+            self.assertTrue(np.array_equal(f1[dname][...],
+                                           f2[dname][...]))
+            self.assertFalse(np.array_equal(f1[dname][...],
+                                            f3[dname][...]))
+
+    def test_storage(self):
+        """Test chunking and compression"""
+        fsynth = self.build(nshots=100, nt=1000, chunk_rows=8)
+        dname = 'Raw data + config/SIS 3301/config01 [0:0]'
+        with h5py.File(fsynth.path, 'r') as f:
+            self.assertEqual(f[dname].chunks, (8, 1000))
+            self.assertEqual(f[dname].compression, 'gzip')
+
+        fsynth = self.build(nshots=100, nt=1000, chunk_rows=None)
+        with h5py.File(fsynth.path, 'r') as f:
+            self.assertIsNone(f[dname].chunks)
+            self.assertIsNone(f[dname].compression)
+
+    def test_sis3301(self):
+        """Test reading a synthetic 'SIS 3301' file"""
+        fsynth = self.build(nshots=200, nt=500, n_configs=2,
+                            channels={'SIS 3301': [(0, 0), (2, 5)]},
+                            shot_gaps=0.1)
+        f = self.open(fsynth)
+        try:
+            configs = f.file_map.main_digitizer.configs
+            self.assertTrue(configs['config01']['active'])
+            self.assertFalse(configs['config02']['active'])
+            for brd, ch in [(0, 0), (2, 5)]:
+                data = f.read_data(brd, ch, config_name='config01',
+                                   silent=True)
+                self.assertTrue(np.array_equal(data['shotnum'],
+                                               fsynth.shotnum))
+                self.assertLess(np.abs(data['signal']).max(), 2.5)
+        finally:
+            f.close()
+
+    def test_siscrate(self):
+        """Test reading a synthetic 'SIS crate' file"""
+        channels = {'SIS 3302': [(1, 1), (3, 8)],
+                    'SIS 3305': [(1, 2), (2, 7)]}
+        fsynth = self.build(nshots=100, nt=200, digitizer='SIS crate',
+                            channels=channels)
+        f = self.open(fsynth)
+        try:
+            digi_map = f.file_map.main_digitizer
+            self.assertEqual(digi_map.info['group name'], 'SIS crate')
+            config = digi_map.configs['config01']
+            self.assertEqual(config['adc'], ['SIS 3302', 'SIS 3305'])
+            for adc, brdch in channels.items():
+                conns = {brd: chs for brd, chs, extras in config[adc]}
+                for brd, ch in brdch:
+                    self.assertIn(ch, conns[brd])
+                    data = f.read_data(brd, ch, adc=adc, silent=True)
+                    self.assertEqual(data.shape, (100,))
+        finally:
+            f.close()
+
+        self.assertRaises(ValueError, FauxSyntheticBuilder,
+                          digitizer='SIS crate',
+                          channels={'SIS 3301': [(0, 0)]})
+
+    def test_controls(self):
+        """Test 6K positions and Waveform command cycles"""
+        fsynth = self.build(nshots=120, nt=16, grid=(4, 3),
+                            shots_per_position=10, sixk_probes=2,
+                            waveform_configs=2, shots_per_command=4)
+        f = self.open(fsynth)
+        try:
+            cdata = f.read_controls([('6K Compumotor', 2)],
+                                    silent=True)
+            xyz = fsynth.position(cdata['shotnum'])
+            self.assertTrue(np.array_equal(cdata['xyz'], xyz))
+            self.assertEqual(np.unique(xyz[:, :2], axis=0).shape[0],
+                             12)
+
+            for i, config in enumerate(['config01', 'config02']):
+                cdata = f.read_controls([('Waveform', config)],
+                                        silent=True)
+                cl = f.file_map.controls['Waveform'].configs[config][
+                    'command list']
+                expected = np.array(cl)[
+                    fsynth.command(cdata['shotnum'], config=i)]
+                self.assertTrue(np.array_equal(cdata['command'],
+                                               expected))
+        finally:
+            f.close()
+
+
+if __name__ == '__main__':
+    ut.main()
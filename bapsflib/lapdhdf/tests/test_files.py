@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# This file is part of the bapsflib package, a Python toolkit for the
+# BaPSF group at UCLA.
+#
+# http://plasma.physics.ucla.edu/
+#
+# Copyright 2017-2018 Erik T. Everson and contributors
+#
+# License: Standard 3-clause BSD; see "LICENSES/LICENSE.txt" for full
+#   license terms and contributor agreement.
+#
+import numpy as np
+import unittest as ut
+
+from ..files import File
+
+from bapsflib.lapdhdf.tests import FauxHDFBuilder
+
+
+class TestFile(ut.TestCase):
+    """Test Case for lapdhdf.File"""
+
+    def setUp(self):
+        self.f = FauxHDFBuilder(
+            add_modules={'SIS 3301': {'n_configs': 1, 'sn_size': 50},
+                         'Waveform': {'n_configs': 1, 'sn_size': 50}})
+
+        # release the builder's writable handle so the file can be
+        # re-opened with a different driver
+        self.filename = self.f.filename
+        self.f.close()
+
+    def tearDown(self):
+        self.f.cleanup()
+
+    def test_in_memory(self):
+        """Test in-memory open mode"""
+        lapdf = File(self.filename)
+        self.assertFalse(lapdf.in_memory)
+        data = lapdf.read_data(0, 0, index=slice(2, 30), silent=True)
+        cdata = lapdf.read_controls(['Waveform'], shotnum=[1, 2, 3])
+        lapdf.close()
+
+        # in-memory file works with the mapping and read stack
+        lapdf = File(self.filename, in_memory=True)
+        self.assertTrue(lapdf.in_memory)
+        self.assertEqual(lapdf.driver, 'core')
+        self.assertEqual(lapdf.list_digitizers, ['SIS 3301'])
+        data_mem = lapdf.read_data(0, 0, index=slice(2, 30),
+                                   silent=True)
+        cdata_mem = lapdf.read_controls(['Waveform'],
+                                        shotnum=[1, 2, 3])
+        self.assertTrue(np.array_equal(data['shotnum'],
+                                       data_mem['shotnum']))
+        self.assertTrue(np.array_equal(data['signal'],
+                                       data_mem['signal']))
+        self.assertTrue(np.array_equal(cdata, cdata_mem))
+        lapdf.close()
+
+        # 'auto' honors the size threshold
+        lapdf = File(self.filename, in_memory='auto')
+        self.assertTrue(lapdf.in_memory)
+        lapdf.close()
+        lapdf = File(self.filename, in_memory='auto',
+                     in_memory_max_bytes=1024)
+        self.assertFalse(lapdf.in_memory)
+        lapdf.close()
+
+        # invalid usage
+        self.assertRaises(ValueError, File, self.filename,
+                          in_memory='blah')
+        self.assertRaises(ValueError, File, self.filename,
+                          mode='r+', in_memory=True)
+
+
+if __name__ == '__main__':
+    ut.main()
@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# This file is part of the bapsflib package, a Python toolkit for the
+# BaPSF group at UCLA.
+#
+# http://plasma.physics.ucla.edu/
+#
+# Copyright 2017-2018 Erik T. Everson and contributors
+#
+# License: Standard 3-clause BSD; see "LICENSES/LICENSE.txt" for full
+#   license terms and contributor agreement.
+#
+import numpy as np
+import os
+import tempfile
+import unittest as ut
+
+from ..files import File
+from ..hdfcache import (hdfReadCache, build_key)
+from ..hdfreaddata import hdfReadData
+
+from bapsflib.lapdhdf.tests import FauxHDFBuilder
+
+
+class TestHDFReadCache(ut.TestCase):
+    """Test Case for hdfReadCache"""
+
+    def setUp(self):
+        self.tempdir = tempfile.TemporaryDirectory(prefix='hdf-test_')
+
+    def tearDown(self):
+        self.tempdir.cleanup()
+
+    def test_lru_eviction(self):
+        """Test RAM budget is enforced with LRU eviction"""
+        arr = np.arange(100, dtype=np.float64)   # 800 bytes
+        cache = hdfReadCache(max_bytes=2000)
+
+        cache.put('a', arr, {'name': 'a'})
+        cache.put('b', arr + 1, {'name': 'b'})
+
+        # touch 'a' so 'b' is the least recently used
+        self.assertIsNotNone(cache.get('a'))
+        cache.put('c', arr + 2, {'name': 'c'})
+        self.assertIn('a', cache)
+        self.assertNotIn('b', cache)
+        self.assertIn('c', cache)
+        self.assertLessEqual(cache.nbytes, cache.max_bytes)
+
+        stats = cache.stats
+        self.assertEqual(stats['hits'], 1)
+        self.assertEqual(stats['evictions'], 1)
+        self.assertEqual(stats['entries'], 2)
+
+        # misses
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.stats['misses'], 1)
+
+        # returned values are copies
+        val, info = cache.get('c')
+        val[:] = -1
+        info['name'] = 'z'
+        val, info = cache.get('c')
+        self.assertTrue(np.array_equal(val, arr + 2))
+        self.assertEqual(info['name'], 'c')
+
+        # clear and reset
+        cache.clear()
+        cache.reset_stats()
+        self.assertEqual(len(cache), 0)
+        self.assertEqual(cache.stats['hits'], 0)
+
+    def test_spill(self):
+        """Test evicted entries spill to, and reload from, disk"""
+        arr = np.arange(100, dtype=np.float64)
+        cache = hdfReadCache(max_bytes=1000,
+                             spill_dir=self.tempdir.name)
+
+        cache.put('a', arr, {'name': 'a'})
+        cache.put('b', arr + 1, {'name': 'b'})
+        self.assertEqual(cache.stats['spills'], 1)
+        self.assertEqual(len(os.listdir(self.tempdir.name)), 1)
+
+        # hit from spill promotes 'a' back into RAM and spills 'b'
+        val, info = cache.get('a')
+        self.assertTrue(np.array_equal(val, arr))
+        self.assertEqual(info['name'], 'a')
+        self.assertEqual(cache.stats['spill hits'], 1)
+        self.assertIn('b', cache)
+
+        # spill budget
+        cache = hdfReadCache(max_bytes=1000,
+                             spill_dir=self.tempdir.name,
+                             max_spill_bytes=1000)
+        for key in ('c', 'd', 'e'):
+            cache.put(key, arr, {})
+        self.assertEqual(cache.stats['spilled entries'], 1)
+        self.assertEqual(cache.stats['spill evictions'], 1)
+        cache.clear()
+
+    def test_invalid_args(self):
+        """Test invalid inputs"""
+        self.assertRaises(ValueError, hdfReadCache, max_bytes=-1)
+        self.assertRaises(ValueError, hdfReadCache, max_bytes=1.5)
+        self.assertRaises(ValueError, hdfReadCache,
+                          max_spill_bytes=-1)
+
+
+class TestReadCacheIntegration(ut.TestCase):
+    """Test Case for read caching in hdfReadData and hdfReadControl"""
+
+    def setUp(self):
+        self.f = FauxHDFBuilder(
+            add_modules={'SIS 3301': {'n_configs': 1, 'sn_size': 50},
+                         'Waveform': {'n_configs': 1, 'sn_size': 50}})
+
+    def tearDown(self):
+        self.f.cleanup()
+
+    def test_file_read_cache(self):
+        """Test File.read_cache attribute"""
+        lapdf = File(self.f.filename)
+        self.assertIsNone(lapdf.read_cache)
+
+        lapdf = File(self.f.filename, read_cache=2 ** 20)
+        self.assertIsInstance(lapdf.read_cache, hdfReadCache)
+        self.assertEqual(lapdf.read_cache.max_bytes, 2 ** 20)
+
+        with self.assertRaises(TypeError):
+            lapdf.read_cache = 'blah'
+
+    def test_read_data(self):
+        """Test hdfReadData hits the cache for a repeated request"""
+        cache = hdfReadCache()
+        lapdf = File(self.f.filename, read_cache=cache)
+
+        data = hdfReadData(lapdf, 0, 0, shotnum=slice(5, 20))
+        self.assertEqual(cache.stats['misses'], 1)
+        self.assertEqual(cache.stats['hits'], 0)
+
+        data2 = hdfReadData(lapdf, 0, 0, shotnum=slice(5, 20))
+        self.assertEqual(cache.stats['hits'], 1)
+        self.assertIsInstance(data2, hdfReadData)
+        self.assertTrue(np.array_equal(data['shotnum'],
+                                       data2['shotnum']))
+        self.assertTrue(np.array_equal(data['signal'],
+                                       data2['signal']))
+        self.assertEqual(data.info, data2.info)
+
+        # an equivalent request resolves to the same rows
+        data3 = hdfReadData(lapdf, 0, 0, shotnum=list(range(5, 20)))
+        self.assertEqual(cache.stats['hits'], 2)
+        self.assertTrue(np.array_equal(data['signal'],
+                                       data3['signal']))
+
+        # a different request is a miss
+        hdfReadData(lapdf, 0, 0, index=[1, 2])
+        self.assertEqual(cache.stats['misses'], 2)
+
+        # keep_bits is part of the request
+        hdfReadData(lapdf, 0, 0, shotnum=slice(5, 20), keep_bits=True)
+        self.assertEqual(cache.stats['misses'], 3)
+
+    def test_read_controls(self):
+        """Test hdfReadControl hits the cache for a repeated request"""
+        cache = hdfReadCache()
+        lapdf = File(self.f.filename, read_cache=cache)
+
+        cdata = lapdf.read_controls(['Waveform'], shotnum=[1, 2, 3])
+        cdata2 = lapdf.read_controls(['Waveform'], shotnum=[1, 2, 3])
+        self.assertEqual(cache.stats['hits'], 1)
+        self.assertTrue(np.array_equal(cdata, cdata2))
+        self.assertEqual(cdata.info, cdata2.info)
+
+        # an equivalent request resolves to the same shot numbers
+        cdata3 = lapdf.read_controls(['Waveform'], shotnum=slice(1, 4))
+        self.assertEqual(cache.stats['hits'], 2)
+        self.assertTrue(np.array_equal(cdata, cdata3))
+
+        # control reads made by hdfReadData are not stored twice
+        nentries = len(cache)
+        hdfReadData(lapdf, 0, 0, shotnum=[7, 8],
+                    add_controls=['Waveform'])
+        self.assertEqual(len(cache), nentries + 1)
+
+    def test_build_key(self):
+        """Test cache key construction"""
+        lapdf = File(self.f.filename)
+        key1 = build_key('r', lapdf, [1, 2], slice(1, 5),
+                         np.arange(3))
+        key2 = build_key('r', lapdf, [1, 2], slice(1, 5),
+                         np.arange(3))
+        key3 = build_key('r', lapdf, [1, 2], slice(1, 6),
+                         np.arange(3))
+        self.assertEqual(key1, key2)
+        self.assertNotEqual(key1, key3)
+        self.assertEqual(hash(key1), hash(key2))
+
+
+if __name__ == '__main__':
+    ut.main()
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# This file is part of the bapsflib package, a Python toolkit for the
+# BaPSF group at UCLA.
+#
+# http://plasma.physics.ucla.edu/
+#
+# Copyright 2017-2018 Erik T. Everson and contributors
+#
+# License: Standard 3-clause BSD; see "LICENSES/LICENSE.txt" for full
+#   license terms and contributor agreement.
+#
+import os
+import tempfile
+import unittest as ut
+
+from ..hdfcatalog import (catalog_file, hdfCatalog)
+
+from bapsflib.lapdhdf.tests import FauxHDFBuilder
+
+
+class TestHDFCatalog(ut.TestCase):
+    """Test Case for hdfCatalog"""
+
+    def setUp(self):
+        self.tempdir = tempfile.TemporaryDirectory(prefix='hdf-test_')
+        os.mkdir(os.path.join(self.tempdir.name, 'sub'))
+        self.fname1 = os.path.join(self.tempdir.name, 'run01.hdf5')
+        self.fname2 = os.path.join(self.tempdir.name, 'sub',
+                                   'run02.hdf5')
+        f = FauxHDFBuilder(
+            name=self.fname1,
+            add_modules={'SIS 3301': {'n_configs': 1, 'sn_size': 20},
+                         '6K Compumotor': {'sn_size': 20},
+                         'Waveform': {'n_configs': 1, 'sn_size': 20}})
+        f.close()
+        f = FauxHDFBuilder(
+            name=self.fname2,
+            add_modules={'SIS 3301': {'n_configs': 1, 'sn_size': 5}})
+        f.close()
+        self.dbname = os.path.join(self.tempdir.name, 'catalog.sqlite')
+
+    def tearDown(self):
+        self.tempdir.cleanup()
+
+    def test_catalog_file(self):
+        """Test mapping a single file into a catalog record"""
+        record = catalog_file(self.fname1)
+        self.assertIsNone(record['error'])
+        self.assertEqual(record['hdf_version'], '0.0.0')
+        self.assertEqual(record['exp_descr'], 'some description')
+        self.assertEqual(len(record['probes']), 1)
+        self.assertEqual(len(record['waveforms']), 1)
+        self.assertEqual(len(record['motion_lists']), 1)
+        self.assertEqual(record['digitizers'][0][7:10], [1, 20, 20])
+
+        # unreadable files are recorded with an error
+        bad = os.path.join(self.tempdir.name, 'bad.hdf5')
+        with open(bad, 'w') as fobj:
+            fobj.write('not an HDF5 file')
+        self.assertIsNotNone(catalog_file(bad)['error'])
+
+        # files removed after the directory walk are recorded with an
+        # error
+        record = catalog_file(os.path.join(self.tempdir.name,
+                                           'gone.hdf5'))
+        self.assertIn('FileNotFoundError', record['error'])
+        self.assertIsNone(record['size'])
+
+    def test_build_and_query(self):
+        """Test building and querying the catalog"""
+        with hdfCatalog(self.dbname) as cat:
+            stats = cat.build(self.tempdir.name, processes=2)
+            self.assertEqual(stats, {'added': 2, 'updated': 0,
+                                     'removed': 0, 'unchanged': 0,
+                                     'errors': 0})
+            self.assertEqual(cat.files, [self.fname1, self.fname2])
+            self.assertEqual(cat.find_files(exp_descr='descr'),
+                             [self.fname1, self.fname2])
+            self.assertEqual(cat.find_files(hdf_version='1.0'), [])
+
+            # digitizer queries
+            found = cat.find_digitizer_data(digitizer='SIS 3301',
+                                            board=0, channel=0)
+            self.assertEqual(
+                found,
+                [(self.fname1,
+                  '/Raw data + config/SIS 3301/config01 [0:0]',
+                  (1, 20)),
+                 (self.fname2,
+                  '/Raw data + config/SIS 3301/config01 [0:0]',
+                  (1, 5))])
+            found = cat.find_digitizer_data(shotnum=(10, 30))
+            self.assertEqual([item[0] for item in found], [self.fname1])
+            self.assertEqual(cat.find_digitizer_data(channel=7), [])
+
+            # control queries
+            found = cat.find_probes(shotnum=12)
+            self.assertEqual(len(found), 1)
+            self.assertEqual(found[0][0], self.fname1)
+            self.assertIn('6K Compumotor', found[0][1])
+            self.assertEqual(cat.find_probes(probe='not a probe'), [])
+
+            found = cat.find_waveforms(command='FREQ', shotnum=(1, 3))
+            self.assertEqual(
+                found,
+                [(self.fname1, '/Raw data + config/Waveform/'
+                               'Run time list', (1, 20))])
+            self.assertEqual(cat.find_waveforms(command='%'), [])
+
+            mls = cat.motion_lists(self.fname1)
+            self.assertEqual(len(mls), 1)
+            for ml in mls.values():
+                self.assertIn('npoints', ml)
+
+    def test_rebuild(self):
+        """Test only changed files are re-mapped"""
+        with hdfCatalog(self.dbname) as cat:
+            cat.build(self.tempdir.name, processes=1)
+            stats = cat.build(self.tempdir.name, processes=1)
+            self.assertEqual(stats['unchanged'], 2)
+            self.assertEqual(stats['added'] + stats['updated'], 0)
+
+            os.utime(self.fname2, (0, 0))
+            os.remove(self.fname1)
+            stats = cat.build(self.tempdir.name)
+            self.assertEqual(stats, {'added': 0, 'updated': 1,
+                                     'removed': 1, 'unchanged': 0,
+                                     'errors': 0})
+            self.assertEqual(cat.files, [self.fname2])
+
+            self.assertRaises(ValueError, cat.build, self.tempdir.name,
+                              processes=0)
+
+        # catalog persists between connections
+        with hdfCatalog(self.dbname) as cat:
+            self.assertEqual(cat.files, [self.fname2])
+
+
+if __name__ == '__main__':
+    ut.main()
@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# This file is part of the bapsflib package, a Python toolkit for the
+# BaPSF group at UCLA.
+#
+# http://plasma.physics.ucla.edu/
+#
+# Copyright 2017-2018 Erik T. Everson and contributors
+#
+# License: Standard 3-clause BSD; see "LICENSES/LICENSE.txt" for full
+#   license terms and contributor agreement.
+#
+import h5py
+import numpy as np
+import os
+import tempfile
+import unittest as ut
+
+from ..files import File
+from ..hdfchunkcache import (auto_chunk_cache, open_dataset,
+                             hdfSharedChunkCache, shared_memory)
+from ..hdfreaddata import hdfReadData
+
+from bapsflib.lapdhdf.tests import FauxHDFBuilder
+
+
+class TestChunkCacheSizing(ut.TestCase):
+    """Test Case for chunk cache sizing"""
+
+    def setUp(self):
+        self.tempdir = tempfile.TemporaryDirectory(prefix='hdf-test_')
+        self.filename = os.path.join(self.tempdir.name, 'chunked.hdf5')
+        self.data = np.arange(40 * 1000,
+                              dtype=np.int16).reshape(40, 1000)
+        with h5py.File(self.filename, 'w') as f:
+            f.create_dataset('chunked', data=self.data,
+                             chunks=(4, 250), compression='gzip')
+            f.create_dataset('contiguous', data=self.data)
+
+    def tearDown(self):
+        self.tempdir.cleanup()
+
+    def test_auto_chunk_cache(self):
+        """Test automatic chunk cache sizing"""
+        with h5py.File(self.filename, 'r') as f:
+            self.assertIsNone(auto_chunk_cache(f['contiguous']))
+
+            nslots, nbytes, w0 = auto_chunk_cache(f['chunked'])
+            self.assertGreaterEqual(nbytes, 5 * 4 * 250 * 2)
+            self.assertGreaterEqual(nslots, 100)
+            self.assertEqual(w0, 1.0)
+
+            # max_nbytes bounds the size (but never below one chunk)
+            nslots, nbytes, w0 = auto_chunk_cache(f['chunked'],
+                                                  max_nbytes=1)
+            self.assertEqual(nbytes, 4 * 250 * 2)
+
+    def test_open_dataset(self):
+        """Test opening a dataset with a dataset specific cache"""
+        with h5py.File(self.filename, 'r') as f:
+            dset = open_dataset(f, 'chunked')
+            self.assertIsInstance(dset, h5py.Dataset)
+            self.assertTrue(np.array_equal(dset[[1, 5, 20], :],
+                                           self.data[[1, 5, 20], :]))
+
+            dset = open_dataset(f, 'contiguous')
+            self.assertTrue(np.array_equal(dset[...], self.data))
+
+            self.assertIsNone(open_dataset(f, 'not a dataset'))
+
+    def test_file_kwargs(self):
+        """Test File chunk cache keywords"""
+        f = FauxHDFBuilder(add_modules={'SIS 3301': {'n_configs': 1,
+                                                     'sn_size': 50}})
+        try:
+            lapdf = File(f.filename)
+            self.assertFalse(lapdf.auto_chunk_cache)
+            lapdf.close()
+
+            lapdf = File(f.filename, rdcc_nbytes='auto')
+            self.assertTrue(lapdf.auto_chunk_cache)
+            data = hdfReadData(lapdf, 0, 0, index=[1, 2, 3],
+                               silent=True)
+            self.assertEqual(data.shape, (3,))
+            lapdf.close()
+
+            lapdf = File(f.filename, rdcc_nbytes=4 * 2 ** 20,
+                         rdcc_nslots=1009, rdcc_w0=0.5)
+            self.assertFalse(lapdf.auto_chunk_cache)
+            lapdf.close()
+
+            self.assertRaises(ValueError, File, f.filename,
+                              rdcc_nbytes='blah')
+            self.assertRaises(TypeError, File, f.filename,
+                              shared_chunk_cache='blah')
+        finally:
+            f.cleanup()
+
+
+@ut.skipIf(shared_memory is None,
+           'requires multiprocessing.shared_memory')
+class TestSharedChunkCache(ut.TestCase):
+    """Test Case for hdfSharedChunkCache"""
+
+    def setUp(self):
+        self.tempdir = tempfile.TemporaryDirectory(prefix='hdf-test_')
+        self.filename = os.path.join(self.tempdir.name, 'chunked.hdf5')
+        self.data = np.arange(40 * 1000,
+                              dtype=np.int16).reshape(40, 1000)
+        with h5py.File(self.filename, 'w') as f:
+            f.create_dataset('chunked', data=self.data,
+                             chunks=(4, 250), compression='gzip')
+            f.create_dataset('contiguous', data=self.data)
+
+    def tearDown(self):
+        self.tempdir.cleanup()
+
+    def test_read_rows(self):
+        """Test reading rows through the shared cache"""
+        with hdfSharedChunkCache(prefix='bt') as scache, \
+                h5py.File(self.filename, 'r') as f:
+            dset = f['chunked']
+            index = [0, 1, 5, 17, 39]
+            rows = scache.read_rows(dset, index)
+            self.assertTrue(np.array_equal(rows, self.data[index, :]))
+            self.assertEqual(scache.stats['misses'], 4)
+            self.assertEqual(scache.stats['stores'], 4)
+
+            # slices and ints
+            rows = scache.read_rows(dset, slice(2, 10))
+            self.assertTrue(np.array_equal(rows, self.data[2:10, :]))
+            rows = scache.read_rows(dset, 3)
+            self.assertTrue(np.array_equal(rows, self.data[3, :]))
+            rows = scache.read_rows(dset, -1)
+            self.assertTrue(np.array_equal(rows, self.data[-1, :]))
+            rows = scache.read_rows(dset, slice(-5, None, 2))
+            self.assertTrue(np.array_equal(rows, self.data[-5::2, :]))
+            self.assertRaises(IndexError, scache.read_rows, dset, 40)
+            self.assertRaises(TypeError, scache.read_rows, dset, [5, 1])
+
+            # unchunked datasets are read directly
+            rows = scache.read_rows(f['contiguous'], [1, 2])
+            self.assertTrue(np.array_equal(rows, self.data[[1, 2], :]))
+
+    def test_shared_between_caches(self):
+        """Test a second cache instance re-uses stored chunks"""
+        with hdfSharedChunkCache(prefix='bt') as writer, \
+                hdfSharedChunkCache(prefix='bt') as reader, \
+                h5py.File(self.filename, 'r') as f:
+            dset = f['chunked']
+            writer.read_rows(dset, slice(None))
+            self.assertEqual(writer.stats['stores'], 10)
+
+            rows = reader.read_rows(dset, [3, 4, 30])
+            self.assertTrue(np.array_equal(rows,
+                                           self.data[[3, 4, 30], :]))
+            self.assertEqual(reader.stats['hits'], 3)
+            self.assertEqual(reader.stats['misses'], 0)
+
+    def test_budget(self):
+        """Test the per-process budget evicts the oldest segments"""
+        block_nbytes = 4 * 1000 * 2
+        with hdfSharedChunkCache(max_bytes=3 * block_nbytes + 100,
+                                 prefix='bt') as scache, \
+                h5py.File(self.filename, 'r') as f:
+            scache.read_rows(f['chunked'], slice(None))
+            self.assertLessEqual(scache.nbytes, scache.max_bytes)
+            self.assertGreater(scache.stats['evictions'], 0)
+
+        self.assertRaises(ValueError, hdfSharedChunkCache, max_bytes=-1)
+        self.assertRaises(ValueError, hdfSharedChunkCache,
+                          prefix='way_too_long')
+
+    def test_file_integration(self):
+        """Test File reads through the shared chunk cache"""
+        f = FauxHDFBuilder(add_modules={'SIS 3301': {'n_configs': 1,
+                                                     'sn_size': 50}})
+        try:
+            with hdfSharedChunkCache(prefix='bt') as scache:
+                lapdf = File(f.filename, shared_chunk_cache=scache)
+                self.assertIs(lapdf.shared_chunk_cache, scache)
+                data = hdfReadData(lapdf, 0, 0, index=[1, 2, 3],
+                                   silent=True)
+                self.assertEqual(data.shape, (3,))
+                lapdf.close()
+        finally:
+            f.cleanup()
+
+
+if __name__ == '__main__':
+    ut.main()
@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# This file is part of the bapsflib package, a Python toolkit for the
+# BaPSF group at UCLA.
+#
+# http://plasma.physics.ucla.edu/
+#
+# Copyright 2017-2018 Erik T. Everson and contributors
+#
+# License: Standard 3-clause BSD; see "LICENSES/LICENSE.txt" for full
+#   license terms and contributor agreement.
+#
+import json
+import numpy as np
+import unittest as ut
+
+from ..hdfdtype import (decode_dtype, encode_dtype)
+
+
+class TestHDFDtype(ut.TestCase):
+    """Test Case for encode_dtype and decode_dtype"""
+
+    def test_round_trip(self):
+        """Test dtypes survive a JSON round trip"""
+        dtypes = [np.dtype('>i2'),
+                  np.dtype('<f8'),
+                  np.dtype('S10'),
+                  np.dtype(('<f4', (3,))),
+                  np.dtype([('shotnum', '<u4'),
+                            ('signal', '<i2', (16,)),
+                            ('xyz', '<f8', (3,))]),
+                  np.dtype([('a', 'u1'), ('b', '<f8')], align=True),
+                  np.dtype([('Discharge', [('current', '<f4', (8,)),
+                                           ('voltage', '<f4', (8,))])])]
+        for dtype in dtypes:
+            val = json.loads(json.dumps(encode_dtype(dtype)))
+            self.assertEqual(decode_dtype(val), dtype)
+
+        # padding is kept
+        dtype = np.dtype([('a', 'u1'), ('b', '<f8')], align=True)
+        self.assertEqual(decode_dtype(encode_dtype(dtype)).itemsize,
+                         16)
+
+
+if __name__ == '__main__':
+    ut.main()
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# This file is part of the bapsflib package, a Python toolkit for the
+# BaPSF group at UCLA.
+#
+# http://plasma.physics.ucla.edu/
+#
+# Copyright 2017-2018 Erik T. Everson and contributors
+#
+# License: Standard 3-clause BSD; see "LICENSES/LICENSE.txt" for full
+#   license terms and contributor agreement.
+#
+import contextlib
+import io
+import numpy as np
+import unittest as ut
+
+from ..files import File
+from ..hdfgrid import (grid_axes, grid_index)
+
+from bapsflib.lapdhdf.tests import FauxSyntheticBuilder
+
+
+class TestHDFGrid(ut.TestCase):
+    """Test Case for hdfgrid and File.read_grid"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.fsynth = FauxSyntheticBuilder(
+            nshots=200, nt=32, grid=(4, 3), shots_per_position=4,
+            shot_gaps=0.1, seed=11)
+        with contextlib.redirect_stdout(io.StringIO()):
+            cls.lapdf = File(cls.fsynth.path)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.lapdf.close()
+        cls.fsynth.cleanup()
+
+    @property
+    def ml_config(self):
+        cmap = self.lapdf.file_map.controls['6K Compumotor']
+        return list(cmap.motion_lists.values())[0]
+
+    def test_grid_index(self):
+        """Test mapping positions to grid indices"""
+        x, y, z = grid_axes(self.ml_config)
+        self.assertTrue(np.array_equal(x, [-1.5, -0.5, 0.5, 1.5]))
+        self.assertTrue(np.array_equal(y, [-1.0, 0.0, 1.0]))
+        self.assertEqual(z.shape, (1,))
+
+        xyz = np.array([[-1.5, -1.0, 0.0],
+                        [0.6, 1.1, 0.0],
+                        [0.0, 0.0, 0.0],    # between grid points
+                        [2.5, 0.0, 0.0],    # off the grid
+                        [np.nan, 0.0, 0.0]])
+        index, valid = grid_index(xyz, self.ml_config)
+        self.assertTrue(np.array_equal(valid,
+                                       [True, True, False, False,
+                                        False]))
+        self.assertTrue(np.array_equal(index[:2, :2], [[0, 0], [2, 2]]))
+
+        # synthetic positions sit on the grid
+        sn = self.fsynth.shotnum
+        index, valid = grid_index(self.fsynth.position(sn),
+                                  self.ml_config)
+        self.assertTrue(valid.all())
+        point = ((sn.astype(np.int64) - 1) // 4) % 12
+        self.assertTrue(np.array_equal(index[:, 0], point % 4))
+        self.assertTrue(np.array_equal(index[:, 1], point // 4))
+
+    def test_dense(self):
+        """Test assembling the dense grid array"""
+        data = self.lapdf.read_data(0, 0, silent=True)
+        grid = self.lapdf.read_grid(0, 0, block_size=9)
+        nrep = grid.data.shape[2]
+        self.assertEqual(grid.data.shape, (4, 3, nrep, 32))
+        self.assertEqual(grid.shotnum.shape, (4, 3, nrep))
+        self.assertEqual(grid.skipped, 0)
+        self.assertEqual(grid.count.sum(), data.shape[0])
+        self.assertTrue(np.array_equal((grid.shotnum != 0).sum(axis=2),
+                                       grid.count))
+
+        # every placed shot matches its read_data signal and position
+        lookup = {sn: i for i, sn in enumerate(data['shotnum'])}
+        xyz = self.fsynth.position(data['shotnum'])
+        for ix, iy, irep in zip(*np.nonzero(grid.shotnum)):
+            i = lookup[grid.shotnum[ix, iy, irep]]
+            np.testing.assert_allclose(grid.data[ix, iy, irep],
+                                       data['signal'][i])
+            self.assertEqual(xyz[i, 0], grid.x[ix])
+            self.assertEqual(xyz[i, 1], grid.y[iy])
+
+        # repeats keep shot order
+        for ix in range(4):
+            for iy in range(3):
+                sn = grid.shotnum[ix, iy, :grid.count[ix, iy]]
+                self.assertTrue(np.all(np.diff(sn.astype(int)) > 0))
+        self.assertTrue(np.isnan(
+            grid.data[grid.shotnum == 0]).all())
+
+    def test_reduced(self):
+        """Test the streaming reduced grid"""
+        dense = self.lapdf.read_grid(0, 0)
+        grid = self.lapdf.read_grid(0, 0, reduce='mean', block_size=7)
+        self.assertEqual(grid.data.shape, (4, 3, 32))
+        self.assertIsNone(grid.shotnum)
+        self.assertTrue(np.array_equal(grid.count, dense.count))
+        np.testing.assert_allclose(grid.data,
+                                   np.nanmean(dense.data, axis=2),
+                                   rtol=1e-5, atol=1e-7)
+
+        grid = self.lapdf.read_grid(0, 0, reduce='max',
+                                    shotnum=slice(1, 50))
+        self.assertLessEqual(grid.count.sum(), 49)
+
+    def test_errors(self):
+        """Test invalid arguments"""
+        self.assertRaises(ValueError, self.lapdf.read_grid, 0, 0,
+                          motion_list='not a list')
+        self.assertRaises(ValueError, self.lapdf.read_grid, 0, 0,
+                          reduce='median')
+        self.assertRaises(ValueError, self.lapdf.read_grid, 0, 0,
+                          shotnum=[100000])
+
+
+if __name__ == '__main__':
+    ut.main()
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# This file is part of the bapsflib package, a Python toolkit for the
+# BaPSF group at UCLA.
+#
+# http://plasma.physics.ucla.edu/
+#
+# Copyright 2017-2018 Erik T. Everson and contributors
+#
+# License: Standard 3-clause BSD; see "LICENSES/LICENSE.txt" for full
+#   license terms and contributor agreement.
+#
+import numpy as np
+import threading
+import unittest as ut
+
+from ..files import File
+from ..hdfhandlepool import hdfHandlePool
+
+from bapsflib.lapdhdf.tests import FauxHDFBuilder
+
+
+class TestHDFHandlePool(ut.TestCase):
+    """Test Case for hdfHandlePool"""
+
+    def setUp(self):
+        self.f = FauxHDFBuilder(
+            add_modules={'SIS 3301': {'n_configs': 1, 'sn_size': 20},
+                         'Waveform': {'n_configs': 1, 'sn_size': 20}})
+        self.f.close()
+
+    def tearDown(self):
+        self.f.cleanup()
+
+    def test_shared_mapping(self):
+        """Test pooled handles share one mapping"""
+        with hdfHandlePool(max_handles=2) as pool:
+            f1 = pool.acquire(self.f.path)
+            f2 = pool.acquire(self.f.path)
+            self.assertIsNot(f1, f2)
+            self.assertIs(f1.file_map, f2.file_map)
+            self.assertEqual(pool.stats['opens'], 2)
+            self.assertEqual(pool.stats['busy handles'], 2)
+
+            data = f2.read_data(0, 0, shotnum=slice(1, 6), silent=True)
+            with File(self.f.path) as lapdf:
+                expected = lapdf.read_data(0, 0, shotnum=slice(1, 6),
+                                           silent=True)
+            self.assertTrue(np.array_equal(data['signal'],
+                                           expected['signal']))
+            pool.release(f1)
+            pool.release(f2)
+            self.assertRaises(ValueError, pool.release, f1)
+
+            # idle handles are reused
+            with pool.checkout(self.f.path) as f3:
+                self.assertIn(f3, (f1, f2))
+            stats = pool.stats
+            self.assertEqual(stats['opens'], 2)
+            self.assertEqual(stats['reuses'], 1)
+            self.assertEqual(stats['checkouts'], 3)
+            self.assertEqual(stats['open handles'], 2)
+            self.assertEqual(stats['busy handles'], 0)
+            self.assertEqual(list(pool.handles.values()), [(2, 0)])
+
+        # closing the pool closes idle handles
+        self.assertFalse(bool(f1))
+        self.assertFalse(bool(f2))
+        self.assertRaises(ValueError, pool.acquire, self.f.path)
+
+        # invalid arguments
+        self.assertRaises(ValueError, hdfHandlePool, max_handles=0)
+        self.assertRaises(ValueError, hdfHandlePool, idle_timeout=-1)
+        self.assertRaises(TypeError, hdfHandlePool, mode='r+')
+        self.assertRaises(TypeError, File, self.f.path, file_map=5)
+
+    def test_bounded(self):
+        """Test checkouts beyond max_handles wait"""
+        pool = hdfHandlePool(max_handles=1)
+        f1 = pool.acquire(self.f.path)
+        self.assertRaises(TimeoutError, pool.acquire, self.f.path,
+                          timeout=0.05)
+        self.assertEqual(pool.stats['timeouts'], 1)
+
+        # a waiting thread gets the released handle
+        result = []
+        thread = threading.Thread(
+            target=lambda: result.append(pool.acquire(self.f.path)))
+        thread.start()
+        thread.join(0.1)
+        self.assertTrue(thread.is_alive())
+        pool.release(f1)
+        thread.join(5.0)
+        self.assertEqual(result, [f1])
+        self.assertEqual(pool.stats['waits'], 1)
+        self.assertEqual(pool.stats['opens'], 1)
+
+        # checked out handles are closed on release after pool close
+        pool.close()
+        self.assertTrue(bool(f1))
+        pool.release(f1)
+        self.assertFalse(bool(f1))
+
+    def test_idle_eviction(self):
+        """Test idle handles are closed"""
+        pool = hdfHandlePool(max_handles=2, idle_timeout=None)
+        with pool.checkout(self.f.path):
+            pass
+        self.assertEqual(pool.evict_idle(), 0)
+        self.assertEqual(pool.stats['open handles'], 1)
+        pool.close()
+
+        # the handle that built the mapping is closed last
+        pool = hdfHandlePool(max_handles=2, idle_timeout=0)
+        f1 = pool.acquire(self.f.path)
+        f2 = pool.acquire(self.f.path)
+        pool.release(f1)
+        self.assertTrue(bool(f1))
+        self.assertEqual(pool.stats['evictions'], 0)
+        pool.release(f2)
+        self.assertFalse(bool(f1))
+        self.assertFalse(bool(f2))
+        self.assertEqual(pool.stats['evictions'], 2)
+        self.assertEqual(pool.stats['files'], 0)
+        pool.close()
+
+
+if __name__ == '__main__':
+    ut.main()
@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# This file is part of the bapsflib package, a Python toolkit for the
+# BaPSF group at UCLA.
+#
+# http://plasma.physics.ucla.edu/
+#
+# Copyright 2017-2018 Erik T. Everson and contributors
+#
+# License: Standard 3-clause BSD; see "LICENSES/LICENSE.txt" for full
+#   license terms and contributor agreement.
+#
+import h5py
+import numpy as np
+import os
+import unittest as ut
+
+from types import SimpleNamespace
+from unittest import mock
+
+from ..files import File
+from ..hdfinventory import (hdfInventory, iter_inventory)
+
+from bapsflib.lapdhdf.tests import FauxHDFBuilder
+
+
+class TestHDFInventory(ut.TestCase):
+    """Test Case for hdfInventory"""
+
+    def setUp(self):
+        self.f = FauxHDFBuilder(
+            add_modules={'SIS 3301': {'n_configs': 1, 'sn_size': 20},
+                         'Waveform': {'n_configs': 1, 'sn_size': 20}})
+        self.dpath = '/Raw data + config/SIS 3301'
+        self.dset = self.f[self.dpath + '/config01 [0:0]']
+        self.filename = self.f.filename
+        self.f.close()
+
+    def tearDown(self):
+        self.f.cleanup()
+
+    def test_build(self):
+        """Test the inventory records"""
+        lapdf = File(self.filename)
+        expected = []
+        lapdf.visit(expected.append)
+
+        # listing items does not build the inventory and does not
+        # re-walk the file on every access
+        self.assertEqual(lapdf.list_file_items, expected)
+        self.assertIsNone(lapdf._File__inventory)
+        with mock.patch('bapsflib.lapdhdf.files.walk') as mock_walk:
+            self.assertEqual(lapdf.list_file_items, expected)
+            mock_walk.assert_not_called()
+
+        inv = lapdf.inventory
+        self.assertIs(inv, lapdf.inventory)
+        self.assertEqual(inv.paths, ['/' + name for name in expected])
+        self.assertEqual(lapdf.list_file_items, expected)
+
+        # without a cached list, items come from the inventory
+        lapdf._File__item_paths = None
+        with mock.patch('bapsflib.lapdhdf.files.walk') as mock_walk:
+            self.assertEqual(lapdf.list_file_items, expected)
+            mock_walk.assert_not_called()
+        self.assertEqual(len(inv), len(expected))
+
+        # group record
+        item = inv[self.dpath]
+        self.assertEqual(item.type, 'group')
+        self.assertIsNone(item.shape)
+        self.assertEqual(item.storage_size, 0)
+        self.assertEqual(item.nattrs, len(lapdf[self.dpath].attrs))
+        self.assertIn(self.dpath[1:], inv)
+
+        # dataset record
+        dset = lapdf[self.dpath + '/config01 [0:0]']
+        item = inv[dset.name]
+        self.assertEqual(item.type, 'dataset')
+        self.assertEqual(item.shape, dset.shape)
+        self.assertEqual(item.dtype, dset.dtype)
+        self.assertEqual(item.chunks, dset.chunks)
+        self.assertEqual(item.compression, dset.compression)
+        self.assertEqual(item.storage_size, dset.id.get_storage_size())
+        self.assertEqual(item.nattrs, len(dset.attrs))
+
+        # generator form
+        gen_paths = [item.path
+                     for item in iter_inventory(lapdf[self.dpath])]
+        self.assertEqual(gen_paths,
+                         [path for path in inv.paths
+                          if path.startswith(self.dpath + '/')])
+        lapdf.close()
+
+    def test_no_num_attrs(self):
+        """Test attribute counts when ObjInfo has no num_attrs"""
+        visit = h5py.h5o.visit
+
+        def old_visit(obj_id, func, info=False):
+            # h5py 2.x object info only has the object type
+            return visit(obj_id,
+                         lambda name, oinfo: func(
+                             name, SimpleNamespace(type=oinfo.type)),
+                         info=info)
+
+        with h5py.File(self.filename, 'r') as f:
+            expected = list(iter_inventory(f))
+            with mock.patch.object(h5py.h5o, 'visit', old_visit):
+                items = list(iter_inventory(f))
+        self.assertEqual(items, expected)
+
+    def test_queries(self):
+        """Test filter queries"""
+        lapdf = File(self.filename)
+        inv = lapdf.inventory
+
+        items = inv.filter(prefix=self.dpath, obj_type='dataset')
+        self.assertTrue(len(items) != 0)
+        for item in items:
+            self.assertTrue(item.path.startswith(self.dpath + '/'))
+            self.assertEqual(item.type, 'dataset')
+
+        for item in inv.filter(dtype=np.int16):
+            self.assertEqual(item.dtype, np.dtype(np.int16))
+        self.assertIn(self.dpath + '/config01 [0:0]',
+                      [item.path for item in inv.filter(
+                          dtype=lapdf[self.dpath
+                                      + '/config01 [0:0]'].dtype)])
+
+        self.assertEqual(
+            inv.storage_size(prefix=self.dpath),
+            sum(item.storage_size for item in items))
+        self.assertEqual(
+            inv.storage_size(),
+            sum(item.storage_size for item in inv))
+        lapdf.close()
+
+    def test_persist(self):
+        """Test saving and loading the inventory"""
+        cache = os.path.join(self.f.tempdir.name, 'inventory.json')
+        lapdf = File(self.filename, inventory_cache=cache)
+        inv = lapdf.inventory
+        self.assertTrue(os.path.exists(cache))
+
+        loaded = hdfInventory.load(cache, hdf_file=lapdf)
+        self.assertEqual(list(loaded), list(inv))
+        lapdf.close()
+
+        lapdf = File(self.filename, inventory_cache=cache)
+        self.assertEqual(list(lapdf.inventory), list(inv))
+        lapdf.close()
+
+        # stale or missing inventories are not loaded
+        os.utime(self.filename, (0, 0))
+        lapdf = File(self.filename)
+        self.assertIsNone(hdfInventory.load(cache, hdf_file=lapdf))
+        self.assertIsNone(hdfInventory.load(cache + '.none'))
+        lapdf.close()
+
+
+if __name__ == '__main__':
+    ut.main()
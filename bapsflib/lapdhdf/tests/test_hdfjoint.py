@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# This file is part of the bapsflib package, a Python toolkit for the
+# BaPSF group at UCLA.
+#
+# http://plasma.physics.ucla.edu/
+#
+# Copyright 2017-2018 Erik T. Everson and contributors
+#
+# License: Standard 3-clause BSD; see "LICENSES/LICENSE.txt" for full
+#   license terms and contributor agreement.
+#
+import contextlib
+import io
+import numpy as np
+import unittest as ut
+
+from ..files import File
+from ..hdfjoint import (common_time_base, resample)
+
+from bapsflib.lapdhdf.tests import FauxSyntheticBuilder
+
+
+class TestHDFJointData(ut.TestCase):
+    """Test Case for hdfJointData and File.read_joint"""
+
+    channels = [('SIS 3301', 0, 0),
+                ('SIS crate', 'SIS 3302', 1, 1),
+                {'digitizer': 'SIS crate', 'adc': 'SIS 3305',
+                 'board': 1, 'channel': 1}]
+
+    @classmethod
+    def setUpClass(cls):
+        cls.fsynth = FauxSyntheticBuilder(
+            nshots=120, nt=64, digitizer=['SIS 3301', 'SIS crate'],
+            shot_gaps=0.1, seed=4)
+        with contextlib.redirect_stdout(io.StringIO()):
+            cls.lapdf = File(cls.fsynth.path)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.lapdf.close()
+        cls.fsynth.cleanup()
+
+    def single(self, **kwargs):
+        """read_data of each channel"""
+        return [
+            self.lapdf.read_data(0, 0, digitizer='SIS 3301',
+                                 silent=True, **kwargs),
+            self.lapdf.read_data(1, 1, digitizer='SIS crate',
+                                 adc='SIS 3302', silent=True, **kwargs),
+            self.lapdf.read_data(1, 1, digitizer='SIS crate',
+                                 adc='SIS 3305', silent=True, **kwargs)]
+
+    def test_joint(self):
+        """Test channels of two digitizers aligned by shot"""
+        data = self.lapdf.read_joint(self.channels, silent=True)
+        single = self.single()
+        self.assertTrue(np.array_equal(data['shotnum'],
+                                       np.unique(self.fsynth.shotnum)))
+        for i, sdata in enumerate(single):
+            self.assertTrue(np.array_equal(data['shotnum'],
+                                           sdata['shotnum']))
+            np.testing.assert_allclose(data['signal{}'.format(i)],
+                                       sdata['signal'])
+            self.assertAlmostEqual(data.dt[i], sdata.dt)
+            self.assertAlmostEqual(data.dv[i], sdata.dv)
+        self.assertEqual(data.info['channels'][2]['adc'], 'SIS 3305')
+        self.assertIsNone(data.time)
+        self.assertIsNotNone(data.metrics)
+
+        # bits
+        data = self.lapdf.read_joint(self.channels[:2], keep_bits=True,
+                                     shotnum=[5, 6, 7, 200])
+        sdata = self.single(shotnum=[5, 6, 7, 200], keep_bits=True)
+        self.assertTrue(np.array_equal(data['shotnum'],
+                                       sdata[1]['shotnum']))
+        self.assertTrue(np.array_equal(data['signal1'],
+                                       sdata[1]['signal']))
+
+    def test_controls(self):
+        """Test joining with control devices"""
+        data = self.lapdf.read_joint(self.channels,
+                                     shotnum=slice(10, 60),
+                                     add_controls=['6K Compumotor'],
+                                     silent=True)
+        sn = self.fsynth.shotnum
+        self.assertTrue(np.array_equal(
+            data['shotnum'], np.unique(sn[(sn >= 10) & (sn < 60)])))
+        np.testing.assert_allclose(
+            data['xyz'], self.fsynth.position(data['shotnum']))
+
+    def test_time_base(self):
+        """Test resampling onto a common time base"""
+        data = self.lapdf.read_joint(self.channels,
+                                     time_base='coarsest', silent=True)
+        single = self.single()
+        time = data.time
+
+        # the 'SIS 3305' (1.25 GHz) record is shortest
+        span = 63 * single[2].dt
+        self.assertAlmostEqual(time[1] - time[0], single[0].dt)
+        self.assertLessEqual(time[-1], span * (1 + 1e-9))
+        for i, sdata in enumerate(single):
+            sig = data['signal{}'.format(i)]
+            self.assertEqual(sig.shape, (data.shape[0], time.shape[0]))
+            tsig = sdata.dt * np.arange(64)
+            expected = np.array([np.interp(time, tsig, row)
+                                 for row in sdata['signal']])
+            np.testing.assert_allclose(sig, expected, rtol=1e-5,
+                                       atol=1e-6)
+        self.assertEqual(len(set(data.dt)), 1)
+
+        data = self.lapdf.read_joint(self.channels[1:],
+                                     time_base='finest', silent=True)
+        self.assertEqual(data['signal0'].shape[1], 64)
+
+    def test_kernels(self):
+        """Test the time base and interpolation kernels"""
+        self.assertTrue(np.allclose(
+            common_time_base('coarsest', [1.0, 0.5], [5, 5]),
+            [0.0, 1.0, 2.0]))
+        self.assertTrue(np.allclose(
+            common_time_base('finest', [1.0, 0.5], [5, 5]),
+            [0.0, 0.5, 1.0, 1.5, 2.0]))
+        self.assertRaises(ValueError, common_time_base, 'middle',
+                          [1.0], [5])
+        self.assertRaises(ValueError, common_time_base, 'finest',
+                          [None], [5])
+
+        signal = np.array([[0, 2, 4, 6]], dtype=np.int16)
+        out = resample(signal, 1.0, np.array([-1.0, 0.5, 2.25, 3.0,
+                                              3.5]))
+        self.assertTrue(np.isnan(out[0, [0, 4]]).all())
+        self.assertTrue(np.allclose(out[0, 1:4], [1.0, 4.5, 6.0]))
+
+    def test_errors(self):
+        """Test invalid arguments"""
+        self.assertRaises(ValueError, self.lapdf.read_joint, [])
+        self.assertRaises(ValueError, self.lapdf.read_joint,
+                          [('SIS 3350', 0, 0)])
+        self.assertRaises(TypeError, self.lapdf.read_joint,
+                          [('SIS 3301', 0)])
+        self.assertRaises(ValueError, self.lapdf.read_joint,
+                          self.channels, shotnum=[500])
+
+
+if __name__ == '__main__':
+    ut.main()
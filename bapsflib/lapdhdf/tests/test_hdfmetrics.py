@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# This file is part of the bapsflib package, a Python toolkit for the
+# BaPSF group at UCLA.
+#
+# http://plasma.physics.ucla.edu/
+#
+# Copyright 2017-2018 Erik T. Everson and contributors
+#
+# License: Standard 3-clause BSD; see "LICENSES/LICENSE.txt" for full
+#   license terms and contributor agreement.
+#
+import contextlib
+import io
+import numpy as np
+import unittest as ut
+
+from ..files import File
+from ..hdfmetrics import (add_read_hook, remove_read_hook,
+                          hdfCountedDataset, hdfReadMetrics)
+from ..hdfmmap import hdfMMapDataset
+
+from bapsflib.lapdhdf.tests import FauxHDFBuilder
+
+
+class TestHDFReadMetrics(ut.TestCase):
+    """Test Case for hdfReadMetrics"""
+
+    def test_record(self):
+        """Test dataset reads and allocations are accumulated"""
+        metrics = hdfReadMetrics('test')
+        metrics.record('/a', 10, 100)
+        metrics.record('/a', 5, 50, calls=2)
+        metrics.record('/b', 1, 8)
+        metrics.mark('stage')
+        self.assertEqual(metrics.datasets['/a'],
+                         {'calls': 3, 'memory reads': 0, 'rows': 15,
+                          'bytes': 150})
+        self.assertEqual(metrics.hdf5_calls, 4)
+        self.assertEqual(metrics.rows_read, 16)
+        self.assertEqual(metrics.bytes_read, 158)
+
+        # reads served from memory are not HDF5 calls
+        metrics.record('/b', 2, 16, source='mmap')
+        self.assertEqual(metrics.datasets['/b']['calls'], 1)
+        self.assertEqual(metrics.datasets['/b']['memory reads'], 1)
+        self.assertEqual(metrics.hdf5_calls, 4)
+        self.assertEqual(metrics.memory_reads, 1)
+        self.assertEqual(metrics.bytes_read, 174)
+        self.assertIn('stage', metrics.stages)
+
+        metrics.allocate(100)
+        metrics.allocate(50)
+        metrics.release(50)
+        metrics.allocate(20)
+        self.assertEqual(metrics.peak_bytes, 150)
+
+        # merge a nested read
+        nested = hdfReadMetrics('nested')
+        nested.record('/c', 2, 16)
+        nested.record('/c', 1, 8, source='warm-up')
+        nested.allocate(40)
+        metrics.merge(nested)
+        self.assertEqual(metrics.datasets['/c'],
+                         {'calls': 1, 'memory reads': 1, 'rows': 3,
+                          'bytes': 24})
+        self.assertEqual(metrics.peak_bytes, 160)
+
+        # finish and export
+        self.assertIs(metrics.finish(), metrics)
+        self.assertIsNotNone(metrics.total_time)
+        mdict = metrics.as_dict()
+        self.assertEqual(mdict['reader'], 'test')
+        self.assertEqual(mdict['bytes read'], 198)
+        self.assertEqual(mdict['memory reads'], 2)
+        self.assertIn('test - total', metrics.report())
+
+    def test_counted_dataset(self):
+        """Test hdfCountedDataset records reads"""
+        metrics = hdfReadMetrics('test')
+        arr = np.arange(20, dtype=np.int32).reshape(10, 2)
+        dset = hdfCountedDataset(arr, metrics, '/arr')
+        self.assertEqual(dset.shape, (10, 2))
+        self.assertEqual(dset.dtype, arr.dtype)
+        self.assertEqual(len(dset), 10)
+        self.assertTrue(np.array_equal(dset[2:5], arr[2:5]))
+        self.assertEqual(dset[0, 0], 0)
+        self.assertEqual(metrics.datasets['/arr'],
+                         {'calls': 2, 'memory reads': 0, 'rows': 4,
+                          'bytes': 28})
+
+        # reads are tagged with the wrapped dataset's read source
+        class Served(np.ndarray):
+            def read_source(self, args):
+                return 'warm-up'
+
+        dset = hdfCountedDataset(arr.view(Served), metrics, '/served')
+        dset[0:2]
+        self.assertEqual(metrics.datasets['/served']['calls'], 0)
+        self.assertEqual(metrics.datasets['/served']['memory reads'], 1)
+
+    def test_hooks(self):
+        """Test hook registration and failing hooks"""
+        seen = []
+        self.assertRaises(TypeError, add_read_hook, 'not callable')
+        add_read_hook(seen.append)
+        try:
+            metrics = hdfReadMetrics('test').finish()
+            self.assertEqual(seen, [metrics])
+
+            # hooks are not called for nested reads
+            hdfReadMetrics('test').finish(emit=False)
+            self.assertEqual(len(seen), 1)
+        finally:
+            remove_read_hook(seen.append)
+        hdfReadMetrics('test').finish()
+        self.assertEqual(len(seen), 1)
+
+        def bad_hook(metrics):
+            raise RuntimeError('boom')
+
+        with self.assertWarns(UserWarning):
+            hdfReadMetrics('test').finish(hooks=[bad_hook])
+
+
+class TestReadMetrics(ut.TestCase):
+    """Test Case for metrics of read_data and read_controls"""
+
+    def setUp(self):
+        self.f = FauxHDFBuilder(
+            add_modules={'SIS 3301': {'n_configs': 1, 'sn_size': 20},
+                         'Waveform': {'n_configs': 1, 'sn_size': 20}})
+        self.f.close()
+        self.lapdf = File(self.f.path, read_cache=2 ** 24)
+
+    def tearDown(self):
+        self.lapdf.close()
+        self.f.cleanup()
+
+    def test_read_data(self):
+        """Test metrics attached to read_data results"""
+        seen = []
+        self.lapdf.read_hooks.append(seen.append)
+        data = self.lapdf.read_data(0, 0, shotnum=slice(3, 9),
+                                    add_controls=['Waveform'],
+                                    silent=True)
+        metrics = data.metrics
+        self.assertIsInstance(metrics, hdfReadMetrics)
+        self.assertEqual(seen, [metrics])
+        self.assertFalse(metrics.cache_hit)
+        for stage in ('conditioning', 'control read', 'allocation',
+                      'signal read', 'conversion', 'cache store'):
+            self.assertIn(stage, metrics.stages)
+
+        # signal, header, and (merged) control reads are counted
+        nt = data['signal'].shape[1]
+        sig_bytes = [entry['bytes']
+                     for path, entry in metrics.datasets.items()
+                     if path.endswith('[0:0]')]
+        self.assertEqual(sig_bytes, [6 * nt * 2])
+        self.assertTrue(any('Waveform' in path
+                            for path in metrics.datasets))
+        self.assertGreater(metrics.hdf5_calls, 1)
+        self.assertGreaterEqual(metrics.peak_bytes, data.nbytes)
+
+        # a memory-mapped signal read is not an HDF5 call
+        sig_path = [path for path in metrics.datasets
+                    if path.endswith('[0:0]')][0]
+        if isinstance(self.lapdf.get_digi_dataset(sig_path),
+                      hdfMMapDataset):
+            self.assertEqual(metrics.datasets[sig_path]['calls'], 0)
+            self.assertEqual(
+                metrics.datasets[sig_path]['memory reads'], 1)
+            self.assertGreaterEqual(metrics.memory_reads, 1)
+
+        # views share the metrics
+        self.assertIs(data[1:3].metrics, metrics)
+
+        # a repeated read is a cache hit
+        data2 = self.lapdf.read_data(0, 0, shotnum=slice(3, 9),
+                                     add_controls=['Waveform'],
+                                     silent=True)
+        self.assertTrue(data2.metrics.cache_hit)
+
+        # - only the header shot numbers are read to resolve the
+        #   request, no signal or control data
+        self.assertFalse(any(path.endswith('[0:0]')
+                             or 'Waveform' in path
+                             for path in data2.metrics.datasets))
+        self.assertLess(data2.metrics.bytes_read, sig_bytes[0])
+        self.assertEqual(len(seen), 2)
+
+    def test_timeit(self):
+        """Test the timeit keyword is deprecated"""
+        with contextlib.redirect_stdout(io.StringIO()):
+            with self.assertWarns(DeprecationWarning):
+                self.lapdf.read_data(0, 0, shotnum=[1, 2], timeit=True,
+                                     silent=True)
+            with self.assertWarns(DeprecationWarning):
+                self.lapdf.read_controls(['Waveform'], shotnum=[1, 2],
+                                         timeit=True, silent=True)
+
+    def test_read_controls(self):
+        """Test metrics attached to read_controls results"""
+        seen = []
+        add_read_hook(seen.append)
+        try:
+            cdata = self.lapdf.read_controls(['Waveform'],
+                                             shotnum=[1, 2, 3],
+                                             silent=True)
+        finally:
+            remove_read_hook(seen.append)
+        metrics = cdata.metrics
+        self.assertIsInstance(metrics, hdfReadMetrics)
+        self.assertEqual(seen, [metrics])
+        self.assertEqual(metrics.reader, 'hdfReadControl')
+        for stage in ('conditioning', 'allocation', 'control read'):
+            self.assertIn(stage, metrics.stages)
+        self.assertGreater(metrics.bytes_read, 0)
+        self.assertGreaterEqual(metrics.peak_bytes, cdata.nbytes)
+
+
+if __name__ == '__main__':
+    ut.main()
@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# This file is part of the bapsflib package, a Python toolkit for the
+# BaPSF group at UCLA.
+#
+# http://plasma.physics.ucla.edu/
+#
+# Copyright 2017-2018 Erik T. Everson and contributors
+#
+# License: Standard 3-clause BSD; see "LICENSES/LICENSE.txt" for full
+#   license terms and contributor agreement.
+#
+import h5py
+import numpy as np
+import os
+import tempfile
+import unittest as ut
+
+from ..files import File
+from ..hdfmmap import (hdfMMapDataset, mmap_dataset)
+from ..hdfreaddata import hdfReadData
+
+from bapsflib.lapdhdf.tests import FauxHDFBuilder
+
+
+class TestMMapDataset(ut.TestCase):
+    """Test Case for mmap_dataset and hdfMMapDataset"""
+
+    def setUp(self):
+        self.tempdir = tempfile.TemporaryDirectory(prefix='hdf-test_')
+        self.filename = os.path.join(self.tempdir.name, 'test.hdf5')
+        self.data = np.arange(20 * 30, dtype='>i2').reshape(20, 30)
+        self.header = np.zeros(20, dtype=[('Shot', '<u4'),
+                                          ('Offset', '<f8')])
+        self.header['Shot'] = np.arange(20) + 1
+        self.header['Offset'] = -1.5
+        with h5py.File(self.filename, 'w', userblock_size=512) as f:
+            f.create_dataset('contiguous', data=self.data)
+            f.create_dataset('header', data=self.header)
+            f.create_dataset('chunked', data=self.data, chunks=(4, 30))
+            f.create_dataset('gzip', data=self.data, compression='gzip')
+            f.create_dataset('empty', shape=(20, 30), dtype='<i2')
+            f.create_dataset('vlen', data=np.array(['a', 'b'],
+                                                   dtype=object),
+                             dtype=h5py.special_dtype(vlen=str))
+
+    def tearDown(self):
+        self.tempdir.cleanup()
+
+    def test_qualifying(self):
+        """Test which datasets qualify for memory mapping"""
+        with h5py.File(self.filename, 'r') as f:
+            self.assertIsInstance(mmap_dataset(f['contiguous']),
+                                  hdfMMapDataset)
+            self.assertIsInstance(mmap_dataset(f['header']),
+                                  hdfMMapDataset)
+            self.assertIsNone(mmap_dataset(f['chunked']))
+            self.assertIsNone(mmap_dataset(f['gzip']))
+            self.assertIsNone(mmap_dataset(f['empty']))
+            self.assertIsNone(mmap_dataset(f['vlen']))
+
+        # files opened for writing do not qualify
+        with h5py.File(self.filename, 'r+') as f:
+            self.assertIsNone(mmap_dataset(f['contiguous']))
+
+    def test_indexing(self):
+        """Test indexing matches h5py"""
+        with h5py.File(self.filename, 'r') as f:
+            dset = mmap_dataset(f['contiguous'])
+            self.assertEqual(dset.shape, self.data.shape)
+            self.assertEqual(dset.dtype, self.data.dtype)
+            self.assertEqual(len(dset), 20)
+            self.assertEqual(dset.name, '/contiguous')
+
+            for index in (3, slice(2, 10, 3), [1, 4, 19], [-1, 0]):
+                val = dset[index, :]
+                self.assertIs(type(val), np.ndarray)
+                self.assertTrue(np.array_equal(
+                    val, f['contiguous'][index, :]
+                    if index != [-1, 0]
+                    else self.data[[0, 19], :]))
+
+            # views are read-only
+            val = dset[0:5, :]
+            with self.assertRaises(ValueError):
+                val[0, 0] = 1
+
+            self.assertRaises(IndexError, dset.__getitem__,
+                              ([1, 40], slice(None)))
+
+            # unsorted lists are rejected, as by h5py
+            self.assertRaises(TypeError, dset.__getitem__,
+                              ([4, 1], slice(None)))
+
+            # field access
+            hdset = mmap_dataset(f['header'])
+            self.assertEqual(hdset[-1, 'Shot'], 20)
+            self.assertEqual(hdset[0, 'Offset'], -1.5)
+            self.assertTrue(np.array_equal(hdset['Shot'],
+                                           self.header['Shot']))
+            self.assertTrue(np.array_equal(hdset[[2, 5], 'Shot'],
+                                           [3, 6]))
+            first, last = hdset[[-1, 0], 'Shot']
+            self.assertEqual((first, last), (1, 20))
+
+
+class TestMMapReads(ut.TestCase):
+    """Test Case for memory-mapped reads in hdfReadData"""
+
+    def setUp(self):
+        self.f = FauxHDFBuilder(
+            add_modules={'SIS 3301': {'n_configs': 1, 'sn_size': 50}})
+
+        # release the builder's writable handle so the file can be
+        # opened read-only (a requirement for memory mapping)
+        self.filename = self.f.filename
+        self.f.close()
+
+    def tearDown(self):
+        self.f.cleanup()
+
+    def test_read_data(self):
+        """Test hdfReadData with and without memory mapping"""
+        lapdf = File(self.filename)
+        self.assertTrue(lapdf.mmap_reads)
+        dpath = lapdf.file_map.main_digitizer.info['group path']
+        dname = lapdf.file_map.main_digitizer.construct_dataset_name(
+            0, 0, silent=True)
+        self.assertIsInstance(
+            lapdf.get_digi_dataset(dpath + '/' + dname),
+            hdfMMapDataset)
+
+        lapdf_h5 = File(self.filename, mmap_reads=False)
+        self.assertIsInstance(
+            lapdf_h5.get_digi_dataset(dpath + '/' + dname),
+            h5py.Dataset)
+
+        for kwargs in ({'index': [1, 5, 10]},
+                       {'index': slice(3, 20)},
+                       {'shotnum': [2, 4, 49]},
+                       {'shotnum': slice(10, 40), 'keep_bits': True}):
+            data = hdfReadData(lapdf, 0, 0, silent=True, **kwargs)
+            data_h5 = hdfReadData(lapdf_h5, 0, 0, silent=True,
+                                  **kwargs)
+            self.assertTrue(np.array_equal(data['shotnum'],
+                                           data_h5['shotnum']))
+            self.assertTrue(np.array_equal(data['signal'],
+                                           data_h5['signal']))
+
+        # closing the file drops the memory maps
+        lapdf.close()
+        lapdf_h5.close()
+        self.assertEqual(lapdf._File__mmap_dsets, {})
+
+
+if __name__ == '__main__':
+    ut.main()
@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# This file is part of the bapsflib package, a Python toolkit for the
+# BaPSF group at UCLA.
+#
+# http://plasma.physics.ucla.edu/
+#
+# Copyright 2017-2018 Erik T. Everson and contributors
+#
+# License: Standard 3-clause BSD; see "LICENSES/LICENSE.txt" for full
+#   license terms and contributor agreement.
+#
+import contextlib
+import io
+import numpy as np
+import unittest as ut
+
+from ..files import File
+from ..hdfmultifile import (file_shot_range, hdfMultiFile)
+from ..hdfwarmup import shotnum_datasets
+
+from bapsflib.lapdhdf.tests import FauxHDFBuilder
+
+
+class TestHDFMultiFile(ut.TestCase):
+    """Test Case for hdfMultiFile"""
+
+    def setUp(self):
+        modules = {'SIS 3301': {'n_configs': 1, 'sn_size': 20},
+                   'Waveform': {'n_configs': 1, 'sn_size': 20}}
+        self.f1 = FauxHDFBuilder(add_modules=modules)
+        self.f2 = FauxHDFBuilder(add_modules=modules)
+        self.f1.close()
+        self.f2.close()
+
+    def tearDown(self):
+        self.f1.cleanup()
+        self.f2.cleanup()
+
+    def shift_shotnum(self, filename, shift):
+        """Shift all recorded shot numbers of a file."""
+        with File(filename) as lapdf:
+            dsets = shotnum_datasets(lapdf)
+        with File(filename, mode='r+') as lapdf:
+            for path, field in dsets:
+                arr = lapdf[path][...]
+                arr[field] += shift
+                lapdf[path][...] = arr
+
+    def test_renumber(self):
+        """Test reading with renumbered (continuous) shot numbers"""
+        lapdf1 = File(self.f1.path)
+        lapdf2 = File(self.f2.path)
+        self.assertEqual(file_shot_range(lapdf1), (1, 20))
+
+        # files with overlapping shot numbers need renumbering
+        self.assertRaises(ValueError, hdfMultiFile, [lapdf1, lapdf2])
+
+        run = hdfMultiFile([lapdf1, lapdf2], renumber=True)
+        self.assertEqual(run.shot_ranges, [(1, 20), (21, 40)])
+        self.assertEqual(run.offsets, [0, 20])
+
+        # global shot numbers across the file boundary
+        data = run.read_data(0, 0, shotnum=slice(15, 26), silent=True)
+        self.assertEqual(data['shotnum'].tolist(), list(range(15, 26)))
+        d1 = lapdf1.read_data(0, 0, shotnum=slice(15, 21), silent=True)
+        d2 = lapdf2.read_data(0, 0, shotnum=slice(1, 6), silent=True)
+        self.assertTrue(np.array_equal(
+            data['signal'], np.concatenate([d1['signal'],
+                                            d2['signal']])))
+        self.assertEqual(data.info['hdf file'],
+                         [d1.info['hdf file'], d2.info['hdf file']])
+        self.assertEqual(data.info['board'], 0)
+
+        # global row index of the virtual dataset
+        data = run.read_data(0, 0, index=[0, 19, 20, 39], silent=True)
+        self.assertEqual(data['shotnum'].tolist(), [1, 20, 21, 40])
+        data = run.read_data(0, 0, index=-1, silent=True)
+        self.assertEqual(data['shotnum'].tolist(), [40])
+        self.assertEqual(len(run.read_data(0, 0, silent=True)), 40)
+        self.assertRaises(IndexError, run.read_data, 0, 0, index=40,
+                          silent=True)
+
+        # mated controls
+        data = run.read_data(0, 0, shotnum=[5, 35],
+                             add_controls=['Waveform'], silent=True)
+        self.assertEqual(data['shotnum'].tolist(), [5, 35])
+        self.assertIn('command', data.dtype.names)
+
+        cdata = run.read_controls(['Waveform'], shotnum=slice(18, 23))
+        self.assertEqual(cdata['shotnum'].tolist(),
+                         list(range(18, 23)))
+
+        # streaming
+        blocks = list(run.iter_data(0, 0, shotnum=slice(15, 26),
+                                    silent=True))
+        self.assertEqual([len(block) for block in blocks], [6, 5])
+
+        # shot numbers outside all files
+        self.assertRaises(ValueError, run.read_data, 0, 0,
+                          shotnum=[100], silent=True)
+
+        # invalid requests are not mistaken for missing shots
+        with self.assertRaisesRegex(ValueError, 'not valid'):
+            run.read_data(0, 5, shotnum=[5, 35], silent=True)
+        with self.assertRaisesRegex(ValueError, 'configuration'):
+            run.read_data(0, 0, shotnum=[5, 35], config_name='blah',
+                          silent=True)
+        run.close()
+        lapdf1.close()
+        lapdf2.close()
+
+    def test_null_fill(self):
+        """Test intersection_set=False across a file boundary"""
+        # the digitizer records shots 1 to 20 and the control device
+        # records shots 1 to 25 of each file
+        modules = {'SIS 3301': {'n_configs': 1, 'sn_size': 20},
+                   'Waveform': {'n_configs': 1, 'sn_size': 25}}
+        f3 = FauxHDFBuilder(add_modules=modules)
+        f4 = FauxHDFBuilder(add_modules=modules)
+        f3.close()
+        f4.close()
+        with contextlib.redirect_stdout(io.StringIO()):
+            run = hdfMultiFile([f3.path, f4.path], renumber=True)
+        try:
+            self.assertEqual(run.shot_ranges, [(1, 25), (26, 50)])
+
+            # shot 23 is not recorded by the digitizer
+            data = run.read_data(0, 0, shotnum=[20, 23, 26],
+                                 intersection_set=False, silent=True)
+            self.assertEqual(data['shotnum'].tolist(), [20, 23, 26])
+            self.assertTrue(np.isnan(data['signal'][1]).all())
+            self.assertFalse(np.isnan(data['signal'][[0, 2]]).any())
+            data = run.read_data(0, 0, shotnum=[20, 23, 26],
+                                 silent=True)
+            self.assertEqual(data['shotnum'].tolist(), [20, 26])
+
+            # controls
+            cdata = run.read_controls(['Waveform'],
+                                      shotnum=[20, 23, 26],
+                                      intersection_set=False)
+            self.assertEqual(cdata['shotnum'].tolist(), [20, 23, 26])
+            self.assertRaises(TypeError, run.read_controls, ['blah'],
+                              shotnum=[20, 26])
+        finally:
+            run.close()
+            f3.cleanup()
+            f4.cleanup()
+
+    def test_file_shotnum(self):
+        """Test reading with the files' own shot numbers"""
+        self.shift_shotnum(self.f2.path, 100)
+
+        with hdfMultiFile([self.f1.path,
+                           self.f2.path]) as run:
+            self.assertEqual(run.shot_ranges, [(1, 20), (101, 120)])
+            data = run.read_data(0, 0, shotnum=[20, 50, 101],
+                                 silent=True)
+            self.assertEqual(data['shotnum'].tolist(), [20, 101])
+            data = run.read_data(0, 0, index=slice(18, 22),
+                                 silent=True)
+            self.assertEqual(data['shotnum'].tolist(),
+                             [19, 20, 101, 102])
+
+        # order matters
+        self.assertRaises(ValueError, hdfMultiFile,
+                          [self.f2.path, self.f1.path])
+
+    def test_incompatible(self):
+        """Test incompatible mappings are rejected"""
+        f3 = FauxHDFBuilder(
+            add_modules={'SIS 3301': {'n_configs': 1, 'sn_size': 20}})
+        f3.close()
+        self.assertRaises(ValueError, hdfMultiFile,
+                          [self.f1.path, f3.path],
+                          renumber=True)
+        self.assertRaises(ValueError, hdfMultiFile, self.f1.path)
+        self.assertRaises(TypeError, hdfMultiFile, [self.f1.path, 5])
+        f3.cleanup()
+
+
+if __name__ == '__main__':
+    ut.main()
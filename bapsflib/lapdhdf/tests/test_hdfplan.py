@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# This file is part of the bapsflib package, a Python toolkit for the
+# BaPSF group at UCLA.
+#
+# http://plasma.physics.ucla.edu/
+#
+# Copyright 2017-2018 Erik T. Everson and contributors
+#
+# License: Standard 3-clause BSD; see "LICENSES/LICENSE.txt" for full
+#   license terms and contributor agreement.
+#
+import h5py
+import numpy as np
+import unittest as ut
+
+from ..files import File
+from ..hdfplan import (hdfReadPlan, plan_dataset)
+
+from bapsflib.lapdhdf.tests import FauxHDFBuilder
+
+
+class TestHDFPlan(ut.TestCase):
+    """Test Case for the read planner"""
+
+    def setUp(self):
+        self.f = FauxHDFBuilder(
+            add_modules={'SIS 3301': {'n_configs': 1, 'sn_size': 20},
+                         'Waveform': {'n_configs': 1, 'sn_size': 20}})
+        brdch = self.f.modules['SIS 3301'].knobs.active_brdch
+        brdch[0][1] = True
+        self.f.modules['SIS 3301'].knobs.active_brdch = brdch
+        self.f.close()
+        self.lapdf = File(self.f.path)
+
+    def tearDown(self):
+        self.lapdf.close()
+        self.f.cleanup()
+
+    def test_plan_read(self):
+        """Test plans match the read they describe"""
+        plan = self.lapdf.plan_read(0, 0, shotnum=slice(3, 9),
+                                    silent=True)
+        data = self.lapdf.read_data(0, 0, shotnum=slice(3, 9),
+                                    silent=True)
+        self.assertIsInstance(plan, hdfReadPlan)
+        self.assertEqual(plan.nshots, 6)
+        self.assertTrue(np.array_equal(plan.shotnum, data['shotnum']))
+        self.assertEqual(plan.nruns, 1)
+        self.assertEqual(plan.output_bytes, data.nbytes)
+        dplan = plan.datasets[0]
+        self.assertEqual(dplan.dtype, data.dtype)
+        self.assertEqual(plan.rows, {dplan.path: 6})
+        self.assertEqual((dplan.board, dplan.channel), (0, 0))
+
+        # contiguous dataset reads only the requested rows
+        dset = self.lapdf[dplan.path]
+        self.assertIsNone(dplan.chunk_rows)
+        self.assertEqual(plan.nchunks, 0)
+        self.assertEqual(plan.disk_bytes,
+                         6 * dset.shape[1] * dset.dtype.itemsize)
+
+        # index requests and hyperslab runs
+        plan = self.lapdf.plan_read(0, 0, index=[0, 2, 3, 7],
+                                    silent=True)
+        self.assertEqual(plan.shotnum.tolist(), [1, 3, 4, 8])
+        self.assertEqual(plan.nruns, 3)
+
+        # controls
+        plan = self.lapdf.plan_read(0, 0, shotnum=[2, 4],
+                                    add_controls=['Waveform'],
+                                    silent=True)
+        data = self.lapdf.read_data(0, 0, shotnum=[2, 4],
+                                    add_controls=['Waveform'],
+                                    silent=True)
+        self.assertEqual(plan.datasets[0].dtype, data.dtype)
+        self.assertEqual(plan.output_bytes, data.nbytes)
+
+        # multiple channels
+        channels = [(0, 0), (0, 1)]
+        plan = self.lapdf.plan_reads(channels, shotnum=slice(1, 5),
+                                     silent=True)
+        self.assertEqual(len(plan.datasets), 2)
+        self.assertEqual(plan.nshots, 4)
+        self.assertEqual(plan.output_bytes,
+                         2 * plan.datasets[0].output_bytes)
+
+        self.assertRaises(ValueError, self.lapdf.plan_read, 0, 0,
+                          shotnum=[100], silent=True)
+
+    def test_chunked(self):
+        """Test chunk counts and stored bytes of chunked datasets"""
+        self.lapdf.close()
+        with h5py.File(self.f.path, 'r+') as hf:
+            grp = hf['Raw data + config/SIS 3301']
+            name = [key for key in grp
+                    if key.endswith('[0:0]')][0]
+            data = grp[name][...]
+            del grp[name]
+            grp.create_dataset(name, data=data,
+                               chunks=(4, data.shape[1] // 4),
+                               compression='gzip')
+        self.lapdf = File(self.f.path)
+
+        dset = self.lapdf['Raw data + config/SIS 3301/' + name]
+        dplan = plan_dataset(dset, np.array([0, 1, 5]),
+                             np.array([1, 2, 6]), np.dtype('<f4'))
+        self.assertEqual(dplan.chunk_rows, 4)
+        self.assertEqual(dplan.nchunks, 8)
+        self.assertEqual(dplan.nruns, 2)
+        if hasattr(dset.id, 'get_chunk_info_by_coord'):
+            # exact stored chunk sizes (h5py >= 2.10 with HDF5 1.10.5)
+            expected = sum(
+                dset.id.get_chunk_info_by_coord((row, col)).size
+                for row in (0, 4)
+                for col in range(0, data.shape[1], data.shape[1] // 4))
+        else:
+            # estimate from the average chunk size
+            nrow_chunks = -(-data.shape[0] // 4)
+            expected = int(dset.id.get_storage_size() * 8
+                           / (nrow_chunks * 4))
+        self.assertEqual(dplan.disk_bytes, expected)
+
+        # streaming block sizes are aligned to chunks
+        plan = self.lapdf.plan_read(0, 0, silent=True)
+        shot_bytes = plan.output_bytes // plan.nshots
+        self.assertEqual(plan.block_size(9 * shot_bytes), 8)
+        self.assertEqual(plan.block_size(3 * shot_bytes), 3)
+        self.assertEqual(plan.block_size(1), 1)
+        self.assertEqual(plan.block_size(10 ** 12), 20)
+
+        blocks = list(self.lapdf.iter_data(0, 0, block_size='auto',
+                                           depth=1,
+                                           max_bytes=9 * shot_bytes,
+                                           silent=True))
+        self.assertEqual([len(block) for block in blocks], [8, 8, 4])
+
+
+if __name__ == '__main__':
+    ut.main()
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# This file is part of the bapsflib package, a Python toolkit for the
+# BaPSF group at UCLA.
+#
+# http://plasma.physics.ucla.edu/
+#
+# Copyright 2017-2018 Erik T. Everson and contributors
+#
+# License: Standard 3-clause BSD; see "LICENSES/LICENSE.txt" for full
+#   license terms and contributor agreement.
+#
+import contextlib
+import io
+import numpy as np
+import unittest as ut
+
+from ..files import File
+
+from bapsflib.lapdhdf.tests import FauxHDFBuilder
+from bapsflib.plasma import core
+
+
+class TestReadPlasma(ut.TestCase):
+    """Test Case for read_plasma and hdfReadData.set_plasma"""
+
+    m_i = 4.0 * core.AMU
+
+    @classmethod
+    def setUpClass(cls):
+        cls.f = FauxHDFBuilder(
+            add_modules={'SIS 3301': {'n_configs': 1, 'sn_size': 20},
+                         'Magnetic field': {'sn_size': 10}})
+        with contextlib.redirect_stdout(io.StringIO()):
+            cls.lapdf = File(cls.f.path)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.lapdf.close()
+        cls.f.cleanup()
+
+    def test_profile(self):
+        """Test parameters along the axial field profile"""
+        n_e = np.linspace(1e11, 1e12, 10)
+        params = self.lapdf.read_plasma(5.0, 1.0, self.m_i, n_e, 1,
+                                        silent=True)
+        bfield = self.f['MSI/Magnetic field/Magnetic field profile']
+        self.assertTrue(np.array_equal(params['shotnum'],
+                                       2 * np.arange(10) + 1))
+        self.assertEqual(params['z'].shape, (1024,))
+        self.assertEqual(params['Bo'].shape, (10, 1024))
+        self.assertEqual(params['VA'].shape, (10, 1024))
+        self.assertEqual(params['fpe'].shape, (10, 1))
+        self.assertAlmostEqual(
+            params['fci'][3, 100] / core.fci(bfield[3, 100], self.m_i,
+                                             1), 1.0, places=6)
+        self.assertAlmostEqual(
+            params['VA'][3, 100] / core.VA(bfield[3, 100], self.m_i,
+                                           n_e[3]), 1.0, places=6)
+
+    def test_peak(self):
+        """Test parameters of the per-shot peak field"""
+        params = self.lapdf.read_plasma(5.0, 1.0, self.m_i, 1e12, 1,
+                                        shotnum=[1, 3, 4], profile=False,
+                                        silent=True)
+        self.assertTrue(np.array_equal(params['shotnum'], [1, 3]))
+        self.assertEqual(params['fce'].shape, (2,))
+        self.assertNotIn('z', params)
+
+    def test_set_plasma(self):
+        """Test hdfReadData.set_plasma with per-shot values"""
+        data = self.lapdf.read_data(0, 0, keep_bits=True, silent=True,
+                                    add_msi='Magnetic field')
+        Bo = data['Magnetic field']['peak magnetic field']
+        data.set_plasma(Bo, 5.0, 1.0, self.m_i, 1e12, 1)
+        self.assertEqual(data.plasma['fce'].shape, Bo.shape)
+        self.assertEqual(data.plasma['fce'].unit, 'Hz')
+
+        fce = data.plasma['fce']
+        data.set_plasma_value('kTe', 10.0)
+        self.assertIs(data.plasma['fce'], fce)
+        data.set_plasma_value('Bo', 1000.0)
+        self.assertIsInstance(data.plasma['fce'], core.FloatUnit)
+        self.assertRaises(ValueError, data.set_plasma_value, 'fce', 1.0)
+
+
+if __name__ == '__main__':
+    ut.main()
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# This file is part of the bapsflib package, a Python toolkit for the
+# BaPSF group at UCLA.
+#
+# http://plasma.physics.ucla.edu/
+#
+# Copyright 2017-2018 Erik T. Everson and contributors
+#
+# License: Standard 3-clause BSD; see "LICENSES/LICENSE.txt" for full
+#   license terms and contributor agreement.
+#
+import contextlib
+import io
+import numpy as np
+import unittest as ut
+
+from ..files import File
+from ..hdfposition import hdfPositionIndex
+
+from bapsflib.lapdhdf.tests import FauxSyntheticBuilder
+
+
+class TestHDFPositionIndex(ut.TestCase):
+    """Test Case for hdfPositionIndex and File.position_index"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.fsynth = FauxSyntheticBuilder(
+            nshots=250, nt=16, grid=(5, 5), shots_per_position=5,
+            shot_gaps=0.1, seed=2)
+        with contextlib.redirect_stdout(io.StringIO()):
+            cls.lapdf = File(cls.fsynth.path)
+        cls.sn = cls.fsynth.shotnum
+        cls.xyz = cls.fsynth.position(cls.sn)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.lapdf.close()
+        cls.fsynth.cleanup()
+
+    def expected(self, mask):
+        return np.unique(self.sn[mask])
+
+    def test_build(self):
+        """Test building and caching the index"""
+        pindex = self.lapdf.position_index()
+        self.assertIs(pindex, self.lapdf.position_index(1))
+        self.assertEqual(pindex.nshots, self.sn.shape[0])
+        self.assertEqual(pindex.positions.shape, (25, 5))
+        self.assertEqual(pindex.counts.sum(), self.sn.shape[0])
+        self.assertEqual(pindex.cell, 1.0)
+
+    def test_queries(self):
+        """Test within, on_line, and nearest"""
+        pindex = self.lapdf.position_index()
+        x, y = self.xyz[:, 0], self.xyz[:, 1]
+
+        for center, radius in [((0.0, 0.0), 1.0), ((1.2, -0.7), 1.5),
+                               ((-5.0, 0.0), 0.5), ((0.0, 0.0), 10.0)]:
+            dist = np.hypot(x - center[0], y - center[1])
+            self.assertTrue(np.array_equal(
+                pindex.within(center, radius),
+                self.expected(dist <= radius)))
+
+        self.assertTrue(np.array_equal(pindex.on_line(y=1.0),
+                                       self.expected(y == 1.0)))
+        self.assertTrue(np.array_equal(
+            pindex.on_line(x=-2.0, y=0.0),
+            self.expected((x == -2.0) & (y == 0.0))))
+        self.assertEqual(pindex.on_line(y=0.5).size, 0)
+
+        pos, shots = pindex.nearest((1.2, -0.7))
+        self.assertTrue(np.array_equal(pos[:3], [1.0, -1.0, 0.0]))
+        self.assertTrue(np.array_equal(
+            shots, self.expected((x == 1.0) & (y == -1.0))))
+        pos, shots = pindex.nearest((30.0, 30.0))
+        self.assertTrue(np.array_equal(pos[:2], [2.0, 2.0]))
+
+        # invalid queries
+        self.assertRaises(ValueError, pindex.within, (0.0,), 1.0)
+        self.assertRaises(ValueError, pindex.within, (0.0, 0.0), -1.0)
+        self.assertRaises(ValueError, pindex.on_line)
+        self.assertRaises(ValueError, pindex.on_line, r=1.0)
+        self.assertRaises(ValueError, pindex.select, {'radius': 1.0})
+
+    def test_read_position(self):
+        """Test read_data(position=...)"""
+        full = self.lapdf.read_data(0, 0, silent=True)
+        for position, mask in [
+                ({'y': 1.0}, self.xyz[:, 1] == 1.0),
+                ((0.1, 0.1), (self.xyz[:, 0] == 0.0)
+                 & (self.xyz[:, 1] == 0.0))]:
+            data = self.lapdf.read_data(0, 0, position=position,
+                                        silent=True)
+            sn = self.expected(mask)
+            self.assertTrue(np.array_equal(data['shotnum'], sn))
+            rows = np.isin(full['shotnum'], sn)
+            self.assertTrue(np.array_equal(data['signal'],
+                                           full['signal'][rows]))
+
+        data = self.lapdf.read_data(
+            0, 0, shotnum=slice(1, 60), silent=True,
+            position={'center': (0.0, 0.0), 'radius': 1.0},
+            add_controls=[('6K Compumotor', 1)])
+        self.assertTrue(np.all(data['shotnum'] < 60))
+        self.assertTrue(np.all(np.hypot(data['xyz'][:, 0],
+                                        data['xyz'][:, 1]) <= 1.0))
+
+        self.assertRaises(ValueError, self.lapdf.read_data, 0, 0,
+                          index=[0, 1], position={'y': 0.0})
+        self.assertRaises(ValueError, self.lapdf.read_data, 0, 0,
+                          position={'y': 0.5})
+
+    def test_index(self):
+        """Test hdfPositionIndex directly"""
+        coords = np.array([[0.0, 0.0, 0.0], [0.0, 0.0, 0.0],
+                           [0.5, 0.0, 0.0], [np.nan, 0.0, 0.0]])
+        pindex = hdfPositionIndex([4, 3, 2, 1], coords)
+        self.assertEqual(pindex.nshots, 3)
+        self.assertEqual(pindex.cell, 0.5)
+        self.assertTrue(np.array_equal(pindex.within((0, 0), 0.1),
+                                       [3, 4]))
+        self.assertTrue(np.array_equal(
+            pindex.within((0, 0), 0.1, ids=True), [0]))
+        self.assertRaises(ValueError, hdfPositionIndex, [1], coords)
+
+        # jittered 21x21 grid, the cell follows the grid spacing and
+        # not the jitter
+        rng = np.random.RandomState(4)
+        grid = np.linspace(-1.0, 1.0, 21)
+        xx, yy = np.meshgrid(grid, grid)
+        coords = np.stack([xx.ravel(), yy.ravel(),
+                           np.zeros(xx.size)], axis=1)
+        coords[:, :2] += rng.uniform(-1e-3, 1e-3, (xx.size, 2))
+        pindex = hdfPositionIndex(np.arange(1, xx.size + 1), coords)
+        self.assertAlmostEqual(pindex.cell, 0.1, delta=0.01)
+        pos, shots = pindex.nearest((0.4, 0.4))
+        i = np.argmin(np.hypot(coords[:, 0] - 0.4, coords[:, 1] - 0.4))
+        self.assertTrue(np.array_equal(shots, [i + 1]))
+
+        # a capped ring search falls back to all positions
+        pindex = hdfPositionIndex(np.arange(1, xx.size + 1), coords,
+                                  cell=1e-6)
+        pos, shots = pindex.nearest((0.4, 0.4))
+        self.assertTrue(np.array_equal(shots, [i + 1]))
+        self.assertRaises(ValueError, hdfPositionIndex, [1, 2, 3, 4],
+                          coords, cell=0.0)
+
+
+if __name__ == '__main__':
+    ut.main()
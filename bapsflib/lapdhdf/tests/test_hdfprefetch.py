@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# This file is part of the bapsflib package, a Python toolkit for the
+# BaPSF group at UCLA.
+#
+# http://plasma.physics.ucla.edu/
+#
+# Copyright 2017-2018 Erik T. Everson and contributors
+#
+# License: Standard 3-clause BSD; see "LICENSES/LICENSE.txt" for full
+#   license terms and contributor agreement.
+#
+import numpy as np
+import unittest as ut
+
+from ..files import File
+from ..hdfprefetch import hdfPrefetchReader
+from ..hdfreaddata import hdfReadData
+
+from bapsflib.lapdhdf.tests import FauxHDFBuilder
+
+
+class TestHDFPrefetchReader(ut.TestCase):
+    """Test Case for hdfPrefetchReader"""
+
+    def setUp(self):
+        self.f = FauxHDFBuilder(
+            add_modules={'SIS 3301': {'n_configs': 1, 'sn_size': 50},
+                         'Waveform': {'n_configs': 1, 'sn_size': 50}})
+        self.lapdf = File(self.f.filename)
+
+    def tearDown(self):
+        self.lapdf.close()
+        self.f.cleanup()
+
+    def test_iterate_index(self):
+        """Test iterating over all dataset rows"""
+        data = hdfReadData(self.lapdf, 0, 0, silent=True)
+        reader = hdfPrefetchReader(self.lapdf, 0, 0, block_size=15,
+                                   silent=True)
+        self.assertEqual(reader.nblocks, 4)
+        self.assertEqual(len(reader), 4)
+        self.assertEqual(reader.depth, 2)
+
+        with reader:
+            blocks = list(reader)
+        self.assertEqual([block.shape[0] for block in blocks],
+                         [15, 15, 15, 5])
+        self.assertTrue(np.array_equal(
+            np.concatenate([block['shotnum'] for block in blocks]),
+            data['shotnum']))
+        self.assertTrue(np.array_equal(
+            np.concatenate([block['signal'] for block in blocks]),
+            data['signal']))
+
+        # reader can be iterated again
+        self.assertEqual(len(list(reader)), 4)
+
+    def test_iterate_shotnum_with_controls(self):
+        """Test iterating over shot numbers with mated controls"""
+        reader = self.lapdf.iter_data(0, 0, block_size=10,
+                                      shotnum=slice(5, 31),
+                                      add_controls=['Waveform'],
+                                      silent=True)
+        self.assertIsInstance(reader, hdfPrefetchReader)
+        shotnum = []
+        for block in reader:
+            self.assertIn('command', block.dtype.names)
+            shotnum.extend(block['shotnum'].tolist())
+        self.assertEqual(shotnum, list(range(5, 31)))
+
+    def test_memory_budget(self):
+        """Test depth is limited by the memory budget"""
+        reader = hdfPrefetchReader(self.lapdf, 0, 0, block_size=10,
+                                   depth=8, max_bytes=0, silent=True)
+        self.assertEqual(reader.depth, 1)
+
+        reader = hdfPrefetchReader(self.lapdf, 0, 0, block_size=10,
+                                   depth=8,
+                                   max_bytes=3 * 10 * 10000 * 4,
+                                   silent=True)
+        self.assertEqual(reader.block_nbytes, 10 * 10000 * 4)
+        self.assertEqual(reader.depth, 3)
+
+    def test_early_stop_and_errors(self):
+        """Test stopping early and error propagation"""
+        reader = hdfPrefetchReader(self.lapdf, 0, 0, block_size=5,
+                                   silent=True)
+        for block in reader:
+            break
+        reader.close()
+        self.assertIsNone(reader._thread)
+
+        # errors in the background thread are raised to the consumer
+        reader = hdfPrefetchReader(self.lapdf, 0, 0, shotnum=[1000],
+                                   silent=True)
+        with self.assertRaises(ValueError):
+            list(reader)
+
+        # invalid keywords
+        self.assertRaises(ValueError, hdfPrefetchReader, self.lapdf,
+                          0, 0, block_size=0)
+        self.assertRaises(ValueError, hdfPrefetchReader, self.lapdf,
+                          0, 0, depth=0)
+        self.assertRaises(ValueError, hdfPrefetchReader, self.lapdf,
+                          0, 0, shotnum=slice(5, None))
+
+
+if __name__ == '__main__':
+    ut.main()
@@ -11,11 +11,14 @@
 # License: Standard 3-clause BSD; see "LICENSES/LICENSE.txt" for full
 #   license terms and contributor agreement.
 #
+import contextlib
+import io
 import numpy as np
+import pickle
 import unittest as ut
 
 from ..files import File
-from ..hdfreaddata import (hdfReadData, condition_shotnum)
+from ..hdfreaddata import (hdfDataInfo, hdfReadData, condition_shotnum)
 
 from bapsflib.lapdhdf.tests import FauxHDFBuilder
 
@@ -1457,5 +1460,75 @@ class TestHDFReadData(ut.TestCase):
                 self.assertIn(field, data.dtype.fields)
 
 
+class TestHDFDataInfo(ut.TestCase):
+    """Test Case for the shared hdfReadData meta-info"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.f = FauxHDFBuilder(
+            add_modules={'SIS 3301': {'n_configs': 1, 'sn_size': 20}})
+        with contextlib.redirect_stdout(io.StringIO()):
+            cls.lapdf = File(cls.f.path)
+            cls.data = cls.lapdf.read_data(0, 0, keep_bits=True,
+                                           silent=True)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.lapdf.close()
+        cls.f.cleanup()
+
+    def test_shared(self):
+        """Test views reference the meta-info of the array"""
+        data = self.data
+        info = data.info
+        self.assertIsInstance(info, hdfDataInfo)
+        self.assertIs(data.info, info)
+        for view in (data[2:5], data[::2], data[[1, 3]],
+                     data[2:5][1:], data.view(hdfReadData)):
+            self.assertIs(view.info, info)
+            self.assertIs(view.metrics, data.metrics)
+        self.assertEqual(data[2:5].dt, data.dt)
+
+        # plasma dict is created on use and shared with later views
+        plasma = data.plasma
+        self.assertIs(data[1:].plasma, plasma)
+
+        # arrays not produced by a read
+        empty = np.zeros(2, dtype=data.dtype).view(hdfReadData)
+        self.assertIsNone(empty.info['hdf file'])
+        self.assertIsNone(empty.metrics)
+
+    def test_immutable(self):
+        """Test the meta-info can not be modified"""
+        info = self.data.info
+        with self.assertRaises(TypeError):
+            info['bit'] = 8
+        self.assertRaises(AttributeError, setattr, info, '_dt', 1.0)
+        self.assertRaises(AttributeError, setattr, info, 'other', 1.0)
+
+        # modifiable copies
+        copy = info.copy()
+        self.assertIsInstance(copy, dict)
+        self.assertEqual(copy, dict(info))
+        copy['probe name'] = 'LP1'
+        self.assertIsNone(info['probe name'])
+        new = info.replace(**{'probe name': 'LP1'})
+        self.assertEqual(new['probe name'], 'LP1')
+        self.assertEqual(new['bit'], info['bit'])
+
+        # pickling
+        self.assertEqual(pickle.loads(pickle.dumps(info)), info)
+
+    def test_cached_steps(self):
+        """Test dt and dv are computed once"""
+        info = hdfDataInfo({'sample rate': (100.0, 'MHz'),
+                            'sample average': 2, 'bit': 14,
+                            'voltage offset': -2.5})
+        self.assertAlmostEqual(info.dt, 2e-8)
+        self.assertAlmostEqual(info.dv, 5.0 / (2. ** 14 - 1.))
+        self.assertIs(info.dt, info.dt)
+        self.assertIs(info.dv, info.dv)
+
+
 if __name__ == '__main__':
     ut.main()
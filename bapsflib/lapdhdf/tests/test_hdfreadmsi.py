@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# This file is part of the bapsflib package, a Python toolkit for the
+# BaPSF group at UCLA.
+#
+# http://plasma.physics.ucla.edu/
+#
+# Copyright 2017-2018 Erik T. Everson and contributors
+#
+# License: Standard 3-clause BSD; see "LICENSES/LICENSE.txt" for full
+#   license terms and contributor agreement.
+#
+import contextlib
+import io
+import numpy as np
+import unittest as ut
+
+from ..files import File
+from ..hdfreadmsi import hdfReadMSI
+
+from bapsflib.lapdhdf.tests import FauxHDFBuilder
+
+
+class TestHDFReadMSI(ut.TestCase):
+    """Test Case for hdfReadMSI and read_data(add_msi=...)"""
+
+    @classmethod
+    def setUpClass(cls):
+        # MSI diagnostics record the odd shots 1 to 59, the digitizer
+        # records shots 1 to 50
+        cls.f = FauxHDFBuilder(
+            add_modules={'SIS 3301': {'n_configs': 1, 'sn_size': 50},
+                         'Discharge': {'sn_size': 30, 'nt': 16},
+                         'Interferometer array': {'sn_size': 30,
+                                                  'nt': 16}})
+        with contextlib.redirect_stdout(io.StringIO()):
+            cls.lapdf = File(cls.f.path)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.lapdf.close()
+        cls.f.cleanup()
+
+    def rows(self, path, sn):
+        """rows of dataset `path` for the odd shot numbers `sn`"""
+        return self.f[path][((np.asarray(sn) - 1) // 2).tolist()]
+
+    def test_read(self):
+        """Test values against direct h5py reads"""
+        mdata = self.lapdf.read_msi('Discharge')
+        sn = 2 * np.arange(30) + 1
+        self.assertIsInstance(mdata, hdfReadMSI)
+        self.assertTrue(np.array_equal(mdata['shotnum'], sn))
+        self.assertTrue(np.array_equal(
+            mdata['current'], self.f['MSI/Discharge/Discharge current']))
+        self.assertTrue(np.array_equal(
+            mdata['peak current'],
+            self.f['MSI/Discharge/Discharge summary']['Peak current']))
+        self.assertEqual(mdata.info['device name'], 'Discharge')
+        self.assertEqual(mdata.info['attrs']['calibration tag'],
+                         '08/27/2015')
+        self.assertIsNotNone(mdata.metrics)
+
+        # sub-set of shots, requested shots not recorded are dropped
+        mdata = self.lapdf.read_msi('Discharge', shotnum=[4, 5, 9, 200])
+        self.assertTrue(np.array_equal(mdata['shotnum'], [5, 9]))
+        self.assertTrue(np.array_equal(
+            mdata['voltage'],
+            self.rows('MSI/Discharge/Cathode-anode voltage', [5, 9])))
+
+    def test_null_fill(self):
+        """Test intersection_set=False"""
+        mdata = self.lapdf.read_msi('Discharge', shotnum=[4, 5, 200],
+                                    intersection_set=False)
+        self.assertTrue(np.array_equal(mdata['shotnum'], [4, 5, 200]))
+        self.assertTrue(np.isnan(mdata['current'][[0, 2]]).all())
+        self.assertTrue(np.array_equal(
+            mdata['current'][1],
+            self.rows('MSI/Discharge/Discharge current', [5])[0]))
+        self.assertTrue(np.array_equal(mdata['data valid'], [0, 1, 0]))
+
+        # no requested shot number is recorded
+        mdata = self.lapdf.read_msi('Discharge', shotnum=[200, 201],
+                                    intersection_set=False)
+        self.assertTrue(np.array_equal(mdata['shotnum'], [200, 201]))
+        self.assertTrue(np.isnan(mdata['current']).all())
+
+    def test_interferometers(self):
+        """Test stacking of the interferometer sub-groups"""
+        mdata = self.lapdf.read_msi('Interferometer array',
+                                    shotnum=slice(1, 20))
+        self.assertEqual(mdata['signal'].shape, (10, 7, 16))
+        for i in range(7):
+            path = 'MSI/Interferometer array/Interferometer ' \
+                   '[{}]/'.format(i)
+            self.assertTrue(np.array_equal(
+                mdata['signal'][:, i],
+                self.rows(path + 'Interferometer trace',
+                          mdata['shotnum'])))
+            self.assertTrue(np.array_equal(
+                mdata['peak density'][:, i],
+                self.rows(path + 'Interferometer summary list',
+                          mdata['shotnum'])['Peak density']))
+
+    def test_read_data(self):
+        """Test matching MSI data to digitizer shots"""
+        data = self.lapdf.read_data(0, 0, keep_bits=True, silent=True,
+                                    add_msi=['Discharge',
+                                             'Interferometer array'])
+        sn = 2 * np.arange(25) + 1
+        self.assertTrue(np.array_equal(data['shotnum'], sn))
+        self.assertTrue(np.array_equal(
+            data['Discharge']['current'],
+            self.rows('MSI/Discharge/Discharge current', sn)))
+        self.assertEqual(
+            data['Interferometer array']['signal'].shape, (25, 7, 16))
+        self.assertIn('Discharge', data.info['added msi'])
+
+        full = self.lapdf.read_data(0, 0, keep_bits=True, silent=True)
+        self.assertTrue(np.array_equal(
+            data['signal'], full['signal'][sn - 1]))
+
+        # union of shots
+        data = self.lapdf.read_data(0, 0, keep_bits=True, silent=True,
+                                    shotnum=[2, 3], add_msi='Discharge',
+                                    intersection_set=False)
+        self.assertTrue(np.array_equal(data['shotnum'], [2, 3]))
+        self.assertTrue(np.isnan(data['Discharge']['current'][0]).all())
+        self.assertFalse(np.isnan(data['Discharge']['current'][1]).any())
+
+    def test_read_cache(self):
+        """Test equivalent requests share a read cache entry"""
+        with contextlib.redirect_stdout(io.StringIO()):
+            lapdf = File(self.f.path, read_cache=2 ** 20)
+        try:
+            mdata = lapdf.read_msi('Discharge', shotnum=slice(5, 12))
+            mdata2 = lapdf.read_msi('Discharge', shotnum=[5, 7, 9, 11])
+            self.assertTrue(mdata2.metrics.cache_hit)
+            self.assertTrue(np.array_equal(mdata, mdata2))
+            self.assertEqual(lapdf.read_cache.stats['hits'], 1)
+        finally:
+            lapdf.close()
+
+    def test_errors(self):
+        """Test invalid arguments"""
+        self.assertRaises(ValueError, self.lapdf.read_msi, 'Heater')
+        self.assertRaisesRegex(ValueError, 'null array',
+                               self.lapdf.read_msi, 'Discharge',
+                               shotnum=[200])
+        self.assertRaisesRegex(ValueError, 'null array',
+                               self.lapdf.read_msi, 'Discharge',
+                               shotnum=slice(100, 200))
+        self.assertRaises(ValueError, self.lapdf.read_msi, 'Discharge',
+                          shotnum=[0.5])
+        self.assertRaises(ValueError, self.lapdf.read_data, 0, 0,
+                          add_msi=['Heater'])
+        self.assertRaises(TypeError, self.lapdf.read_data, 0, 0,
+                          add_msi=[1])
+
+
+if __name__ == '__main__':
+    ut.main()
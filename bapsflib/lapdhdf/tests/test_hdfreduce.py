@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# This file is part of the bapsflib package, a Python toolkit for the
+# BaPSF group at UCLA.
+#
+# http://plasma.physics.ucla.edu/
+#
+# Copyright 2017-2018 Erik T. Everson and contributors
+#
+# License: Standard 3-clause BSD; see "LICENSES/LICENSE.txt" for full
+#   license terms and contributor agreement.
+#
+import contextlib
+import io
+import numpy as np
+import unittest as ut
+
+from ..files import File
+from ..hdfreduce import hdfGroupReducer
+
+from bapsflib.lapdhdf.tests import FauxSyntheticBuilder
+
+
+class TestHDFGroupReducer(ut.TestCase):
+    """Test Case for hdfGroupReducer and File.reduce_data"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.fsynth = FauxSyntheticBuilder(
+            nshots=240, nt=64, grid=(4, 3), shots_per_position=5,
+            shots_per_command=3, shot_gaps=0.1, seed=5)
+        with contextlib.redirect_stdout(io.StringIO()):
+            cls.lapdf = File(cls.fsynth.path)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.lapdf.close()
+        cls.fsynth.cleanup()
+
+    @staticmethod
+    def key(row, by):
+        return tuple(tuple(np.asarray(row[name]).ravel().tolist())
+                     for name in by)
+
+    def expected(self, data, by):
+        """Group-by of a full read with NumPy"""
+        groups = {}
+        for i in range(data.shape[0]):
+            groups.setdefault(self.key(data[i], by), []).append(i)
+        return groups
+
+    def check(self, stats, data, by, bits=False):
+        groups = self.expected(data, by)
+        self.assertEqual(stats.shape[0], len(groups))
+        self.assertEqual(stats['count'].sum(), data.shape[0])
+        for row in stats:
+            sig = np.asarray(data['signal'][groups[self.key(row, by)]],
+                             dtype=np.float64)
+            self.assertEqual(row['count'], sig.shape[0])
+            rtol = 1e-5 if bits else 1e-10
+            np.testing.assert_allclose(row['mean'], sig.mean(axis=0),
+                                       rtol=rtol, atol=1e-7)
+            np.testing.assert_allclose(row['var'], sig.var(axis=0),
+                                       rtol=1e-4, atol=1e-9)
+            np.testing.assert_allclose(row['min'], sig.min(axis=0),
+                                       rtol=rtol, atol=1e-7)
+            np.testing.assert_allclose(row['max'], sig.max(axis=0),
+                                       rtol=rtol, atol=1e-7)
+
+    def test_reduce_xyz(self):
+        """Test grouping on probe position"""
+        data = self.lapdf.read_data(0, 0,
+                                    add_controls=['6K Compumotor'],
+                                    silent=True)
+        stats = self.lapdf.reduce_data(0, 0, 'xyz',
+                                       add_controls=['6K Compumotor'],
+                                       block_size=7)
+        self.assertEqual(stats.shape[0], 12)
+        self.check(stats, data, ['xyz'])
+
+    def test_reduce_xyz_command(self):
+        """Test grouping on position and waveform command"""
+        controls = ['6K Compumotor', 'Waveform']
+        data = self.lapdf.read_data(0, 0, add_controls=controls,
+                                    silent=True)
+        stats = self.lapdf.reduce_data(0, 0, ['xyz', 'command'],
+                                       add_controls=controls,
+                                       block_size=50)
+        self.assertEqual(stats.shape[0], 12 * 3)
+        self.check(stats, data, ['xyz', 'command'])
+
+    def test_reduce_bits(self):
+        """Test accumulating in bit space"""
+        data = self.lapdf.read_data(0, 0,
+                                    add_controls=['6K Compumotor'],
+                                    silent=True)
+        stats = self.lapdf.reduce_data(0, 0, 'xyz',
+                                       add_controls=['6K Compumotor'],
+                                       block_size=13, bits=True)
+        self.check(stats, data, ['xyz'], bits=True)
+
+    def test_reducer(self):
+        """Test hdfGroupReducer directly"""
+        dtype = [('shotnum', np.uint32), ('signal', np.float32, (4,)),
+                 ('xyz', np.float64, (3,))]
+        data = np.zeros(6, dtype=dtype)
+        data['signal'] = np.arange(24).reshape(6, 4)
+        data['xyz'][:, 0] = [0.0, -0.0, 1.001, 0.999, np.nan, 0.0]
+
+        reducer = hdfGroupReducer('xyz', stats=('mean',), decimals=2)
+        reducer.update(data[:3])
+        reducer.update(data[3:])
+        stats = reducer.result()
+        self.assertEqual(reducer.ngroups, 2)
+        self.assertEqual(reducer.nshots, 5)
+        self.assertEqual(reducer.skipped, 1)
+        self.assertEqual(stats.dtype.names, ('xyz', 'count', 'mean'))
+        self.assertTrue(np.array_equal(stats['count'], [3, 2]))
+        np.testing.assert_allclose(stats['mean'][0],
+                                   data['signal'][[0, 1, 5]].mean(0))
+
+        # memory scales with groups, not shots
+        nbytes = reducer.nbytes
+        for i in range(5):
+            reducer.update(data[:4])
+        self.assertEqual(reducer.nbytes, nbytes)
+
+        # invalid arguments
+        self.assertRaises(ValueError, hdfGroupReducer, [])
+        self.assertRaises(ValueError, hdfGroupReducer, 'signal')
+        self.assertRaises(ValueError, hdfGroupReducer, 'xyz',
+                          stats=('median',))
+        self.assertRaises(ValueError, reducer.update,
+                          np.zeros(2, dtype=[('signal', float, (4,))]))
+        self.assertRaises(ValueError,
+                          hdfGroupReducer('xyz', bits=True).update,
+                          data)
+
+        # no data
+        stats = hdfGroupReducer('xyz').result()
+        self.assertEqual(stats.shape, (0,))
+
+        # blocks with known group keys
+        signal = data['signal'].astype(np.float64)
+        reducer = hdfGroupReducer('point', stats=('mean', 'var'))
+        reducer.update_groups(np.array([2, 0, 2]), signal[:3])
+        reducer.update_groups(np.array([0, 2, 2]), signal[3:])
+        stats = reducer.result()
+        self.assertEqual(stats.dtype.names,
+                         ('point', 'count', 'mean', 'var'))
+        self.assertTrue(np.array_equal(stats['point'], [0, 2]))
+        self.assertTrue(np.array_equal(stats['count'], [2, 4]))
+        np.testing.assert_allclose(stats['mean'][1],
+                                   signal[[0, 2, 4, 5]].mean(0))
+        np.testing.assert_allclose(stats['var'][1],
+                                   signal[[0, 2, 4, 5]].var(0))
+        self.assertRaises(ValueError, reducer.update_groups,
+                          np.array([0.5]), signal[:1])
+        self.assertRaises(ValueError, reducer.update_groups,
+                          np.array([0]), signal[:2])
+        self.assertRaises(ValueError,
+                          hdfGroupReducer(['ix', 'iy']).update_groups,
+                          np.array([0]), signal[:1])
+
+
+if __name__ == '__main__':
+    ut.main()
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# This file is part of the bapsflib package, a Python toolkit for the
+# BaPSF group at UCLA.
+#
+# http://plasma.physics.ucla.edu/
+#
+# Copyright 2017-2018 Erik T. Everson and contributors
+#
+# License: Standard 3-clause BSD; see "LICENSES/LICENSE.txt" for full
+#   license terms and contributor agreement.
+#
+import numpy as np
+import os
+import socket
+import tempfile
+import unittest as ut
+
+from ..files import File
+from ..hdfserver import (decode_value, encode_value, hdfReadClient,
+                         hdfReadServer, recv_message, send_message)
+
+from bapsflib.lapdhdf.tests import FauxHDFBuilder
+
+
+class TestHDFServer(ut.TestCase):
+    """Test Case for hdfReadServer and hdfReadClient"""
+
+    def setUp(self):
+        self.f = FauxHDFBuilder(
+            add_modules={'SIS 3301': {'n_configs': 1, 'sn_size': 20},
+                         'Waveform': {'n_configs': 1, 'sn_size': 20}})
+        self.f.close()
+        self.sockdir = tempfile.TemporaryDirectory()
+        self.server = hdfReadServer(
+            os.path.join(self.sockdir.name, 'bapsflib.sock'),
+            root=os.path.dirname(self.f.path)).start()
+        self.client = hdfReadClient(self.server.address)
+        self.fname = os.path.basename(self.f.path)
+
+    def tearDown(self):
+        self.client.close()
+        self.server.shutdown()
+        self.sockdir.cleanup()
+        self.f.cleanup()
+
+    def test_codec(self):
+        """Test metadata encoding round trip"""
+        val = {'port': (None, None),
+               'sample rate': (100.0, 'MHz'),
+               'added controls': [('Waveform', 'config01')],
+               'voltage offset': np.float64(-2.5),
+               'index': slice(1, None, 2),
+               'raw': b'\x00\xff',
+               'arr': np.arange(3, dtype=np.int32),
+               1: 'int key'}
+        out = decode_value(encode_value(val))
+        self.assertEqual(out['port'], (None, None))
+        self.assertEqual(out['sample rate'], (100.0, 'MHz'))
+        self.assertEqual(out['added controls'], [('Waveform',
+                                                  'config01')])
+        self.assertEqual(out['voltage offset'], -2.5)
+        self.assertEqual(out['index'], slice(1, None, 2))
+        self.assertEqual(out['raw'], b'\x00\xff')
+        self.assertEqual(out['arr'].dtype, np.int32)
+        self.assertEqual(out[1], 'int key')
+        self.assertRaises(TypeError, encode_value, object())
+
+    def test_reads(self):
+        """Test reads through the server match direct reads"""
+        with File(self.f.path) as lapdf:
+            expected = lapdf.read_data(0, 0, shotnum=slice(3, 9),
+                                       add_controls=['Waveform'],
+                                       silent=True)
+            cexpected = lapdf.read_controls(['Waveform'],
+                                            shotnum=[2, 5])
+
+        data = self.client.read_data(self.fname, 0, 0,
+                                     shotnum=slice(3, 9),
+                                     add_controls=['Waveform'],
+                                     silent=True)
+        self.assertEqual(data.dtype, expected.dtype)
+        for name in expected.dtype.names:
+            np.testing.assert_array_equal(data[name], expected[name])
+        self.assertEqual(data.info, expected.info)
+        self.assertAlmostEqual(data.dt, expected.dt)
+
+        # returned arrays are writable
+        data['signal'][0, 0] = 0
+
+        cdata = self.client.read_controls(self.fname, ['Waveform'],
+                                          shotnum=[2, 5])
+        for name in cexpected.dtype.names:
+            np.testing.assert_array_equal(cdata[name], cexpected[name])
+        self.assertEqual(cdata.info, cexpected.info)
+
+        info = self.client.file_info(self.fname)
+        self.assertEqual(info['digitizers'], ['SIS 3301'])
+        self.assertEqual(info['controls'], ['Waveform'])
+
+        # the file is mapped once and the handle reused
+        stats = self.client.stats()
+        self.assertEqual(stats['opens'], 1)
+        self.assertEqual(stats['checkouts'], 3)
+
+        # a second client shares the server's handles
+        with hdfReadClient(self.server.address) as client:
+            client.read_data(self.fname, 0, 0, index=0, silent=True)
+        self.assertEqual(self.client.stats()['opens'], 1)
+
+    def test_errors(self):
+        """Test server errors are re-raised by the client"""
+        self.assertRaises(ValueError, self.client.read_data,
+                          self.fname, 0, 0, shotnum=[1000],
+                          silent=True)
+        self.assertRaises(ValueError, self.client.read_data,
+                          '../' + self.fname, 0, 0)
+        self.assertRaises(OSError, self.client.read_data,
+                          'not_a_file.hdf5', 0, 0)
+
+        # the connection stays usable
+        data = self.client.read_data(self.fname, 0, 0, index=[0, 1],
+                                     silent=True)
+        self.assertEqual(data.shape, (2,))
+        self.assertRaises(TypeError, hdfReadServer, 5)
+        self.assertRaises(ValueError, hdfReadServer,
+                          os.path.join(self.sockdir.name, 'b.sock'),
+                          max_request_bytes=0)
+
+    def test_frame_limits(self):
+        """Test oversize frames are rejected before allocation"""
+        for prefix in (
+                # header of 4 GB
+                b'BPSF' + (2 ** 32 - 1).to_bytes(4, 'big')
+                + (0).to_bytes(8, 'big'),
+                # payload of 2**63 bytes
+                b'BPSF' + (2).to_bytes(4, 'big')
+                + (2 ** 63).to_bytes(8, 'big')):
+            with socket.socket(socket.AF_UNIX,
+                               socket.SOCK_STREAM) as sock:
+                sock.connect(self.server.address)
+                sock.sendall(prefix)
+                header, payload = recv_message(sock)
+                self.assertEqual(header['status'], 'error')
+                self.assertEqual(header['error'], 'ValueError')
+                self.assertIn('exceeds the limit', header['message'])
+
+                # the connection is dropped
+                self.assertEqual(sock.recv(1), b'')
+
+        # a request within the limits is still served
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.connect(self.server.address)
+            send_message(sock, {'version': 1, 'op': 'stats'})
+            self.assertEqual(recv_message(sock)[0]['status'], 'ok')
+        self.assertEqual(self.server.max_request_bytes, 2 ** 20)
+
+
+if __name__ == '__main__':
+    ut.main()
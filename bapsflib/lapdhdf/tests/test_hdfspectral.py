@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# This file is part of the bapsflib package, a Python toolkit for the
+# BaPSF group at UCLA.
+#
+# http://plasma.physics.ucla.edu/
+#
+# Copyright 2017-2018 Erik T. Everson and contributors
+#
+# License: Standard 3-clause BSD; see "LICENSES/LICENSE.txt" for full
+#   license terms and contributor agreement.
+#
+import contextlib
+import io
+import numpy as np
+import unittest as ut
+
+from ..files import File
+from ..hdfspectral import (get_window, hdfSpectralReducer)
+
+from bapsflib.lapdhdf.tests import FauxSyntheticBuilder
+
+
+def welch(signal, dt, nperseg, noverlap, window):
+    """Reference one-sided Welch density, one segment at a time"""
+    step = nperseg - noverlap
+    nseg = (signal.shape[-1] - noverlap) // step
+    psd = np.zeros(signal.shape[:-1] + (nperseg // 2 + 1,))
+    for i in range(nseg):
+        seg = signal[..., i * step:i * step + nperseg]
+        seg = (seg - seg.mean(axis=-1, keepdims=True)) * window
+        psd += np.abs(np.fft.rfft(seg, axis=-1)) ** 2
+    psd *= dt / (np.sum(window ** 2) * nseg)
+    psd[..., 1:] *= 2.0
+    if nperseg % 2 == 0:
+        psd[..., -1] /= 2.0
+    return psd
+
+
+class TestHDFSpectral(ut.TestCase):
+    """
+    Test Case for hdfSpectralReducer, File.welch_data, and
+    File.iter_fft
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        cls.fsynth = FauxSyntheticBuilder(
+            nshots=120, nt=64, grid=(3, 2), shots_per_position=5,
+            seed=11)
+        with contextlib.redirect_stdout(io.StringIO()):
+            cls.lapdf = File(cls.fsynth.path)
+            cls.data = cls.lapdf.read_data(
+                0, 0, add_controls=['6K Compumotor'], silent=True)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.lapdf.close()
+        cls.fsynth.cleanup()
+
+    def test_welch(self):
+        """Test the ensemble-averaged spectrum of all shots"""
+        data = self.data
+        spec = self.lapdf.welch_data(0, 0, nperseg=16, block_size=7)
+        expected = welch(np.asarray(data['signal'], dtype=np.float64),
+                         data.dt, 16, 8, get_window('hann', 16))
+        self.assertEqual(spec.count, data.shape[0])
+        self.assertIsNone(spec.groups)
+        self.assertTrue(np.allclose(spec.freq,
+                                    np.fft.rfftfreq(16, data.dt)))
+        np.testing.assert_allclose(spec.psd, expected.mean(axis=0),
+                                   rtol=1e-10)
+
+        # sample window, overlap, and spectrum scaling
+        spec = self.lapdf.welch_data(0, 0, nperseg=10, noverlap=3,
+                                     window='boxcar',
+                                     samples=slice(5, 45),
+                                     scaling='spectrum')
+        sig = np.asarray(data['signal'][:, 5:45], dtype=np.float64)
+        expected = welch(sig, data.dt, 10, 3, np.ones(10))
+        expected *= 1.0 / (data.dt * 10)
+        np.testing.assert_allclose(spec.psd, expected.mean(axis=0),
+                                   rtol=1e-10)
+
+        # separate memory budgets of the reducer and the reader
+        spec = self.lapdf.welch_data(0, 0, nperseg=10, noverlap=3,
+                                     window='boxcar',
+                                     samples=slice(5, 45),
+                                     scaling='spectrum',
+                                     reduce_max_bytes=1,
+                                     max_bytes=2 ** 16)
+        np.testing.assert_allclose(spec.psd, expected.mean(axis=0),
+                                   rtol=1e-10)
+        self.assertRaises(ValueError, self.lapdf.welch_data, 0, 0,
+                          nperseg=16, max_bytes=-1)
+
+    def test_welch_grouped(self):
+        """Test one spectrum per probe position"""
+        data = self.data
+        spec = self.lapdf.welch_data(0, 0, nperseg=32, by='xyz',
+                                     add_controls=['6K Compumotor'],
+                                     block_size=11)
+        self.assertEqual(spec.psd.shape, (6, 17))
+        self.assertEqual(spec.count.sum(), data.shape[0])
+        expected = welch(np.asarray(data['signal'], dtype=np.float64),
+                         data.dt, 32, 16, get_window('hann', 32))
+        for i, xyz in enumerate(spec.groups['xyz']):
+            mask = np.all(data['xyz'] == xyz, axis=1)
+            self.assertEqual(spec.count[i], np.count_nonzero(mask))
+            np.testing.assert_allclose(spec.psd[i],
+                                       expected[mask].mean(axis=0),
+                                       rtol=1e-10)
+
+    def test_iter_fft(self):
+        """Test streaming per-shot FFTs"""
+        data = self.data
+        nshots = 0
+        for sn, freq, fft in self.lapdf.iter_fft(0, 0, block_size=25,
+                                                 samples=slice(0, 32)):
+            self.assertEqual(fft.shape, (sn.shape[0], 17))
+            self.assertTrue(np.allclose(freq,
+                                        np.fft.rfftfreq(32, data.dt)))
+            sig = data['signal'][nshots:nshots + sn.shape[0], :32]
+            np.testing.assert_allclose(fft, np.fft.rfft(sig, axis=-1),
+                                       rtol=1e-10, atol=1e-10)
+            nshots += sn.shape[0]
+        self.assertEqual(nshots, data.shape[0])
+
+    def test_reducer(self):
+        """Test hdfSpectralReducer directly"""
+        dtype = [('shotnum', np.uint32), ('signal', np.float64, (40,)),
+                 ('xyz', np.float64, (3,))]
+        data = np.zeros(9, dtype=dtype)
+        t = np.arange(40)
+        data['signal'] = np.sin(2.0 * np.pi * 0.25 * t)
+        data['xyz'][5:, 0] = 1.0
+
+        # chunked transforms match a single pass
+        reducer = hdfSpectralReducer(nperseg=8, by='xyz', dt=1.0,
+                                     max_bytes=1)
+        reducer.update(data[:4])
+        reducer.update(data[4:])
+        spec = reducer.result()
+        self.assertEqual(reducer.nshots, 9)
+        self.assertTrue(np.array_equal(spec.count, [5, 4]))
+        self.assertEqual(spec.freq[np.argmax(spec.psd[0])], 0.25)
+        np.testing.assert_allclose(
+            spec.psd[0], welch(data['signal'][0], 1.0, 8, 4,
+                               get_window('hann', 8)))
+
+        # memory does not grow with shots
+        nbytes = reducer.nbytes
+        for i in range(5):
+            reducer.update(data)
+        self.assertEqual(reducer.nbytes, nbytes)
+
+        # no data
+        spec = hdfSpectralReducer().result()
+        self.assertIsNone(spec.freq)
+        self.assertEqual(spec.count, 0)
+
+        # invalid arguments
+        self.assertRaises(ValueError, hdfSpectralReducer, nperseg=1)
+        self.assertRaises(ValueError, hdfSpectralReducer, noverlap=256)
+        self.assertRaises(TypeError, hdfSpectralReducer, samples=[0, 1])
+        self.assertRaises(ValueError, hdfSpectralReducer,
+                          scaling='power')
+        self.assertRaises(ValueError, hdfSpectralReducer,
+                          window='triangle')
+        self.assertRaises(ValueError, hdfSpectralReducer, nperseg=8,
+                          window=np.ones(4))
+        self.assertRaises(ValueError,
+                          hdfSpectralReducer(nperseg=8).update, data)
+        self.assertRaises(ValueError,
+                          hdfSpectralReducer(nperseg=64, dt=1.0).update,
+                          data)
+        reducer = hdfSpectralReducer(nperseg=8, dt=1.0)
+        reducer.update(data)
+        short = np.zeros(2, dtype=[('signal', np.float64, (20,))])
+        self.assertRaises(ValueError, reducer.update, short)
+
+
+if __name__ == '__main__':
+    ut.main()
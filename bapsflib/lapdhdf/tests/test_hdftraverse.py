@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# This file is part of the bapsflib package, a Python toolkit for the
+# BaPSF group at UCLA.
+#
+# http://plasma.physics.ucla.edu/
+#
+# Copyright 2017-2018 Erik T. Everson and contributors
+#
+# License: Standard 3-clause BSD; see "LICENSES/LICENSE.txt" for full
+#   license terms and contributor agreement.
+#
+import h5py
+import numpy as np
+import unittest as ut
+
+from ..hdftraverse import (DATASET, GROUP, list_members, member_attrs,
+                           member_types, read_attrs, walk)
+
+from bapsflib.lapdhdf.tests import FauxHDFBuilder
+
+
+class TestHDFTraverse(ut.TestCase):
+    """Test Case for the hdftraverse helpers"""
+
+    def setUp(self):
+        self.f = FauxHDFBuilder(
+            add_modules={'SIS 3301': {'n_configs': 2},
+                         'Waveform': {'n_configs': 1}})
+        self.dgroup = self.f['Raw data + config/SIS 3301']
+
+    def tearDown(self):
+        self.f.cleanup()
+
+    def test_member_types(self):
+        """Test member types match the h5py object types"""
+        mtypes = member_types(self.dgroup)
+        self.assertEqual(list(mtypes), list(self.dgroup.keys()))
+        for name, otype in mtypes.items():
+            if isinstance(self.dgroup[name], h5py.Group):
+                self.assertEqual(otype, GROUP)
+            else:
+                self.assertEqual(otype, DATASET)
+
+        self.assertEqual(
+            list_members(self.dgroup, GROUP),
+            [name for name in self.dgroup
+             if isinstance(self.dgroup[name], h5py.Group)])
+        self.assertEqual(
+            list_members(self.dgroup, DATASET),
+            [name for name in self.dgroup
+             if isinstance(self.dgroup[name], h5py.Dataset)])
+        self.assertRaises(ValueError, list_members, self.dgroup, 'link')
+
+        # dangling links have no type
+        self.f['Raw data + config'].create_group('Empty')
+        egroup = self.f['Raw data + config/Empty']
+        egroup['dangling'] = h5py.SoftLink('/not/an/object')
+        self.assertEqual(member_types(egroup), {'dangling': None})
+
+    def test_walk(self):
+        """Test walking the objects below a group"""
+        config_name = list_members(self.dgroup, GROUP)[0]
+        cgroup = self.dgroup[config_name]
+
+        expected = []
+        cgroup.visit(expected.append)
+        items = walk(cgroup)
+        self.assertEqual(sorted(path for path, otype in items),
+                         sorted(expected))
+        for path, otype in items:
+            self.assertEqual(otype, GROUP)
+
+        # limit depth
+        items = walk(cgroup, max_depth=1)
+        self.assertEqual([path for path, otype in items],
+                         list(cgroup.keys()))
+
+    def test_attrs(self):
+        """Test bulk attribute reads"""
+        config_name = list_members(self.dgroup, GROUP)[0]
+        cgroup = self.dgroup[config_name]
+
+        attrs = read_attrs(cgroup)
+        self.assertEqual(sorted(attrs), sorted(cgroup.attrs.keys()))
+        for key, val in attrs.items():
+            self.assertTrue(np.array_equal(val, cgroup.attrs[key]))
+        self.assertEqual(read_attrs(cgroup, ['not an attr']), {})
+
+        # channel attributes of all boards
+        ch_attrs = member_attrs(cgroup, ['Board', 'Channel'],
+                                max_depth=2)
+        for path, attrs in ch_attrs.items():
+            if '/' in path:
+                self.assertEqual(attrs['Board'],
+                                 cgroup[path].attrs['Board'])
+                self.assertEqual(attrs['Channel'],
+                                 cgroup[path].attrs['Channel'])
+        self.assertEqual(list(member_attrs(cgroup)),
+                         list(cgroup.keys()))
+
+
+if __name__ == '__main__':
+    ut.main()
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# This file is part of the bapsflib package, a Python toolkit for the
+# BaPSF group at UCLA.
+#
+# http://plasma.physics.ucla.edu/
+#
+# Copyright 2017-2018 Erik T. Everson and contributors
+#
+# License: Standard 3-clause BSD; see "LICENSES/LICENSE.txt" for full
+#   license terms and contributor agreement.
+#
+import numpy as np
+import unittest as ut
+
+from ..files import File
+from ..hdfwarmup import (hdfShotnumDataset, hdfWarmup)
+
+from bapsflib.lapdhdf.tests import FauxHDFBuilder
+
+
+class TestHDFWarmup(ut.TestCase):
+    """Test Case for hdfWarmup"""
+
+    def setUp(self):
+        self.f = FauxHDFBuilder(
+            add_modules={'SIS 3301': {'n_configs': 1, 'sn_size': 50},
+                         'Waveform': {'n_configs': 1, 'sn_size': 50}})
+
+    def tearDown(self):
+        self.f.cleanup()
+
+    def test_warmup(self):
+        """Test warm-up of shot number columns"""
+        lapdf = File(self.f.filename)
+        self.assertIsNone(lapdf.warmup)
+
+        warmup = hdfWarmup(lapdf, start=False)
+        self.assertFalse(warmup.done)
+        self.assertEqual(warmup.progress, (0, len(warmup.paths)))
+
+        # one header dataset per connected channel plus the control
+        digi_map = lapdf.file_map.main_digitizer
+        nchannels = 0
+        for config_name in digi_map.active_configs:
+            config = digi_map.configs[config_name]
+            for adc in config['adc']:
+                for conn in config[adc]:
+                    nchannels += len(conn[1])
+        self.assertEqual(len(warmup.paths), nchannels + 1)
+
+        self.assertTrue(warmup.wait(timeout=30))
+        self.assertTrue(warmup.done)
+        self.assertEqual(warmup.fraction, 1.0)
+        self.assertEqual(warmup.errors, {})
+
+        for path in warmup.paths:
+            field, column = warmup.get_column(path)
+            self.assertTrue(np.array_equal(column,
+                                           lapdf.get(path)[field]))
+            self.assertIsNotNone(warmup.get_handle(path))
+        self.assertIsNone(warmup.get_column('/not/a/path'))
+
+    def test_read_with_warmup(self):
+        """Test reads are served from warmed columns"""
+        lapdf = File(self.f.filename)
+        data = lapdf.read_data(0, 0, shotnum=[2, 5, 9], silent=True)
+        cdata = lapdf.read_controls(['Waveform'], shotnum=slice(3, 20))
+
+        lapdf_w = File(self.f.filename, warmup=True)
+        self.assertIsInstance(lapdf_w.warmup, hdfWarmup)
+        lapdf_w.warmup.wait()
+
+        digi_map = lapdf_w.file_map.main_digitizer
+        dhname = digi_map.construct_header_dataset_name(0, 0,
+                                                        silent=True)
+        dheader = lapdf_w.get_digi_dataset(
+            digi_map.info['group path'] + '/' + dhname)
+        self.assertIsInstance(dheader, hdfShotnumDataset)
+
+        data_w = lapdf_w.read_data(0, 0, shotnum=[2, 5, 9],
+                                   silent=True)
+        cdata_w = lapdf_w.read_controls(['Waveform'],
+                                        shotnum=slice(3, 20))
+        self.assertTrue(np.array_equal(data['shotnum'],
+                                       data_w['shotnum']))
+        self.assertTrue(np.array_equal(data['signal'],
+                                       data_w['signal']))
+        self.assertTrue(np.array_equal(cdata, cdata_w))
+        lapdf_w.close()
+
+    def test_shotnum_dataset(self):
+        """Test hdfShotnumDataset indexing"""
+        lapdf = File(self.f.filename)
+        digi_map = lapdf.file_map.main_digitizer
+        dhname = digi_map.construct_header_dataset_name(0, 0,
+                                                        silent=True)
+        dheader = lapdf.get(digi_map.info['group path'] + '/' + dhname)
+        column = dheader['Shot']
+        wdset = hdfShotnumDataset(dheader, 'Shot', column)
+
+        self.assertEqual(wdset.shape, dheader.shape)
+        self.assertEqual(wdset.dtype, dheader.dtype)
+        self.assertEqual(wdset[0, 'Shot'], column[0])
+        self.assertTrue(np.array_equal(wdset[[-1, 0], 'Shot'],
+                                       column[[0, -1]]))
+        self.assertTrue(np.array_equal(wdset[2:10, 'Shot'],
+                                       column[2:10]))
+        self.assertTrue(np.array_equal(wdset['Shot'], column))
+
+        # other fields are read from the dataset
+        self.assertTrue(np.array_equal(wdset[0:3, 'Offset'],
+                                       dheader[0:3, 'Offset']))
+
+
+if __name__ == '__main__':
+    ut.main()
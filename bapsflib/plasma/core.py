@@ -13,9 +13,18 @@
 # TODO: add collision frequencies
 # TODO: add mean-free-paths
 #
-"""Core plasma paramters in (cgs)."""
+"""
+Core plasma paramters in (cgs).
+
+All parameter functions accept scalars or :mod:`numpy` arrays.  Array
+arguments are broadcast against each other (e.g. a magnetic field
+profile of shape :code:`(nz,)` against a density of shape
+:code:`(nshot, 1)`) and the result is an :class:`ArrayUnit`, scalar
+arguments give a :class:`FloatUnit`.
+"""
 
 import math
+import numpy as np
 
 from scipy import constants
 
@@ -68,6 +77,67 @@ class IntUnit(int):
         return self._unit
 
 
+class ArrayUnit(np.ndarray):
+    """
+    Template class for :mod:`numpy` arrays with a unit attribute.
+
+    Indexing and views keep the unit.  Arithmetic and other
+    :class:`numpy.ufunc` results are plain :class:`numpy.ndarray`
+    objects, since the unit of a result is not tracked.
+    """
+
+    def __new__(cls, value, cgs_unit):
+        """
+        :param value: values of the quantity
+        :type value: array_like
+        :param str cgs_unit: string representation of of cgs unit
+        :return: values of the quantity
+        :rtype: :class:`ArrayUnit`
+        """
+        obj = np.asarray(value, dtype=np.float64).view(cls)
+        obj._unit = cgs_unit
+        return obj
+
+    def __array_finalize__(self, obj):
+        if obj is None:
+            return
+        self._unit = getattr(obj, '_unit', None)
+
+    def __array_ufunc__(self, ufunc, method, *inputs, **kwargs):
+        # compute on plain ndarray views, results do not carry a unit
+        inputs = tuple(arg.view(np.ndarray)
+                       if isinstance(arg, ArrayUnit) else arg
+                       for arg in inputs)
+        if 'out' in kwargs:
+            kwargs['out'] = tuple(arg.view(np.ndarray)
+                                  if isinstance(arg, ArrayUnit) else arg
+                                  for arg in kwargs['out'])
+        return getattr(ufunc, method)(*inputs, **kwargs)
+
+    @property
+    def unit(self):
+        """units of quantity"""
+        return self._unit
+
+
+def with_unit(value, cgs_unit):
+    """
+    Attach a unit to a scalar or array value.
+
+    :param value: value of the quantity
+    :type value: float or array_like
+    :param str cgs_unit: string representation of of cgs unit
+    :return: :data:`value` with unit, :code:`None` if :data:`value`
+        is :code:`None`
+    :rtype: :class:`FloatUnit` or :class:`ArrayUnit`
+    """
+    if value is None:
+        return None
+    if np.ndim(value) == 0:
+        return FloatUnit(value, cgs_unit)
+    return ArrayUnit(value, cgs_unit)
+
+
 #: atomic mass unit (g)
 AMU = FloatUnit(1000.0 * constants.m_u, 'g')
 
@@ -102,7 +172,7 @@ def fce(Bo, **kwargs):
     .. note:: see function :func:`oce`
     """
     _fce = oce(Bo) / (2.0 * math.pi)
-    return FloatUnit(_fce, 'Hz')
+    return with_unit(_fce, 'Hz')
 
 
 def fci(Bo, m_i, Z, **kwargs):
@@ -121,7 +191,7 @@ def fci(Bo, m_i, Z, **kwargs):
     .. note:: see function :func:`oci`
     """
     _fci = oci(Bo, m_i, Z) / (2.0 * constants.pi)
-    return FloatUnit(_fci, 'Hz')
+    return with_unit(_fci, 'Hz')
 
 
 def fLH(Bo, m_i, n_i, Z, **kwargs):
@@ -139,7 +209,7 @@ def fLH(Bo, m_i, n_i, Z, **kwargs):
     .. note:: for details see function :func:`oLH`
     """
     _fLH = oLH(Bo, m_i, n_i, Z) / (2.0 * math.pi)
-    return FloatUnit(_fLH, 'Hz')
+    return with_unit(_fLH, 'Hz')
 
 
 def fpe(n_e, **kwargs):
@@ -156,7 +226,7 @@ def fpe(n_e, **kwargs):
     .. note:: see function :func:`ope`
     """
     _fpe = ope(n_e) / (2.0 * math.pi)
-    return FloatUnit(_fpe, 'Hz')
+    return with_unit(_fpe, 'Hz')
 
 
 def fpi(m_i, n_i, Z, **kwargs):
@@ -175,7 +245,7 @@ def fpi(m_i, n_i, Z, **kwargs):
     .. note:: see function :func:`opi`
     """
     _fpi = opi(m_i, n_i, Z) / (2.0 * math.pi)
-    return FloatUnit(_fpi, 'Hz')
+    return with_unit(_fpi, 'Hz')
 
 
 def fUH(Bo, n_e, **kwargs):
@@ -192,7 +262,7 @@ def fUH(Bo, n_e, **kwargs):
     .. note:: see function :func:`oUH`
     """
     _fUH = oUH(Bo, n_e) / (2.0 * math.pi)
-    return FloatUnit(_fUH, 'Hz')
+    return with_unit(_fUH, 'Hz')
 
 
 def oce(Bo, **kwargs):
@@ -206,7 +276,7 @@ def oce(Bo, **kwargs):
     :param float Bo: magnetic-field (in Gauss)
     """
     _oce = (-E * Bo) / (ME * C)
-    return FloatUnit(_oce, 'rad s^-1')
+    return with_unit(_oce, 'rad s^-1')
 
 
 def oci(Bo, m_i, Z, **kwargs):
@@ -222,7 +292,7 @@ def oci(Bo, m_i, Z, **kwargs):
     :param int Z: charge number
     """
     _oci = (Z * E * Bo) / (m_i * C)
-    return FloatUnit(_oci, 'rad s^-1')
+    return with_unit(_oci, 'rad s^-1')
 
 
 def oLH(Bo, m_i, n_i, Z, **kwargs):
@@ -252,9 +322,9 @@ def oLH(Bo, m_i, n_i, Z, **kwargs):
     _oce = oce(**_args)
     _oci = oci(**_args)
     first_term = 1.0 / ((_oci ** 2) + (_opi ** 2))
-    second_term = 1.0 / math.fabs(_oce * _oci)
-    _olh = math.sqrt(1.0 / (first_term + second_term))
-    return FloatUnit(_olh, 'rad s^-1')
+    second_term = 1.0 / np.abs(_oce * _oci)
+    _olh = np.sqrt(1.0 / (first_term + second_term))
+    return with_unit(_olh, 'rad s^-1')
 
 
 def ope(n_e, **kwargs):
@@ -267,8 +337,8 @@ def ope(n_e, **kwargs):
 
     :param float n_e: electron number density (in :math:`cm^{-3}`)
     """
-    _ope = math.sqrt(4 * math.pi * n_e * E * E / ME)
-    return FloatUnit(_ope, 'rad s^-1')
+    _ope = np.sqrt(4 * math.pi * n_e * E * E / ME)
+    return with_unit(_ope, 'rad s^-1')
 
 
 def opi(m_i, n_i, Z, **kwargs):
@@ -283,8 +353,8 @@ def opi(m_i, n_i, Z, **kwargs):
     :param float n_i: ion number density (in :math:`cm^{-3}`)
     :param int Z: ion charge number
     """
-    _opi = math.sqrt(4 * math.pi * n_i * (Z * E) * (Z * E) / m_i)
-    return FloatUnit(_opi, 'rad s^-1')
+    _opi = np.sqrt(4 * math.pi * n_i * (Z * E) * (Z * E) / m_i)
+    return with_unit(_opi, 'rad s^-1')
 
 
 def oUH(Bo, n_e, **kwargs):
@@ -300,8 +370,8 @@ def oUH(Bo, n_e, **kwargs):
     """
     _ope = ope(n_e)
     _oce = oce(Bo)
-    _ouh = math.sqrt((_ope ** 2) + (_oce ** 2))
-    return FloatUnit(_ouh, 'rad s^-1')
+    _ouh = np.sqrt((_ope ** 2) + (_oce ** 2))
+    return with_unit(_ouh, 'rad s^-1')
 
 
 # ---- length constants ----
@@ -317,8 +387,8 @@ def lD(kT, n, **kwargs):
     :param float n: number density (in :math:`cm^{-3}`)
     """
     kT = kT * constants.e * 1.e7  # eV to ergs
-    _lD = math.sqrt(kT / (4.0 * math.pi * n)) / E
-    return FloatUnit(_lD, 'cm')
+    _lD = np.sqrt(kT / (4.0 * math.pi * n)) / E
+    return with_unit(_lD, 'cm')
 
 
 def lpe(n_e, **kwargs):
@@ -334,7 +404,7 @@ def lpe(n_e, **kwargs):
     .. note:: see function :func:`ope`
     """
     _lpe = C / ope(n_e)
-    return FloatUnit(_lpe, 'cm')
+    return with_unit(_lpe, 'cm')
 
 
 def lpi(m_i, n_i, Z, **kwargs):
@@ -352,7 +422,7 @@ def lpi(m_i, n_i, Z, **kwargs):
     .. note:: see function :func:`opi`
     """
     _lpi = C / opi(m_i, n_i, Z)
-    return FloatUnit(_lpi, 'cm')
+    return with_unit(_lpi, 'cm')
 
 
 def rce(Bo, kTe, **kwargs):
@@ -369,7 +439,7 @@ def rce(Bo, kTe, **kwargs):
     .. note:: see functions :func:`vTe` and :func:`oce`
     """
     _rce = vTe(kTe) / abs(oce(Bo))
-    return FloatUnit(_rce, 'cm')
+    return with_unit(_rce, 'cm')
 
 
 def rci(Bo, kTi, m_i, Z, **kwargs):
@@ -388,7 +458,7 @@ def rci(Bo, kTi, m_i, Z, **kwargs):
     .. note:: see functions :func:`vTi` and :func:`oci`
     """
     _rci = vTi(kTi, m_i) / oci(Bo, m_i, Z)
-    return FloatUnit(_rci, 'cm')
+    return with_unit(_rci, 'cm')
 
 
 # ---- velocity constants ----
@@ -412,8 +482,8 @@ def cs(kTe, m_i, Z, gamma=1.0, **kwargs):
     """
     # TODO: double check adiabatic index default value
     kTe = kTe * constants.e * 1.e7 # eV to ergs
-    _cs = math.sqrt(gamma * Z * kTe / m_i)
-    return FloatUnit(_cs, 'cm s^-1')
+    _cs = np.sqrt(gamma * Z * kTe / m_i)
+    return with_unit(_cs, 'cm s^-1')
 
 
 def VA(Bo, m_i, n_i, **kwargs):
@@ -428,8 +498,8 @@ def VA(Bo, m_i, n_i, **kwargs):
     :param float m_i: ion mass (in g)
     :param float n_i: ion number density (in :math:`cm^{-3}`)
     """
-    _VA = Bo / math.sqrt(4.0 * math.pi * n_i * m_i)
-    return FloatUnit(_VA, 'cm s^-1')
+    _VA = Bo / np.sqrt(4.0 * math.pi * n_i * m_i)
+    return with_unit(_VA, 'cm s^-1')
 
 
 def vTe(kTe, **kwargs):
@@ -443,8 +513,8 @@ def vTe(kTe, **kwargs):
     :param float kTe: electron temperature (in eV)
     """
     kTe = kTe * constants.e * 1.e7  # eV to erg
-    _vTe = math.sqrt(kTe / ME)
-    return FloatUnit(_vTe, 'cm s^-1')
+    _vTe = np.sqrt(kTe / ME)
+    return with_unit(_vTe, 'cm s^-1')
 
 
 def vTi(kTi, m_i, **kwargs):
@@ -459,5 +529,5 @@ def vTi(kTi, m_i, **kwargs):
     :param float m_i: ion mass (in g)
     """
     kTi = kTi * constants.e * 1.e7 # eV to erg
-    _vTi = math.sqrt(kTi / m_i)
-    return FloatUnit(_vTi, 'cm s^-1')
\ No newline at end of file
+    _vTi = np.sqrt(kTi / m_i)
+    return with_unit(_vTi, 'cm s^-1')
\ No newline at end of file
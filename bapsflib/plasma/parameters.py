@@ -0,0 +1,177 @@
+# This file is part of the bapsflib package, a Python toolkit for the
+# BaPSF group at UCLA.
+#
+# http://plasma.physics.ucla.edu/
+#
+# Copyright 2017-2018 Erik T. Everson and contributors
+#
+# License: Standard 3-clause BSD; see "LICENSES/LICENSE.txt" for full
+#   license terms and contributor agreement.
+#
+"""Lazily evaluated plasma parameter dictionary."""
+
+import inspect
+
+from . import core
+
+#: units of the base (input) plasma values
+BASE_UNITS = {
+    'Bo': 'G',
+    'gamma': 'arb',
+    'kT': 'eV',
+    'kTe': 'eV',
+    'kTi': 'eV',
+    'm_e': 'g',
+    'm_i': 'g',
+    'n': 'cm^-3',
+    'n_e': 'cm^-3',
+    'n_i': 'cm^-3',
+    'Z': 'arb',
+}
+
+#: calculated plasma values and the :mod:`~bapsflib.plasma.core`
+#: function calculating them
+DERIVED = {
+    # frequencies
+    'fce': core.fce,
+    'fci': core.fci,
+    'fpe': core.fpe,
+    'fpi': core.fpi,
+    'fUH': core.fUH,
+    'fLH': core.fLH,
+
+    # lengths
+    'lD': core.lD,
+    'lpe': core.lpe,
+    'lpi': core.lpi,
+    'rce': core.rce,
+    'rci': core.rci,
+
+    # velocities
+    'cs': core.cs,
+    'VA': core.VA,
+    'vTe': core.vTe,
+    'vTi': core.vTi,
+}
+
+
+def _inputs(func):
+    """Base values :data:`func` is calculated from."""
+    return tuple(name for name, param
+                 in inspect.signature(func).parameters.items()
+                 if param.kind == param.POSITIONAL_OR_KEYWORD)
+
+
+#: base values each calculated value depends on
+DEPENDS = {name: _inputs(func) for name, func in DERIVED.items()}
+
+
+class PlasmaParameters(dict):
+    """
+    Dictionary of plasma parameters.  (All quantities are in cgs
+    units except temperature is in eV)
+
+    Base values (see :data:`BASE_UNITS`) are set like any dictionary
+    item and are given their unit on assignment.  Calculated values
+    (see :data:`DERIVED`) are evaluated on first access and cached
+    until one of the base values they depend on changes, so
+    re-defining a base value costs nothing until a dependent value is
+    requested.
+
+    Base values may be scalars or :mod:`numpy` arrays, calculated
+    values then broadcast over the arrays (see
+    :mod:`bapsflib.plasma.core`).
+
+    .. note::
+
+        A calculated value is only a key of the dictionary (e.g. when
+        iterating) after it has been evaluated, use :meth:`evaluate`
+        to evaluate all of them.
+
+    :Example:
+
+        >>> import numpy as np
+        >>> from bapsflib.plasma.core import AMU
+        >>> params = PlasmaParameters(Bo=np.linspace(500., 2000., 4),
+        ...                           kTe=5.0, kTi=1.0, m_i=4 * AMU,
+        ...                           n_e=1e12, Z=1)
+        >>> params['fci'].shape
+        (4,)
+    """
+
+    def __init__(self, **kwargs):
+        """
+        :param kwargs: base values (see :data:`BASE_UNITS`)
+        """
+        super().__init__()
+        for key in BASE_UNITS:
+            dict.__setitem__(self, key, None)
+        dict.__setitem__(self, 'gamma', core.FloatUnit(1.0, 'arb'))
+        dict.__setitem__(self, 'm_e', core.ME)
+        for key, val in kwargs.items():
+            self[key] = val
+
+    def __setitem__(self, key, value):
+        if key in DERIVED:
+            raise ValueError(
+                "'{}' is calculated from the base values and can not "
+                "be set".format(key))
+        if key in BASE_UNITS:
+            value = core.with_unit(value, BASE_UNITS[key])
+
+            # drop cached values calculated from the old value
+            for name, depends in DEPENDS.items():
+                if key in depends:
+                    self.pop(name, None)
+        dict.__setitem__(self, key, value)
+
+    def __missing__(self, key):
+        if key not in DERIVED:
+            raise KeyError(key)
+        inputs = {name: dict.__getitem__(self, name)
+                  for name in DEPENDS[key]
+                  if dict.__contains__(self, name)}
+        missing = [name for name in DEPENDS[key]
+                   if inputs.get(name, None) is None]
+        if len(missing) != 0:
+            raise KeyError(
+                "'{}' needs base value(s) {}".format(key, missing))
+        value = DERIVED[key](**inputs)
+        dict.__setitem__(self, key, value)
+        return value
+
+    def __contains__(self, key):
+        if key in DERIVED:
+            return self.get(key, None) is not None
+        return dict.__contains__(self, key)
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def update(self, *args, **kwargs):
+        for key, val in dict(*args, **kwargs).items():
+            self[key] = val
+
+    def copy(self):
+        """
+        :return: shallow copy, including the cached calculated values
+        :rtype: :class:`PlasmaParameters`
+        """
+        new = PlasmaParameters()
+        for key, val in self.items():
+            dict.__setitem__(new, key, val)
+        return new
+
+    def evaluate(self):
+        """
+        Evaluate all calculated values whose base values are defined.
+
+        :return: self
+        :rtype: :class:`PlasmaParameters`
+        """
+        for key in DERIVED:
+            self.get(key)
+        return self
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# This file is part of the bapsflib package, a Python toolkit for the
+# BaPSF group at UCLA.
+#
+# http://plasma.physics.ucla.edu/
+#
+# Copyright 2017-2018 Erik T. Everson and contributors
+#
+# License: Standard 3-clause BSD; see "LICENSES/LICENSE.txt" for full
+#   license terms and contributor agreement.
+#
+import numpy as np
+import unittest as ut
+
+from .. import core
+from ..parameters import (DERIVED, PlasmaParameters)
+
+
+class TestArrayCore(ut.TestCase):
+    """Test Case for array arguments of the core functions"""
+
+    def test_broadcast(self):
+        """Test array results against scalar results"""
+        Bo = np.linspace(500.0, 2000.0, 5)
+        n = np.array([[1e11], [1e12], [5e12]])
+        args = {'Bo': Bo, 'kT': 2.0, 'kTe': 5.0, 'kTi': 1.0,
+                'm_i': 4.0 * core.AMU, 'n': n, 'n_e': n, 'n_i': n,
+                'Z': 1}
+        for name, func in DERIVED.items():
+            val = func(**args)
+            self.assertIsInstance(val, (core.ArrayUnit, core.FloatUnit))
+            sargs = dict(args, Bo=Bo[3], n=n[1, 0], n_e=n[1, 0],
+                         n_i=n[1, 0])
+            expected = func(**sargs)
+            self.assertIsInstance(expected, core.FloatUnit)
+            self.assertEqual(val.unit, expected.unit)
+            self.assertAlmostEqual(
+                float(np.broadcast_to(val, (3, 5))[1, 3]) / expected,
+                1.0, places=12)
+
+    def test_array_unit(self):
+        """Test the ArrayUnit container"""
+        val = core.ArrayUnit([1.0, 2.0, 3.0], 'G')
+        self.assertEqual(val.unit, 'G')
+        self.assertEqual(val[1:].unit, 'G')
+        self.assertNotIsInstance(val * 2.0, core.ArrayUnit)
+        self.assertIsInstance(core.with_unit(2.0, 'G'), core.FloatUnit)
+        self.assertIsInstance(core.with_unit([2.0], 'G'),
+                              core.ArrayUnit)
+        self.assertIsNone(core.with_unit(None, 'G'))
+
+
+class TestPlasmaParameters(ut.TestCase):
+    """Test Case for PlasmaParameters"""
+
+    def setUp(self):
+        self.params = PlasmaParameters(
+            Bo=np.linspace(500.0, 2000.0, 4), kT=5.0, kTe=5.0, kTi=1.0,
+            m_i=4.0 * core.AMU, n=1e12, n_e=1e12, n_i=1e12, Z=1)
+
+    def test_lazy(self):
+        """Test lazy evaluation and invalidation"""
+        params = self.params
+        self.assertNotIn('fci', dict(params))
+        fci = params['fci']
+        self.assertIs(params['fci'], fci)
+        self.assertEqual(fci.unit, 'Hz')
+        self.assertEqual(params['Bo'].unit, 'G')
+
+        # only values depending on 'Bo' are dropped
+        fpe = params['fpe']
+        params['Bo'] = 1000.0
+        self.assertNotIn('fci', dict(params))
+        self.assertIs(params['fpe'], fpe)
+        self.assertIsInstance(params['fci'], core.FloatUnit)
+        self.assertAlmostEqual(params['fci'] / fci[1], 1.0, places=12)
+
+        params.evaluate()
+        self.assertTrue(set(DERIVED).issubset(set(params)))
+
+    def test_missing(self):
+        """Test undefined base values"""
+        params = PlasmaParameters(n_e=1e12)
+        self.assertIn('fpe', params)
+        self.assertNotIn('fce', params)
+        self.assertIsNone(params.get('fce'))
+        self.assertRaises(KeyError, params.__getitem__, 'fce')
+        self.assertRaises(KeyError, params.__getitem__, 'nothing')
+        self.assertRaises(ValueError, params.__setitem__, 'fce', 1.0)
+        self.assertEqual(params['gamma'], 1.0)
+        self.assertEqual(params['m_e'], core.ME)
+
+
+if __name__ == '__main__':
+    ut.main()
@@ -0,0 +1,26 @@
+# This file is part of the bapsflib package, a Python toolkit for the
+# BaPSF group at UCLA.
+#
+# http://plasma.physics.ucla.edu/
+#
+# Copyright 2017-2018 Erik T. Everson and contributors
+#
+# License: Standard 3-clause BSD; see "LICENSES/LICENSE.txt" for full
+#   license terms and contributor agreement.
+#
+"""
+Performance benchmarks of :mod:`bapsflib.lapdhdf` run with
+`airspeed velocity <https://asv.readthedocs.io>`_.
+
+Run the suite against the current checkout with::
+
+    asv run
+
+compare two versions with::
+
+    asv continuous master HEAD
+
+and browse the stored results with :code:`asv publish` and
+:code:`asv preview`.  Results are kept in :code:`.asv/results` (see
+:code:`asv.conf.json`).
+"""
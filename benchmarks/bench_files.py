@@ -0,0 +1,44 @@
+# This file is part of the bapsflib package, a Python toolkit for the
+# BaPSF group at UCLA.
+#
+# http://plasma.physics.ucla.edu/
+#
+# Copyright 2017-2018 Erik T. Everson and contributors
+#
+# License: Standard 3-clause BSD; see "LICENSES/LICENSE.txt" for full
+#   license terms and contributor agreement.
+#
+"""
+Benchmarks of opening and mapping files.
+"""
+from .common import (open_file, synthetic_file)
+
+
+class TimeFileOpen(object):
+    """Time opening (checking and mapping) a file."""
+    params = ([100, 10000], [1, 8])
+    param_names = ['nshots', 'nchannels']
+
+    def setup(self, nshots, nchannels):
+        self.path = synthetic_file(nshots=nshots, nt=256,
+                                   nchannels=nchannels)
+        self.owner = open_file(self.path)
+
+    def teardown(self, nshots, nchannels):
+        self.owner.close()
+
+    def time_open(self, nshots, nchannels):
+        """open, check, and map the file"""
+        open_file(self.path).close()
+
+    def time_open_with_map(self, nshots, nchannels):
+        """open the file re-using an existing mapping"""
+        open_file(self.path, file_map=self.owner.file_map).close()
+
+    def time_inventory(self, nshots, nchannels):
+        """build the file inventory"""
+        f = open_file(self.path)
+        try:
+            f.inventory
+        finally:
+            f.close()
@@ -0,0 +1,83 @@
+# This file is part of the bapsflib package, a Python toolkit for the
+# BaPSF group at UCLA.
+#
+# http://plasma.physics.ucla.edu/
+#
+# Copyright 2017-2018 Erik T. Everson and contributors
+#
+# License: Standard 3-clause BSD; see "LICENSES/LICENSE.txt" for full
+#   license terms and contributor agreement.
+#
+"""
+Benchmarks of control device reads (:meth:`File.read_controls`).
+"""
+import numpy as np
+
+from bapsflib.lapdhdf.hdfreadcontrol import (
+    condition_controls, condition_shotnum_list_simple)
+
+from .common import (open_file, shot_selection, synthetic_file)
+
+
+class TimeReadControls(object):
+    """
+    Time :meth:`read_controls` of one and two control devices with the
+    intersection and the union of their shot numbers.
+    """
+    params = ([1000, 10000, 100000], [True, False])
+    param_names = ['nshots', 'intersection_set']
+
+    def setup(self, nshots, intersection_set):
+        path = synthetic_file(nshots=nshots, nt=16)
+        self.f = open_file(path)
+
+    def teardown(self, nshots, intersection_set):
+        self.f.close()
+
+    def time_one_control(self, nshots, intersection_set):
+        """read a '6K Compumotor'"""
+        self.f.read_controls(['6K Compumotor'],
+                             intersection_set=intersection_set,
+                             silent=True)
+
+    def time_two_controls(self, nshots, intersection_set):
+        """read a '6K Compumotor' and a 'Waveform'"""
+        self.f.read_controls(['6K Compumotor', 'Waveform'],
+                             intersection_set=intersection_set,
+                             silent=True)
+
+
+class TimeShotConditioning(object):
+    """Time the conditioning of :data:`shotnum` requests."""
+    params = ([1000, 100000], ['contiguous', 'sparse', 'random'])
+    param_names = ['nshots', 'selection']
+
+    def setup(self, nshots, selection):
+        path = synthetic_file(nshots=nshots, nt=16)
+        self.f = open_file(path)
+        self.shotnum = shot_selection(selection, nshots)
+        if isinstance(self.shotnum, slice):
+            self.shotnum = list(range(self.shotnum.start,
+                                      self.shotnum.stop))
+        self.shotnum = np.array(self.shotnum, dtype=np.uint32)
+
+        cname, cspec = condition_controls(self.f, ['6K Compumotor'],
+                                          silent=True)[0]
+        cmap = self.f.file_map.controls[cname]
+        dname, self.shotnumkey = cmap.resolve_dataset(cspec)
+        self.dset = self.f.get_control_dataset(
+            cmap.info['group path'] + '/' + dname)
+
+    def teardown(self, nshots, selection):
+        self.f.close()
+
+    def time_condition_shotnum(self, nshots, selection):
+        """resolve the requested shots to dataset rows"""
+        condition_shotnum_list_simple(self.shotnum, self.dset,
+                                      self.shotnumkey)
+
+    def time_read_selection(self, nshots, selection):
+        """read the requested shots of a '6K Compumotor'"""
+        self.f.read_controls(['6K Compumotor'],
+                             shotnum=self.shotnum.tolist(),
+                             silent=True)
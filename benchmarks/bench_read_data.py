@@ -0,0 +1,123 @@
+# This file is part of the bapsflib package, a Python toolkit for the
+# BaPSF group at UCLA.
+#
+# http://plasma.physics.ucla.edu/
+#
+# Copyright 2017-2018 Erik T. Everson and contributors
+#
+# License: Standard 3-clause BSD; see "LICENSES/LICENSE.txt" for full
+#   license terms and contributor agreement.
+#
+"""
+Benchmarks of digitizer reads (:meth:`File.read_data`).
+"""
+from .common import (open_file, shot_selection, synthetic_file)
+
+
+class TimeReadData(object):
+    """
+    Time :meth:`read_data` for contiguous, sparse, and random shot
+    selections (10% of the shots) across storage layouts.
+    """
+    params = (['contiguous', 'sparse', 'random'],
+              ['contiguous', 'chunked', 'gzip'],
+              [1000, 10000])
+    param_names = ['selection', 'storage', 'nshots']
+
+    def setup(self, selection, storage, nshots):
+        path = synthetic_file(nshots=nshots, nt=2048, storage=storage,
+                              controls=False)
+        self.f = open_file(path)
+        self.shotnum = shot_selection(selection, nshots)
+
+    def teardown(self, selection, storage, nshots):
+        self.f.close()
+
+    def time_read_data(self, selection, storage, nshots):
+        """read the selected shots"""
+        self.f.read_data(0, 0, shotnum=self.shotnum, silent=True)
+
+    def peakmem_read_data(self, selection, storage, nshots):
+        """peak memory of reading the selected shots"""
+        self.f.read_data(0, 0, shotnum=self.shotnum, silent=True)
+
+    def track_hdf5_calls(self, selection, storage, nshots):
+        """number of HDF5 read calls of the read"""
+        data = self.f.read_data(0, 0, shotnum=self.shotnum,
+                                silent=True)
+        return data.metrics.hdf5_calls
+
+    track_hdf5_calls.unit = 'calls'
+
+
+class TimeReadSamples(object):
+    """Time full-channel reads as the number of samples grows."""
+    params = ([1024, 16384], ['contiguous', 'gzip'])
+    param_names = ['nt', 'storage']
+
+    def setup(self, nt, storage):
+        path = synthetic_file(nshots=500, nt=nt, storage=storage,
+                              controls=False)
+        self.f = open_file(path)
+
+    def teardown(self, nt, storage):
+        self.f.close()
+
+    def time_read_all(self, nt, storage):
+        """read every shot of the channel"""
+        self.f.read_data(0, 0, silent=True)
+
+    def time_read_index(self, nt, storage):
+        """read a row slice by index"""
+        self.f.read_data(0, 0, index=slice(100, 300), silent=True)
+
+
+class TimeReadChannels(object):
+    """Time reading every active channel of a digitizer."""
+    params = [1, 8, 32]
+    param_names = ['nchannels']
+
+    def setup(self, nchannels):
+        path = synthetic_file(nshots=500, nt=2048, nchannels=nchannels,
+                              storage='chunked', controls=False)
+        self.f = open_file(path)
+        self.channels = [(brd, ch)
+                         for brd in range(13) for ch in range(8)
+                         ][:nchannels]
+
+    def teardown(self, nchannels):
+        self.f.close()
+
+    def time_read_channels(self, nchannels):
+        """one read_data call per channel"""
+        for brd, ch in self.channels:
+            self.f.read_data(brd, ch, shotnum=slice(1, 251),
+                             silent=True)
+
+
+class TimeReadDataControls(object):
+    """Time mating digitizer data with control device data."""
+    params = ([1000, 10000], [True, False])
+    param_names = ['nshots', 'intersection_set']
+
+    def setup(self, nshots, intersection_set):
+        path = synthetic_file(nshots=nshots, nt=512)
+        self.f = open_file(path)
+        self.shotnum = shot_selection('random', nshots)
+
+    def teardown(self, nshots, intersection_set):
+        self.f.close()
+
+    def time_one_control(self, nshots, intersection_set):
+        """mate with a '6K Compumotor'"""
+        self.f.read_data(0, 0, shotnum=self.shotnum,
+                         add_controls=['6K Compumotor'],
+                         intersection_set=intersection_set,
+                         silent=True)
+
+    def time_two_controls(self, nshots, intersection_set):
+        """mate with a '6K Compumotor' and a 'Waveform'"""
+        self.f.read_data(0, 0, shotnum=self.shotnum,
+                         add_controls=['6K Compumotor', 'Waveform'],
+                         intersection_set=intersection_set,
+                         silent=True)
@@ -0,0 +1,160 @@
+# This file is part of the bapsflib package, a Python toolkit for the
+# BaPSF group at UCLA.
+#
+# http://plasma.physics.ucla.edu/
+#
+# Copyright 2017-2018 Erik T. Everson and contributors
+#
+# License: Standard 3-clause BSD; see "LICENSES/LICENSE.txt" for full
+#   license terms and contributor agreement.
+#
+"""
+Synthetic LaPD files for the benchmarks.
+"""
+import atexit
+import contextlib
+import h5py
+import io
+import numpy as np
+import os
+import tempfile
+
+from bapsflib.lapdhdf import File
+from bapsflib.lapdhdf.tests import FauxHDFBuilder
+
+# seed of all generated data and shot selections
+SEED = 20180101
+
+# storage layouts of the digitizer datasets
+#   name -> keywords for h5py.Group.create_dataset
+STORAGE = {'contiguous': {},
+           'chunked': {'chunks': True},
+           'gzip': {'chunks': True, 'compression': 'gzip',
+                    'compression_opts': 4}}
+
+# number of shots per chunk of chunked digitizer datasets
+CHUNK_ROWS = 16
+
+# files built by this process, spec -> path
+_FILES = {}
+_TEMPDIR = None
+
+
+def synthetic_file(nshots=1000, nt=2048, nchannels=1,
+                   storage='contiguous', controls=True):
+    """
+    Path to a synthetic LaPD file (built on first request and re-used
+    for the lifetime of the process).
+
+    The file holds an 'SIS 3301' digitizer with :data:`nchannels`
+    active channels of :data:`nshots` shots and :data:`nt` samples,
+    and (if :data:`controls`) a '6K Compumotor' recording every shot
+    and a 'Waveform' recording every other shot.
+
+    :param int nshots: number of shots
+    :param int nt: number of samples per shot
+    :param int nchannels: number of active digitizer channels
+    :param str storage: storage layout of the digitizer datasets, a
+        key of :data:`STORAGE`
+    :param bool controls: :code:`True` adds the control devices
+    :return: path of the HDF5 file
+    :rtype: str
+    """
+    global _TEMPDIR
+
+    spec = (nshots, nt, nchannels, storage, controls)
+    if spec in _FILES:
+        return _FILES[spec]
+    if storage not in STORAGE:
+        raise ValueError('unknown storage {}'.format(storage))
+
+    if _TEMPDIR is None:
+        _TEMPDIR = tempfile.TemporaryDirectory(prefix='bapsf-bench_')
+        atexit.register(_TEMPDIR.cleanup)
+    path = os.path.join(
+        _TEMPDIR.name,
+        'bench_{}_{}_{}_{}_{}.hdf5'.format(*spec))
+
+    modules = {'SIS 3301': {'n_configs': 1, 'sn_size': nshots,
+                            'nt': nt}}
+    if controls:
+        modules['6K Compumotor'] = {'n_configs': 1, 'sn_size': nshots}
+        modules['Waveform'] = {'n_configs': 1,
+                               'sn_size': max(nshots // 2, 1)}
+    fbuilder = FauxHDFBuilder(name=path, add_modules=modules)
+    try:
+        sis = fbuilder.modules['SIS 3301']
+        brdch = np.zeros_like(sis.knobs.active_brdch)
+        brdch.flat[:nchannels] = True
+        sis.knobs.active_brdch = brdch
+        _fill_digitizer(sis, STORAGE[storage])
+    finally:
+        fbuilder.close()
+
+    _FILES[spec] = path
+    return path
+
+
+def _fill_digitizer(group, create_kw):
+    """
+    Rewrite the digitizer datasets of :data:`group` with deterministic
+    noisy signals (so compression ratios are realistic) using the
+    dataset keywords :data:`create_kw`.  Data is written in blocks of
+    shots to bound memory.
+    """
+    rng = np.random.RandomState(SEED)
+    for name in list(group.keys()):
+        dset = group[name]
+        if isinstance(dset, h5py.Dataset) \
+                and dset.dtype.names is None:
+            shape = dset.shape
+            del group[name]
+            kw = dict(create_kw)
+            if kw.get('chunks', None) is True:
+                kw['chunks'] = (min(CHUNK_ROWS, shape[0]), shape[1])
+            new = group.create_dataset(name, shape=shape,
+                                       dtype=np.int16, **kw)
+
+            tt = np.arange(shape[1])
+            base = (2000. * np.sin(2. * np.pi * tt / 256.)).astype(
+                np.int16)
+            block = max(1, 2 ** 22 // (2 * shape[1]))
+            for start in range(0, shape[0], block):
+                stop = min(start + block, shape[0])
+                noise = rng.randint(-64, 64, size=(stop - start,
+                                                   shape[1]))
+                new[start:stop] = base + noise.astype(np.int16)
+
+
+def shot_selection(kind, nshots, fraction=0.1):
+    """
+    Shot numbers of a selection of :data:`kind`.
+
+    :param str kind: :code:`'contiguous'` (a slice of consecutive
+        shots), :code:`'sparse'` (every n-th shot), or
+        :code:`'random'` (a seeded random sample)
+    :param int nshots: number of shots in the file
+    :param float fraction: fraction of the shots selected
+    :rtype: slice or list(int)
+    """
+    nsel = max(int(nshots * fraction), 1)
+    if kind == 'contiguous':
+        start = (nshots - nsel) // 2 + 1
+        return slice(start, start + nsel)
+    elif kind == 'sparse':
+        step = max(nshots // nsel, 1)
+        return list(range(1, nshots + 1, step))[:nsel]
+    elif kind == 'random':
+        rng = np.random.RandomState(SEED)
+        return sorted(rng.choice(np.arange(1, nshots + 1), size=nsel,
+                                 replace=False).tolist())
+    raise ValueError('unknown selection {}'.format(kind))
+
+
+def open_file(path, **kwargs):
+    """
+    Open :data:`path` as a :class:`~bapsflib.lapdhdf.files.File`
+    without printing the file report.
+    """
+    with contextlib.redirect_stdout(io.StringIO()):
+        return File(path, **kwargs)
@@ -32,7 +32,7 @@ setup(
     url='https://github.com/rocco8773/bapsflib.git#egg=bapsflib',
     author='Erik T. Everson',
     author_email='eteveson@gmail.com',
-    packages=find_packages(),
+    packages=find_packages(exclude=['benchmarks', 'benchmarks.*']),
     install_requires=['h5py>=2.6', 'numpy>=1.7'],
     python_requires='>=3.5',
     zip_safe=False,